@@ -0,0 +1,223 @@
+import csv
+import io
+from datetime import datetime
+
+from apps.features.compute import FEATURE_KEYS
+from apps.market.archive import iter_range_rows
+from apps.market.symbols import default_symbol
+from apps.predictions.models import PricePrediction
+
+# Rows are pulled through ``QuerySet.iterator(chunk_size=...)`` which uses a
+# server-side cursor on Postgres, so memory stays flat no matter how long the
+# requested window is.  Candles, features and scores go through
+# ``iter_range_rows``, which reads months moved to cold storage one at a time
+# before the live table.  Writers flush once per chunk.
+DEFAULT_CHUNK_SIZE = 2000
+
+EXPORT_FORMATS = ('csv', 'parquet', 'arrow')
+
+OHLC_COLUMNS = ('ts', 'open', 'high', 'low', 'close', 'volume', 'source')
+SCORE_COLUMNS = (
+    'ts',
+    'price_action_score',
+    'volume_score',
+    'news_score',
+    'announcements_score',
+    'regime_score',
+    'overall_score',
+)
+
+
+class ExportError(Exception):
+    pass
+
+
+def _ohlc_rows(start_ts, end_ts, symbol, chunk_size):
+    return iter_range_rows('market_ohlc1m', start_ts, end_ts, OHLC_COLUMNS, symbol=symbol, chunk_size=chunk_size)
+
+
+def _features_rows(start_ts, end_ts, symbol, chunk_size):
+    return iter_range_rows(
+        'features_feature1m', start_ts, end_ts, ('ts', *FEATURE_KEYS), symbol=symbol, chunk_size=chunk_size
+    )
+
+
+def _scores_rows(start_ts, end_ts, symbol, chunk_size):
+    return iter_range_rows('features_signalscore', start_ts, end_ts, SCORE_COLUMNS, symbol=symbol, chunk_size=chunk_size)
+
+
+def _predictions_rows(start_ts, end_ts, symbol, chunk_size):
+    return PricePrediction.objects.filter(symbol=symbol, ts__gte=start_ts, ts__lte=end_ts).order_by(
+        'ts', 'horizon_min'
+    ).values_list(
+        'ts',
+        'horizon_min',
+        'predicted_return',
+        'predicted_price',
+        'last_close',
+        'model_name',
+        'confidence',
+    ).iterator(chunk_size=chunk_size)
+
+
+def _feature_kind(key):
+    if key == 'regime_label':
+        return 'str'
+    if key == 'insufficient_history':
+        return 'bool'
+    return 'float'
+
+
+# Column name -> logical type, used for explicit Arrow schemas so an all-NULL
+# chunk can never change the inferred type mid-stream.
+DATASETS = {
+    'ohlc': {
+        'rows': _ohlc_rows,
+        'columns': [
+            ('ts', 'ts'),
+            ('open', 'float'),
+            ('high', 'float'),
+            ('low', 'float'),
+            ('close', 'float'),
+            ('volume', 'float'),
+            ('source', 'str'),
+        ],
+        'row': None,
+    },
+    'features': {
+        'rows': _features_rows,
+        'columns': [('ts', 'ts'), *((key, _feature_kind(key)) for key in FEATURE_KEYS)],
+        'row': None,
+    },
+    'scores': {
+        'rows': _scores_rows,
+        'columns': [
+            ('ts', 'ts'),
+            ('price_action_score', 'int'),
+            ('volume_score', 'int'),
+            ('news_score', 'int'),
+            ('announcements_score', 'int'),
+            ('regime_score', 'int'),
+            ('overall_score', 'int'),
+        ],
+        'row': None,
+    },
+    'predictions': {
+        'rows': _predictions_rows,
+        'columns': [
+            ('ts', 'ts'),
+            ('horizon_min', 'int'),
+            ('predicted_return', 'float'),
+            ('predicted_price', 'float'),
+            ('last_close', 'float'),
+            ('model_name', 'str'),
+            ('confidence', 'float'),
+        ],
+        'row': None,
+    },
+}
+
+
+def _get_dataset(name):
+    dataset = DATASETS.get(name)
+    if dataset is None:
+        raise ExportError(f"unknown dataset: {name}")
+    return dataset
+
+
+def export_columns(name):
+    return [column for column, _kind in _get_dataset(name)['columns']]
+
+
+def iter_row_chunks(name, start_ts, end_ts, chunk_size=DEFAULT_CHUNK_SIZE, symbol=None):
+    """Yield lists of at most ``chunk_size`` row tuples for a dataset."""
+    dataset = _get_dataset(name)
+    transform = dataset['row']
+    chunk = []
+    for row in dataset['rows'](start_ts, end_ts, symbol or default_symbol(), chunk_size):
+        chunk.append(transform(row) if transform else row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def iter_csv(name, start_ts, end_ts, chunk_size=DEFAULT_CHUNK_SIZE, symbol=None):
+    """Yield CSV text, one header block then one block per row chunk."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(export_columns(name))
+    yield buffer.getvalue()
+
+    for chunk in iter_row_chunks(name, start_ts, end_ts, chunk_size=chunk_size, symbol=symbol):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_value(value) for value in row] for row in chunk)
+        yield buffer.getvalue()
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ExportError('pyarrow is required for parquet/arrow exports')
+    return pyarrow
+
+
+def _arrow_schema(pa, name):
+    types = {
+        'ts': pa.timestamp('us', tz='UTC'),
+        'float': pa.float64(),
+        'int': pa.int64(),
+        'str': pa.string(),
+        'bool': pa.bool_(),
+    }
+    return pa.schema([(column, types[kind]) for column, kind in _get_dataset(name)['columns']])
+
+
+def _arrow_batches(pa, schema, name, start_ts, end_ts, chunk_size, symbol):
+    for chunk in iter_row_chunks(name, start_ts, end_ts, chunk_size=chunk_size, symbol=symbol):
+        arrays = [
+            pa.array([row[idx] for row in chunk], type=field.type)
+            for idx, field in enumerate(schema)
+        ]
+        yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def iter_arrow(name, start_ts, end_ts, chunk_size=DEFAULT_CHUNK_SIZE, symbol=None):
+    """Yield an Arrow IPC stream as bytes, one record batch per chunk."""
+    pa = _require_pyarrow()
+    schema = _arrow_schema(pa, name)
+    sink = io.BytesIO()
+    writer = pa.ipc.new_stream(sink, schema)
+    for batch in _arrow_batches(pa, schema, name, start_ts, end_ts, chunk_size, symbol):
+        writer.write_batch(batch)
+        yield sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+
+    writer.close()
+    yield sink.getvalue()
+
+
+def write_parquet(name, start_ts, end_ts, path, chunk_size=DEFAULT_CHUNK_SIZE, symbol=None):
+    """Write a dataset to a Parquet file one row group per chunk. Returns rows written."""
+    pa = _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema(pa, name)
+    rows = 0
+    with pq.ParquetWriter(path, schema, compression='zstd') as writer:
+        for batch in _arrow_batches(pa, schema, name, start_ts, end_ts, chunk_size, symbol):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
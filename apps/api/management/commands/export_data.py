@@ -0,0 +1,75 @@
+import sys
+from datetime import timedelta
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.api.exports import DATASETS, EXPORT_FORMATS, ExportError, iter_arrow, iter_csv, write_parquet
+
+
+def _parse_ts(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise CommandError(f"Invalid datetime: {value}")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, ZoneInfo(settings.JSLL_MARKET_TZ))
+    return parsed
+
+
+class Command(BaseCommand):
+    help = 'Export candles, features, scores or predictions for a time range.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(DATASETS))
+        parser.add_argument('--start', help='Range start (ISO 8601, market tz if naive). Default: end - 1 day')
+        parser.add_argument('--end', help='Range end (ISO 8601, market tz if naive). Default: now')
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument('--output', default='-', help="Output path, or '-' for stdout (csv/arrow only)")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--symbol', help='Ticker to export. Default: JSLL_TICKER')
+
+    def handle(self, *args, **options):
+        dataset = options['dataset']
+        fmt = options['format']
+        output = options['output']
+        chunk_size = max(1, options['chunk_size'])
+        symbol = options.get('symbol')
+        end_ts = _parse_ts(options['end']) if options.get('end') else timezone.now()
+        start_ts = _parse_ts(options['start']) if options.get('start') else end_ts - timedelta(days=1)
+
+        try:
+            if fmt == 'parquet':
+                if output == '-':
+                    raise CommandError('Parquet export requires --output')
+                rows = write_parquet(dataset, start_ts, end_ts, output, chunk_size=chunk_size, symbol=symbol)
+                self.stderr.write(f"Exported {rows} rows to {output}")
+                return
+
+            if fmt == 'csv':
+                self._write_stream(iter_csv(dataset, start_ts, end_ts, chunk_size=chunk_size, symbol=symbol), output, 'w')
+            else:
+                self._write_stream(iter_arrow(dataset, start_ts, end_ts, chunk_size=chunk_size, symbol=symbol), output, 'wb')
+        except ExportError as exc:
+            raise CommandError(str(exc))
+
+    def _write_stream(self, stream, output, mode):
+        if output == '-':
+            if 'b' in mode:
+                target = sys.stdout.buffer
+                for part in stream:
+                    target.write(part)
+                target.flush()
+            else:
+                for part in stream:
+                    self.stdout.write(part, ending='')
+            return
+
+        encoding = None if 'b' in mode else 'utf-8'
+        newline = None if 'b' in mode else ''
+        with open(output, mode, encoding=encoding, newline=newline) as handle:
+            for part in stream:
+                handle.write(part)
+        self.stderr.write(f"Exported to {output}")
@@ -1,11 +1,27 @@
+import os
+import subprocess
+import sys
+import tempfile
 from datetime import timedelta
+from io import StringIO
 
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import URLResolver, get_resolver, resolve
 from django.utils import timezone
 from rest_framework.test import APITestCase
 
-from apps.market.models import Ohlc1m
+from apps.api.exports import iter_csv
+from apps.events.models import Announcement, EventsFetchRun, NewsItem
+from apps.features.models import Feature1m
+from apps.features.services import compute_and_store
+from apps.market.archive import archive_sealed_months
+from apps.market.models import IngestRun, Ohlc1m
 from apps.market.providers.mock_provider import MockPriceProvider
 from apps.market.services import ingest_1m_candles
+from apps.ops.bench import fill_synthetic_market
+from apps.predictions.models import PricePrediction, PricePredictionRun
 
 
 class HealthEndpointTests(APITestCase):
@@ -78,6 +94,31 @@ class OhlcEndpointTests(APITestCase):
         self.assertTrue(len(response.json()) > 0)
 
 
+class SymbolRouteTests(APITestCase):
+    def test_symbol_routes_are_scoped(self):
+        ingest_1m_candles(MockPriceProvider())
+        saved = ingest_1m_candles(MockPriceProvider(), symbol='AAA.NS')['saved']
+
+        response = self.client.get('/api/v1/symbols/AAA.NS/ohlc/1m?limit=100')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), saved)
+
+        response = self.client.get('/api/v1/symbols/AAA/quote/latest')
+        self.assertEqual(response.json()['ticker'], 'AAA.NS')
+
+        response = self.client.get('/api/v1/jsll/quote/latest?symbol=AAA.NS')
+        self.assertEqual(response.json()['ticker'], 'AAA.NS')
+
+        response = self.client.get('/api/v1/jsll/quote/latest')
+        self.assertEqual(response.json()['ticker'], 'JSLL.NS')
+
+    def test_unknown_symbol_returns_empty(self):
+        ingest_1m_candles(MockPriceProvider())
+        response = self.client.get('/api/v1/symbols/NOPE.NS/ohlc/1m')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+
+
 class PipelineStatusTests(APITestCase):
     def test_pipeline_status_returns_expected_keys(self):
         ingest_1m_candles(MockPriceProvider())
@@ -94,3 +135,234 @@ class PipelineStatusTests(APITestCase):
         self.assertIn('status', payload)
         self.assertIn('reason', payload)
         self.assertIn('thresholds', payload)
+
+
+class EventsSummaryTests(APITestCase):
+    def test_window_totals(self):
+        now = timezone.now()
+        for hours, impact, low_priority in ((2, 40, False), (30, 15, False), (30, -20, False), (5, 3, True), (24 * 9, 50, False)):
+            Announcement.objects.create(
+                published_at=now - timedelta(hours=hours),
+                headline=f'Announcement {hours} {impact}',
+                impact_score=impact,
+                low_priority=low_priority,
+            )
+        for index, (hours, sentiment) in enumerate(((1, 0.5), (3, -0.1), (30, 0.9))):
+            NewsItem.objects.create(
+                published_at=now - timedelta(hours=hours),
+                source='test',
+                title=f'News {index}',
+                url=f'https://news.example.com/{index}',
+                sentiment=sentiment,
+            )
+
+        payload = self.client.get('/api/v1/jsll/events/summary').json()
+        self.assertEqual(payload['news_last_24h_count'], 2)
+        self.assertAlmostEqual(payload['news_last_24h_sentiment_avg'], 0.2)
+        self.assertEqual(payload['announcements_raw_7d'], 4)
+        self.assertEqual(payload['announcements_high_impact_7d_count'], 2)
+        self.assertEqual(payload['announcements_high_impact_24h_count'], 1)
+        self.assertEqual(payload['announcements_last_7d_count'], 2)
+        self.assertEqual(payload['announcements_impact_sum_24h'], 43)
+        self.assertEqual(payload['announcements_impact_sum_7d'], 38)
+        self.assertEqual(payload['announcements_negative_impact_sum_7d'], -20)
+        self.assertEqual(payload['latest_high_impact']['impact_score'], 40)
+
+
+# Queries per request for each view on a populated database.  A change here
+# should be deliberate; config/loadtest.json holds the same budgets for
+# `manage.py loadtest`.  Every routed view needs an entry (see
+# test_every_view_has_a_query_budget); streamed responses are counted while
+# their body is read.
+QUERY_BUDGETS = {
+    '/api/v1/health': 0,
+    '/api/v1/meta': 0,
+    '/api/v1/jsll/quote/latest': 2,
+    '/api/v1/jsll/pipeline/status': 3,
+    '/api/v1/jsll/ohlc/1m?limit=390': 1,
+    '/api/v1/jsll/news': 1,
+    '/api/v1/jsll/announcements': 1,
+    '/api/v1/jsll/events/summary': 4,
+    '/api/v1/jsll/scores/latest': 1,
+    '/api/v1/jsll/predictions/latest': 3,
+    '/api/v1/jsll/export/ohlc': 2,
+    '/api/v1/predictions/latest': 3,
+    '/api/v1/symbols/JSLL.NS/ohlc/1m?limit=390': 1,
+    '/api/v1/symbols/JSLL.NS/quote/latest': 2,
+    '/api/v1/symbols/JSLL.NS/pipeline/status': 3,
+    '/api/v1/symbols/JSLL.NS/news': 1,
+    '/api/v1/symbols/JSLL.NS/announcements': 1,
+    '/api/v1/symbols/JSLL.NS/events/summary': 4,
+    '/api/v1/symbols/JSLL.NS/scores/latest': 1,
+    '/api/v1/symbols/JSLL.NS/predictions/latest': 3,
+    '/api/v1/symbols/JSLL.NS/export/scores': 2,
+    '/api/predictions/latest': 3,
+    '/metrics': 0,
+    '/': 9,
+}
+# Routes outside the budget: the admin and the OpenAPI schema and docs.
+UNBUDGETED_VIEWS = {'schema', 'swagger-ui', 'redoc'}
+
+
+def _routed_view_names(patterns):
+    names = set()
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.namespace != 'admin':
+                names |= _routed_view_names(pattern.url_patterns)
+        elif pattern.name:
+            names.add(pattern.name)
+    return names
+
+
+class QueryBudgetTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _counts, candles = fill_synthetic_market(2, symbol='JSLL.NS', announcements_per_day=3)
+        last = candles[-1]
+        compute_and_store(last['ts'], symbol='JSLL.NS')
+        IngestRun.objects.create(symbol='JSLL.NS', provider_primary='synthetic', provider_fallback='synthetic')
+        EventsFetchRun.objects.create()
+        run = PricePredictionRun.objects.create(symbol='JSLL.NS', metrics_json={'mae': 0.1})
+        for horizon in (60, 180):
+            PricePrediction.objects.create(
+                symbol='JSLL.NS',
+                ts=last['ts'],
+                horizon_min=horizon,
+                predicted_return=0.01,
+                predicted_price=last['close'] * 1.01,
+                last_close=last['close'],
+                model_name='ridge',
+                run=run,
+            )
+
+    def test_views_stay_within_query_budget(self):
+        for path, budget in QUERY_BUDGETS.items():
+            with self.subTest(path=path), self.assertNumQueries(budget):
+                response = self.client.get(path)
+                self.assertEqual(response.status_code, 200)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+
+    def test_every_view_has_a_query_budget(self):
+        budgeted = {resolve(path.split('?')[0]).url_name for path in QUERY_BUDGETS}
+        missing = _routed_view_names(get_resolver().url_patterns) - budgeted - UNBUDGETED_VIEWS
+        self.assertEqual(missing, set(), 'add these views to QUERY_BUDGETS')
+
+
+class ExportTests(APITestCase):
+    def _seed(self, count=5, base=None):
+        base = base or timezone.now().replace(second=0, microsecond=0) - timedelta(hours=1)
+        for i in range(count):
+            Ohlc1m.objects.create(
+                ts=base + timedelta(minutes=i),
+                open=100.0 + i,
+                high=101.0 + i,
+                low=99.0 + i,
+                close=100.5 + i,
+                volume=10.0,
+                source='test',
+            )
+        return base
+
+    def test_export_ohlc_csv_streams_all_rows(self):
+        base = self._seed(5)
+        rows = list(iter_csv('ohlc', base, base + timedelta(minutes=10), chunk_size=2))
+        text = ''.join(rows)
+        lines = text.strip().splitlines()
+        self.assertEqual(lines[0], 'ts,open,high,low,close,volume,source')
+        self.assertEqual(len(lines), 6)
+        # header + 3 chunks of at most 2 rows
+        self.assertEqual(len(rows), 4)
+
+    def test_export_features_columns(self):
+        base = self._seed(1)
+        Feature1m.objects.create(ts=base, rsi_14=55.5, regime_label='calm')
+        text = ''.join(iter_csv('features', base, base))
+        header, row = text.strip().splitlines()
+        columns = header.split(',')
+        values = row.split(',')
+        self.assertEqual(columns[0], 'ts')
+        self.assertEqual(values[columns.index('rsi_14')], '55.5')
+        self.assertEqual(values[columns.index('regime_label')], 'calm')
+
+    def test_export_includes_archived_months(self):
+        now = timezone.now().replace(second=0, microsecond=0)
+        old = self._seed(2, base=now - timedelta(days=500))
+        self._seed(1, base=now)
+        with tempfile.TemporaryDirectory() as tmp, override_settings(JSLL_ARCHIVE_DIR=tmp, JSLL_HOT_RETENTION_DAYS=400):
+            archive_sealed_months(now=now, tables=['market_ohlc1m'])
+            self.assertEqual(Ohlc1m.objects.count(), 1)
+            lines = ''.join(iter_csv('ohlc', old, now)).strip().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[1].startswith(old.isoformat()))
+
+    def test_export_endpoint_csv(self):
+        base = self._seed(3)
+        response = self.client.get(
+            '/api/v1/jsll/export/ohlc',
+            {'start': base.isoformat(), 'end': (base + timedelta(minutes=5)).isoformat()},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        body = b''.join(response.streaming_content).decode()
+        self.assertEqual(len(body.strip().splitlines()), 4)
+
+    def test_export_endpoint_rejects_unknown_dataset(self):
+        response = self.client.get('/api/v1/jsll/export/nope')
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_command_writes_file(self):
+        base = self._seed(2)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'ohlc.csv')
+            call_command(
+                'export_data',
+                'ohlc',
+                '--start', base.isoformat(),
+                '--end', (base + timedelta(minutes=5)).isoformat(),
+                '--output', path,
+                stderr=StringIO(),
+            )
+            with open(path, encoding='utf-8') as handle:
+                self.assertEqual(len(handle.read().strip().splitlines()), 3)
+
+
+# Loading the URLconf is what a web worker does at boot.  Scraping and
+# data-science stacks must only be imported by the tasks/commands that use them.
+IMPORT_FORBIDDEN = ('pandas', 'numpy', 'sklearn', 'yfinance', 'bs4', 'feedparser', 'pyarrow')
+IMPORT_BUDGET_MS = int(os.getenv('JSLL_IMPORT_BUDGET_MS', '1500'))
+
+_IMPORT_PROBE = (
+    'import django; django.setup(); '
+    'from django.urls import get_resolver; get_resolver().url_patterns'
+)
+
+
+class ImportBudgetTests(SimpleTestCase):
+    def _importtime(self):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings.dev'))
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', _IMPORT_PROBE],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+        modules = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, _cumulative, name = line[len('import time:'):].split('|')
+            modules[name.strip()] = int(self_us)
+        return modules
+
+    def test_api_import_graph_stays_light(self):
+        modules = self._importtime()
+        loaded = sorted({name.split('.')[0] for name in modules} & set(IMPORT_FORBIDDEN))
+        self.assertEqual(loaded, [], f"heavy modules imported while loading the API: {loaded}")
+
+        total_ms = sum(modules.values()) / 1000
+        self.assertLess(total_ms, IMPORT_BUDGET_MS, f"API import time {total_ms:.0f}ms over budget")
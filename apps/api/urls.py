@@ -8,6 +8,7 @@ from drf_spectacular.views import (
 from .views import (
     AnnouncementsView,
     EventsSummaryView,
+    ExportView,
     HealthView,
     LatestQuoteView,
     MetaView,
@@ -29,7 +30,19 @@ urlpatterns = [
     path('jsll/events/summary', EventsSummaryView.as_view(), name='events-summary'),
     path('jsll/scores/latest', ScoresLatestView.as_view(), name='scores-latest'),
     path('jsll/predictions/latest', PredictionsLatestView.as_view(), name='predictions-latest'),
+    path('jsll/export/<str:dataset>', ExportView.as_view(), name='export'),
     path('predictions/latest', PredictionsLatestView.as_view(), name='predictions-latest-short'),
+    # Same endpoints scoped to any tracked ticker; the ``jsll/`` routes above
+    # stay as aliases for the default ticker (or ``?symbol=``).
+    path('symbols/<str:symbol>/ohlc/1m', Ohlc1mView.as_view(), name='symbol-ohlc-1m'),
+    path('symbols/<str:symbol>/quote/latest', LatestQuoteView.as_view(), name='symbol-quote-latest'),
+    path('symbols/<str:symbol>/pipeline/status', PipelineStatusView.as_view(), name='symbol-pipeline-status'),
+    path('symbols/<str:symbol>/news', NewsView.as_view(), name='symbol-news'),
+    path('symbols/<str:symbol>/announcements', AnnouncementsView.as_view(), name='symbol-announcements'),
+    path('symbols/<str:symbol>/events/summary', EventsSummaryView.as_view(), name='symbol-events-summary'),
+    path('symbols/<str:symbol>/scores/latest', ScoresLatestView.as_view(), name='symbol-scores-latest'),
+    path('symbols/<str:symbol>/predictions/latest', PredictionsLatestView.as_view(), name='symbol-predictions-latest'),
+    path('symbols/<str:symbol>/export/<str:dataset>', ExportView.as_view(), name='symbol-export'),
     path('schema/', SpectacularAPIView.as_view(), name='schema'),
     path('docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     path('redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
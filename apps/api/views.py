@@ -1,11 +1,12 @@
-import re
 from datetime import timedelta
 from zoneinfo import ZoneInfo
 
 from django.conf import settings
-from django.db.models import Avg, Sum
+from django.db.models import Avg, Count, Q, Sum
+from django.http import StreamingHttpResponse
 from django.shortcuts import render
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from drf_spectacular.utils import extend_schema
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -22,8 +23,9 @@ from apps.api.serializers import (
     PredictionsLatestSerializer,
     ScoresLatestSerializer,
 )
+from apps.api.exports import ExportError, export_columns, iter_arrow, iter_csv
 from apps.events.models import Announcement, EventsFetchRun, NewsItem
-from apps.events.services import high_impact_queryset
+from apps.events.services import high_impact_filter, high_impact_queryset
 from apps.features.models import SignalScore
 from apps.market.market_time import (
     compute_thresholds,
@@ -31,9 +33,15 @@ from apps.market.market_time import (
     market_state,
 )
 from apps.market.models import IngestRun, Ohlc1m
+from apps.market.symbols import to_ticker
 from apps.predictions.models import PricePrediction, PricePredictionRun
 
 
+def _request_symbol(request, symbol=None):
+    """Ticker from the ``symbols/<symbol>/`` route or ``?symbol=``; default ticker otherwise."""
+    return to_ticker(symbol or request.query_params.get('symbol'))
+
+
 def _serialize_run(run):
     if run is None:
         return None
@@ -50,6 +58,12 @@ def _serialize_run(run):
         'candles_saved': run.candles_saved,
         'missing_filled': run.missing_filled,
         'outliers_rejected': run.outliers_rejected,
+        'fetched_end_ts': run.fetched_end_ts,
+        'provider_delay_sec': run.provider_delay_sec,
+        'no_new_candles': run.no_new_candles,
+        'primary_latency_ms': run.primary_latency_ms,
+        'fallback_latency_ms': run.fallback_latency_ms,
+        'timings': run.timings_json,
         'notes': run.notes,
     }
 
@@ -63,8 +77,13 @@ def _serialize_events_run(run):
         'finished_at': run.finished_at,
         'news_ok': run.news_ok,
         'announcements_ok': run.announcements_ok,
-        'news_fetched': run.news_fetched,
+        'news_new': run.news_new,
+        'news_seen': run.news_seen,
+        'news_not_modified': run.news_not_modified,
+        'news_interval_sec': run.news_interval_sec,
+        'announcements_interval_sec': run.announcements_interval_sec,
         'announcements_fetched': run.announcements_fetched,
+        'timings': run.timings_json,
         'notes': run.notes,
     }
 
@@ -85,14 +104,11 @@ def _freshness(latest):
     return now_server, seconds_since
 
 
-def _extract_delay_reason(notes):
-    if not notes:
-        return None
-    if 'no_new_candles' in notes:
+def _delay_reason(no_new_candles, provider_delay_sec):
+    if no_new_candles:
         return 'no_new_candles'
-    match = re.search(r'provider_delay_sec=(\d+)', notes)
-    if match:
-        return f"provider_delay_sec={match.group(1)}"
+    if provider_delay_sec is not None and provider_delay_sec >= 0:
+        return f"provider_delay_sec={provider_delay_sec}"
     return None
 
 
@@ -135,34 +151,44 @@ def _ist_now():
     return timezone.now().astimezone(ZoneInfo(settings.JSLL_MARKET_TZ))
 
 
+def _event_totals(symbol, now):
+    """24h news and 7d/24h announcement totals in one query per table."""
+    since_24h = now - timedelta(hours=24)
+    since_7d = now - timedelta(days=7)
+    news = NewsItem.objects.filter(symbol=symbol, published_at__gte=since_24h).aggregate(
+        count=Count('*'),
+        sentiment_avg=Avg('sentiment'),
+    )
+    announcements = Announcement.objects.filter(symbol=symbol, published_at__gte=since_7d).aggregate(
+        raw_7d=Count('*'),
+        high_impact_7d=Count('impact_score', filter=high_impact_filter(since_7d)),
+        high_impact_24h=Count('impact_score', filter=high_impact_filter(since_24h)),
+        impact_sum_7d=Sum('impact_score'),
+        impact_sum_24h=Sum('impact_score', filter=Q(published_at__gte=since_24h)),
+        negative_impact_sum_7d=Sum('impact_score', filter=Q(impact_score__lt=0)),
+    )
+    return news, announcements
+
+
 def dashboard(request):
-    latest = Ohlc1m.objects.order_by('-ts').first()
-    recent = Ohlc1m.objects.order_by('-ts')[:20]
-    last_run = IngestRun.objects.first()
+    symbol = to_ticker(request.GET.get('symbol'))
+    candles = Ohlc1m.objects.filter(symbol=symbol)
+    latest = candles.order_by('-ts').first()
+    recent = candles.order_by('-ts')[:20]
+    last_run = IngestRun.objects.filter(symbol=symbol).first()
 
     last_candle_time = latest.ts if latest else None
     last_candle_time_ist = _format_market_time(last_candle_time)
     since = timezone.now() - timedelta(minutes=60)
-    candles_last_60m = Ohlc1m.objects.filter(ts__gte=since).count()
+    candles_last_60m = candles.filter(ts__gte=since).count()
 
     pipeline = _pipeline_status(latest, candles_last_60m)
 
-    news_24h_since = timezone.now() - timedelta(hours=24)
-    news_count = NewsItem.objects.filter(published_at__gte=news_24h_since).count()
-    news_sentiment_avg = NewsItem.objects.filter(published_at__gte=news_24h_since).aggregate(
-        avg=Avg('sentiment')
-    )['avg']
-
-    announcements_7d_since = timezone.now() - timedelta(days=7)
-    announcements_24h_since = timezone.now() - timedelta(hours=24)
-    announcements_raw_7d = Announcement.objects.filter(published_at__gte=announcements_7d_since)
-    high_impact_7d = high_impact_queryset(days=7)
-    high_impact_24h = high_impact_queryset(days=1)
-
-    latest_high_impact = high_impact_7d.order_by('-published_at').first()
+    news, announcements = _event_totals(symbol, timezone.now())
+    latest_high_impact = high_impact_queryset(days=7, symbol=symbol).order_by('-published_at').first()
     last_events_run = EventsFetchRun.objects.first()
 
-    latest_score = SignalScore.objects.order_by('-ts').first()
+    latest_score = SignalScore.objects.filter(symbol=symbol).order_by('-ts').first()
     score_ts_ist = _format_market_time(latest_score.ts) if latest_score else None
     score_freshness_sec = None
     if latest_score:
@@ -181,12 +207,12 @@ def dashboard(request):
             'data_ok': pipeline['status'] == 'ok',
             'pipeline_status': pipeline['status'],
             'pipeline_reason': pipeline['reason'],
-            'ticker': settings.JSLL_TICKER,
+            'ticker': symbol,
             'market_tz': settings.JSLL_MARKET_TZ,
-            'news_24h_count': news_count,
-            'news_24h_sentiment_avg': news_sentiment_avg,
-            'announcements_7d_count': high_impact_7d.count(),
-            'announcements_24h_count': high_impact_24h.count(),
+            'news_24h_count': news['count'],
+            'news_24h_sentiment_avg': news['sentiment_avg'],
+            'announcements_7d_count': announcements['high_impact_7d'],
+            'announcements_24h_count': announcements['high_impact_24h'],
             'latest_high_impact': latest_high_impact,
             'events_last_run': last_events_run,
             'score_ts_ist': score_ts_ist,
@@ -215,10 +241,11 @@ class Ohlc1mView(APIView):
     serializer_class = OhlcCandleSerializer
 
     @extend_schema(responses=OhlcCandleSerializer(many=True))
-    def get(self, request):
+    def get(self, request, symbol=None):
+        symbol = _request_symbol(request, symbol)
         limit = int(request.query_params.get('limit', 100))
         limit = max(1, min(limit, 1000))
-        candles = Ohlc1m.objects.order_by('-ts')[:limit]
+        candles = Ohlc1m.objects.filter(symbol=symbol).order_by('-ts')[:limit]
         payload = [
             {
                 'ts': candle.ts,
@@ -238,17 +265,20 @@ class LatestQuoteView(APIView):
     serializer_class = LatestQuoteSerializer
 
     @extend_schema(responses=LatestQuoteSerializer)
-    def get(self, request):
-        latest = Ohlc1m.objects.order_by('-ts').first()
+    def get(self, request, symbol=None):
+        symbol = _request_symbol(request, symbol)
+        latest = Ohlc1m.objects.filter(symbol=symbol).order_by('-ts').first()
         now_server, seconds_since = _freshness(latest)
         delay_threshold = settings.JSLL_PRICE_DELAY_SEC
-        last_ingest = IngestRun.objects.first()
-        delayed_reason = _extract_delay_reason(last_ingest.notes if last_ingest else '')
+        last_ingest = (
+            IngestRun.objects.filter(symbol=symbol).values_list('no_new_candles', 'provider_delay_sec').first()
+        )
+        delayed_reason = _delay_reason(*last_ingest) if last_ingest else None
 
         if latest is None:
             return Response(
                 {
-                    'ticker': settings.JSLL_TICKER,
+                    'ticker': symbol,
                     'last_price': None,
                     'last_candle_time': None,
                     'now_server_time': now_server,
@@ -266,7 +296,7 @@ class LatestQuoteView(APIView):
 
         return Response(
             {
-                'ticker': settings.JSLL_TICKER,
+                'ticker': symbol,
                 'last_price': latest.close,
                 'last_candle_time': latest.ts,
                 'now_server_time': now_server,
@@ -284,12 +314,13 @@ class PipelineStatusView(APIView):
     serializer_class = PipelineStatusSerializer
 
     @extend_schema(responses=PipelineStatusSerializer)
-    def get(self, request):
-        last_run = IngestRun.objects.first()
-        latest = Ohlc1m.objects.order_by('-ts').first()
+    def get(self, request, symbol=None):
+        symbol = _request_symbol(request, symbol)
+        last_run = IngestRun.objects.filter(symbol=symbol).first()
+        latest = Ohlc1m.objects.filter(symbol=symbol).order_by('-ts').first()
         last_candle_time = latest.ts if latest else None
         since = timezone.now() - timedelta(minutes=60)
-        candles_last_60m = Ohlc1m.objects.filter(ts__gte=since).count()
+        candles_last_60m = Ohlc1m.objects.filter(symbol=symbol, ts__gte=since).count()
 
         pipeline = _pipeline_status(latest, candles_last_60m)
 
@@ -299,7 +330,7 @@ class PipelineStatusView(APIView):
                 'last_candle_time': last_candle_time,
                 'candles_last_60m': candles_last_60m,
                 'data_ok': pipeline['status'] == 'ok',
-                'ticker': settings.JSLL_TICKER,
+                'ticker': symbol,
                 'market_tz': settings.JSLL_MARKET_TZ,
                 'now_server_time': pipeline['now_server_time'],
                 'seconds_since_last_candle': pipeline['seconds_since_last_candle'],
@@ -317,10 +348,11 @@ class NewsView(APIView):
     serializer_class = NewsItemSerializer
 
     @extend_schema(responses=NewsItemSerializer(many=True))
-    def get(self, request):
+    def get(self, request, symbol=None):
+        symbol = _request_symbol(request, symbol)
         limit = int(request.query_params.get('limit', 50))
         limit = max(1, min(limit, 200))
-        items = NewsItem.objects.order_by('-published_at')[:limit]
+        items = NewsItem.objects.filter(symbol=symbol).order_by('-published_at')[:limit]
         payload = [
             {
                 'published_at': item.published_at,
@@ -341,10 +373,11 @@ class AnnouncementsView(APIView):
     serializer_class = AnnouncementSerializer
 
     @extend_schema(responses=AnnouncementSerializer(many=True))
-    def get(self, request):
+    def get(self, request, symbol=None):
+        symbol = _request_symbol(request, symbol)
         limit = int(request.query_params.get('limit', 50))
         limit = max(1, min(limit, 200))
-        items = Announcement.objects.order_by('-published_at')[:limit]
+        items = Announcement.objects.filter(symbol=symbol).order_by('-published_at')[:limit]
         payload = [
             {
                 'published_at': item.published_at,
@@ -366,25 +399,10 @@ class EventsSummaryView(APIView):
     serializer_class = EventsSummarySerializer
 
     @extend_schema(responses=EventsSummarySerializer)
-    def get(self, request):
-        news_24h_since = timezone.now() - timedelta(hours=24)
-        news_last_24h = NewsItem.objects.filter(published_at__gte=news_24h_since)
-        news_count = news_last_24h.count()
-        news_sentiment_avg = news_last_24h.aggregate(avg=Avg('sentiment'))['avg'] or 0.0
-
-        announcements_7d_since = timezone.now() - timedelta(days=7)
-        announcements_24h_since = timezone.now() - timedelta(hours=24)
-        announcements_last_7d = Announcement.objects.filter(published_at__gte=announcements_7d_since)
-        announcements_last_24h = Announcement.objects.filter(published_at__gte=announcements_24h_since)
-
-        high_impact_7d = high_impact_queryset(days=7)
-        high_impact_24h = high_impact_queryset(days=1)
-
-        impact_sum_24h = announcements_last_24h.aggregate(total=Sum('impact_score'))['total'] or 0
-        impact_sum_7d = announcements_last_7d.aggregate(total=Sum('impact_score'))['total'] or 0
-        negative_impact_7d = announcements_last_7d.filter(impact_score__lt=0).aggregate(total=Sum('impact_score'))['total'] or 0
-
-        latest_high_impact = high_impact_7d.order_by('-published_at').first()
+    def get(self, request, symbol=None):
+        symbol = _request_symbol(request, symbol)
+        news, announcements = _event_totals(symbol, timezone.now())
+        latest_high_impact = high_impact_queryset(days=7, symbol=symbol).order_by('-published_at').first()
         last_fetch_run = EventsFetchRun.objects.first()
 
         latest_payload = None
@@ -401,17 +419,17 @@ class EventsSummaryView(APIView):
 
         return Response(
             {
-                'news_last_24h_count': news_count,
-                'news_last_24h_sentiment_avg': news_sentiment_avg,
-                'announcements_last_7d_count': high_impact_7d.count(),
-                'announcements_last_24h_count': high_impact_24h.count(),
-                'announcements_impact_sum_24h': impact_sum_24h,
-                'announcements_impact_sum_7d': impact_sum_7d,
-                'announcements_negative_impact_sum_7d': negative_impact_7d,
-                'announcements_high_impact_7d_count': high_impact_7d.count(),
-                'announcements_high_impact_24h_count': high_impact_24h.count(),
+                'news_last_24h_count': news['count'],
+                'news_last_24h_sentiment_avg': news['sentiment_avg'] or 0.0,
+                'announcements_last_7d_count': announcements['high_impact_7d'],
+                'announcements_last_24h_count': announcements['high_impact_24h'],
+                'announcements_impact_sum_24h': announcements['impact_sum_24h'] or 0,
+                'announcements_impact_sum_7d': announcements['impact_sum_7d'] or 0,
+                'announcements_negative_impact_sum_7d': announcements['negative_impact_sum_7d'] or 0,
+                'announcements_high_impact_7d_count': announcements['high_impact_7d'],
+                'announcements_high_impact_24h_count': announcements['high_impact_24h'],
                 'latest_high_impact': latest_payload,
-                'announcements_raw_7d': announcements_last_7d.count(),
+                'announcements_raw_7d': announcements['raw_7d'],
                 'last_fetch_run': _serialize_events_run(last_fetch_run),
             }
         )
@@ -421,8 +439,9 @@ class ScoresLatestView(APIView):
     serializer_class = ScoresLatestSerializer
 
     @extend_schema(responses=ScoresLatestSerializer)
-    def get(self, request):
-        latest = SignalScore.objects.order_by('-ts').first()
+    def get(self, request, symbol=None):
+        symbol = _request_symbol(request, symbol)
+        latest = SignalScore.objects.filter(symbol=symbol).order_by('-ts').first()
         if not latest:
             return Response(
                 {
@@ -454,8 +473,9 @@ class PredictionsLatestView(APIView):
     serializer_class = PredictionsLatestSerializer
 
     @extend_schema(responses=PredictionsLatestSerializer)
-    def get(self, request):
-        latest = PricePrediction.objects.order_by('-ts').first()
+    def get(self, request, symbol=None):
+        symbol = _request_symbol(request, symbol)
+        latest = PricePrediction.objects.filter(symbol=symbol).order_by('-ts').first()
         if not latest:
             return Response(
                 {
@@ -469,7 +489,7 @@ class PredictionsLatestView(APIView):
                 }
             )
 
-        preds = PricePrediction.objects.filter(ts=latest.ts).order_by('horizon_min')
+        preds = PricePrediction.objects.filter(symbol=symbol, ts=latest.ts).order_by('horizon_min')
         horizon_map = {
             60: '1h',
             180: '3h',
@@ -495,7 +515,7 @@ class PredictionsLatestView(APIView):
                 }
             )
 
-        latest_run = PricePredictionRun.objects.first()
+        latest_run = PricePredictionRun.objects.filter(symbol=symbol).first()
         backtest = latest_run.metrics_json if latest_run else None
 
         return Response(
@@ -509,3 +529,55 @@ class PredictionsLatestView(APIView):
                 'backtest': backtest,
             }
         )
+
+
+def _parse_export_ts(value):
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(f"invalid datetime: {value}")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, ZoneInfo(settings.JSLL_MARKET_TZ))
+    return parsed
+
+
+class ExportView(APIView):
+    """Stream a dataset for a time range as CSV or an Arrow IPC stream."""
+
+    @extend_schema(responses=None)
+    def get(self, request, dataset, symbol=None):
+        symbol = _request_symbol(request, symbol)
+        try:
+            export_columns(dataset)
+            end_ts = _parse_export_ts(request.query_params.get('end')) or timezone.now()
+            start_ts = _parse_export_ts(request.query_params.get('start')) or end_ts - timedelta(days=1)
+        except (ExportError, ValueError) as exc:
+            return Response({'error': str(exc)}, status=400)
+
+        fmt = request.query_params.get('format', 'csv')
+        filename = f"{dataset}_{symbol}_{start_ts:%Y%m%d%H%M}_{end_ts:%Y%m%d%H%M}"
+        if fmt == 'csv':
+            stream = iter_csv(dataset, start_ts, end_ts, symbol=symbol)
+            content_type = 'text/csv'
+            filename += '.csv'
+        elif fmt == 'arrow':
+            try:
+                stream = iter_arrow(dataset, start_ts, end_ts, symbol=symbol)
+                first = next(stream)
+            except ExportError as exc:
+                return Response({'error': str(exc)}, status=400)
+            stream = _prepend(first, stream)
+            content_type = 'application/vnd.apache.arrow.stream'
+            filename += '.arrows'
+        else:
+            return Response({'error': f"unsupported format: {fmt}"}, status=400)
+
+        response = StreamingHttpResponse(stream, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+def _prepend(first, rest):
+    yield first
+    yield from rest
@@ -0,0 +1,170 @@
+"""Cumulative per-minute event counters (``EventMinuteAggregate``).
+
+Each announcement counts in the bucket of the minute it closes, i.e. its
+``published_at`` rounded up to the minute, so the row at or before a
+minute-aligned ``ts`` covers exactly the events published at or before ``ts``.
+Window aggregates over ``(ts - window, ts]`` are then two indexed lookups.
+
+Writers call ``refresh_announcement_aggregates`` / ``refresh_news_aggregates``
+once per batch with the earliest ``published_at`` they touched; only buckets
+from there on are rebuilt, which for live fetches is the last few minutes.
+Saves are not hooked, so code that writes events outside the services must
+refresh too.  Deletes, of one row or a queryset, go through
+``refresh_after_delete``.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+
+from .models import Announcement, EventMinuteAggregate, NewsItem
+
+NEWS_SUFFIX = ':news'
+
+HIGH_IMPACT_THRESHOLD = 10
+RESULTS_TYPES = ('results', 'board_meeting')
+
+STATE_FIELDS = (
+    'ann_high_count',
+    'ann_impact_sum',
+    'ann_results_count',
+    'news_count',
+    'news_sentiment_sum',
+    'last_impact',
+    'last_high_impact_at',
+)
+EMPTY_STATE = {
+    'ann_high_count': 0,
+    'ann_impact_sum': 0,
+    'ann_results_count': 0,
+    'news_count': 0,
+    'news_sentiment_sum': 0.0,
+    'last_impact': None,
+    'last_high_impact_at': None,
+}
+
+_WRITE_BATCH_SIZE = 1000
+
+
+def bucket_for(ts):
+    """The minute that closes at or after ``ts``."""
+    floor = ts.replace(second=0, microsecond=0)
+    return floor if floor == ts else floor + timedelta(minutes=1)
+
+
+def news_series(symbol):
+    """``EventMinuteAggregate.symbol`` of ``symbol``'s news series."""
+    return f'{symbol}{NEWS_SUFFIX}'
+
+
+def is_results_event(event_type, headline):
+    if event_type not in RESULTS_TYPES:
+        return False
+    headline = (headline or '').lower()
+    return 'result' in headline or 'financial' in headline
+
+
+def state_at(symbol, ts):
+    """Cumulative counters for events published at or before ``ts``."""
+    row = (
+        EventMinuteAggregate.objects.filter(symbol=symbol, bucket__lte=ts)
+        .order_by('-bucket')
+        .values(*STATE_FIELDS)
+        .first()
+    )
+    return row or dict(EMPTY_STATE)
+
+
+def window_delta(symbol, ts, window, current=None):
+    """Counter increments over ``(ts - window, ts]``; ``current`` reuses a ``state_at(symbol, ts)``."""
+    current = current or state_at(symbol, ts)
+    before = state_at(symbol, ts - window)
+    return {
+        name: current[name] - before[name]
+        for name in ('ann_high_count', 'ann_impact_sum', 'ann_results_count', 'news_count', 'news_sentiment_sum')
+    }
+
+
+def _rebuild(symbol, since, events, apply_event):
+    """Replace the series' rows from ``bucket_for(since)`` on with totals over ``events``.
+
+    ``events`` must be ordered by ``published_at`` and contain exactly the
+    events in buckets from that point on; ``apply_event(state, event)``
+    folds one into the running state.
+    """
+    queryset = EventMinuteAggregate.objects.filter(symbol=symbol)
+    if since is None:
+        state = dict(EMPTY_STATE)
+    else:
+        start = bucket_for(since)
+        state = state_at(symbol, start - timedelta(minutes=1))
+        queryset = queryset.filter(bucket__gte=start)
+
+    rows = []
+    current_bucket = None
+    for event in events:
+        bucket = bucket_for(event[0])
+        if current_bucket is not None and bucket != current_bucket:
+            rows.append(EventMinuteAggregate(symbol=symbol, bucket=current_bucket, **state))
+        current_bucket = bucket
+        apply_event(state, event)
+    if current_bucket is not None:
+        rows.append(EventMinuteAggregate(symbol=symbol, bucket=current_bucket, **state))
+
+    with transaction.atomic():
+        queryset.delete()
+        EventMinuteAggregate.objects.bulk_create(rows, batch_size=_WRITE_BATCH_SIZE)
+    return len(rows)
+
+
+def _apply_announcement(state, event):
+    published_at, impact_score, event_type, headline = event
+    if impact_score >= HIGH_IMPACT_THRESHOLD:
+        state['ann_high_count'] += 1
+        state['last_high_impact_at'] = published_at
+    state['ann_impact_sum'] += impact_score
+    if is_results_event(event_type, headline):
+        state['ann_results_count'] += 1
+    state['last_impact'] = impact_score
+
+
+def _apply_news(state, event):
+    state['news_count'] += 1
+    state['news_sentiment_sum'] += event[1]
+
+
+def refresh_announcement_aggregates(symbol, since=None):
+    """Rebuild ``symbol``'s announcement series from ``since`` (all history when ``None``)."""
+    queryset = Announcement.objects.filter(symbol=symbol, low_priority=False)
+    if since is not None:
+        queryset = queryset.filter(published_at__gt=bucket_for(since) - timedelta(minutes=1))
+    events = queryset.order_by('published_at', 'id').values_list('published_at', 'impact_score', 'type', 'headline')
+    return _rebuild(symbol, since, events.iterator(), _apply_announcement)
+
+
+def refresh_news_aggregates(symbol, since=None):
+    """Rebuild ``symbol``'s news series from ``since`` (all history when ``None``)."""
+    queryset = NewsItem.objects.filter(symbol=symbol)
+    if since is not None:
+        queryset = queryset.filter(published_at__gt=bucket_for(since) - timedelta(minutes=1))
+    events = queryset.order_by('published_at', 'id').values_list('published_at', 'sentiment')
+    return _rebuild(news_series(symbol), since, events.iterator(), _apply_news)
+
+
+def refresh_after_delete(model, touched):
+    """Rebuild the series of deleted ``model`` rows; ``touched`` is ``(symbol, earliest published_at)`` pairs."""
+    refresh = refresh_news_aggregates if model is NewsItem else refresh_announcement_aggregates
+    for symbol, since in touched:
+        refresh(symbol, since=since)
+
+
+def rebuild_all_aggregates():
+    """Recompute every series from scratch. Returns ``{series: rows}``."""
+    series = set(EventMinuteAggregate.objects.order_by().values_list('symbol', flat=True).distinct())
+    news_symbols = {name[: -len(NEWS_SUFFIX)] for name in series if name.endswith(NEWS_SUFFIX)}
+    news_symbols |= set(NewsItem.objects.order_by().values_list('symbol', flat=True).distinct())
+    symbols = {name for name in series if not name.endswith(NEWS_SUFFIX)}
+    symbols |= set(Announcement.objects.order_by().values_list('symbol', flat=True).distinct())
+    results = {symbol: refresh_announcement_aggregates(symbol) for symbol in sorted(symbols)}
+    for symbol in sorted(news_symbols):
+        results[news_series(symbol)] = refresh_news_aggregates(symbol)
+    return results
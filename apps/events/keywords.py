@@ -0,0 +1,67 @@
+"""Compiled keyword matching for the taxonomy and sentiment lexicons.
+
+Each lexicon is compiled once into a single regex and every text is scanned in
+one pass, instead of one ``in`` test per keyword.
+
+``PhraseMatcher`` keeps substring semantics (``'unaudited' in text``).  The
+pattern is a zero-width lookahead tried at every offset, with longer phrases
+first, so it reports the longest phrase starting at each offset; every phrase
+contained in a reported phrase is then present too, which is how overlapping
+keywords such as ``'unaudited'`` and ``'unaudited financial results'`` are all
+found in one scan.
+
+``TokenMatcher`` matches whole whitespace-separated tokens after trimming
+surrounding punctuation, the way ``score_sentiment`` tokenizes.
+"""
+import re
+from bisect import bisect_right
+
+# Joins texts for a batch scan.  No phrase contains it, so no match can span
+# two texts.
+_SEPARATOR = '\n'
+
+
+class PhraseMatcher:
+    def __init__(self, phrases):
+        phrases = sorted({phrase.lower() for phrase in phrases if phrase}, key=lambda p: (-len(p), p))
+        if any(_SEPARATOR in phrase for phrase in phrases):
+            raise ValueError('phrases cannot contain newlines')
+        self.phrases = tuple(phrases)
+        self._pattern = re.compile('(?=(%s))' % '|'.join(re.escape(phrase) for phrase in phrases))
+        self._contained = {
+            phrase: frozenset(other for other in phrases if other in phrase) for phrase in phrases
+        }
+
+    def find(self, text):
+        """Set of phrases occurring in ``text`` (case-insensitive)."""
+        found = set()
+        for match in self._pattern.finditer((text or '').lower()):
+            found |= self._contained[match.group(1)]
+        return found
+
+    def find_many(self, texts):
+        """``find`` for each text, from a single scan over the whole batch."""
+        texts = [(text or '').lower() for text in texts]
+        results = [set() for _ in texts]
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + len(_SEPARATOR)
+        for match in self._pattern.finditer(_SEPARATOR.join(texts)):
+            results[bisect_right(starts, match.start()) - 1] |= self._contained[match.group(1)]
+        return results
+
+
+class TokenMatcher:
+    def __init__(self, words, punctuation):
+        words = sorted({word.lower() for word in words if word}, key=lambda w: (-len(w), w))
+        punct = '[%s]*' % re.escape(punctuation)
+        self.words = tuple(words)
+        self._pattern = re.compile(
+            r'(?<!\S)%s(%s)%s(?!\S)' % (punct, '|'.join(re.escape(word) for word in words), punct)
+        )
+
+    def findall(self, text):
+        """Matched words in ``text``, one entry per matching token."""
+        return self._pattern.findall((text or '').lower())
@@ -0,0 +1,104 @@
+"""Chunked read/plan/apply engine for the announcement maintenance commands.
+
+Commands read ``Announcement`` columns in id-ordered batches, work out deletes
+and field updates in memory, and hand them to ``apply_changes``, which writes
+them with one ``DELETE ... WHERE id IN`` or ``bulk_update`` per chunk, each in
+its own short transaction so the table is never locked for the whole run.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+
+from .aggregates import rebuild_all_aggregates
+from .models import Announcement
+
+CHUNK_SIZE = 1000
+
+
+def iter_announcements(fields, chunk_size=CHUNK_SIZE):
+    """Yield every announcement as a named tuple of ``('id', *fields)``.
+
+    Pages through the table by primary key so each read is one indexed query.
+    """
+    last_id = 0
+    while True:
+        chunk = list(
+            Announcement.objects.filter(id__gt=last_id)
+            .order_by('id')
+            .values_list('id', *fields, named=True)[:chunk_size]
+        )
+        if not chunk:
+            return
+        yield from chunk
+        last_id = chunk[-1].id
+
+
+def add_maintenance_arguments(parser):
+    parser.add_argument('--dry-run', action='store_true', help='Report what would change without writing.')
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=CHUNK_SIZE,
+        help=f'Rows per read and per write transaction. Default: {CHUNK_SIZE}',
+    )
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def plan_dedupe(rows, key_for, rank):
+    """Group ``rows`` by ``key_for(row)`` and keep the highest ``rank`` in each group.
+
+    Returns ``(delete_ids, updates, group_sizes)`` where ``updates`` sets each
+    kept row's ``dedupe_key`` to its group key when it differs.
+    """
+    groups = defaultdict(list)
+    for row in rows:
+        key = key_for(row)
+        if key:
+            groups[key].append(row)
+
+    delete_ids = []
+    updates = {}
+    for key, items in groups.items():
+        items.sort(key=rank, reverse=True)
+        keep = items[0]
+        if keep.dedupe_key != key:
+            updates[keep.id] = {'dedupe_key': key}
+        delete_ids.extend(item.id for item in items[1:])
+    group_sizes = {key: len(items) for key, items in groups.items()}
+    return delete_ids, updates, group_sizes
+
+
+def apply_changes(delete_ids=(), updates=None, dry_run=False, chunk_size=CHUNK_SIZE):
+    """Delete ``delete_ids`` then apply ``updates`` (``{id: {field: value}}``).
+
+    Deletes run first so kept rows can take over dedupe keys held by deleted
+    ones.  Each delete chunk refreshes the aggregate series it touched; the
+    per-minute event aggregates are rebuilt once afterwards if anything was
+    updated.  Returns ``(deleted, updated)``; with ``dry_run`` nothing is
+    written and the planned counts are returned.
+    """
+    deleting = set(delete_ids)
+    updates = {ann_id: values for ann_id, values in (updates or {}).items() if ann_id not in deleting}
+    if dry_run:
+        return len(delete_ids), len(updates)
+
+    deleted = 0
+    for chunk in _chunks(sorted(delete_ids), chunk_size):
+        with transaction.atomic():
+            deleted += Announcement.objects.filter(id__in=chunk).delete()[0]
+
+    by_fields = defaultdict(list)
+    for ann_id, values in sorted(updates.items()):
+        by_fields[tuple(sorted(values))].append(Announcement(id=ann_id, **values))
+    updated = 0
+    for fields, objects in by_fields.items():
+        for chunk in _chunks(objects, chunk_size):
+            with transaction.atomic():
+                updated += Announcement.objects.bulk_update(chunk, fields)
+    if updated:
+        rebuild_all_aggregates()
+    return deleted, updated
@@ -1,55 +1,44 @@
-﻿from collections import defaultdict
+﻿from django.core.management.base import BaseCommand
 
-from django.conf import settings
-from django.core.management.base import BaseCommand
-
-from apps.events.models import Announcement
+from apps.events.maintenance import add_maintenance_arguments, apply_changes, iter_announcements, plan_dedupe
 from apps.events.utils import build_announcement_dedupe_key, build_soft_dedupe_key
 
+FIELDS = ('symbol', 'published_at', 'headline', 'url', 'type', 'impact_score', 'low_priority', 'dedupe_key')
+
 
 def _score(ann):
     type_bonus = 100 if ann.type == 'results' else (50 if ann.type == 'board_meeting' else 0)
     return ann.impact_score * 10 + type_bonus + (20 if not ann.low_priority else 0)
 
 
+def _key(ann):
+    soft_key = build_soft_dedupe_key(ann.symbol, ann.published_at, ann.url)
+    key = soft_key or ann.dedupe_key
+    if not key:
+        key = build_announcement_dedupe_key(ann.symbol, ann.headline, ann.published_at, ann.url, '')
+    return key
+
+
 class Command(BaseCommand):
     help = 'Delete duplicate announcements based on dedupe_key.'
 
+    def add_arguments(self, parser):
+        add_maintenance_arguments(parser)
+
     def handle(self, *args, **options):
-        total_before = Announcement.objects.count()
-        symbol = getattr(settings, 'JSLL_TICKER', 'JSLL')
-        by_key = defaultdict(list)
-
-        for ann in Announcement.objects.all().iterator():
-            soft_key = build_soft_dedupe_key(symbol, ann.published_at, ann.url)
-            key = soft_key or ann.dedupe_key
-            if not key:
-                key = build_announcement_dedupe_key(symbol, ann.headline, ann.published_at, ann.url, '')
-            if not key:
-                continue
-            by_key[key].append(ann)
-
-        to_delete = []
-        to_keep = []
-        top_dupes = sorted(((k, len(v)) for k, v in by_key.items()), key=lambda x: x[1], reverse=True)
-
-        for key, items in by_key.items():
-            items_sorted = sorted(items, key=lambda x: (x.published_at, _score(x)), reverse=True)
-            keep = items_sorted[0]
-            to_keep.append((keep.id, key))
-            to_delete.extend([item.id for item in items_sorted[1:]])
-
-        if to_delete:
-            Announcement.objects.filter(id__in=to_delete).delete()
-
-        for ann_id, key in to_keep:
-            Announcement.objects.filter(id=ann_id).update(dedupe_key=key)
-
-        total_after = Announcement.objects.count()
-        deleted = total_before - total_after
-        self.stdout.write(f"Before: {total_before}")
-        self.stdout.write(f"Deleted: {deleted}")
-        self.stdout.write(f"After: {total_after}")
+        rows = list(iter_announcements(FIELDS, chunk_size=options['chunk_size']))
+        total_before = len(rows)
+        to_delete, updates, group_sizes = plan_dedupe(rows, _key, rank=lambda x: (x.published_at, _score(x)))
+        top_dupes = sorted(group_sizes.items(), key=lambda x: x[1], reverse=True)
+        deleted, updated = apply_changes(
+            to_delete, updates, dry_run=options['dry_run'], chunk_size=options['chunk_size']
+        )
+
+        prefix = '[dry-run] ' if options['dry_run'] else ''
+        self.stdout.write(f"{prefix}Before: {total_before}")
+        self.stdout.write(f"{prefix}Deleted: {deleted}")
+        self.stdout.write(f"{prefix}Keys updated: {updated}")
+        self.stdout.write(f"{prefix}After: {total_before - deleted}")
         self.stdout.write("Top duplicate keys:")
         for key, count in top_dupes[:5]:
             if count > 1:
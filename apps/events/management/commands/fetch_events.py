@@ -3,7 +3,10 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 
 from apps.events.models import EventsFetchRun
-from apps.events.services import fetch_announcements_nse, fetch_news_rss
+from apps.events.services import fetch_announcements_nse, fetch_news_rss, merge_announcement_results
+from apps.market.symbols import active_symbols
+from apps.ops import metrics
+from apps.ops.profiling import add_profile_argument, profile_run, report
 
 
 class Command(BaseCommand):
@@ -15,63 +18,82 @@ class Command(BaseCommand):
             action='store_true',
             help='Run reclassify_announcements after fetching events.',
         )
+        parser.add_argument(
+            '--symbol',
+            action='append',
+            help='Ticker or NSE code to fetch announcements for (repeatable). Default: all active symbols.',
+        )
+        add_profile_argument(parser)
 
     def handle(self, *args, **options):
+        with profile_run('fetch_events', enabled=options['profile']) as profile:
+            self.fetch(options)
+        report(self.stdout, profile)
+
+    def fetch(self, options):
         run = EventsFetchRun.objects.create()
         notes = []
+        symbols = options.get('symbol') or active_symbols()
 
-        try:
-            news_count, note = fetch_news_rss()
-            run.news_fetched = news_count
-            run.news_ok = news_count > 0
-            if note:
-                notes.append(note)
-        except Exception as exc:
-            notes.append(f"news_error: {exc}")
+        with metrics.collect() as timings:
+            try:
+                news_result = fetch_news_rss()
+                run.news_new = news_result['new_count']
+                run.news_seen = news_result['seen_count']
+                run.news_not_modified = news_result['not_modified_count']
+                run.news_ok = news_result['feeds_ok'] > 0
+                notes.extend(news_result['errors'])
+            except Exception as exc:
+                notes.append(f"news_error: {exc}")
 
-        ann_summary = None
-        try:
-            ann_result = fetch_announcements_nse()
-            parsed = ann_result['parsed_count']
-            created = ann_result['saved_count']
-            updated = ann_result['updated_count']
-            skipped = ann_result['skipped_duplicates']
-            parse_errors = ann_result['parse_errors']
-            errors = ann_result['errors']
-            total_processed = created + updated + skipped + parse_errors
+            ann_summary = None
+            try:
+                ann_result = merge_announcement_results(
+                    [(symbol, fetch_announcements_nse(symbol=symbol)) for symbol in symbols]
+                )
+                parsed = ann_result['parsed_count']
+                created = ann_result['saved_count']
+                updated = ann_result['updated_count']
+                skipped = ann_result['skipped_duplicates']
+                parse_errors = ann_result['parse_errors']
+                errors = ann_result['errors']
+                total_processed = created + updated + skipped + parse_errors
 
-            run.announcements_fetched = created + updated
-            run.announcements_ok = total_processed > 0 and not errors
-            if errors:
-                notes.append(f"announcements_error: {','.join(errors)}")
-            notes.append(
-                "ann_parsed={parsed}, ann_created={created}, ann_updated={updated}, "
-                "ann_skipped={skipped}, ann_parse_errors={parse_errors}, ann_total_processed={total_processed}"
-                .format(
-                    parsed=parsed,
-                    created=created,
-                    updated=updated,
-                    skipped=skipped,
-                    parse_errors=parse_errors,
-                    total_processed=total_processed,
+                run.announcements_fetched = created + updated
+                run.announcements_ok = total_processed > 0 and not errors
+                if errors:
+                    notes.append(f"announcements_error: {','.join(errors)}")
+                notes.append(
+                    "ann_parsed={parsed}, ann_created={created}, ann_updated={updated}, "
+                    "ann_skipped={skipped}, ann_parse_errors={parse_errors}, ann_total_processed={total_processed}"
+                    .format(
+                        parsed=parsed,
+                        created=created,
+                        updated=updated,
+                        skipped=skipped,
+                        parse_errors=parse_errors,
+                        total_processed=total_processed,
+                    )
                 )
-            )
-            ann_summary = {
-                'created': created,
-                'updated': updated,
-                'skipped': skipped,
-                'parse_errors': parse_errors,
-                'total_processed': total_processed,
-            }
-        except Exception as exc:
-            notes.append(f"announcements_error: {exc}")
+                ann_summary = {
+                    'created': created,
+                    'updated': updated,
+                    'skipped': skipped,
+                    'parse_errors': parse_errors,
+                    'total_processed': total_processed,
+                }
+            except Exception as exc:
+                notes.append(f"announcements_error: {exc}")
 
+        run.timings_json = timings.summary()
         run.finished_at = timezone.now()
         run.notes = '; '.join(notes)
         run.save()
 
         self.stdout.write('Events fetch summary')
-        self.stdout.write(f"News OK: {run.news_ok} ({run.news_fetched})")
+        self.stdout.write(
+            f"News OK: {run.news_ok} (new={run.news_new}, seen={run.news_seen}, not_modified={run.news_not_modified})"
+        )
         if ann_summary:
             self.stdout.write(
                 "Announcements OK: {ok} (created={created}, updated={updated}, skipped={skipped}, "
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.events.aggregates import rebuild_all_aggregates
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-minute cumulative event counters from the raw announcement and news rows.'
+
+    def handle(self, *args, **options):
+        for series, rows in rebuild_all_aggregates().items():
+            self.stdout.write(f"{series}: {rows} minute buckets")
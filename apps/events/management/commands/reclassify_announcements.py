@@ -4,11 +4,24 @@ import sys
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 
+from apps.events.maintenance import add_maintenance_arguments, apply_changes, iter_announcements
 from apps.events.models import Announcement
-from apps.events.taxonomy import classify_announcement
+from apps.events.taxonomy import classify_announcements
 from apps.events.utils import build_announcement_dedupe_key
 from apps.events.services import high_impact_queryset
 
+FIELDS = (
+    'published_at',
+    'headline',
+    'url',
+    'type',
+    'polarity',
+    'impact_score',
+    'low_priority',
+    'tags_json',
+    'dedupe_key',
+)
+
 
 def _normalize(text):
     return ' '.join((text or '').lower().split())
@@ -26,37 +39,60 @@ class Command(BaseCommand):
             return False
         return True
 
+    def add_arguments(self, parser):
+        add_maintenance_arguments(parser)
+
     def handle(self, *args, **options):
-        total = Announcement.objects.count()
+        chunk_size = options['chunk_size']
+        rows = list(iter_announcements(FIELDS, chunk_size=chunk_size))
+        total = len(rows)
+        # dedupe_key -> id, kept current as keys are handed out so a key is
+        # only assigned when no other row holds it.
+        key_owner = {row.dedupe_key: row.id for row in rows if row.dedupe_key}
+        current = {}
         by_results_key = defaultdict(list)
 
-        for ann in Announcement.objects.all().iterator():
-            classification = classify_announcement(ann.headline)
-            ann.type = classification['type']
-            ann.polarity = classification['polarity']
-            ann.impact_score = classification['impact_score']
-            ann.low_priority = classification['low_priority']
-            ann.tags_json = {'tags': classification['tags']}
-
-            dedupe_key = build_announcement_dedupe_key('', ann.headline, ann.published_at, ann.url, '')
-            if dedupe_key:
-                exists = Announcement.objects.filter(dedupe_key=dedupe_key).exclude(id=ann.id).exists()
-                if not exists:
-                    ann.dedupe_key = dedupe_key
-
-            ann.save(update_fields=['type', 'polarity', 'impact_score', 'low_priority', 'tags_json', 'dedupe_key'])
-
-            if ann.type == 'results':
-                key = (ann.published_at.date().isoformat(), _normalize(ann.headline))
-                by_results_key[key].append(ann)
+        for start in range(0, total, chunk_size):
+            chunk = rows[start:start + chunk_size]
+            classifications = classify_announcements([row.headline for row in chunk])
+            for row, classification in zip(chunk, classifications):
+                values = {
+                    'type': classification['type'],
+                    'polarity': classification['polarity'],
+                    'impact_score': classification['impact_score'],
+                    'low_priority': classification['low_priority'],
+                    'tags_json': {'tags': classification['tags']},
+                    'dedupe_key': row.dedupe_key,
+                }
+                dedupe_key = build_announcement_dedupe_key('', row.headline, row.published_at, row.url, '')
+                if dedupe_key and key_owner.get(dedupe_key, row.id) == row.id:
+                    if row.dedupe_key and key_owner.get(row.dedupe_key) == row.id:
+                        del key_owner[row.dedupe_key]
+                    key_owner[dedupe_key] = row.id
+                    values['dedupe_key'] = dedupe_key
+                current[row.id] = values
+
+                if values['type'] == 'results':
+                    key = (row.published_at.date().isoformat(), _normalize(row.headline))
+                    by_results_key[key].append(row)
 
         for items in by_results_key.values():
-            items_sorted = sorted(items, key=lambda x: (x.impact_score, x.published_at), reverse=True)
+            items_sorted = sorted(
+                items, key=lambda x: (current[x.id]['impact_score'], x.published_at), reverse=True
+            )
             for duplicate in items_sorted[1:]:
-                if not duplicate.low_priority or duplicate.impact_score != 0:
-                    duplicate.low_priority = True
-                    duplicate.impact_score = 0
-                    duplicate.save(update_fields=['low_priority', 'impact_score'])
+                current[duplicate.id]['low_priority'] = True
+                current[duplicate.id]['impact_score'] = 0
+
+        updates = {}
+        for row in rows:
+            values = current[row.id]
+            if any(getattr(row, field) != value for field, value in values.items()):
+                updates[row.id] = values
+        _, updated = apply_changes(updates=updates, dry_run=options['dry_run'], chunk_size=chunk_size)
+        if options['dry_run']:
+            self.stdout.write(f"[dry-run] Would update {updated} of {total} announcements")
+            return
 
         high_impact_rolling = high_impact_queryset(days=7)
         high_impact_calendar = high_impact_queryset(days=7, use_calendar_days=True)
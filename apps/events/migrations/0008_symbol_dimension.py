@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:03
+
+import apps.market.symbols
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_drop_headline_published_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='announcement',
+            name='symbol',
+            field=models.CharField(db_index=True, default=apps.market.symbols.default_symbol, max_length=32),
+        ),
+    ]
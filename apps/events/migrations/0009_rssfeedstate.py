@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0008_symbol_dimension'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RssFeedState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=1000, unique=True)),
+                ('etag', models.CharField(blank=True, default='', max_length=255)),
+                ('last_modified', models.CharField(blank=True, default='', max_length=64)),
+                ('last_status', models.IntegerField(blank=True, null=True)),
+                ('last_checked_at', models.DateTimeField(blank=True, null=True)),
+                ('last_changed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
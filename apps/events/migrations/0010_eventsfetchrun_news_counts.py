@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0009_rssfeedstate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventsfetchrun',
+            name='news_new',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='eventsfetchrun',
+            name='news_seen',
+            field=models.IntegerField(default=0),
+        ),
+    ]
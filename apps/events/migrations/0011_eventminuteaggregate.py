@@ -0,0 +1,106 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:18
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+_BATCH_SIZE = 1000
+
+# The aggregation rules at the time of this migration, copied so later edits
+# to apps.events.aggregates cannot change what this backfill writes.  News had
+# no symbol yet and kept one series under ''.
+_HIGH_IMPACT_THRESHOLD = 10
+_RESULTS_TYPES = ('results', 'board_meeting')
+_NEWS_SERIES = ''
+
+
+def _bucket_for(ts):
+    floor = ts.replace(second=0, microsecond=0)
+    return floor if floor == ts else floor + timedelta(minutes=1)
+
+
+def _apply_announcement(state, event):
+    published_at, impact_score, event_type, headline = event
+    if impact_score >= _HIGH_IMPACT_THRESHOLD:
+        state['ann_high_count'] += 1
+        state['last_high_impact_at'] = published_at
+    state['ann_impact_sum'] += impact_score
+    headline = (headline or '').lower()
+    if event_type in _RESULTS_TYPES and ('result' in headline or 'financial' in headline):
+        state['ann_results_count'] += 1
+    state['last_impact'] = impact_score
+
+
+def _apply_news(state, event):
+    state['news_count'] += 1
+    state['news_sentiment_sum'] += event[1]
+
+
+def _write_series(EventMinuteAggregate, symbol, events, apply_event):
+    state = {
+        'ann_high_count': 0,
+        'ann_impact_sum': 0,
+        'ann_results_count': 0,
+        'news_count': 0,
+        'news_sentiment_sum': 0.0,
+        'last_impact': None,
+        'last_high_impact_at': None,
+    }
+    rows = []
+    current_bucket = None
+    for event in events:
+        bucket = _bucket_for(event[0])
+        if current_bucket is not None and bucket != current_bucket:
+            rows.append(EventMinuteAggregate(symbol=symbol, bucket=current_bucket, **state))
+        current_bucket = bucket
+        apply_event(state, event)
+    if current_bucket is not None:
+        rows.append(EventMinuteAggregate(symbol=symbol, bucket=current_bucket, **state))
+    EventMinuteAggregate.objects.bulk_create(rows, batch_size=_BATCH_SIZE)
+
+
+def build_aggregates(apps, schema_editor):
+    """Fill the counters from the events already stored, so scores do not change on upgrade."""
+    Announcement = apps.get_model('events', 'Announcement')
+    NewsItem = apps.get_model('events', 'NewsItem')
+    EventMinuteAggregate = apps.get_model('events', 'EventMinuteAggregate')
+    announcements = Announcement.objects.filter(low_priority=False)
+    for symbol in announcements.order_by().values_list('symbol', flat=True).distinct():
+        events = (
+            announcements.filter(symbol=symbol)
+            .order_by('published_at', 'id')
+            .values_list('published_at', 'impact_score', 'type', 'headline')
+        )
+        _write_series(EventMinuteAggregate, symbol, events.iterator(), _apply_announcement)
+    news = NewsItem.objects.order_by('published_at', 'id').values_list('published_at', 'sentiment')
+    _write_series(EventMinuteAggregate, _NEWS_SERIES, news.iterator(), _apply_news)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0010_eventsfetchrun_news_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventMinuteAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(blank=True, default='', max_length=32)),
+                ('bucket', models.DateTimeField()),
+                ('ann_high_count', models.IntegerField(default=0)),
+                ('ann_impact_sum', models.IntegerField(default=0)),
+                ('ann_results_count', models.IntegerField(default=0)),
+                ('news_count', models.IntegerField(default=0)),
+                ('news_sentiment_sum', models.FloatField(default=0.0)),
+                ('last_impact', models.IntegerField(blank=True, null=True)),
+                ('last_high_impact_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['symbol', 'bucket'],
+                'constraints': [models.UniqueConstraint(fields=('symbol', 'bucket'), name='uniq_eventminuteaggregate_symbol_bucket')],
+            },
+        ),
+        migrations.RunPython(build_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0011_eventminuteaggregate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventSourceSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=32, unique=True)),
+                ('interval_sec', models.IntegerField(default=0)),
+                ('empty_streak', models.IntegerField(default=0)),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+                ('next_run_at', models.DateTimeField(blank=True, null=True)),
+                ('last_new_count', models.IntegerField(default=0)),
+                ('reason', models.CharField(blank=True, default='', max_length=32)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='eventsfetchrun',
+            name='announcements_interval_sec',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='eventsfetchrun',
+            name='news_interval_sec',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
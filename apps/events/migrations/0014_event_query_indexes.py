@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:37
+
+import apps.market.symbols
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0013_run_timings'),
+    ]
+
+    # The composite indexes are created before the single-column ones they
+    # replace are dropped.
+    operations = [
+        migrations.AddIndex(
+            model_name='announcement',
+            index=models.Index(fields=['symbol', '-published_at'], name='announcement_symbol_pub_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='announcement',
+            index=models.Index(condition=models.Q(('low_priority', False)), fields=['symbol', 'published_at', 'impact_score'], name='announcement_high_impact_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsitem',
+            index=models.Index(fields=['published_at', 'sentiment'], name='newsitem_pub_sentiment_idx'),
+        ),
+        migrations.AlterField(
+            model_name='announcement',
+            name='symbol',
+            field=models.CharField(default=apps.market.symbols.default_symbol, max_length=32),
+        ),
+        migrations.AlterField(
+            model_name='newsitem',
+            name='published_at',
+            field=models.DateTimeField(),
+        ),
+    ]
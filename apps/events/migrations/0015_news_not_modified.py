@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 20:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0014_event_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='eventsfetchrun',
+            name='news_fetched',
+        ),
+        migrations.AddField(
+            model_name='eventsfetchrun',
+            name='news_not_modified',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:51
+
+import apps.market.symbols
+from apps.market.symbols import default_symbol
+from django.db import migrations, models
+
+
+def move_news_series(apps, schema_editor):
+    """The single news series belonged to the default ticker, like the existing news rows."""
+    EventMinuteAggregate = apps.get_model('events', 'EventMinuteAggregate')
+    EventMinuteAggregate.objects.filter(symbol='').update(symbol=f'{default_symbol()}:news')
+
+
+def restore_news_series(apps, schema_editor):
+    EventMinuteAggregate = apps.get_model('events', 'EventMinuteAggregate')
+    series = f'{default_symbol()}:news'
+    EventMinuteAggregate.objects.filter(symbol__endswith=':news').exclude(symbol=series).delete()
+    EventMinuteAggregate.objects.filter(symbol=series).update(symbol='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0015_news_not_modified'),
+    ]
+
+    # Existing news was fetched for the default ticker, so its rows and its
+    # aggregate series are assigned to it.  The per-symbol index is created
+    # before the one it replaces is dropped.
+    operations = [
+        migrations.AddField(
+            model_name='newsitem',
+            name='symbol',
+            field=models.CharField(default=apps.market.symbols.default_symbol, max_length=32),
+        ),
+        migrations.AddIndex(
+            model_name='newsitem',
+            index=models.Index(fields=['symbol', 'published_at', 'sentiment'], name='newsitem_symbol_pub_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='newsitem',
+            name='newsitem_pub_sentiment_idx',
+        ),
+        migrations.AlterField(
+            model_name='newsitem',
+            name='url',
+            field=models.URLField(),
+        ),
+        migrations.AddConstraint(
+            model_name='newsitem',
+            constraint=models.UniqueConstraint(fields=('symbol', 'url'), name='uniq_newsitem_symbol_url'),
+        ),
+        migrations.AlterField(
+            model_name='eventminuteaggregate',
+            name='symbol',
+            field=models.CharField(max_length=40),
+        ),
+        migrations.RunPython(move_news_series, restore_news_series),
+    ]
@@ -1,11 +1,53 @@
-﻿from django.db import models
+﻿from django.db import models, transaction
 
+from apps.market.symbols import default_symbol
 
-class NewsItem(models.Model):
-    published_at = models.DateTimeField(db_index=True)
+
+class EventQuerySet(models.QuerySet):
+    """Rebuilds the minute aggregates of the series a delete touched, once per series."""
+
+    def delete(self):
+        from .aggregates import refresh_after_delete
+
+        touched = list(
+            self.order_by().values('symbol').annotate(since=models.Min('published_at')).values_list('symbol', 'since')
+        )
+        with transaction.atomic():
+            result = super().delete()
+            refresh_after_delete(self.model, touched)
+        return result
+
+
+class EventModel(models.Model):
+    """An event row counted in ``EventMinuteAggregate``.
+
+    Writes do not refresh the aggregates; the writer refreshes once per batch
+    (see ``apps.events.aggregates``).  Deletes, single or queryset, rebuild
+    the series they touched.
+    """
+
+    objects = EventQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
+    def delete(self, *args, **kwargs):
+        from .aggregates import refresh_after_delete
+
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            refresh_after_delete(type(self), [(self.symbol, self.published_at)])
+        return result
+
+
+class NewsItem(EventModel):
+    # The ticker whose feeds returned the item; the same article found for two
+    # tickers is stored once per ticker.
+    symbol = models.CharField(max_length=32, default=default_symbol)
+    published_at = models.DateTimeField()
     source = models.CharField(max_length=100)
     title = models.CharField(max_length=500)
-    url = models.URLField(unique=True)
+    url = models.URLField()
     summary = models.TextField(blank=True, default='')
     sentiment = models.FloatField(default=0.0)
     relevance = models.FloatField(default=1.0)
@@ -13,12 +55,22 @@ class NewsItem(models.Model):
 
     class Meta:
         ordering = ['-published_at']
+        constraints = [
+            models.UniqueConstraint(fields=['symbol', 'url'], name='uniq_newsitem_symbol_url'),
+        ]
+        indexes = [
+            # Covers the per-symbol newest-first listing and the 24h
+            # count/sentiment average in the events summary without touching
+            # the heap.
+            models.Index(fields=['symbol', 'published_at', 'sentiment'], name='newsitem_symbol_pub_idx'),
+        ]
 
     def __str__(self):
         return f"{self.published_at.isoformat()} {self.title}"
 
 
-class Announcement(models.Model):
+class Announcement(EventModel):
+    symbol = models.CharField(max_length=32, default=default_symbol)
     published_at = models.DateTimeField(db_index=True)
     headline = models.CharField(max_length=500)
     url = models.URLField(blank=True, default='')
@@ -32,6 +84,17 @@ class Announcement(models.Model):
 
     class Meta:
         ordering = ['-published_at']
+        indexes = [
+            # Per-symbol listing and the 7d/24h windows of the events summary.
+            models.Index(fields=['symbol', '-published_at'], name='announcement_symbol_pub_idx'),
+            # ``high_impact_queryset`` and the aggregate rebuild only read
+            # announcements that are not low priority.
+            models.Index(
+                fields=['symbol', 'published_at', 'impact_score'],
+                condition=models.Q(low_priority=False),
+                name='announcement_high_impact_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.published_at.isoformat()} {self.headline}"
@@ -42,12 +105,77 @@ class EventsFetchRun(models.Model):
     finished_at = models.DateTimeField(null=True, blank=True)
     news_ok = models.BooleanField(default=False)
     announcements_ok = models.BooleanField(default=False)
-    news_fetched = models.IntegerField(default=0)
+    news_new = models.IntegerField(default=0)
+    news_seen = models.IntegerField(default=0)
+    # Feeds that answered 304: reachable, nothing new since the last run.
+    news_not_modified = models.IntegerField(default=0)
     announcements_fetched = models.IntegerField(default=0)
+    news_interval_sec = models.IntegerField(null=True, blank=True)
+    announcements_interval_sec = models.IntegerField(null=True, blank=True)
     notes = models.TextField(blank=True, default='')
+    timings_json = models.JSONField(default=dict, blank=True)
 
     class Meta:
         ordering = ['-started_at']
 
     def __str__(self):
         return f"EventsFetchRun {self.started_at.isoformat()}"
+
+
+class EventSourceSchedule(models.Model):
+    """Adaptive polling state for one event source (``news`` or ``announcements``)."""
+
+    source = models.CharField(max_length=32, unique=True)
+    interval_sec = models.IntegerField(default=0)
+    empty_streak = models.IntegerField(default=0)
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    next_run_at = models.DateTimeField(null=True, blank=True)
+    last_new_count = models.IntegerField(default=0)
+    reason = models.CharField(max_length=32, blank=True, default='')
+
+    def __str__(self):
+        return f"EventSourceSchedule {self.source} every {self.interval_sec}s ({self.reason})"
+
+
+class RssFeedState(models.Model):
+    """HTTP validators from the last successful fetch of one RSS feed."""
+
+    url = models.URLField(max_length=1000, unique=True)
+    etag = models.CharField(max_length=255, blank=True, default='')
+    last_modified = models.CharField(max_length=64, blank=True, default='')
+    last_status = models.IntegerField(null=True, blank=True)
+    last_checked_at = models.DateTimeField(null=True, blank=True)
+    last_changed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"RssFeedState {self.url} status={self.last_status}"
+
+
+class EventMinuteAggregate(models.Model):
+    """Running event totals as of the end of one minute bucket.
+
+    Two series per ticker, one for announcements (``symbol`` is the ticker) and
+    one for news (``aggregates.news_series(ticker)``), holding a row only for
+    minutes in which events happened.  Counts over
+    ``(ts - window, ts]`` are the difference between the latest rows at or
+    before ``ts`` and ``ts - window``.  Maintained by ``apps.events.aggregates``.
+    """
+
+    symbol = models.CharField(max_length=40)
+    bucket = models.DateTimeField()
+    ann_high_count = models.IntegerField(default=0)
+    ann_impact_sum = models.IntegerField(default=0)
+    ann_results_count = models.IntegerField(default=0)
+    news_count = models.IntegerField(default=0)
+    news_sentiment_sum = models.FloatField(default=0.0)
+    last_impact = models.IntegerField(null=True, blank=True)
+    last_high_impact_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['symbol', 'bucket']
+        constraints = [
+            models.UniqueConstraint(fields=['symbol', 'bucket'], name='uniq_eventminuteaggregate_symbol_bucket'),
+        ]
+
+    def __str__(self):
+        return f"EventMinuteAggregate {self.symbol} {self.bucket.isoformat()}"
@@ -1,9 +1,17 @@
-﻿import time
+﻿import logging
+import threading
+import time
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
-import requests
-from bs4 import BeautifulSoup
+from django.conf import settings
+
+from apps.ops import tape
+
+logger = logging.getLogger(__name__)
+
+NSE_HOME = 'https://www.nseindia.com/'
+NSE_ANNOUNCEMENTS_API = 'https://www.nseindia.com/api/corporate-announcements'
 
 
 def _headers():
@@ -85,11 +93,96 @@ def _source_id_from_url(url, fallback=''):
     return parts[-1] if parts else fallback
 
 
-def _fetch_json_announcements(session, symbol):
-    url = f'https://www.nseindia.com/api/corporate-announcements?index=equities&symbol={symbol}'
-    resp = session.get(url, headers=_headers(), timeout=10)
-    if resp.status_code != 200:
-        return []
+class NseClient:
+    """Long-lived, pooled NSE session.
+
+    NSE's API only answers requests carrying the cookies set by its homepage.
+    The homepage is fetched once and its cookies reused until they expire or
+    ``JSLL_NSE_COOKIE_TTL_SEC`` passes; a 401/403 refreshes them and retries
+    with exponential backoff.
+    """
+
+    def __init__(self, cookie_ttl=None, max_retries=2, backoff=0.5, timeout=10, session_factory=None, sleep=time.sleep):
+        self.cookie_ttl = cookie_ttl if cookie_ttl is not None else settings.JSLL_NSE_COOKIE_TTL_SEC
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self._session_factory = session_factory or _pooled_session
+        self._sleep = sleep
+        self._session = None
+        self._cookies_at = None
+        self._lock = threading.Lock()
+
+    def _cookies_fresh(self):
+        if self._session is None or self._cookies_at is None:
+            return False
+        if time.monotonic() - self._cookies_at >= self.cookie_ttl:
+            return False
+        return not any(cookie.is_expired() for cookie in self._session.cookies)
+
+    def _refresh_cookies(self):
+        if self._session is None:
+            self._session = self._session_factory()
+        self._session.cookies.clear()
+        self._session.get(NSE_HOME, headers=_headers(), timeout=self.timeout)
+        self._cookies_at = time.monotonic()
+
+    def invalidate(self):
+        self._cookies_at = None
+
+    def get(self, url, params=None):
+        with self._lock:
+            response = None
+            for attempt in range(self.max_retries + 1):
+                if not self._cookies_fresh():
+                    self._refresh_cookies()
+                response = self._session.get(url, params=params, headers=_headers(), timeout=self.timeout)
+                if response.status_code not in (401, 403):
+                    return response
+                logger.info('NSE returned %s, refreshing cookies (attempt %s)', response.status_code, attempt + 1)
+                self.invalidate()
+                if attempt < self.max_retries:
+                    self._sleep(self.backoff * (2 ** attempt))
+            return response
+
+
+def _pooled_session():
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+    return session
+
+
+_client = None
+
+
+def get_client():
+    """Process-wide client, so cookies and connections survive between runs."""
+    global _client
+    if _client is None:
+        _client = NseClient()
+    return _client
+
+
+def _date_params(since):
+    if since is None:
+        return {}
+    ist = ZoneInfo('Asia/Kolkata')
+    return {
+        'from_date': since.astimezone(ist).strftime('%d-%m-%Y'),
+        'to_date': datetime.now(ist).strftime('%d-%m-%Y'),
+    }
+
+
+def _fetch_json_announcements(client, symbol, since=None):
+    """Rows from the JSON API, or ``None`` if the API did not answer."""
+    params = {'index': 'equities', 'symbol': symbol, **_date_params(since)}
+    # The tape key leaves out the date window so recordings replay on any day.
+    resp = tape.http_get('nse', f'announcements:{symbol}', client.get, NSE_ANNOUNCEMENTS_API, params=params)
+    if resp is None or resp.status_code != 200:
+        return None
     data = resp.json()
     items = []
     for row in data:
@@ -108,11 +201,13 @@ def _fetch_json_announcements(session, symbol):
     return items
 
 
-def _fetch_html_announcements(session, symbol):
+def _fetch_html_announcements(client, symbol):
     url = f'https://www.nseindia.com/get-quote/equity?symbol={symbol}'
-    resp = session.get(url, headers=_headers(), timeout=10)
-    if resp.status_code != 200:
+    resp = tape.http_get('nse', url, client.get, url)
+    if resp is None or resp.status_code != 200:
         return []
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(resp.text, 'html.parser')
     items = []
     for card in soup.select('.announcementList li'):
@@ -121,14 +216,12 @@ def _fetch_html_announcements(session, symbol):
     return items
 
 
-def fetch_nse_announcements(symbol='JSLL'):
-    session = requests.Session()
-    session.get('https://www.nseindia.com/', headers=_headers(), timeout=10)
-    time.sleep(0.5)
-
-    items = _fetch_json_announcements(session, symbol)
-    if not items:
-        items = _fetch_html_announcements(session, symbol)
+def fetch_nse_announcements(symbol='JSLL', since=None, client=None):
+    """Announcements for ``symbol``; only those on or after ``since``'s date when given."""
+    client = client or get_client()
+    items = _fetch_json_announcements(client, symbol, since=since)
+    if items is None:
+        items = _fetch_html_announcements(client, symbol)
 
     results = []
     for item in items:
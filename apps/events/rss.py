@@ -1,11 +1,21 @@
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from urllib.parse import quote_plus
 
-import feedparser
+from django.conf import settings
 from django.utils import timezone
 
+from apps.market.symbols import default_symbol, to_nse_symbol
+from apps.ops import tape
 
+logger = logging.getLogger(__name__)
+
+_USER_AGENT = 'Mozilla/5.0 (compatible; jsll-events/1.0)'
+
+
+# Search terms of the default ticker, JSLL.
 DEFAULT_KEYWORDS = [
     'JSLL',
     'Jeena Sikho Lifecare',
@@ -13,20 +23,37 @@ DEFAULT_KEYWORDS = [
 ]
 
 
-def _default_rss_urls():
-    urls = []
-    for keyword in DEFAULT_KEYWORDS:
-        query = quote_plus(keyword)
-        urls.append(f"https://news.google.com/rss/search?q={query}")
-    return urls
+def news_keywords(symbol):
+    """Search terms for ``symbol``'s news.
 
+    ``TrackedSymbol.news_keywords`` (comma-separated) when set, otherwise
+    ``DEFAULT_KEYWORDS`` for the default ticker and the NSE code for others.
+    """
+    from apps.market.models import TrackedSymbol
 
-def get_rss_urls():
-    override = os.getenv('EVENTS_RSS_URLS', '').strip()
+    configured = TrackedSymbol.objects.filter(ticker=symbol).values_list('news_keywords', flat=True).first()
+    if configured:
+        return [item.strip() for item in configured.split(',') if item.strip()]
+    if symbol == default_symbol():
+        return list(DEFAULT_KEYWORDS)
+    return [to_nse_symbol(symbol)]
+
+
+def _search_urls(keywords):
+    return [f"https://news.google.com/rss/search?q={quote_plus(keyword)}" for keyword in keywords]
+
+
+def get_rss_urls(symbol=None):
+    """Feeds searched for ``symbol``'s news.
+
+    ``EVENTS_RSS_URLS`` adds feeds to the default ticker only.
+    """
+    symbol = symbol or default_symbol()
     urls = []
-    if override:
+    override = os.getenv('EVENTS_RSS_URLS', '').strip()
+    if override and symbol == default_symbol():
         urls.extend([item.strip() for item in override.split(',') if item.strip()])
-    urls.extend(_default_rss_urls())
+    urls.extend(_search_urls(news_keywords(symbol)))
     return list(dict.fromkeys(urls))
 
 
@@ -50,11 +77,103 @@ def parse_entry(entry, feed_title):
     }
 
 
-def fetch_feeds():
+def _fetch_feed(url, etag, last_modified, timeout):
+    """Conditional GET and parse of one feed.  Runs in a worker thread, so no ORM access."""
+    import feedparser
+    import requests
+
+    headers = {'User-Agent': _USER_AGENT}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+
+    result = {'url': url, 'status': None, 'etag': '', 'last_modified': '', 'items': [], 'error': ''}
+    try:
+        response = tape.http_get('rss', url, requests.get, url, headers=headers, timeout=timeout)
+    except Exception as exc:
+        result['error'] = str(exc)
+        return result
+
+    result['status'] = response.status_code
+    if response.status_code == 304:
+        return result
+    if response.status_code != 200:
+        result['error'] = f"http_{response.status_code}"
+        return result
+
+    feed = feedparser.parse(response.content)
+    feed_title = getattr(feed.feed, 'title', 'rss')
+    result['items'] = [parse_entry(entry, feed_title) for entry in feed.entries]
+    result['etag'] = response.headers.get('ETag', '')
+    result['last_modified'] = response.headers.get('Last-Modified', '')
+    return result
+
+
+def save_feed_states(feeds, now=None):
+    """Store the status and, for changed feeds, the validators of a ``fetch_feeds`` run.
+
+    Call this once the feeds' items are stored: a saved ETag makes the next
+    run answer 304, so items that never reached the database would be lost.
+    """
+    from .models import RssFeedState
+
+    now = now or timezone.now()
+    feeds = [feed for feed in feeds if feed['status'] is not None]
+    states = {state.url: state for state in RssFeedState.objects.filter(url__in=[feed['url'] for feed in feeds])}
+    for feed in feeds:
+        state = states.get(feed['url']) or RssFeedState(url=feed['url'])
+        state.last_status = feed['status']
+        state.last_checked_at = now
+        if feed['status'] == 200:
+            state.etag = feed['etag'][:255]
+            state.last_modified = feed['last_modified'][:64]
+            state.last_changed_at = now
+        state.save()
+
+
+def fetch_feeds(symbols=None, max_workers=None, timeout=None):
+    """Fetch the feeds of ``symbols`` (default ticker when ``None``) concurrently.
+
+    Returns ``(items, feeds)``: the entries from the feeds that changed, each
+    with the ``symbol`` whose feed returned it (once per symbol sharing the
+    feed), and one result per feed (``url``, ``status``, validators,
+    ``error``) to pass to ``save_feed_states`` after the items are stored.
+    ETag/Last-Modified from the previous run are sent back, so an unchanged
+    feed answers 304 and is neither downloaded nor parsed.  A slow or failing
+    feed only costs its own timeout.
+    """
+    from .models import RssFeedState
+
+    feed_symbols = {}
+    for symbol in symbols or [default_symbol()]:
+        for url in get_rss_urls(symbol):
+            feed_symbols.setdefault(url, []).append(symbol)
+    urls = list(feed_symbols)
+    if not urls:
+        return [], []
+    max_workers = max_workers or settings.JSLL_RSS_MAX_WORKERS
+    timeout = timeout or settings.JSLL_RSS_TIMEOUT_SEC
+    states = {state.url: state for state in RssFeedState.objects.filter(url__in=urls)}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as pool:
+        results = list(
+            pool.map(
+                lambda url: _fetch_feed(
+                    url,
+                    states[url].etag if url in states else '',
+                    states[url].last_modified if url in states else '',
+                    timeout,
+                ),
+                urls,
+            )
+        )
+
     items = []
-    for url in get_rss_urls():
-        feed = feedparser.parse(url)
-        feed_title = getattr(feed.feed, 'title', 'rss')
-        for entry in feed.entries:
-            items.append(parse_entry(entry, feed_title))
-    return items
\ No newline at end of file
+    for result in results:
+        if result['error']:
+            logger.warning('RSS fetch failed url=%s error=%s', result['url'], result['error'])
+        entries = result.pop('items')
+        for symbol in feed_symbols[result['url']]:
+            items.extend({**entry, 'symbol': symbol} for entry in entries)
+    return items, results
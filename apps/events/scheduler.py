@@ -0,0 +1,151 @@
+"""Adaptive polling intervals for the event sources.
+
+Each source (``news``, ``announcements``) keeps its own ``EventSourceSchedule``.
+The interval starts at the market-hours base (``JSLL_EVENTS_OPEN_INTERVAL_SEC``
+/ ``JSLL_EVENTS_CLOSED_INTERVAL_SEC``) and is multiplied by
+``JSLL_EVENTS_BACKOFF_FACTOR`` for every consecutive run that found nothing
+new, up to ``JSLL_EVENTS_MAX_INTERVAL_SEC``.  Failed fetches neither grow nor
+reset the streak, so an outage does not push polling out to the maximum.
+Announcements drop to ``JSLL_EVENTS_BURST_INTERVAL_SEC`` while a catalyst is
+live (a board-meeting or results announcement in the last
+``JSLL_EVENTS_CATALYST_HOURS``), and do not back off past the base interval
+during results season.  A backed-off run never lands after the next market
+open (or, for announcements, the start of the next results season): it is
+pulled forward to that boundary, and the streak restarts when the market
+state has changed since the last run.
+"""
+import math
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.utils import timezone
+
+from apps.market.market_time import MARKET_OPEN, market_state
+
+from .models import Announcement, EventSourceSchedule
+
+NEWS = 'news'
+ANNOUNCEMENTS = 'announcements'
+SOURCES = (NEWS, ANNOUNCEMENTS)
+
+CATALYST_TYPES = ('board_meeting', 'results')
+
+
+def _local(now):
+    return now.astimezone(ZoneInfo(settings.JSLL_MARKET_TZ))
+
+
+def base_interval(now):
+    if market_state(_local(now)) == 'OPEN':
+        return settings.JSLL_EVENTS_OPEN_INTERVAL_SEC
+    return settings.JSLL_EVENTS_CLOSED_INTERVAL_SEC
+
+
+def in_results_season(now):
+    today = _local(now).date()
+    for window in settings.JSLL_RESULTS_SEASONS:
+        first, last = window.split(':')
+        start = date(today.year, *map(int, first.split('-')))
+        end = date(today.year, *map(int, last.split('-')))
+        if start <= today <= end:
+            return True
+    return False
+
+
+def _season_starts(year):
+    for window in settings.JSLL_RESULTS_SEASONS:
+        first = window.split(':')[0]
+        yield date(year, *map(int, first.split('-')))
+
+
+def next_boundary(source, now):
+    """The next market open, or for announcements the next results-season start if sooner."""
+    local = _local(now)
+    tz = local.tzinfo
+    candidate = datetime.combine(local.date(), MARKET_OPEN, tzinfo=tz)
+    while candidate <= local or candidate.weekday() >= 5:
+        candidate = datetime.combine(candidate.date() + timedelta(days=1), MARKET_OPEN, tzinfo=tz)
+    if source == ANNOUNCEMENTS:
+        for year in (local.year, local.year + 1):
+            for start in _season_starts(year):
+                season = datetime.combine(start, datetime.min.time(), tzinfo=tz)
+                if local < season < candidate:
+                    candidate = season
+    return candidate
+
+
+def max_streak(base):
+    """Streak at which the backoff reaches ``JSLL_EVENTS_MAX_INTERVAL_SEC``."""
+    factor = settings.JSLL_EVENTS_BACKOFF_FACTOR
+    ceiling = settings.JSLL_EVENTS_MAX_INTERVAL_SEC
+    if factor <= 1 or ceiling <= base:
+        return 0
+    return math.ceil(math.log(ceiling / base, factor))
+
+
+def has_live_catalyst(now):
+    since = now - timedelta(hours=settings.JSLL_EVENTS_CATALYST_HOURS)
+    return Announcement.objects.filter(
+        type__in=CATALYST_TYPES,
+        low_priority=False,
+        published_at__gte=since,
+        published_at__lte=now,
+    ).exists()
+
+
+def choose_interval(source, empty_streak, now):
+    """Return ``(interval_sec, reason)`` for the next run of ``source``."""
+    base = base_interval(now)
+    if source == ANNOUNCEMENTS and has_live_catalyst(now):
+        return min(base, settings.JSLL_EVENTS_BURST_INTERVAL_SEC), 'catalyst'
+    empty_streak = min(empty_streak, max_streak(base))
+    if empty_streak and not (source == ANNOUNCEMENTS and in_results_season(now)):
+        interval = base * settings.JSLL_EVENTS_BACKOFF_FACTOR ** empty_streak
+        return int(min(interval, max(base, settings.JSLL_EVENTS_MAX_INTERVAL_SEC))), 'backoff'
+    if source == ANNOUNCEMENTS and in_results_season(now):
+        return base, 'results_season'
+    return base, 'base'
+
+
+def due_sources(now=None):
+    """Sources whose next run time has passed (or that have never run)."""
+    now = now or timezone.now()
+    schedules = {schedule.source: schedule for schedule in EventSourceSchedule.objects.filter(source__in=SOURCES)}
+    due = []
+    for source in SOURCES:
+        schedule = schedules.get(source)
+        if schedule is None or schedule.next_run_at is None or schedule.next_run_at <= now:
+            due.append(source)
+    return due
+
+
+def record_run(source, new_count, now=None, failed=False):
+    """Update ``source``'s schedule after a fetch. Returns the chosen interval in seconds.
+
+    ``failed`` runs keep the current streak: an error says nothing about
+    whether the source has news.
+    """
+    now = now or timezone.now()
+    schedule, _ = EventSourceSchedule.objects.get_or_create(source=source)
+    streak = schedule.empty_streak
+    if schedule.last_run_at and market_state(_local(schedule.last_run_at)) != market_state(_local(now)):
+        streak = 0
+    if new_count:
+        streak = 0
+    elif not failed:
+        streak = min(streak + 1, max_streak(base_interval(now)))
+    schedule.empty_streak = streak
+    interval, reason = choose_interval(source, streak, now)
+    next_run_at = now + timedelta(seconds=interval)
+    boundary = next_boundary(source, now)
+    if boundary < next_run_at:
+        next_run_at = boundary
+        interval = max(1, int((boundary - now).total_seconds()))
+        reason = 'boundary'
+    schedule.interval_sec, schedule.reason = interval, reason
+    schedule.last_run_at = now
+    schedule.last_new_count = new_count
+    schedule.next_run_at = next_run_at
+    schedule.save()
+    return schedule.interval_sec
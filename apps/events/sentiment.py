@@ -1,3 +1,5 @@
+from .keywords import TokenMatcher
+
 POSITIVE_WORDS = {
     'gain', 'gains', 'surge', 'profit', 'profits', 'beat', 'record', 'approved', 'wins',
     'order', 'contract', 'dividend', 'bonus', 'buyback', 'upgrade', 'growth', 'strong',
@@ -9,13 +11,17 @@ NEGATIVE_WORDS = {
 }
 
 
+PUNCTUATION = ".,:;!?()[]{}\"'" + "-"
+
+MATCHER = TokenMatcher(POSITIVE_WORDS | NEGATIVE_WORDS, PUNCTUATION)
+
+
 def score_sentiment(text):
     if not text:
         return 0.0
-    punctuation = ".,:;!?()[]{}\"'" + "-"
-    tokens = [token.strip(punctuation).lower() for token in text.split()]
-    pos = sum(1 for token in tokens if token in POSITIVE_WORDS)
-    neg = sum(1 for token in tokens if token in NEGATIVE_WORDS)
+    words = MATCHER.findall(text)
+    pos = sum(1 for word in words if word in POSITIVE_WORDS)
+    neg = sum(1 for word in words if word in NEGATIVE_WORDS)
     if pos == 0 and neg == 0:
         return 0.0
     score = (pos - neg) / max(pos + neg, 1)
@@ -1,14 +1,21 @@
 from zoneinfo import ZoneInfo
 import sys
+from collections import defaultdict
 from datetime import timedelta
 
 from django.conf import settings
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from django.utils import timezone
 
+from apps.market.symbols import active_symbols, default_symbol, to_nse_symbol, to_ticker
+from apps.ops import metrics
+
+from .aggregates import HIGH_IMPACT_THRESHOLD, refresh_announcement_aggregates, refresh_news_aggregates
 from .models import Announcement, NewsItem
 from .nse import fetch_nse_announcements
-from .rss import fetch_feeds
+from .rss import fetch_feeds, save_feed_states
+from .signals import high_impact_announcement
 from .sentiment import score_sentiment
 from .taxonomy import classify_announcement, tag_news
 from .utils import build_announcement_dedupe_key
@@ -26,55 +33,241 @@ def _is_testing():
     return 'test' in sys.argv
 
 
-def high_impact_queryset(days=7, impact_threshold=10, use_calendar_days=False, tz=None):
+def high_impact_filter(since, impact_threshold=10):
+    """``Q`` matching ``high_impact_queryset`` rows from ``since``, for filtered aggregates."""
+    return Q(published_at__gte=since, impact_score__gte=impact_threshold, low_priority=False)
+
+
+def high_impact_queryset(days=7, impact_threshold=10, use_calendar_days=False, tz=None, symbol=None):
     now = timezone.now()
+    queryset = Announcement.objects.all()
+    if symbol:
+        queryset = queryset.filter(symbol=symbol)
     if use_calendar_days:
         tz = tz or ZoneInfo(settings.TIME_ZONE)
         local_now = timezone.localtime(now, tz)
         cutoff_date = local_now.date() - timedelta(days=days)
-        return Announcement.objects.filter(
+        return queryset.filter(
             published_at__date__gte=cutoff_date,
             impact_score__gte=impact_threshold,
             low_priority=False,
         )
 
-    since = now - timedelta(days=days)
-    return Announcement.objects.filter(
-        published_at__gte=since,
-        impact_score__gte=impact_threshold,
-        low_priority=False,
-    )
+    return queryset.filter(high_impact_filter(now - timedelta(days=days), impact_threshold))
 
 
-def fetch_news_rss():
-    items = fetch_feeds()
+_SEEN_URL_BATCH_SIZE = 500
+
+
+def _stored_news_urls(symbol, urls):
+    """URLs from ``urls`` that already have a ``NewsItem`` for ``symbol``, via the unique index."""
+    urls = list(urls)
+    seen = set()
+    for start in range(0, len(urls), _SEEN_URL_BATCH_SIZE):
+        seen.update(
+            NewsItem.objects.filter(symbol=symbol, url__in=urls[start:start + _SEEN_URL_BATCH_SIZE])
+            .order_by()
+            .values_list('url', flat=True)
+        )
+    return seen
+
+
+def fetch_news_rss(symbols=None):
+    """Fetch the RSS feeds of ``symbols`` (the active tickers by default) and store new entries.
+
+    Each entry is stored for the ticker whose feed returned it; entries whose
+    URL that ticker already has are dropped before sentiment scoring and
+    tagging, which is most of every run.  Returns ``new_count`` (items scored
+    and inserted), ``seen_count`` (already stored or repeated within the
+    batch), ``feeds_ok`` (feeds that answered 200 or 304),
+    ``not_modified_count`` (feeds that answered 304) and per-feed ``errors``.
+    Feed validators are saved in the same transaction as the items, so a run
+    that fails before the insert fetches the same entries again next time.
+    """
+    with metrics.timer('events.news.fetch'):
+        items, feeds = fetch_feeds(symbols or active_symbols())
+    summary = {
+        'feeds_ok': sum(1 for feed in feeds if feed['status'] in (200, 304)),
+        'not_modified_count': sum(1 for feed in feeds if feed['status'] == 304),
+        'errors': [f"rss_error: {feed['url']} {feed['error']}" for feed in feeds if feed['error']],
+    }
     if not items:
-        return 0, 'no_items'
+        save_feed_states(feeds)
+        return {'new_count': 0, 'seen_count': 0, **summary}
 
-    news_objects = []
+    by_symbol = defaultdict(list)
     for item in items:
-        text = f"{item['title']} {item['summary']}"
-        sentiment = score_sentiment(text)
-        tags = tag_news(text)
-        news_objects.append(
-            NewsItem(
-                published_at=item['published_at'],
-                source=item['source'][:100],
-                title=item['title'][:500],
-                url=item['url'],
-                summary=item['summary'],
-                sentiment=sentiment,
-                relevance=1.0,
-                entities_json=tags,
+        by_symbol[item['symbol']].append(item)
+    seen_count = 0
+    news_objects = []
+    for symbol, symbol_items in by_symbol.items():
+        with metrics.timer('events.news.prefilter'):
+            stored = _stored_news_urls(symbol, {item['url'] for item in symbol_items})
+        with metrics.timer('events.news.score'):
+            for item in symbol_items:
+                if item['url'] in stored:
+                    seen_count += 1
+                    continue
+                stored.add(item['url'])
+                text = f"{item['title']} {item['summary']}"
+                news_objects.append(
+                    NewsItem(
+                        symbol=symbol,
+                        published_at=item['published_at'],
+                        source=item['source'][:100],
+                        title=item['title'][:500],
+                        url=item['url'],
+                        summary=item['summary'],
+                        sentiment=score_sentiment(text),
+                        relevance=1.0,
+                        entities_json=tag_news(text),
+                    )
+                )
+
+    with transaction.atomic():
+        # ignore_conflicts still covers a concurrent run inserting the same URL.
+        with metrics.timer('events.news.write'):
+            NewsItem.objects.bulk_create(news_objects, ignore_conflicts=True)
+        since = {}
+        for obj in news_objects:
+            since[obj.symbol] = min(since.get(obj.symbol, obj.published_at), obj.published_at)
+        with metrics.timer('events.news.aggregates'):
+            for symbol, published_at in since.items():
+                refresh_news_aggregates(symbol, since=published_at)
+        save_feed_states(feeds)
+    metrics.count('events.news_new', len(news_objects))
+    metrics.count('events.news_seen', seen_count)
+    return {'new_count': len(news_objects), 'seen_count': seen_count, **summary}
+
+
+_UPSERT_BATCH_SIZE = 500
+_ANNOUNCEMENT_WRITE_FIELDS = (
+    'symbol',
+    'published_at',
+    'headline',
+    'url',
+    'type',
+    'polarity',
+    'impact_score',
+    'low_priority',
+    'dedupe_hash',
+    'tags_json',
+)
+
+
+def _upsert_announcements(ticker, candidates):
+    """Write one batch of ``(dedupe_key, headline, published_at, url)`` rows.
+
+    Existing keys are loaded in one query.  Headlines that are already stored
+    keep their classification, rows that would not change are not written, and
+    everything else goes out in a single upsert.  Returns
+    ``(created, updated, skipped, written)``: the first three with the same
+    meaning as the old row-at-a-time ``update_or_create`` loop, ``written`` the
+    unsaved ``Announcement`` instances that were inserted or changed.
+    """
+    existing = {
+        row['dedupe_key']: row
+        for row in Announcement.objects.filter(dedupe_key__in=[key for key, *_ in candidates])
+        .order_by()
+        .values('dedupe_key', *_ANNOUNCEMENT_WRITE_FIELDS)
+    }
+    created = 0
+    updated = 0
+    to_write = []
+    for dedupe_key, headline, published_at, url in candidates:
+        prior = existing.get(dedupe_key)
+        if prior is not None and prior['headline'] == headline:
+            classification = {
+                'type': prior['type'],
+                'polarity': prior['polarity'],
+                'impact_score': prior['impact_score'],
+                'low_priority': prior['low_priority'],
+                'tags': (prior['tags_json'] or {}).get('tags', []),
+            }
+        else:
+            classification = classify_announcement(headline)
+        values = {
+            'symbol': ticker,
+            'published_at': published_at,
+            'headline': headline,
+            'url': url,
+            'type': classification['type'],
+            'polarity': classification['polarity'],
+            'impact_score': classification['impact_score'],
+            'low_priority': classification['low_priority'],
+            'dedupe_hash': None,
+            'tags_json': {'tags': classification['tags']},
+        }
+        if prior is None:
+            created += 1
+        else:
+            updated += 1
+            if all(prior[name] == values[name] for name in _ANNOUNCEMENT_WRITE_FIELDS):
+                continue
+        to_write.append(Announcement(dedupe_key=dedupe_key, **values))
+
+    if not to_write:
+        return created, updated, 0, []
+    try:
+        with transaction.atomic():
+            Announcement.objects.bulk_create(
+                to_write,
+                update_conflicts=True,
+                unique_fields=['dedupe_key'],
+                update_fields=list(_ANNOUNCEMENT_WRITE_FIELDS),
             )
+    except IntegrityError:
+        return _upsert_announcements_rowwise(to_write, existing, created, updated)
+    return created, updated, 0, to_write
+
+
+def _upsert_announcements_rowwise(objects, existing, created, updated):
+    # Slow path when the batch upsert hits a constraint other than
+    # ``dedupe_key``: retry row by row so only the offending rows are skipped.
+    skipped = 0
+    written = []
+    for obj in objects:
+        defaults = {name: getattr(obj, name) for name in _ANNOUNCEMENT_WRITE_FIELDS}
+        try:
+            with transaction.atomic():
+                Announcement.objects.update_or_create(dedupe_key=obj.dedupe_key, defaults=defaults)
+        except IntegrityError:
+            skipped += 1
+            if obj.dedupe_key in existing:
+                updated -= 1
+            else:
+                created -= 1
+            continue
+        written.append(obj)
+    return created, updated, skipped, written
+
+
+def _notify_high_impact(ticker, announcements):
+    high_impact = [
+        ann for ann in announcements
+        if ann.impact_score >= HIGH_IMPACT_THRESHOLD and not ann.low_priority
+    ]
+    if high_impact:
+        transaction.on_commit(
+            lambda: high_impact_announcement.send(sender=Announcement, symbol=ticker, announcements=high_impact)
         )
 
-    NewsItem.objects.bulk_create(news_objects, ignore_conflicts=True)
-    return len(news_objects), ''
 
+def fetch_announcements_nse(symbol=None):
+    """Fetch and upsert NSE announcements for one symbol.
 
-def fetch_announcements_nse(symbol='JSLL'):
-    items = fetch_nse_announcements(symbol=symbol)
+    ``symbol`` may be a ticker (``JSLL.NS``) or a bare NSE code (``JSLL``).
+    Rows are stored against the ticker; dedupe keys keep using the NSE code so
+    keys written before the symbol column existed still match.  Only the days
+    since the newest stored announcement are requested.
+    """
+    ticker = to_ticker(symbol)
+    symbol = to_nse_symbol(ticker)
+    newest = Announcement.objects.filter(symbol=ticker).order_by('-published_at').values_list(
+        'published_at', flat=True
+    ).first()
+    with metrics.timer('events.announcements.fetch'):
+        items = fetch_nse_announcements(symbol=symbol, since=newest)
     if not items:
         return {
             'parsed_count': 0,
@@ -82,7 +275,8 @@ def fetch_announcements_nse(symbol='JSLL'):
             'updated_count': 0,
             'skipped_duplicates': 0,
             'parse_errors': 0,
-            'errors': ['no_items'],
+            # An incremental window with nothing new is not a failure.
+            'errors': [] if newest else ['no_items'],
         }
 
     created_count = 0
@@ -90,6 +284,7 @@ def fetch_announcements_nse(symbol='JSLL'):
     skipped_duplicates = 0
     parse_errors = 0
     seen_keys = set()
+    candidates = []
     error_samples = []
 
     for idx, item in enumerate(items):
@@ -135,33 +330,24 @@ def fetch_announcements_nse(symbol='JSLL'):
             skipped_duplicates += 1
             continue
         seen_keys.add(dedupe_key)
+        candidates.append((dedupe_key, headline[:500], published_at, item.get('url', '')))
 
-        classification = classify_announcement(headline)
-        defaults = {
-            'published_at': published_at,
-            'headline': headline[:500],
-            'url': item.get('url', ''),
-            'type': classification['type'],
-            'polarity': classification['polarity'],
-            'impact_score': classification['impact_score'],
-            'low_priority': classification['low_priority'],
-            'dedupe_hash': None,
-            'tags_json': {'tags': classification['tags']},
-        }
-
-        try:
-            obj, created = Announcement.objects.update_or_create(
-                dedupe_key=dedupe_key,
-                defaults=defaults,
+    written = []
+    with metrics.timer('events.announcements.upsert'):
+        for start in range(0, len(candidates), _UPSERT_BATCH_SIZE):
+            created, updated, skipped, batch_written = _upsert_announcements(
+                ticker, candidates[start:start + _UPSERT_BATCH_SIZE]
             )
-        except IntegrityError:
-            skipped_duplicates += 1
-            continue
-
-        if created:
-            created_count += 1
-        else:
-            updated_count += 1
+            created_count += created
+            updated_count += updated
+            skipped_duplicates += skipped
+            written.extend(batch_written)
+    metrics.count('events.announcements_parsed', len(items))
+    metrics.count('events.announcements_written', len(written))
+    if written:
+        with metrics.timer('events.announcements.aggregates'):
+            refresh_announcement_aggregates(ticker, since=min(obj.published_at for obj in written))
+        _notify_high_impact(ticker, written)
 
     if error_samples and not _is_testing():
         for sample in error_samples:
@@ -184,14 +370,35 @@ def fetch_announcements_nse(symbol='JSLL'):
     }
 
 
-def create_announcement_from_text(headline, published_at, url=''):
+def merge_announcement_results(results):
+    """Sum per-symbol ``fetch_announcements_nse`` results into one summary."""
+    merged = {
+        'parsed_count': 0,
+        'saved_count': 0,
+        'updated_count': 0,
+        'skipped_duplicates': 0,
+        'parse_errors': 0,
+        'errors': [],
+    }
+    for symbol, result in results:
+        for key in merged:
+            if key == 'errors':
+                prefix = f"{symbol}:" if len(results) > 1 else ''
+                merged['errors'].extend(f"{prefix}{error}" for error in result['errors'])
+            else:
+                merged[key] += result[key]
+    return merged
+
+
+def create_announcement_from_text(headline, published_at, url='', symbol=None):
     classification = classify_announcement(headline)
     published_at_ist = _ensure_ist(published_at)
     if not published_at_ist:
         raise ValueError('published_at required')
-    symbol = getattr(settings, 'JSLL_TICKER', 'JSLL')
+    symbol = symbol or default_symbol()
     dedupe_key = build_announcement_dedupe_key(symbol, headline, published_at_ist, url, '')
-    return Announcement.objects.create(
+    announcement = Announcement.objects.create(
+        symbol=symbol,
         dedupe_key=dedupe_key,
         published_at=published_at_ist,
         headline=headline[:500],
@@ -203,3 +410,6 @@ def create_announcement_from_text(headline, published_at, url=''):
         dedupe_hash=None,
         tags_json={'tags': classification['tags']},
     )
+    refresh_announcement_aggregates(symbol, since=announcement.published_at)
+    _notify_high_impact(symbol, [announcement])
+    return announcement
@@ -0,0 +1,23 @@
+import logging
+
+from django.dispatch import Signal, receiver
+
+logger = logging.getLogger(__name__)
+
+# Sent once per fetch with ``symbol`` (ticker) and ``announcements`` (the
+# high-impact rows just inserted or changed), after the minute aggregates have
+# been refreshed, so receivers can rescore straight away.
+high_impact_announcement = Signal()
+
+
+@receiver(high_impact_announcement)
+def refresh_signals_on_high_impact(sender, symbol, announcements, **kwargs):
+    # Imported here so loading the events app does not pull in Celery.
+    from apps.market.tasks import dispatch_downstream
+
+    logger.info('High-impact announcement for %s (%s rows), refreshing scores', symbol, len(announcements))
+    try:
+        dispatch_downstream(symbol, recompute_latest=True)
+    except Exception as exc:
+        # The beat-driven rescoring still catches up if the broker is down.
+        logger.warning('Could not enqueue high-impact refresh for %s: %s', symbol, exc)
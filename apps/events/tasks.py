@@ -6,8 +6,13 @@ from django.conf import settings
 from django.utils import timezone
 
 from apps.market.market_time import market_state
+from apps.market.symbols import active_symbols
+from apps.ops import metrics
+from apps.ops.locks import single_flight
+from apps.ops.profiling import profile_task
 from .models import EventsFetchRun
-from .services import fetch_announcements_nse, fetch_news_rss
+from .scheduler import ANNOUNCEMENTS, NEWS, SOURCES, due_sources, record_run
+from .services import fetch_announcements_nse, fetch_news_rss, merge_announcement_results
 
 logger = logging.getLogger(__name__)
 
@@ -19,43 +24,78 @@ def _should_run(schedule_type):
 
 
 @shared_task
-def fetch_events_task(schedule_type='open'):
-    if not _should_run(schedule_type):
+@single_flight(key='fetch_events', ttl=540)
+@profile_task
+def fetch_events_task(schedule_type='auto'):
+    """Fetch events.
+
+    ``'auto'`` (the beat default) fetches only the sources whose adaptive
+    interval has elapsed; ``'open'``/``'closed'`` fetch both sources when the
+    market is in that state, as the old fixed timers did.
+    """
+    now = timezone.now()
+    if schedule_type == 'auto':
+        sources = due_sources(now)
+        if not sources:
+            return 'skip'
+    elif _should_run(schedule_type):
+        sources = list(SOURCES)
+    else:
         return 'skip'
 
     run = EventsFetchRun.objects.create()
     notes = []
 
-    try:
-        news_count, note = fetch_news_rss()
-        run.news_fetched = news_count
-        run.news_ok = news_count > 0
-        if note:
-            notes.append(note)
-    except Exception as exc:
-        notes.append(f"news_error: {exc}")
-        logger.exception('News RSS fetch failed: %s', exc)
-
-    try:
-        ann_result = fetch_announcements_nse()
-        parsed = ann_result['parsed_count']
-        created = ann_result['saved_count']
-        updated = ann_result['updated_count']
-        skipped = ann_result['skipped_duplicates']
-        parse_errors = ann_result['parse_errors']
-        errors = ann_result['errors']
-
-        run.announcements_fetched = created
-        run.announcements_ok = (created + updated + skipped) > 0 and not errors
-        if errors:
-            notes.append(f"announcements_error: {','.join(errors)}")
-        notes.append(
-            f"ann_parsed={parsed}, ann_created={created}, ann_updated={updated}, ann_skipped={skipped}, ann_parse_errors={parse_errors}"
-        )
-    except Exception as exc:
-        notes.append(f"announcements_error: {exc}")
-        logger.exception('Announcements fetch failed: %s', exc)
+    with metrics.collect() as timings:
+        if NEWS in sources:
+            news_new = 0
+            news_failed = False
+            try:
+                news_result = fetch_news_rss()
+                news_new = news_result['new_count']
+                run.news_new = news_result['new_count']
+                run.news_seen = news_result['seen_count']
+                run.news_not_modified = news_result['not_modified_count']
+                run.news_ok = news_result['feeds_ok'] > 0
+                news_failed = not run.news_ok
+                notes.extend(news_result['errors'])
+            except Exception as exc:
+                notes.append(f"news_error: {exc}")
+                logger.exception('News RSS fetch failed: %s', exc)
+                news_failed = True
+            if schedule_type == 'auto':
+                run.news_interval_sec = record_run(NEWS, news_new, now, failed=news_failed)
+
+        if ANNOUNCEMENTS in sources:
+            created = 0
+            ann_failed = False
+            try:
+                ann_result = merge_announcement_results(
+                    [(symbol, fetch_announcements_nse(symbol=symbol)) for symbol in active_symbols()]
+                )
+                parsed = ann_result['parsed_count']
+                created = ann_result['saved_count']
+                updated = ann_result['updated_count']
+                skipped = ann_result['skipped_duplicates']
+                parse_errors = ann_result['parse_errors']
+                errors = ann_result['errors']
+
+                run.announcements_fetched = created
+                run.announcements_ok = (created + updated + skipped) > 0 and not errors
+                if errors:
+                    ann_failed = True
+                    notes.append(f"announcements_error: {','.join(errors)}")
+                notes.append(
+                    f"ann_parsed={parsed}, ann_created={created}, ann_updated={updated}, ann_skipped={skipped}, ann_parse_errors={parse_errors}"
+                )
+            except Exception as exc:
+                notes.append(f"announcements_error: {exc}")
+                logger.exception('Announcements fetch failed: %s', exc)
+                ann_failed = True
+            if schedule_type == 'auto':
+                run.announcements_interval_sec = record_run(ANNOUNCEMENTS, created, now, failed=ann_failed)
 
+    run.timings_json = timings.summary()
     run.finished_at = timezone.now()
     run.notes = '; '.join(notes)
     run.save()
@@ -1,6 +1,50 @@
-﻿
+﻿from .keywords import PhraseMatcher
+
+BOARD_MEETING_KEYWORDS = ('outcome of board meeting',)
+RESULTS_KEYWORDS = (
+    'financial results',
+    'unaudited financial results',
+    'unaudited',
+    'limited review',
+    'standalone',
+    'consolidated',
+    'quarter',
+    'nine months',
+)
+RESULTS_ONLY_KEYWORDS = ('financial results', 'unaudited financial results', 'unaudited')
+DIVIDEND_KEYWORDS = ('dividend',)
+BONUS_KEYWORDS = ('bonus',)
+SPLIT_KEYWORDS = ('split',)
+FUNDRAISE_KEYWORDS = ('fund raise', 'preferential', 'warrant')
+LEGAL_KEYWORDS = ('penalty', 'court', 'notice', 'legal')
+INSIDER_KEYWORDS = ('insider trading', 'insider')
+COMPLIANCE_KEYWORDS = ('copy of newspaper publication', 'xbrl', 'compliance', 'submission of copies')
+NEWS_TAG_KEYWORDS = ('results', 'order', 'fraud', 'penalty', 'dividend', 'bonus', 'split')
+
+MATCHER = PhraseMatcher(
+    BOARD_MEETING_KEYWORDS
+    + RESULTS_KEYWORDS
+    + DIVIDEND_KEYWORDS
+    + BONUS_KEYWORDS
+    + SPLIT_KEYWORDS
+    + FUNDRAISE_KEYWORDS
+    + LEGAL_KEYWORDS
+    + INSIDER_KEYWORDS
+    + COMPLIANCE_KEYWORDS
+    + NEWS_TAG_KEYWORDS
+)
+
+
 def classify_announcement(headline, summary=''):
-    text = f"{headline} {summary}".lower()
+    return _classify(MATCHER.find(f"{headline} {summary}"))
+
+
+def classify_announcements(headlines):
+    """``classify_announcement`` for a list of headlines, scanned in one pass."""
+    return [_classify(found) for found in MATCHER.find_many(headlines)]
+
+
+def _classify(found):
     tags = []
     low_priority = False
     typ = 'other'
@@ -8,61 +52,50 @@ def classify_announcement(headline, summary=''):
     impact_score = 0
 
     def has(*keywords):
-        return any(keyword in text for keyword in keywords)
-
-    results_keywords = (
-        'financial results',
-        'unaudited financial results',
-        'unaudited',
-        'limited review',
-        'standalone',
-        'consolidated',
-        'quarter',
-        'nine months',
-    )
-
-    if has('outcome of board meeting') and has(*results_keywords):
+        return not found.isdisjoint(keywords)
+
+    if has(*BOARD_MEETING_KEYWORDS) and has(*RESULTS_KEYWORDS):
         typ = 'results'
         impact_score = 70
         low_priority = False
-    elif has('financial results', 'unaudited financial results', 'unaudited'):
+    elif has(*RESULTS_ONLY_KEYWORDS):
         typ = 'results'
         impact_score = 70
         low_priority = False
-    elif has('outcome of board meeting'):
+    elif has(*BOARD_MEETING_KEYWORDS):
         typ = 'board_meeting'
         impact_score = 25
         low_priority = False
 
-    if has('dividend'):
+    if has(*DIVIDEND_KEYWORDS):
         typ = 'dividend'
         polarity = 1
         impact_score = max(impact_score, 40)
         low_priority = False
 
-    if has('bonus') or has('split'):
-        typ = 'bonus' if has('bonus') else 'split'
+    if has(*BONUS_KEYWORDS) or has(*SPLIT_KEYWORDS):
+        typ = 'bonus' if has(*BONUS_KEYWORDS) else 'split'
         polarity = 1
         impact_score = max(impact_score, 45)
         low_priority = False
 
-    if has('fund raise', 'preferential', 'warrant'):
+    if has(*FUNDRAISE_KEYWORDS):
         typ = 'fundraise'
         impact_score = max(impact_score, 25)
         low_priority = False
 
-    if has('penalty', 'court', 'notice', 'legal'):
+    if has(*LEGAL_KEYWORDS):
         typ = 'legal'
         polarity = -1
         impact_score = min(impact_score, -40) if impact_score else -40
         low_priority = False
 
-    if has('insider trading', 'insider'):
+    if has(*INSIDER_KEYWORDS):
         typ = 'insider'
         low_priority = True
         impact_score = 5
 
-    if has('copy of newspaper publication', 'xbrl', 'compliance', 'submission of copies'):
+    if has(*COMPLIANCE_KEYWORDS):
         typ = 'compliance'
         low_priority = True
         impact_score = 0
@@ -88,9 +121,5 @@ def classify_announcement(headline, summary=''):
 
 
 def tag_news(text):
-    text_lower = (text or '').lower()
-    tags = {}
-    for key in ['results', 'order', 'fraud', 'penalty', 'dividend', 'bonus', 'split']:
-        if key in text_lower:
-            tags[key] = True
-    return tags
+    found = MATCHER.find(text)
+    return {key: True for key in NEWS_TAG_KEYWORDS if key in found}
@@ -1,14 +1,41 @@
+from importlib import import_module
 from io import StringIO
-from datetime import timedelta
+import random
+from datetime import datetime, timedelta, timezone as dt_timezone
 from unittest.mock import patch
 
 from django.core.management import call_command
-from django.test import TestCase
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
-from apps.events.models import Announcement
+from apps.events.aggregates import (
+    news_series,
+    refresh_announcement_aggregates,
+    refresh_news_aggregates,
+    state_at,
+    window_delta,
+)
+from apps.events.models import (
+    Announcement,
+    EventMinuteAggregate,
+    EventsFetchRun,
+    EventSourceSchedule,
+    NewsItem,
+    RssFeedState,
+)
+from apps.events.scheduler import ANNOUNCEMENTS, NEWS, choose_interval, due_sources, record_run
+from apps.events.tasks import fetch_events_task
+from apps.events.nse import NseClient
+from apps.events.keywords import PhraseMatcher
+from apps.events.rss import fetch_feeds, get_rss_urls, news_keywords, save_feed_states
+from apps.events.services import fetch_announcements_nse, fetch_news_rss
 from apps.events.services import high_impact_queryset
+from apps.events.sentiment import NEGATIVE_WORDS, POSITIVE_WORDS, score_sentiment
+from apps.events.taxonomy import MATCHER, classify_announcement, classify_announcements, tag_news
 from apps.events.utils import build_announcement_dedupe_key
+from apps.market.models import TrackedSymbol
 
 
 class FetchEventsCommandTests(TestCase):
@@ -16,7 +43,7 @@ class FetchEventsCommandTests(TestCase):
         out = StringIO()
         with patch('apps.events.management.commands.fetch_events.fetch_news_rss') as mock_news, \
                 patch('apps.events.management.commands.fetch_events.fetch_announcements_nse') as mock_ann:
-            mock_news.return_value = (0, '')
+            mock_news.return_value = {'new_count': 0, 'seen_count': 0, 'feeds_ok': 1, 'not_modified_count': 1, 'errors': []}
             mock_ann.return_value = {
                 'parsed_count': 2,
                 'saved_count': 0,
@@ -37,7 +64,7 @@ class FetchEventsCommandTests(TestCase):
         with patch('apps.events.management.commands.fetch_events.fetch_news_rss') as mock_news, \
                 patch('apps.events.management.commands.fetch_events.fetch_announcements_nse') as mock_ann, \
                 patch('apps.events.management.commands.fetch_events.call_command') as mock_call:
-            mock_news.return_value = (0, '')
+            mock_news.return_value = {'new_count': 0, 'seen_count': 0, 'feeds_ok': 1, 'not_modified_count': 1, 'errors': []}
             mock_ann.return_value = {
                 'parsed_count': 1,
                 'saved_count': 0,
@@ -93,3 +120,640 @@ class HighImpactQuerysetTests(TestCase):
         output = out.getvalue()
         self.assertIn('High impact (7d, rolling_168h): 1', output)
         self.assertIn('High impact (7d, calendar_days):', output)
+
+
+RSS_BODY = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Test feed</title>
+<item><title>JSLL wins order</title><link>https://example.com/a</link>
+<description>Order win</description><pubDate>Mon, 09 Feb 2026 10:00:00 GMT</pubDate></item>
+</channel></rss>"""
+
+
+class MaintenanceCommandTests(TestCase):
+    def _seed(self, groups=6, copies=3):
+        base = timezone.now().replace(second=0, microsecond=0) - timedelta(days=1)
+        for group in range(groups):
+            for copy in range(copies):
+                Announcement.objects.create(
+                    published_at=base + timedelta(minutes=group, seconds=copy * 10),
+                    headline='Outcome of Board Meeting - Unaudited Financial Results' if copy == 0 else 'Clarification',
+                    url=f'http://example.com/{group}.pdf',
+                    type='results' if copy == 0 else 'other',
+                    impact_score=70 if copy == 0 else 0,
+                )
+
+    def test_dry_run_reports_without_writing(self):
+        self._seed()
+        for command in ('dedupe_announcements', 'backfill_dedupe_keys'):
+            out = StringIO()
+            call_command(command, '--dry-run', stdout=out)
+            self.assertIn('[dry-run] Deleted: 12', out.getvalue())
+            self.assertIn('[dry-run] After: 6', out.getvalue())
+        out = StringIO()
+        call_command('reclassify_announcements', '--dry-run', stdout=out)
+        self.assertIn('Would update 18 of 18', out.getvalue())
+        self.assertEqual(Announcement.objects.count(), 18)
+        self.assertFalse(Announcement.objects.exclude(dedupe_key=None).exists())
+
+    def test_backfill_keeps_best_row_per_key(self):
+        self._seed()
+        out = StringIO()
+        call_command('backfill_dedupe_keys', '--chunk-size', '4', stdout=out)
+        self.assertIn('Deleted: 12', out.getvalue())
+        self.assertEqual(set(Announcement.objects.values_list('type', flat=True)), {'results'})
+        self.assertFalse(Announcement.objects.filter(dedupe_key=None).exists())
+
+    def test_queries_do_not_grow_per_row(self):
+        counts = []
+        for groups in (5, 40):
+            Announcement.objects.all().delete()
+            self._seed(groups=groups, copies=1)
+            with CaptureQueriesContext(connection) as queries:
+                call_command('reclassify_announcements', '--chunk-size', '100', stdout=StringIO())
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+
+class EventMinuteAggregateTests(TestCase):
+    def setUp(self):
+        self.base = timezone.now().replace(second=0, microsecond=0) - timedelta(days=2)
+
+    def _announce(self, minutes, impact, headline='Outcome of Board Meeting - Financial Results', low_priority=False):
+        announcement = Announcement.objects.create(
+            symbol='JSLL.NS',
+            published_at=self.base + timedelta(minutes=minutes),
+            headline=headline,
+            type='results',
+            impact_score=impact,
+            low_priority=low_priority,
+        )
+        refresh_announcement_aggregates('JSLL.NS', since=announcement.published_at)
+        return announcement
+
+    def _snapshot(self):
+        return list(
+            EventMinuteAggregate.objects.order_by('symbol', 'bucket').values(
+                'symbol', 'bucket', 'ann_high_count', 'ann_impact_sum', 'ann_results_count', 'last_impact',
+            )
+        )
+
+    def test_window_counts_match_raw_rows(self):
+        self._announce(0, 70)
+        self._announce(30.5, 5)
+        self._announce(90, 40)
+        self._announce(100, 70, low_priority=True)
+        ts = self.base + timedelta(minutes=120)
+
+        current = state_at('JSLL.NS', ts)
+        self.assertEqual(current['ann_high_count'], 2)
+        self.assertEqual(current['last_impact'], 40)
+        delta = window_delta('JSLL.NS', ts, timedelta(minutes=90), current=current)
+        # (30m, 120m]: the 30.5m and 90m announcements.
+        self.assertEqual(delta['ann_impact_sum'], 45)
+        self.assertEqual(delta['ann_high_count'], 1)
+        # The 30.5m announcement closes in the 31m bucket.
+        self.assertEqual(state_at('JSLL.NS', self.base + timedelta(minutes=30))['ann_impact_sum'], 70)
+        self.assertEqual(state_at('JSLL.NS', self.base + timedelta(minutes=31))['ann_impact_sum'], 75)
+
+    def test_out_of_order_write_matches_full_rebuild(self):
+        self._announce(10, 70)
+        self._announce(50, 40)
+        self._announce(20, 10, headline='Dividend')
+        incremental = self._snapshot()
+        refresh_announcement_aggregates('JSLL.NS')
+        self.assertEqual(incremental, self._snapshot())
+        self.assertEqual([row['ann_results_count'] for row in incremental], [1, 1, 2])
+
+    def test_news_and_bulk_maintenance_keep_series_current(self):
+        NewsItem.objects.create(published_at=self.base, source='x', title='a', url='http://x/a', sentiment=0.5)
+        refresh_news_aggregates('JSLL.NS', since=self.base)
+        self.assertEqual(state_at(news_series('JSLL.NS'), self.base)['news_count'], 1)
+        for headline in ('Outcome of Board Meeting', 'Outcome of Board Meeting - Financial Results'):
+            Announcement.objects.create(
+                symbol='JSLL.NS',
+                published_at=self.base,
+                headline=headline,
+                url='http://example.com/a.pdf',
+                impact_score=70,
+            )
+        refresh_announcement_aggregates('JSLL.NS', since=self.base)
+        self.assertEqual(state_at('JSLL.NS', self.base)['ann_high_count'], 2)
+        call_command('dedupe_announcements', stdout=StringIO())
+        self.assertEqual(Announcement.objects.count(), 1)
+        self.assertEqual(state_at('JSLL.NS', self.base)['ann_high_count'], 1)
+
+    def test_migration_backfills_existing_events(self):
+        from django.apps import apps as django_apps
+
+        migration = import_module('apps.events.migrations.0011_eventminuteaggregate')
+        for minutes, impact, headline in ((10, 70, 'Financial Results'), (20, 5, 'Dividend'), (20.5, 40, 'Dividend')):
+            Announcement.objects.create(
+                symbol='JSLL.NS',
+                published_at=self.base + timedelta(minutes=minutes),
+                headline=headline,
+                type='results',
+                impact_score=impact,
+            )
+        NewsItem.objects.create(published_at=self.base, source='x', title='a', url='http://x/a', sentiment=0.5)
+
+        migration.build_aggregates(django_apps, None)
+        backfilled = self._snapshot()
+        self.assertEqual(state_at('', self.base)['news_count'], 1)
+        EventMinuteAggregate.objects.filter(symbol='').delete()
+        refresh_announcement_aggregates('JSLL.NS')
+        self.assertEqual(backfilled[1:], self._snapshot())
+        self.assertEqual([row['ann_impact_sum'] for row in backfilled[1:]], [70, 75, 115])
+
+    def test_saves_do_not_refresh_and_deletes_do(self):
+        self._announce(10, 70)
+        with CaptureQueriesContext(connection) as queries:
+            Announcement.objects.create(symbol='JSLL.NS', published_at=self.base, headline='Dividend', impact_score=20)
+        self.assertEqual(len(queries), 1)
+        refresh_announcement_aggregates('JSLL.NS', since=self.base)
+        ts = self.base + timedelta(minutes=30)
+        self.assertEqual(state_at('JSLL.NS', ts)['ann_impact_sum'], 90)
+
+        Announcement.objects.filter(headline='Dividend').get().delete()
+        self.assertEqual(state_at('JSLL.NS', ts)['ann_impact_sum'], 70)
+        Announcement.objects.filter(symbol='JSLL.NS').delete()
+        self.assertEqual(state_at('JSLL.NS', ts)['ann_impact_sum'], 0)
+
+        item = NewsItem.objects.create(symbol='JSLL.NS', published_at=self.base, source='x', title='a', url='http://x/a')
+        refresh_news_aggregates('JSLL.NS', since=self.base)
+        item.delete()
+        self.assertEqual(state_at(news_series('JSLL.NS'), ts)['news_count'], 0)
+
+
+@override_settings(
+    JSLL_EVENTS_OPEN_INTERVAL_SEC=600,
+    JSLL_EVENTS_CLOSED_INTERVAL_SEC=1800,
+    JSLL_EVENTS_MAX_INTERVAL_SEC=7200,
+    JSLL_EVENTS_BURST_INTERVAL_SEC=120,
+    JSLL_EVENTS_BACKOFF_FACTOR=2,
+    JSLL_EVENTS_CATALYST_HOURS=12,
+    JSLL_RESULTS_SEASONS=['01-10:02-15'],
+)
+class AdaptiveEventScheduleTests(TestCase):
+    # Wednesday 2026-03-11 11:00 IST: market open, outside results season.
+    open_now = datetime(2026, 3, 11, 5, 30, tzinfo=dt_timezone.utc)
+
+    def test_backs_off_on_empty_runs_and_resets_on_news(self):
+        intervals = [record_run(NEWS, 0, self.open_now) for _ in range(4)]
+        self.assertEqual(intervals, [1200, 2400, 4800, 7200])
+        self.assertEqual(record_run(NEWS, 3, self.open_now), 600)
+        # Sources are tracked independently.
+        self.assertEqual(record_run(ANNOUNCEMENTS, 0, self.open_now), 1200)
+        self.assertEqual(EventSourceSchedule.objects.get(source=NEWS).empty_streak, 0)
+
+    def test_backoff_streak_is_capped(self):
+        self.assertEqual(choose_interval(NEWS, 1100, self.open_now), (7200, 'backoff'))
+        EventSourceSchedule.objects.create(source=NEWS, empty_streak=5000, last_run_at=self.open_now)
+        self.assertEqual(record_run(NEWS, 0, self.open_now), 7200)
+        self.assertEqual(EventSourceSchedule.objects.get(source=NEWS).empty_streak, 4)
+
+    def test_failed_runs_do_not_grow_the_streak(self):
+        record_run(NEWS, 0, self.open_now)
+        self.assertEqual(record_run(NEWS, 0, self.open_now, failed=True), 1200)
+        self.assertEqual(EventSourceSchedule.objects.get(source=NEWS).empty_streak, 1)
+
+    def test_backoff_does_not_skip_market_open(self):
+        # Wednesday 08:00 IST, closed: the 7200s backoff is pulled forward to 09:15.
+        early = datetime(2026, 3, 11, 2, 30, tzinfo=dt_timezone.utc)
+        EventSourceSchedule.objects.create(source=NEWS, empty_streak=3, last_run_at=early - timedelta(hours=2))
+        self.assertEqual(record_run(NEWS, 0, early), 75 * 60)
+        schedule = EventSourceSchedule.objects.get(source=NEWS)
+        self.assertEqual((schedule.next_run_at, schedule.reason), (early + timedelta(minutes=75), 'boundary'))
+
+        # The first run after the open restarts the streak at the open-market base.
+        self.assertEqual(record_run(NEWS, 0, schedule.next_run_at), 1200)
+        self.assertEqual(EventSourceSchedule.objects.get(source=NEWS).empty_streak, 1)
+
+    def test_catalyst_and_results_season_shorten_announcement_polling(self):
+        Announcement.objects.create(
+            published_at=self.open_now - timedelta(hours=2),
+            headline='Outcome of Board Meeting',
+            type='board_meeting',
+            impact_score=25,
+        )
+        self.assertEqual(choose_interval(ANNOUNCEMENTS, 3, self.open_now), (120, 'catalyst'))
+        self.assertEqual(choose_interval(NEWS, 1, self.open_now), (1200, 'backoff'))
+        in_season = datetime(2026, 2, 4, 5, 30, tzinfo=dt_timezone.utc)
+        self.assertEqual(choose_interval(ANNOUNCEMENTS, 3, in_season + timedelta(days=2)), (600, 'results_season'))
+
+    def test_auto_task_fetches_only_due_sources_and_records_interval(self):
+        ann_result = {
+            'parsed_count': 0,
+            'saved_count': 0,
+            'updated_count': 0,
+            'skipped_duplicates': 0,
+            'parse_errors': 0,
+            'errors': [],
+        }
+        with patch('apps.events.tasks.fetch_news_rss', return_value={'new_count': 2, 'seen_count': 5, 'feeds_ok': 1, 'not_modified_count': 0, 'errors': []}) as news, \
+                patch('apps.events.tasks.fetch_announcements_nse', return_value=ann_result) as ann, \
+                patch('apps.events.tasks.timezone.now', return_value=self.open_now), \
+                patch('apps.events.scheduler.timezone.now', return_value=self.open_now):
+            self.assertEqual(fetch_events_task('auto'), 'ok')
+            self.assertEqual(due_sources(self.open_now + timedelta(seconds=700)), [NEWS])
+            self.assertEqual(fetch_events_task('auto'), 'skip')
+        self.assertEqual(news.call_count, 1)
+        self.assertEqual(ann.call_count, 1)
+        run = EventsFetchRun.objects.get()
+        self.assertEqual((run.news_interval_sec, run.announcements_interval_sec), (600, 1200))
+
+
+class HighImpactSignalTests(TestCase):
+    def _items(self, headline):
+        return [{'headline': headline, 'published_at': timezone.now(), 'published_text': '', 'url': 'http://example.com/r.pdf'}]
+
+    @patch('apps.market.tasks.dispatch_downstream')
+    @patch('apps.events.services.fetch_nse_announcements')
+    def test_new_high_impact_announcement_triggers_refresh_once(self, mock_fetch, mock_dispatch):
+        mock_fetch.return_value = self._items('Outcome of Board Meeting - Unaudited Financial Results')
+        with self.captureOnCommitCallbacks(execute=True):
+            fetch_announcements_nse(symbol='JSLL')
+        mock_dispatch.assert_called_once_with('JSLL.NS', recompute_latest=True)
+
+        # A re-fetch of the same row writes nothing and stays quiet.
+        with self.captureOnCommitCallbacks(execute=True):
+            fetch_announcements_nse(symbol='JSLL')
+        self.assertEqual(mock_dispatch.call_count, 1)
+
+    @patch('apps.market.tasks.dispatch_downstream')
+    @patch('apps.events.services.fetch_nse_announcements')
+    def test_low_priority_announcement_does_not_trigger(self, mock_fetch, mock_dispatch):
+        mock_fetch.return_value = self._items('Copy of Newspaper Publication')
+        with self.captureOnCommitCallbacks(execute=True):
+            fetch_announcements_nse(symbol='JSLL')
+        mock_dispatch.assert_not_called()
+
+
+class _Response:
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+
+@override_settings(JSLL_RSS_MAX_WORKERS=4, JSLL_RSS_TIMEOUT_SEC=2)
+class RssFetchTests(TestCase):
+    urls = ['https://feeds.example.com/a', 'https://feeds.example.com/b']
+
+    def test_conditional_fetch_skips_unchanged_feeds(self):
+        def first(url, headers, timeout):
+            self.assertNotIn('If-None-Match', headers)
+            return _Response(200, RSS_BODY, {'ETag': f'"{url[-1]}1"', 'Last-Modified': 'Mon, 09 Feb 2026 10:00:00 GMT'})
+
+        with patch('apps.events.rss.get_rss_urls', return_value=self.urls), \
+                patch('requests.get', side_effect=first):
+            items, feeds = fetch_feeds()
+        self.assertEqual(len(items), 2)
+        self.assertFalse(RssFeedState.objects.exists())
+        save_feed_states(feeds)
+        self.assertEqual(RssFeedState.objects.get(url=self.urls[0]).etag, '"a1"')
+
+        seen_headers = []
+
+        def second(url, headers, timeout):
+            seen_headers.append(headers)
+            return _Response(304)
+
+        with patch('apps.events.rss.get_rss_urls', return_value=self.urls), \
+                patch('requests.get', side_effect=second):
+            items, feeds = fetch_feeds()
+        save_feed_states(feeds)
+        self.assertEqual(items, [])
+        self.assertEqual(sorted(h['If-None-Match'] for h in seen_headers), ['"a1"', '"b1"'])
+        self.assertTrue(all(h['If-Modified-Since'] for h in seen_headers))
+        state = RssFeedState.objects.get(url=self.urls[1])
+        self.assertEqual(state.last_status, 304)
+        self.assertEqual(state.etag, '"b1"')
+
+    def test_failing_feed_does_not_block_others(self):
+        def fetch(url, headers, timeout):
+            if url.endswith('a'):
+                raise TimeoutError('slow feed')
+            return _Response(200, RSS_BODY)
+
+        with patch('apps.events.rss.get_rss_urls', return_value=self.urls), \
+                patch('requests.get', side_effect=fetch):
+            items, feeds = fetch_feeds()
+        save_feed_states(feeds)
+        self.assertEqual(len(items), 1)
+        self.assertFalse(RssFeedState.objects.filter(url=self.urls[0]).exists())
+
+
+    def test_validators_are_not_saved_when_storing_fails(self):
+        def fetch(url, headers, timeout):
+            return _Response(200, RSS_BODY, {'ETag': f'"{url[-1]}1"'})
+
+        with patch('apps.events.rss.get_rss_urls', return_value=self.urls), \
+                patch('requests.get', side_effect=fetch), \
+                patch('apps.events.services.score_sentiment', side_effect=RuntimeError('model unavailable')):
+            with self.assertRaises(RuntimeError):
+                fetch_news_rss()
+        self.assertFalse(RssFeedState.objects.exists())
+
+        with patch('apps.events.rss.get_rss_urls', return_value=self.urls), \
+                patch('requests.get', side_effect=fetch):
+            self.assertEqual(fetch_news_rss()['new_count'], 1)
+        self.assertEqual(RssFeedState.objects.get(url=self.urls[1]).etag, '"b1"')
+
+
+class NewsPrefilterTests(TestCase):
+    def _item(self, idx):
+        return {
+            'title': f'Jubilant story {idx}',
+            'summary': 'Shares rise on strong results',
+            'source': 'example',
+            'url': f'https://news.example.com/{idx}',
+            'published_at': timezone.now(),
+            'symbol': 'JSLL.NS',
+        }
+
+    def test_only_new_urls_are_scored_and_inserted(self):
+        NewsItem.objects.create(published_at=timezone.now(), source='example', title='old', url='https://news.example.com/0')
+        items = [self._item(0), self._item(1), self._item(2), self._item(1)]
+        with patch('apps.events.services.fetch_feeds', return_value=(items, [])), \
+                patch('apps.events.services.score_sentiment', return_value=0.5) as mock_score:
+            result = fetch_news_rss()
+        self.assertEqual(result, {'new_count': 2, 'seen_count': 2, 'feeds_ok': 0, 'not_modified_count': 0, 'errors': []})
+        self.assertEqual(mock_score.call_count, 2)
+        self.assertEqual(NewsItem.objects.count(), 3)
+
+    @override_settings(JSLL_TICKER='JSLL.NS')
+    def test_news_is_stored_and_aggregated_per_symbol(self):
+        feeds = {'JSLL.NS': ['https://feeds.example.com/a'], 'AAA.NS': ['https://feeds.example.com/a', 'https://feeds.example.com/b']}
+        with patch('apps.events.rss.get_rss_urls', side_effect=feeds.get), \
+                patch('requests.get', return_value=_Response(200, RSS_BODY)) as mock_get, \
+                patch('apps.events.services.score_sentiment', return_value=0.5):
+            result = fetch_news_rss(['JSLL.NS', 'AAA.NS'])
+        # The shared feed is fetched once and its entry stored for both tickers.
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual((result['new_count'], result['seen_count']), (2, 1))
+        self.assertEqual(NewsItem.objects.filter(symbol='JSLL.NS').count(), 1)
+        self.assertEqual(NewsItem.objects.filter(symbol='AAA.NS').count(), 1)
+        later = timezone.now() + timedelta(days=1)
+        self.assertEqual(state_at(news_series('AAA.NS'), later)['news_count'], 1)
+        self.assertEqual(state_at(news_series('BBB.NS'), later)['news_count'], 0)
+
+    @override_settings(JSLL_TICKER='JSLL.NS')
+    def test_feeds_search_each_symbols_keywords(self):
+        TrackedSymbol.objects.create(ticker='TATASTEEL.NS', nse_symbol='TATASTEEL', news_keywords='Tata Steel, TATASTEEL')
+        self.assertEqual(news_keywords('TATASTEEL.NS'), ['Tata Steel', 'TATASTEEL'])
+        self.assertEqual(news_keywords('AAA.NS'), ['AAA'])
+        self.assertIn('Jeena Sikho Lifecare', news_keywords('JSLL.NS'))
+        with patch.dict('os.environ', {'EVENTS_RSS_URLS': 'https://feeds.example.com/jsll'}):
+            self.assertIn('https://feeds.example.com/jsll', get_rss_urls('JSLL.NS'))
+            self.assertEqual(get_rss_urls('AAA.NS'), ['https://news.google.com/rss/search?q=AAA'])
+
+    def test_fetch_events_records_new_and_seen(self):
+        with patch('apps.events.management.commands.fetch_events.fetch_news_rss') as mock_news, \
+                patch('apps.events.management.commands.fetch_events.fetch_announcements_nse') as mock_ann:
+            mock_news.return_value = {'new_count': 3, 'seen_count': 40, 'feeds_ok': 2, 'not_modified_count': 1, 'errors': []}
+            mock_ann.return_value = {
+                'parsed_count': 0,
+                'saved_count': 0,
+                'updated_count': 0,
+                'skipped_duplicates': 0,
+                'parse_errors': 0,
+                'errors': [],
+            }
+            call_command('fetch_events', stdout=StringIO())
+        run = EventsFetchRun.objects.get()
+        self.assertEqual((run.news_new, run.news_seen, run.news_not_modified), (3, 40, 1))
+        self.assertTrue(run.news_ok)
+
+    def test_unchanged_feeds_are_a_healthy_run(self):
+        with patch('apps.events.rss.get_rss_urls', return_value=['https://feeds.example.com/a']), \
+                patch('requests.get', return_value=_Response(304)):
+            result = fetch_news_rss()
+        self.assertEqual((result['new_count'], result['feeds_ok'], result['not_modified_count']), (0, 1, 1))
+        self.assertEqual(result['errors'], [])
+
+        with patch('apps.events.rss.get_rss_urls', return_value=['https://feeds.example.com/a']), \
+                patch('requests.get', side_effect=TimeoutError('down')):
+            result = fetch_news_rss()
+        self.assertEqual(result['feeds_ok'], 0)
+        self.assertEqual(result['errors'], ['rss_error: https://feeds.example.com/a down'])
+
+
+def _legacy_classify(headline, summary=''):
+    # Reference copy of the substring-scan rules the compiled matcher replaced.
+    text = f"{headline} {summary}".lower()
+    tags = []
+    low_priority = False
+    typ = 'other'
+    polarity = 0
+    impact_score = 0
+
+    def has(*keywords):
+        return any(keyword in text for keyword in keywords)
+
+    results_keywords = (
+        'financial results', 'unaudited financial results', 'unaudited', 'limited review',
+        'standalone', 'consolidated', 'quarter', 'nine months',
+    )
+    if has('outcome of board meeting') and has(*results_keywords):
+        typ, impact_score = 'results', 70
+    elif has('financial results', 'unaudited financial results', 'unaudited'):
+        typ, impact_score = 'results', 70
+    elif has('outcome of board meeting'):
+        typ, impact_score = 'board_meeting', 25
+    if has('dividend'):
+        typ, polarity, impact_score = 'dividend', 1, max(impact_score, 40)
+    if has('bonus') or has('split'):
+        typ = 'bonus' if has('bonus') else 'split'
+        polarity, impact_score = 1, max(impact_score, 45)
+    if has('fund raise', 'preferential', 'warrant'):
+        typ, impact_score = 'fundraise', max(impact_score, 25)
+    if has('penalty', 'court', 'notice', 'legal'):
+        typ, polarity = 'legal', -1
+        impact_score = min(impact_score, -40) if impact_score else -40
+    if has('insider trading', 'insider'):
+        typ, low_priority, impact_score = 'insider', True, 5
+    if has('copy of newspaper publication', 'xbrl', 'compliance', 'submission of copies'):
+        typ, low_priority, impact_score = 'compliance', True, 0
+    if typ == 'other':
+        low_priority, impact_score = True, 0
+    if impact_score >= 50:
+        tags.append('high_impact')
+    if low_priority:
+        tags.append('low_priority')
+    return {
+        'type': typ,
+        'polarity': polarity,
+        'impact_score': max(-100, min(100, impact_score)),
+        'low_priority': low_priority,
+        'tags': tags,
+    }
+
+
+def _legacy_tag_news(text):
+    text_lower = (text or '').lower()
+    return {key: True for key in ['results', 'order', 'fraud', 'penalty', 'dividend', 'bonus', 'split'] if key in text_lower}
+
+
+def _legacy_sentiment(text):
+    if not text:
+        return 0.0
+    punctuation = ".,:;!?()[]{}\"'" + "-"
+    tokens = [token.strip(punctuation).lower() for token in text.split()]
+    pos = sum(1 for token in tokens if token in POSITIVE_WORDS)
+    neg = sum(1 for token in tokens if token in NEGATIVE_WORDS)
+    if pos == 0 and neg == 0:
+        return 0.0
+    return max(-1.0, min(1.0, (pos - neg) / max(pos + neg, 1)))
+
+
+def _keyword_corpus(size=3000, seed=7):
+    rng = random.Random(seed)
+    vocabulary = list(MATCHER.phrases) + sorted(POSITIVE_WORDS | NEGATIVE_WORDS) + [
+        'Jubilant', 'Limited', 'Board', 'of', 'the', 'Q3', 'FY26', 'Regulation 30', 'SEBI', 'LODR',
+        'unaudit', 'dividends', 'splits', 'insiders', 'court-approved', 'NOTICE:', '(loss)', '"gains"',
+        'order-book', 'lo-ss', 'profit...', '-', "'", '', 'İstanbul',
+    ]
+    separators = [' ', '  ', ' - ', ', ', '\t', '\n', '', '-']
+    corpus = [
+        'Outcome of Board Meeting - Unaudited Financial Results Q3',
+        'Copy of Newspaper Publication',
+        'Company receives penalty notice',
+        'Board approves stock split and bonus issue',
+        'Clarification - Financial Results',
+        '',
+    ]
+    for _ in range(size):
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(1, 8))]
+        text = ''
+        for word in words:
+            text += rng.choice(separators) + (word.upper() if rng.random() < 0.2 else word.title() if rng.random() < 0.3 else word)
+        corpus.append(text)
+    return corpus
+
+
+class KeywordEngineParityTests(SimpleTestCase):
+    def test_matches_legacy_rules_over_corpus(self):
+        corpus = _keyword_corpus()
+        for text in corpus:
+            self.assertEqual(classify_announcement(text), _legacy_classify(text), text)
+            self.assertEqual(classify_announcement(text, 'Dividend'), _legacy_classify(text, 'Dividend'), text)
+            self.assertEqual(tag_news(text), _legacy_tag_news(text), text)
+            self.assertEqual(score_sentiment(text), _legacy_sentiment(text), text)
+        self.assertEqual(classify_announcements(corpus), [_legacy_classify(text) for text in corpus])
+
+    def test_overlapping_phrases_are_all_found(self):
+        matcher = PhraseMatcher(['unaudited', 'unaudited financial results', 'financial results', 'results'])
+        self.assertEqual(
+            matcher.find('Unaudited Financial Results'),
+            {'unaudited', 'unaudited financial results', 'financial results', 'results'},
+        )
+        self.assertEqual(matcher.find_many(['unaudited', '', 'results']), [{'unaudited'}, set(), {'results'}])
+
+
+class _Cookie:
+    def __init__(self, expired=False):
+        self.expired = expired
+
+    def is_expired(self):
+        return self.expired
+
+
+class _CookieJar(list):
+    def clear(self):
+        del self[:]
+
+
+class _FakeSession:
+    def __init__(self, api_statuses):
+        self.cookies = _CookieJar()
+        self.calls = []
+        self._api_statuses = list(api_statuses)
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.calls.append((url, params))
+        if url == 'https://www.nseindia.com/':
+            self.cookies.append(_Cookie())
+            return _Response(200)
+        return _Response(self._api_statuses.pop(0) if self._api_statuses else 200)
+
+
+class NseClientTests(TestCase):
+    def _homepage_hits(self, session):
+        return sum(1 for url, _params in session.calls if url == 'https://www.nseindia.com/')
+
+    def test_cookies_reused_between_requests(self):
+        session = _FakeSession([200, 200])
+        client = NseClient(cookie_ttl=600, session_factory=lambda: session, sleep=lambda _s: None)
+        client.get('https://www.nseindia.com/api/x')
+        client.get('https://www.nseindia.com/api/x')
+        self.assertEqual(self._homepage_hits(session), 1)
+
+    def test_forbidden_refreshes_cookies_with_backoff(self):
+        session = _FakeSession([403, 401, 200])
+        sleeps = []
+        client = NseClient(cookie_ttl=600, backoff=0.5, session_factory=lambda: session, sleep=sleeps.append)
+        response = client.get('https://www.nseindia.com/api/x')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._homepage_hits(session), 3)
+        self.assertEqual(sleeps, [0.5, 1.0])
+
+    def test_expired_cookie_triggers_refresh(self):
+        session = _FakeSession([200, 200])
+        client = NseClient(cookie_ttl=600, session_factory=lambda: session, sleep=lambda _s: None)
+        client.get('https://www.nseindia.com/api/x')
+        session.cookies[0].expired = True
+        client.get('https://www.nseindia.com/api/x')
+        self.assertEqual(self._homepage_hits(session), 2)
+
+    @patch('apps.events.services.fetch_nse_announcements')
+    def test_fetch_requests_only_since_newest_announcement(self, mock_fetch):
+        mock_fetch.return_value = []
+        fetch_announcements_nse(symbol='JSLL')
+        self.assertIsNone(mock_fetch.call_args.kwargs['since'])
+
+        newest = timezone.now() - timedelta(days=2)
+        Announcement.objects.create(symbol='JSLL.NS', headline='Old', published_at=newest - timedelta(days=3))
+        Announcement.objects.create(symbol='JSLL.NS', headline='New', published_at=newest)
+        result = fetch_announcements_nse(symbol='JSLL')
+        self.assertEqual(mock_fetch.call_args.kwargs['since'], newest)
+        self.assertEqual(mock_fetch.call_args.kwargs['symbol'], 'JSLL')
+        self.assertEqual(result['errors'], [])
+
+
+class QueryPlanTests(TestCase):
+    """The hot event queries must be able to use their indexes.
+
+    Postgres is told to avoid sequential scans so the plan shows whether a
+    usable index exists even on near-empty test tables.
+    """
+
+    def _plan(self, queryset):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def test_hot_queries_use_indexes(self):
+        now = timezone.now()
+        cases = [
+            (
+                high_impact_queryset(days=7, symbol='JSLL.NS').order_by('-published_at'),
+                'announcement_high_impact_idx',
+            ),
+            (
+                Announcement.objects.filter(symbol='JSLL.NS', low_priority=False, published_at__gt=now)
+                .order_by('published_at', 'id')
+                .values_list('published_at', 'impact_score'),
+                'announcement_high_impact_idx',
+            ),
+            (Announcement.objects.filter(symbol='JSLL.NS').order_by('-published_at')[:50], 'announcement_symbol_pub_idx'),
+            (
+                NewsItem.objects.filter(symbol='JSLL.NS', published_at__gte=now).values_list('sentiment'),
+                'newsitem_symbol_pub_idx',
+            ),
+            (NewsItem.objects.filter(symbol='JSLL.NS').order_by('-published_at')[:50], 'newsitem_symbol_pub_idx'),
+        ]
+        for queryset, index in cases:
+            plan = self._plan(queryset)
+            with self.subTest(index=index, sql=str(queryset.query)):
+                self.assertIn(index, plan, plan)
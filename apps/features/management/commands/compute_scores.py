@@ -1,13 +1,23 @@
 ﻿from django.core.management.base import BaseCommand
 
 from apps.features.services import compute_latest_missing
+from apps.ops.profiling import add_profile_argument, profile_run, report
 
 
 class Command(BaseCommand):
     help = 'Compute latest missing feature scores.'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--symbol', help='Ticker to score. Default: JSLL_TICKER')
+        add_profile_argument(parser)
+
     def handle(self, *args, **options):
-        result = compute_latest_missing()
+        with profile_run('compute_scores', enabled=options['profile']) as profile:
+            self.compute(options)
+        report(self.stdout, profile)
+
+    def compute(self, options):
+        result = compute_latest_missing(symbol=options.get('symbol'))
         if result is None:
             self.stdout.write('No candle data available.')
             return
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+BRIN_INDEXES = (
+    ('features_feature1m', 'ts'),
+    ('features_signalscore', 'ts'),
+)
+
+
+def create_brin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, column in BRIN_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{table}_{column}_brin" ON "{table}" '
+            f'USING brin ("{column}") WITH (pages_per_range = 32)'
+        )
+
+
+def drop_brin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, column in BRIN_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{table}_{column}_brin"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('features', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_brin_indexes, drop_brin_indexes),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:03
+
+import apps.market.symbols
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('features', '0002_brin_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feature1m',
+            name='symbol',
+            field=models.CharField(default=apps.market.symbols.default_symbol, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='signalscore',
+            name='symbol',
+            field=models.CharField(default=apps.market.symbols.default_symbol, max_length=32),
+        ),
+        migrations.AlterField(
+            model_name='feature1m',
+            name='ts',
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='signalscore',
+            name='ts',
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.AddConstraint(
+            model_name='feature1m',
+            constraint=models.UniqueConstraint(fields=('symbol', 'ts'), name='uniq_feature1m_symbol_ts'),
+        ),
+        migrations.AddConstraint(
+            model_name='signalscore',
+            constraint=models.UniqueConstraint(fields=('symbol', 'ts'), name='uniq_signalscore_symbol_ts'),
+        ),
+    ]
@@ -0,0 +1,443 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:44
+
+import re
+
+from django.db import migrations, models
+from django.utils import timezone
+
+_BATCH_SIZE = 2000
+
+# The reason catalogue and explanation layout at the time of this migration.
+# They are copied here so later edits to apps.features.scoring cannot change
+# what this migration reads or writes.
+_REASONS = (
+    'Insufficient history',
+    'RSI overbought ({rsi_14:.0f}); 15m return {ret_15m_pct:.2f}%',
+    'RSI oversold ({rsi_14:.0f}); 15m return {ret_15m_pct:.2f}%',
+    'Positive 15m momentum ({ret_15m_pct:.2f}%)',
+    'Negative 15m momentum ({ret_15m_pct:.2f}%)',
+    'Neutral momentum; RSI {rsi_14:.0f}',
+    'Strong volume surge (z={vol_z_20:.1f})',
+    'Above-average volume (z={vol_z_20:.1f})',
+    'Low volume (z={vol_z_20:.1f})',
+    'Normal volume (z={vol_z_20:.1f})',
+    'No news in last 24h',
+    'Positive news sentiment ({news_count_24h} items, avg {news_sent_avg_24h:.2f})',
+    'Negative news sentiment ({news_count_24h} items, avg {news_sent_avg_24h:.2f})',
+    '{news_count_24h} news items; neutral sentiment',
+    'High-impact announcements in 24h (sum={ann_impact_sum_24h})',
+    'Results/board meeting announced in last 7 days',
+    'Some announcement activity (impact sum {ann_impact_sum_24h})',
+    'No significant announcements',
+    'Volatile regime (vol={realized_vol_60m:.4f})',
+    'Active regime (vol={realized_vol_60m:.4f})',
+    'Calm regime (vol={realized_vol_60m:.4f})',
+    'Volatile regime (vol={realized_vol_60m:.4f}); {vwap_pct:.2f}% {vwap_side} VWAP',
+    'Active regime (vol={realized_vol_60m:.4f}); {vwap_pct:.2f}% {vwap_side} VWAP',
+    'Calm regime (vol={realized_vol_60m:.4f}); {vwap_pct:.2f}% {vwap_side} VWAP',
+    'Insufficient candle history',
+    'Scores held at neutral baseline',
+    'High announcement impact in last 24h',
+    'Volume surge vs 20m average',
+    'Positive 15m momentum',
+    'Negative 15m momentum',
+    'RSI elevated (overbought)',
+    'RSI depressed (oversold)',
+    'Positive news sentiment',
+    'Negative news sentiment',
+    'Price {vwap_pct:.1f}% {vwap_side} VWAP',
+    'Mixed signals; neutral stance',
+)
+_CATEGORIES = ('price_action', 'volume', 'announcements', 'news', 'regime')
+_KEY_FEATURES = (
+    'ret_1m',
+    'ret_15m',
+    'rsi_14',
+    'vol_z_20',
+    'ann_impact_sum_24h',
+    'results_flag_7d',
+    'realized_vol_60m',
+    'vwap_dist',
+)
+_EXPLAIN_VALUES = _KEY_FEATURES + ('news_count_24h', 'news_sent_avg_24h')
+
+# Defaults of the feature keys at the time of this migration.
+_FEATURE_DEFAULTS = {
+    'ret_1m': 0.0,
+    'ret_5m': 0.0,
+    'ret_15m': 0.0,
+    'rsi_14': 50.0,
+    'atr_14': 0.0,
+    'atr_pct': 0.0,
+    'candle_body_pct': 0.0,
+    'range_pct': 0.0,
+    'vol_z_20': 0.0,
+    'vol_z_60': 0.0,
+    'vwap_dist': 0.0,
+    'ann_high_count_24h': 0,
+    'ann_impact_sum_24h': 0,
+    'ann_impact_sum_7d': 0,
+    'ann_results_flag_7d': 0,
+    'time_since_last_high_impact_min': None,
+    'news_count_24h': 0,
+    'news_sent_avg_24h': 0.0,
+    'realized_vol_60m': 0.0,
+    'regime_high_vol': 0,
+    'regime_label': 'calm',
+    'insufficient_history': False,
+}
+_SCORE_FIELDS = list(_EXPLAIN_VALUES) + [f'{category}_reason' for category in _CATEGORIES] + [
+    'top_reason_1',
+    'top_reason_2',
+    'top_reason_3',
+    'legacy_explain_json',
+]
+
+
+def _params(values):
+    return {
+        **values,
+        'ret_15m_pct': values['ret_15m'] * 100,
+        'vwap_pct': abs(values['vwap_dist']) * 100,
+        'vwap_side': 'above' if values['vwap_dist'] > 0 else 'below',
+    }
+
+
+def _render_explain(values, codes):
+    params = _params(values)
+    return {
+        'key_features': {key: values[key] for key in _KEY_FEATURES},
+        'top_reasons': [_REASONS[code].format(**params) for code in codes['top']],
+        'category_reasons': {category: _REASONS[codes[category]].format(**params) for category in _CATEGORIES},
+    }
+
+
+def _converted(queryset, fields, convert):
+    model = queryset.model
+    batch = []
+    for row in queryset.iterator(chunk_size=_BATCH_SIZE):
+        convert(row)
+        batch.append(row)
+        if len(batch) >= _BATCH_SIZE:
+            model.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        model.objects.bulk_update(batch, fields)
+
+
+def convert_features(apps, schema_editor):
+    """Copy ``feature_json`` into the typed columns."""
+    Feature1m = apps.get_model('features', 'Feature1m')
+
+    def convert(row):
+        feature_json = row.feature_json or {}
+        for key, default in _FEATURE_DEFAULTS.items():
+            value = feature_json.get(key, default)
+            setattr(row, key, default if value is None and default is not None else value)
+
+    _converted(Feature1m.objects.only('id', 'feature_json'), list(_FEATURE_DEFAULTS), convert)
+
+
+def restore_features(apps, schema_editor):
+    """Rebuild ``feature_json`` from the typed columns."""
+    Feature1m = apps.get_model('features', 'Feature1m')
+
+    def convert(row):
+        row.feature_json = {
+            'ts': timezone.localtime(row.ts).isoformat(),
+            **{key: getattr(row, key) for key in _FEATURE_DEFAULTS},
+        }
+
+    _converted(Feature1m.objects.all(), ['feature_json'], convert)
+
+
+def _news_values(reason):
+    match = re.search(r'\((\d+) items, avg (-?\d+\.\d+)\)$', reason) or re.match(r'(\d+) news items;', reason)
+    if match is None:
+        return 0, 0.0
+    count = int(match.group(1))
+    return count, float(match.group(2)) if match.lastindex == 2 else 0.0
+
+
+def _reason_codes(explain):
+    """Reason codes that render ``explain`` back exactly, or ``None``."""
+    try:
+        key_features = explain['key_features']
+        category_reasons = explain['category_reasons']
+        top_reasons = explain['top_reasons']
+        count, sentiment = _news_values(category_reasons['news'])
+        values = {**key_features, 'news_count_24h': count, 'news_sent_avg_24h': sentiment}
+        params = _params(values)
+        rendered = {}
+        for code, template in enumerate(_REASONS):
+            rendered.setdefault(template.format(**params), code)
+        codes = {category: rendered[category_reasons[category]] for category in _CATEGORIES}
+        codes['top'] = [rendered[reason] for reason in top_reasons]
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return None
+    if len(codes['top']) > 3 or _render_explain(values, codes) != explain:
+        return None
+    return values, codes
+
+
+def convert_scores(apps, schema_editor):
+    """Replace ``explain_json`` with reason codes wherever they reproduce it."""
+    SignalScore = apps.get_model('features', 'SignalScore')
+
+    def convert(row):
+        encoded = _reason_codes(row.legacy_explain_json or {})
+        if encoded is None:
+            return
+        values, codes = encoded
+        top = codes['top'] + [None] * (3 - len(codes['top']))
+        for key in _EXPLAIN_VALUES:
+            setattr(row, key, values[key])
+        for category in _CATEGORIES:
+            setattr(row, f'{category}_reason', codes[category])
+        row.top_reason_1, row.top_reason_2, row.top_reason_3 = top
+        row.legacy_explain_json = None
+
+    _converted(SignalScore.objects.only('id', 'legacy_explain_json'), _SCORE_FIELDS, convert)
+
+
+def restore_scores(apps, schema_editor):
+    """Render ``explain_json`` back from the reason codes of converted rows."""
+    SignalScore = apps.get_model('features', 'SignalScore')
+
+    def convert(row):
+        if row.legacy_explain_json is not None:
+            return
+        if row.price_action_reason is None:
+            row.legacy_explain_json = {}
+            return
+        codes = {category: getattr(row, f'{category}_reason') for category in _CATEGORIES}
+        codes['top'] = [code for code in (row.top_reason_1, row.top_reason_2, row.top_reason_3) if code is not None]
+        row.legacy_explain_json = _render_explain({key: getattr(row, key) for key in _EXPLAIN_VALUES}, codes)
+
+    _converted(SignalScore.objects.all(), ['legacy_explain_json'], convert)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('features', '0003_symbol_dimension'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='signalscore',
+            old_name='explain_json',
+            new_name='legacy_explain_json',
+        ),
+        migrations.AlterField(
+            model_name='signalscore',
+            name='legacy_explain_json',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='feature1m',
+            name='ann_high_count_24h',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='feature1m',
+            name='ann_impact_sum_24h',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='feature1m',
+            name='ann_impact_sum_7d',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='feature1m',
+            name='ann_results_flag_7d',
+            field=models.SmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='feature1m',
+            name='atr_14',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='feature1m',
+            name='atr_pct',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='feature1m',
+            name='candle_body_pct',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='feature1m',
+            name='insufficient_history',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='feature1m',
+            name='news_count_24h',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='feature1m',
+            name='news_sent_avg_24h',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='feature1m',
+            name='range_pct',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='feature1m',
+            name='realized_vol_60m',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='feature1m',
+            name='regime_high_vol',
+            field=models.SmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='feature1m',
+            name='regime_label',
+            field=models.CharField(default='calm', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='feature1m',
+            name='ret_15m',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='feature1m',
+            name='ret_1m',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='feature1m',
+            name='ret_5m',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='feature1m',
+            name='rsi_14',
+            field=models.FloatField(default=50.0),
+        ),
+        migrations.AddField(
+            model_name='feature1m',
+            name='time_since_last_high_impact_min',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='feature1m',
+            name='vol_z_20',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='feature1m',
+            name='vol_z_60',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='feature1m',
+            name='vwap_dist',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='signalscore',
+            name='ann_impact_sum_24h',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='signalscore',
+            name='announcements_reason',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='signalscore',
+            name='news_count_24h',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='signalscore',
+            name='news_reason',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='signalscore',
+            name='news_sent_avg_24h',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='signalscore',
+            name='price_action_reason',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='signalscore',
+            name='realized_vol_60m',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='signalscore',
+            name='regime_reason',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='signalscore',
+            name='results_flag_7d',
+            field=models.SmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='signalscore',
+            name='ret_15m',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='signalscore',
+            name='ret_1m',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='signalscore',
+            name='rsi_14',
+            field=models.FloatField(default=50.0),
+        ),
+        migrations.AddField(
+            model_name='signalscore',
+            name='top_reason_1',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='signalscore',
+            name='top_reason_2',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='signalscore',
+            name='top_reason_3',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='signalscore',
+            name='vol_z_20',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='signalscore',
+            name='volume_reason',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='signalscore',
+            name='vwap_dist',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.RunPython(convert_features, restore_features),
+        migrations.RunPython(convert_scores, restore_scores),
+        migrations.RemoveField(
+            model_name='feature1m',
+            name='feature_json',
+        ),
+    ]
@@ -1,31 +1,131 @@
 ﻿from django.db import models
+from django.utils import timezone
+
+from apps.market.symbols import default_symbol
+
+from .compute import FEATURE_DEFAULTS, FEATURE_KEYS
+from .scoring import CATEGORIES, EXPLAIN_VALUES, render_explain
 
 
 class Feature1m(models.Model):
-    ts = models.DateTimeField(unique=True, db_index=True)
-    feature_json = models.JSONField(default=dict)
+    """One minute of features, a typed column per ``FEATURE_KEYS`` entry."""
+
+    symbol = models.CharField(max_length=32, default=default_symbol)
+    ts = models.DateTimeField(db_index=True)
+    ret_1m = models.FloatField(default=0.0)
+    ret_5m = models.FloatField(default=0.0)
+    ret_15m = models.FloatField(default=0.0)
+    rsi_14 = models.FloatField(default=50.0)
+    atr_14 = models.FloatField(default=0.0)
+    atr_pct = models.FloatField(default=0.0)
+    candle_body_pct = models.FloatField(default=0.0)
+    range_pct = models.FloatField(default=0.0)
+    vol_z_20 = models.FloatField(default=0.0)
+    vol_z_60 = models.FloatField(default=0.0)
+    vwap_dist = models.FloatField(default=0.0)
+    ann_high_count_24h = models.IntegerField(default=0)
+    ann_impact_sum_24h = models.IntegerField(default=0)
+    ann_impact_sum_7d = models.IntegerField(default=0)
+    ann_results_flag_7d = models.SmallIntegerField(default=0)
+    time_since_last_high_impact_min = models.IntegerField(null=True, blank=True)
+    news_count_24h = models.IntegerField(default=0)
+    news_sent_avg_24h = models.FloatField(default=0.0)
+    realized_vol_60m = models.FloatField(default=0.0)
+    regime_high_vol = models.SmallIntegerField(default=0)
+    regime_label = models.CharField(max_length=16, default='calm')
+    insufficient_history = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ['-ts']
+        constraints = [
+            models.UniqueConstraint(fields=['symbol', 'ts'], name='uniq_feature1m_symbol_ts'),
+        ]
 
     def __str__(self):
-        return f"Feature1m {self.ts.isoformat()}"
+        return f"Feature1m {self.symbol} {self.ts.isoformat()}"
+
+    @staticmethod
+    def columns(feature_json):
+        """Column values for a ``compute_features_for_ts`` dict."""
+        return {key: feature_json.get(key, default) for key, default in FEATURE_DEFAULTS.items()}
+
+    @property
+    def feature_json(self):
+        """The row in the shape ``compute_features_for_ts`` returns."""
+        return {'ts': timezone.localtime(self.ts).isoformat(), **{key: getattr(self, key) for key in FEATURE_KEYS}}
+
+    @feature_json.setter
+    def feature_json(self, value):
+        for key, column_value in self.columns(value).items():
+            setattr(self, key, column_value)
 
 
 class SignalScore(models.Model):
-    ts = models.DateTimeField(unique=True, db_index=True)
+    """Category scores plus the reason codes and values their explanation is rendered from."""
+
+    symbol = models.CharField(max_length=32, default=default_symbol)
+    ts = models.DateTimeField(db_index=True)
     price_action_score = models.IntegerField(default=50)
     volume_score = models.IntegerField(default=50)
     news_score = models.IntegerField(default=50)
     announcements_score = models.IntegerField(default=50)
     regime_score = models.IntegerField(default=50)
     overall_score = models.IntegerField(default=50)
-    explain_json = models.JSONField(default=dict)
+    # Indexes into ``scoring.REASONS``.
+    price_action_reason = models.PositiveSmallIntegerField(null=True, blank=True)
+    volume_reason = models.PositiveSmallIntegerField(null=True, blank=True)
+    announcements_reason = models.PositiveSmallIntegerField(null=True, blank=True)
+    news_reason = models.PositiveSmallIntegerField(null=True, blank=True)
+    regime_reason = models.PositiveSmallIntegerField(null=True, blank=True)
+    top_reason_1 = models.PositiveSmallIntegerField(null=True, blank=True)
+    top_reason_2 = models.PositiveSmallIntegerField(null=True, blank=True)
+    top_reason_3 = models.PositiveSmallIntegerField(null=True, blank=True)
+    ret_1m = models.FloatField(default=0.0)
+    ret_15m = models.FloatField(default=0.0)
+    rsi_14 = models.FloatField(default=50.0)
+    vol_z_20 = models.FloatField(default=0.0)
+    ann_impact_sum_24h = models.IntegerField(default=0)
+    results_flag_7d = models.SmallIntegerField(default=0)
+    realized_vol_60m = models.FloatField(default=0.0)
+    vwap_dist = models.FloatField(default=0.0)
+    news_count_24h = models.IntegerField(default=0)
+    news_sent_avg_24h = models.FloatField(default=0.0)
+    # Explanations that could not be expressed as reason codes when the
+    # column layout was introduced are kept verbatim.
+    legacy_explain_json = models.JSONField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ['-ts']
+        constraints = [
+            models.UniqueConstraint(fields=['symbol', 'ts'], name='uniq_signalscore_symbol_ts'),
+        ]
 
     def __str__(self):
-        return f"SignalScore {self.ts.isoformat()}"
+        return f"SignalScore {self.symbol} {self.ts.isoformat()}"
+
+    @staticmethod
+    def explain_columns(values, codes):
+        """Column values for ``scoring.explain_values`` and reason codes."""
+        top = list(codes['top']) + [None] * (3 - len(codes['top']))
+        return {
+            **{key: values[key] for key in EXPLAIN_VALUES},
+            **{f'{category}_reason': codes[category] for category in CATEGORIES},
+            'top_reason_1': top[0],
+            'top_reason_2': top[1],
+            'top_reason_3': top[2],
+            'legacy_explain_json': None,
+        }
+
+    @property
+    def explain_json(self):
+        if self.legacy_explain_json is not None:
+            return self.legacy_explain_json
+        if self.price_action_reason is None:
+            return {}
+        codes = {
+            'top': [code for code in (self.top_reason_1, self.top_reason_2, self.top_reason_3) if code is not None],
+            **{category: getattr(self, f'{category}_reason') for category in CATEGORIES},
+        }
+        return render_explain({key: getattr(self, key) for key in EXPLAIN_VALUES}, codes)
@@ -0,0 +1,498 @@
+"""Feature registry shared by scoring and prediction.
+
+Every feature is declared once with ``feature(...)``: the features it is
+computed from (``deps``), the candle history it needs on top of theirs
+(``window``, in minutes) and, for event features, the counter series it reads
+(``source``) and how far back (``lookback``).  ``compile_plan(names)`` resolves
+the dependencies into one ordered list of steps, so an intermediate such as
+``r1`` or a rolling std is computed once however many outputs use it, and
+``FeatureFrame.compute(plan)`` runs the steps vectorized over candles loaded
+once.
+
+Scoring (``apps.features.compute.FEATURE_KEYS``) and prediction
+(``apps.predictions.services.FEATURE_COLUMNS``) are two plans over these
+declarations; a frame computing both shares every common step.  Names that
+start with ``_`` are intermediates.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from apps.events.aggregates import STATE_FIELDS, news_series, state_at
+from apps.events.models import EventMinuteAggregate
+from apps.market.archive import load_ohlc_rows
+from apps.market.models import Ohlc1m
+from apps.market.sessions import session_ordinals
+
+CANDLE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+_NAT = np.iinfo(np.int64).min
+ANNOUNCEMENTS = 'announcements'
+NEWS = 'news'
+# 09:15-15:30 IST; session features need the whole session in the frame.
+SESSION_MINUTES = 375
+
+
+@dataclass(frozen=True)
+class Feature:
+    name: str
+    func: Callable
+    deps: Tuple[str, ...] = ()
+    window: int = 0
+    source: Optional[str] = None
+    lookback: pd.Timedelta = pd.Timedelta(0)
+    kind: str = 'float'
+
+
+@dataclass(frozen=True)
+class Plan:
+    outputs: Tuple[str, ...]
+    steps: Tuple[Feature, ...]
+    warmup: int
+    lookbacks: Dict[str, pd.Timedelta] = field(default_factory=dict)
+
+
+REGISTRY: Dict[str, Feature] = {}
+
+
+def feature(name, deps=(), window=0, source=None, lookback=None, kind='float'):
+    """Register ``func(frame, *deps)`` as ``name``.
+
+    ``func`` returns a Series (or array) aligned with ``frame.index``; NaN
+    marks rows without enough history.
+    """
+    def register(func):
+        if name in REGISTRY:
+            raise ValueError(f'feature {name} is declared twice')
+        REGISTRY[name] = Feature(
+            name=name,
+            func=func,
+            deps=tuple(deps),
+            window=window,
+            source=source,
+            lookback=lookback if lookback is not None else pd.Timedelta(0),
+            kind=kind,
+        )
+        return func
+
+    return register
+
+
+def alias(name, target, **options):
+    """Expose ``target`` under another name without computing it twice."""
+    feature(name, deps=(target,), kind=REGISTRY[target].kind, **options)(_identity)
+
+
+def _identity(frame, value):
+    return value
+
+
+def compile_plan(names):
+    """The ordered steps that compute ``names`` and everything they depend on."""
+    return _compile(tuple(names))
+
+
+@lru_cache(maxsize=None)
+def _compile(names):
+    steps = []
+    warmup = {}
+
+    def visit(name, path):
+        if name in CANDLE_COLUMNS:
+            return 0
+        if name in warmup:
+            return warmup[name]
+        if name in path:
+            raise ValueError(f"feature dependency cycle: {' -> '.join(path + (name,))}")
+        spec = REGISTRY.get(name)
+        if spec is None:
+            raise ValueError(f'unknown feature: {name}')
+        need = spec.window + max((visit(dep, path + (name,)) for dep in spec.deps), default=0)
+        warmup[name] = need
+        steps.append(spec)
+        return need
+
+    for name in names:
+        visit(name, ())
+    lookbacks = {}
+    for spec in steps:
+        if spec.source is not None:
+            lookbacks[spec.source] = max(lookbacks.get(spec.source, pd.Timedelta(0)), spec.lookback)
+    return Plan(
+        outputs=names,
+        steps=tuple(steps),
+        warmup=max((warmup[name] for name in names), default=0),
+        lookbacks=lookbacks,
+    )
+
+
+# ──────────────────────────────── Frames ─────────────────────────────────────
+
+class FeatureFrame:
+    """One symbol's candles and the features computed over them so far."""
+
+    def __init__(self, candles: pd.DataFrame, symbol: str):
+        self.candles = candles
+        self.symbol = symbol
+        self.index = candles.index
+        self._values = {}
+        self._events = {}
+        self._lookbacks = {}
+
+    @classmethod
+    def from_rows(cls, rows, symbol):
+        """``rows`` is a list of candle dicts or a DataFrame with a ``ts`` column."""
+        if len(rows) == 0:
+            return cls(pd.DataFrame(columns=CANDLE_COLUMNS, index=pd.DatetimeIndex([], tz='UTC', name='ts')), symbol)
+        df = pd.DataFrame(rows)
+        df['ts'] = pd.to_datetime(df['ts'], utc=True)
+        return cls(df.set_index('ts').sort_index(), symbol)
+
+    @classmethod
+    def load(cls, start_ts, end_ts, symbol):
+        """Candles in ``[start_ts, end_ts]``, archived months included."""
+        return cls.from_rows(load_ohlc_rows(start_ts, end_ts, symbol=symbol), symbol)
+
+    @classmethod
+    def load_latest(cls, ts, symbol, count):
+        """The last ``count`` candles at or before ``ts``."""
+        rows = list(
+            Ohlc1m.objects.filter(symbol=symbol, ts__lte=ts).order_by('-ts').values_list('ts', *CANDLE_COLUMNS)[:count]
+        )
+        rows.reverse()
+        return cls.from_rows(pd.DataFrame.from_records(rows, columns=('ts', *CANDLE_COLUMNS)), symbol)
+
+    def __len__(self):
+        return len(self.candles)
+
+    def __getitem__(self, name):
+        if name in CANDLE_COLUMNS:
+            return self.candles[name]
+        return self._values[name]
+
+    def events(self, source):
+        """``EventMinuteAggregate`` rows for ``source`` covering the frame and its lookback."""
+        lookback = self._lookbacks.get(source, pd.Timedelta(0))
+        cached = self._events.get(source)
+        if cached is None or cached[0] < lookback:
+            symbol = news_series(self.symbol) if source == NEWS else self.symbol
+            cached = (lookback, _event_states(symbol, self.index, lookback))
+            self._events[source] = cached
+        return cached[1]
+
+    def _run(self, plan):
+        for source, lookback in plan.lookbacks.items():
+            self._lookbacks[source] = max(self._lookbacks.get(source, pd.Timedelta(0)), lookback)
+        for spec in plan.steps:
+            if spec.name not in self._values:
+                self._values[spec.name] = spec.func(self, *(self[dep] for dep in spec.deps))
+
+    def compute(self, plan: Plan) -> pd.DataFrame:
+        """Run ``plan``'s steps not already computed; returns its outputs."""
+        self._run(plan)
+        return pd.DataFrame({name: self._values[name] for name in plan.outputs}, index=self.index)
+
+    def latest(self, plan: Plan) -> dict:
+        """``plan``'s outputs for the last candle as plain Python values, ``None`` where missing."""
+        self._run(plan)
+        return {name: _python_value(REGISTRY[name], _last(self._values[name])) for name in plan.outputs}
+
+
+def _last(values):
+    return values.iloc[-1] if isinstance(values, pd.Series) else values[-1]
+
+
+def _python_value(spec, value):
+    if value is None or (isinstance(value, (float, np.floating)) and not np.isfinite(value)):
+        return None
+    if spec.kind == 'int':
+        return int(value)
+    if spec.kind == 'bool':
+        return bool(value)
+    if spec.kind == 'str':
+        return str(value)
+    return float(value)
+
+
+def _series(frame, values):
+    return pd.Series(values, index=frame.index)
+
+
+def _nonzero(series):
+    return series.replace(0.0, np.nan)
+
+
+# ─────────────────────────────── Candles ─────────────────────────────────────
+
+def _pct_change(frame, close, periods):
+    return close.pct_change(periods)
+
+
+for _periods in (1, 5, 15, 60, 120):
+    feature(f'r{_periods}', deps=('close',), window=_periods)(partial(_pct_change, periods=_periods))
+
+alias('ret_1m', 'r1')
+alias('ret_5m', 'r5')
+alias('ret_15m', 'r15')
+
+
+def _rolling_std(frame, values, window):
+    return values.rolling(window).std()
+
+
+def _rolling_sum(frame, values, window):
+    return values.rolling(window).sum()
+
+
+def _rolling_mean(frame, values, window):
+    return values.rolling(window).mean()
+
+
+for _window in (5, 15, 60, 120):
+    feature(f'vol_std_{_window}', deps=('r1',), window=_window)(partial(_rolling_std, window=_window))
+for _window in (15, 60, 120):
+    feature(f'mom_{_window}', deps=('r1',), window=_window)(partial(_rolling_sum, window=_window))
+
+# Standard deviation of the last hour of 1m returns; drives the regime.
+alias('realized_vol_60m', 'vol_std_60')
+
+
+@feature('_range_ratio', deps=('high', 'low', 'close'))
+def _range_ratio(frame, high, low, close):
+    return (high - low) / _nonzero(close)
+
+
+for _window in (15, 60, 120):
+    feature(f'range_mean_{_window}', deps=('_range_ratio',), window=_window)(partial(_rolling_mean, window=_window))
+
+
+def _volume_z(frame, volume, window):
+    mean = volume.rolling(window).mean()
+    std = _nonzero(volume.rolling(window).std())
+    return ((volume - mean) / std).fillna(0.0)
+
+
+for _window in (15, 20, 60, 120):
+    feature(f'vol_z_{_window}', deps=('volume',), window=_window)(partial(_volume_z, window=_window))
+
+
+@feature('rsi_14', deps=('close',), window=3 * 14 + 1)
+def _rsi_14(frame, close, period=14):
+    """RSI using Wilder's EMA (alpha = 1/period), in [0, 100].
+
+    A small epsilon floor on avg_loss makes pure-uptrend windows return
+    RSI ≈ 100 rather than NaN; a window with no moves at all is neutral 50.
+    """
+    delta = close.diff()
+    alpha = 1.0 / period
+    avg_gain = delta.clip(lower=0.0).ewm(alpha=alpha, adjust=False, min_periods=period).mean().to_numpy()
+    avg_loss = (-delta).clip(lower=0.0).ewm(alpha=alpha, adjust=False, min_periods=period).mean().to_numpy()
+    rsi = 100.0 - 100.0 / (1.0 + avg_gain / np.maximum(avg_loss, 1e-10))
+    rsi = np.where((avg_gain == 0) & (avg_loss == 0), 50.0, rsi)
+    # Neutral 50 where min_periods is not met
+    return _series(frame, np.where(np.isnan(avg_gain), 50.0, rsi))
+
+
+@feature('_true_range', deps=('high', 'low', 'close'), window=1)
+def _true_range(frame, high, low, close):
+    prev_close = close.shift(1).to_numpy()
+    high, low = high.to_numpy(), low.to_numpy()
+    # fmax skips the NaN previous close of the first candle
+    return _series(frame, np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close))))
+
+
+@feature('atr_14', deps=('_true_range',), window=3 * 14)
+def _atr_14(frame, true_range, period=14):
+    """Average true range, Wilder-smoothed."""
+    return true_range.ewm(alpha=1.0 / period, adjust=False, min_periods=period).mean()
+
+
+@feature('atr_pct', deps=('atr_14', 'close'))
+def _atr_pct(frame, atr, close):
+    """ATR as a percentage of close (scale-invariant volatility)."""
+    return (atr / _nonzero(close) * 100.0).fillna(0.0)
+
+
+@feature('candle_body_pct', deps=('open', 'close'))
+def _candle_body_pct(frame, open_, close):
+    return (close - open_).abs() / _nonzero(open_) * 100.0
+
+
+@feature('range_pct', deps=('open', 'high', 'low'))
+def _range_pct(frame, open_, high, low):
+    return (high - low).abs() / _nonzero(open_) * 100.0
+
+
+@feature('macd_hist', deps=('close',), window=3 * 35)
+def _macd_hist(frame, close):
+    """MACD histogram normalised by price — scale-free momentum signal."""
+    ema12 = close.ewm(span=12, adjust=False).mean()
+    ema26 = close.ewm(span=26, adjust=False).mean()
+    macd = ema12 - ema26
+    signal = macd.ewm(span=9, adjust=False).mean()
+    return ((macd - signal) / _nonzero(close)).fillna(0.0)
+
+
+@feature('bb_pct_b', deps=('close',), window=20)
+def _bb_pct_b(frame, close, period=20):
+    """Bollinger Band %B: 0 = lower band, 0.5 = midline, 1 = upper band."""
+    mid = close.rolling(period).mean()
+    std = close.rolling(period).std()
+    upper = mid + 2.0 * std
+    lower = mid - 2.0 * std
+    return ((close - lower) / _nonzero(upper - lower)).fillna(0.5)
+
+
+@feature('regime_label', deps=('realized_vol_60m',), kind='str')
+def _regime_label(frame, vol):
+    return _series(frame, np.select([vol >= 0.005, vol >= 0.002], ['volatile', 'active'], 'calm'))
+
+
+@feature('regime_high_vol', deps=('realized_vol_60m',), kind='int')
+def _regime_high_vol(frame, vol):
+    return (vol >= 0.005).astype(int)
+
+
+@feature('insufficient_history', kind='bool')
+def _insufficient_history(frame):
+    return _series(frame, np.arange(len(frame)) < 1)
+
+
+# ──────────────────────── Intraday session context ───────────────────────────
+
+@feature('_session')
+def _session(frame):
+    """int32 trading-session ordinal of each candle; session features reset at 09:15 IST."""
+    return _series(frame, session_ordinals(frame.index))
+
+
+@feature('vwap_dist', deps=('_session', 'high', 'low', 'close', 'volume'), window=SESSION_MINUTES)
+def _vwap_dist(frame, session, high, low, close, volume):
+    """Close vs session VWAP (intraday mean reversion)."""
+    volume = volume.clip(lower=0.0)
+    typical = (high + low + close) / 3.0
+    cum_tp_vol = (typical * volume).groupby(session).cumsum()
+    cum_vol = volume.groupby(session).cumsum()
+    vwap = cum_tp_vol / _nonzero(cum_vol)
+    return ((close - vwap) / _nonzero(close)).fillna(0.0)
+
+
+@feature('open_to_now_ret', deps=('_session', 'open', 'close'), window=SESSION_MINUTES)
+def _open_to_now_ret(frame, session, open_, close):
+    """Return from the first candle of the session to the current close."""
+    session_open = open_.groupby(session).transform('first')
+    return ((close - session_open) / _nonzero(session_open)).fillna(0.0)
+
+
+# ──────────────────────────────── Events ─────────────────────────────────────
+
+def _event_states(symbol, ts_values, lookback):
+    """``EventMinuteAggregate`` states covering ``ts_values`` and ``lookback`` before them.
+
+    Loads the series rows between ``min(ts_values) - lookback`` and
+    ``max(ts_values)`` plus the row in force at the start.  Returns their
+    buckets and one array per state field, all as int64 ns (NaT for no
+    value) or float (NaN).
+    """
+    if len(ts_values) == 0:
+        return np.empty(0, dtype=np.int64), {name: np.empty(0) for name in STATE_FIELDS}
+    start_ts = ts_values.min() - lookback
+    end_ts = ts_values.max()
+    base = state_at(symbol, start_ts.to_pydatetime())
+    rows = [(start_ts, *(base[name] for name in STATE_FIELDS))]
+    rows.extend(
+        EventMinuteAggregate.objects.filter(symbol=symbol, bucket__gt=start_ts, bucket__lte=end_ts)
+        .order_by('bucket')
+        .values_list('bucket', *STATE_FIELDS)
+    )
+    columns = list(zip(*rows))
+    arrays = {}
+    for name, values in zip(STATE_FIELDS, columns[1:]):
+        if name == 'last_high_impact_at':
+            arrays[name] = _ns(values)
+        else:
+            arrays[name] = np.array(values, dtype=float)
+    return _ns(columns[0]), arrays
+
+
+def _ns(values):
+    return pd.DatetimeIndex(pd.to_datetime(list(values), utc=True)).as_unit('ns').asi8
+
+
+def _states_asof(states, ts_values):
+    """The state in force at each of ``ts_values``: the last bucket at or before it."""
+    buckets, columns = states
+    positions = np.searchsorted(buckets, ts_values.as_unit('ns').asi8, side='right') - 1
+    return {name: values[positions] for name, values in columns.items()}
+
+
+def _states_now(frame, source):
+    return _states_asof(frame.events(source), frame.index)
+
+
+def _states_before(frame, source, window):
+    return _states_asof(frame.events(source), frame.index - window)
+
+
+def _window_sum(frame, now, before, column):
+    """Increments of ``column`` over (ts - window, ts] for each ts."""
+    return _series(frame, now[column] - before[column])
+
+
+_EVENT_WINDOWS = {
+    ANNOUNCEMENTS: (('2h', pd.Timedelta(hours=2)), ('24h', pd.Timedelta(hours=24)), ('7d', pd.Timedelta(days=7))),
+    NEWS: (('2h', pd.Timedelta(hours=2)), ('24h', pd.Timedelta(hours=24))),
+}
+
+feature('_ann_now', source=ANNOUNCEMENTS)(partial(_states_now, source=ANNOUNCEMENTS))
+feature('_news_now', source=NEWS)(partial(_states_now, source=NEWS))
+for _source, _prefix in ((ANNOUNCEMENTS, '_ann'), (NEWS, '_news')):
+    for _suffix, _span in _EVENT_WINDOWS[_source]:
+        feature(f'{_prefix}_before_{_suffix}', source=_source, lookback=_span)(
+            partial(_states_before, source=_source, window=_span)
+        )
+
+for _suffix, _span in _EVENT_WINDOWS[ANNOUNCEMENTS]:
+    _deps = ('_ann_now', f'_ann_before_{_suffix}')
+    feature(f'ann_high_count_{_suffix}', deps=_deps, kind='int')(
+        partial(_window_sum, column='ann_high_count')
+    )
+    feature(f'ann_impact_sum_{_suffix}', deps=_deps, kind='int')(
+        partial(_window_sum, column='ann_impact_sum')
+    )
+
+
+@feature('ann_results_flag_7d', deps=('_ann_now', '_ann_before_7d'), kind='int')
+def _ann_results_flag_7d(frame, now, before):
+    return (_window_sum(frame, now, before, 'ann_results_count') > 0).astype(int)
+
+
+@feature('ann_last_impact', deps=('_ann_now',))
+def _ann_last_impact(frame, now):
+    return _series(frame, np.nan_to_num(now['last_impact'], nan=0.0))
+
+
+@feature('time_since_last_high_impact_min', deps=('_ann_now',), kind='int')
+def _time_since_last_high_impact_min(frame, now):
+    last = now['last_high_impact_at']
+    elapsed = frame.index.as_unit('ns').asi8 - last
+    return _series(frame, np.where(last == _NAT, np.nan, elapsed // 60_000_000_000))
+
+
+for _suffix, _span in _EVENT_WINDOWS[NEWS]:
+    _deps = ('_news_now', f'_news_before_{_suffix}')
+    feature(f'news_count_{_suffix}', deps=_deps, kind='int')(partial(_window_sum, column='news_count'))
+    feature(f'_news_sent_sum_{_suffix}', deps=_deps)(partial(_window_sum, column='news_sentiment_sum'))
+
+
+def _news_sent_avg(frame, count, total):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return _series(frame, np.where(count > 0, total / count, 0.0))
+
+
+for _suffix, _span in _EVENT_WINDOWS[NEWS]:
+    feature(f'news_sent_avg_{_suffix}', deps=(f'news_count_{_suffix}', f'_news_sent_sum_{_suffix}'))(_news_sent_avg)
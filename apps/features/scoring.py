@@ -1,10 +1,145 @@
+﻿# Reason catalogue.  A SignalScore stores the index of each of its reasons and
+# renders the text when it is read, so entries may be appended but never
+# reordered or reworded.
+REASONS = (
+    'Insufficient history',
+    'RSI overbought ({rsi_14:.0f}); 15m return {ret_15m_pct:.2f}%',
+    'RSI oversold ({rsi_14:.0f}); 15m return {ret_15m_pct:.2f}%',
+    'Positive 15m momentum ({ret_15m_pct:.2f}%)',
+    'Negative 15m momentum ({ret_15m_pct:.2f}%)',
+    'Neutral momentum; RSI {rsi_14:.0f}',
+    'Strong volume surge (z={vol_z_20:.1f})',
+    'Above-average volume (z={vol_z_20:.1f})',
+    'Low volume (z={vol_z_20:.1f})',
+    'Normal volume (z={vol_z_20:.1f})',
+    'No news in last 24h',
+    'Positive news sentiment ({news_count_24h} items, avg {news_sent_avg_24h:.2f})',
+    'Negative news sentiment ({news_count_24h} items, avg {news_sent_avg_24h:.2f})',
+    '{news_count_24h} news items; neutral sentiment',
+    'High-impact announcements in 24h (sum={ann_impact_sum_24h})',
+    'Results/board meeting announced in last 7 days',
+    'Some announcement activity (impact sum {ann_impact_sum_24h})',
+    'No significant announcements',
+    'Volatile regime (vol={realized_vol_60m:.4f})',
+    'Active regime (vol={realized_vol_60m:.4f})',
+    'Calm regime (vol={realized_vol_60m:.4f})',
+    'Volatile regime (vol={realized_vol_60m:.4f}); {vwap_pct:.2f}% {vwap_side} VWAP',
+    'Active regime (vol={realized_vol_60m:.4f}); {vwap_pct:.2f}% {vwap_side} VWAP',
+    'Calm regime (vol={realized_vol_60m:.4f}); {vwap_pct:.2f}% {vwap_side} VWAP',
+    'Insufficient candle history',
+    'Scores held at neutral baseline',
+    'High announcement impact in last 24h',
+    'Volume surge vs 20m average',
+    'Positive 15m momentum',
+    'Negative 15m momentum',
+    'RSI elevated (overbought)',
+    'RSI depressed (oversold)',
+    'Positive news sentiment',
+    'Negative news sentiment',
+    'Price {vwap_pct:.1f}% {vwap_side} VWAP',
+    'Mixed signals; neutral stance',
+)
+(
+    INSUFFICIENT_HISTORY,
+    PA_OVERBOUGHT,
+    PA_OVERSOLD,
+    PA_POSITIVE,
+    PA_NEGATIVE,
+    PA_NEUTRAL,
+    VOL_SURGE,
+    VOL_ABOVE_AVERAGE,
+    VOL_LOW,
+    VOL_NORMAL,
+    NEWS_NONE,
+    NEWS_POSITIVE,
+    NEWS_NEGATIVE,
+    NEWS_NEUTRAL,
+    ANN_HIGH_IMPACT,
+    ANN_RESULTS,
+    ANN_SOME,
+    ANN_NONE,
+    REGIME_VOLATILE,
+    REGIME_ACTIVE,
+    REGIME_CALM,
+    REGIME_VOLATILE_VWAP,
+    REGIME_ACTIVE_VWAP,
+    REGIME_CALM_VWAP,
+    TOP_INSUFFICIENT_HISTORY,
+    TOP_NEUTRAL_BASELINE,
+    TOP_ANN_IMPACT,
+    TOP_VOLUME_SURGE,
+    TOP_POSITIVE_MOMENTUM,
+    TOP_NEGATIVE_MOMENTUM,
+    TOP_RSI_OVERBOUGHT,
+    TOP_RSI_OVERSOLD,
+    TOP_POSITIVE_NEWS,
+    TOP_NEGATIVE_NEWS,
+    TOP_VWAP,
+    TOP_MIXED,
+) = range(len(REASONS))
+
+CATEGORIES = ('price_action', 'volume', 'announcements', 'news', 'regime')
+KEY_FEATURES = (
+    'ret_1m',
+    'ret_15m',
+    'rsi_14',
+    'vol_z_20',
+    'ann_impact_sum_24h',
+    'results_flag_7d',
+    'realized_vol_60m',
+    'vwap_dist',
+)
+# Everything a rendered explanation depends on besides the reason codes.
+EXPLAIN_VALUES = KEY_FEATURES + ('news_count_24h', 'news_sent_avg_24h')
+MAX_TOP_REASONS = 3
+
 
 def _clamp(score):
     return max(0, min(100, int(round(score))))
 
 
+def explain_values(feature_json):
+    """The feature values an explanation is rendered from."""
+    return {
+        'ret_1m': feature_json.get('ret_1m', 0.0),
+        'ret_15m': feature_json.get('ret_15m', 0.0),
+        'rsi_14': feature_json.get('rsi_14', 50.0),
+        'vol_z_20': feature_json.get('vol_z_20', 0.0),
+        'ann_impact_sum_24h': feature_json.get('ann_impact_sum_24h', 0),
+        'results_flag_7d': feature_json.get('ann_results_flag_7d', 0),
+        'realized_vol_60m': feature_json.get('realized_vol_60m', 0.0),
+        'vwap_dist': feature_json.get('vwap_dist', 0.0),
+        'news_count_24h': feature_json.get('news_count_24h', 0),
+        'news_sent_avg_24h': feature_json.get('news_sent_avg_24h', 0.0),
+    }
+
+
+def render_explain(values, codes):
+    """The ``explain`` dict for ``explain_values`` and reason ``codes``.
+
+    ``codes`` maps each of ``CATEGORIES`` to a reason index and ``'top'`` to a
+    list of them.
+    """
+    params = {
+        **values,
+        'ret_15m_pct': values['ret_15m'] * 100,
+        'vwap_pct': abs(values['vwap_dist']) * 100,
+        'vwap_side': 'above' if values['vwap_dist'] > 0 else 'below',
+    }
+    return {
+        'key_features': {key: values[key] for key in KEY_FEATURES},
+        'top_reasons': [REASONS[code].format(**params) for code in codes['top']],
+        'category_reasons': {category: REASONS[codes[category]].format(**params) for category in CATEGORIES},
+    }
+
+
 def score_from_features(feature_json):
+    values = explain_values(feature_json)
     if feature_json.get('insufficient_history'):
+        codes = {
+            'top': [TOP_INSUFFICIENT_HISTORY, TOP_NEUTRAL_BASELINE],
+            **{category: INSUFFICIENT_HISTORY for category in CATEGORIES},
+        }
         return {
             'price_action_score': 50,
             'volume_score': 50,
@@ -12,41 +147,19 @@ def score_from_features(feature_json):
             'announcements_score': 50,
             'regime_score': 50,
             'overall_score': 50,
-            'explain_json': {
-                'key_features': {
-                    'ret_1m': feature_json.get('ret_1m', 0.0),
-                    'ret_15m': feature_json.get('ret_15m', 0.0),
-                    'rsi_14': feature_json.get('rsi_14', 50.0),
-                    'vol_z_20': feature_json.get('vol_z_20', 0.0),
-                    'ann_impact_sum_24h': feature_json.get('ann_impact_sum_24h', 0),
-                    'results_flag_7d': feature_json.get('ann_results_flag_7d', 0),
-                    'realized_vol_60m': feature_json.get('realized_vol_60m', 0.0),
-                    'vwap_dist': feature_json.get('vwap_dist', 0.0),
-                },
-                'top_reasons': [
-                    'Insufficient candle history',
-                    'Scores held at neutral baseline',
-                ],
-                'category_reasons': {
-                    'price_action': 'Insufficient history',
-                    'volume': 'Insufficient history',
-                    'announcements': 'Insufficient history',
-                    'news': 'Insufficient history',
-                    'regime': 'Insufficient history',
-                },
-            },
+            'reason_codes': codes,
+            'explain_json': render_explain(values, codes),
         }
 
-    ret_15m = feature_json.get('ret_15m', 0.0)
-    rsi_14 = feature_json.get('rsi_14', 50.0)
-    vol_z_20 = feature_json.get('vol_z_20', 0.0)
-    ann_impact_sum_24h = feature_json.get('ann_impact_sum_24h', 0)
-    results_flag_7d = feature_json.get('ann_results_flag_7d', 0)
-    realized_vol_60m = feature_json.get('realized_vol_60m', 0.0)
-    news_count_24h = feature_json.get('news_count_24h', 0)
-    news_sent_avg_24h = feature_json.get('news_sent_avg_24h', 0.0)
+    ret_15m = values['ret_15m']
+    rsi_14 = values['rsi_14']
+    vol_z_20 = values['vol_z_20']
+    ann_impact_sum_24h = values['ann_impact_sum_24h']
+    results_flag_7d = values['results_flag_7d']
+    news_count_24h = values['news_count_24h']
+    news_sent_avg_24h = values['news_sent_avg_24h']
     regime_label = feature_json.get('regime_label', 'calm')
-    vwap_dist = feature_json.get('vwap_dist', 0.0)
+    vwap_dist = values['vwap_dist']
 
     # ── Price action ──
     price_action = 50 + ret_15m * 2000
@@ -56,28 +169,28 @@ def score_from_features(feature_json):
         price_action -= 12
 
     if rsi_14 >= 70:
-        pa_reason = f'RSI overbought ({rsi_14:.0f}); 15m return {ret_15m*100:.2f}%'
+        pa_reason = PA_OVERBOUGHT
     elif rsi_14 <= 30:
-        pa_reason = f'RSI oversold ({rsi_14:.0f}); 15m return {ret_15m*100:.2f}%'
+        pa_reason = PA_OVERSOLD
     elif ret_15m >= 0.005:
-        pa_reason = f'Positive 15m momentum ({ret_15m*100:.2f}%)'
+        pa_reason = PA_POSITIVE
     elif ret_15m <= -0.005:
-        pa_reason = f'Negative 15m momentum ({ret_15m*100:.2f}%)'
+        pa_reason = PA_NEGATIVE
     else:
-        pa_reason = f'Neutral momentum; RSI {rsi_14:.0f}'
+        pa_reason = PA_NEUTRAL
 
     # ── Volume ──
     vol_z_capped = max(-3.0, min(3.0, vol_z_20))
     volume = 50 + vol_z_capped * 15
 
     if vol_z_20 >= 2.0:
-        vol_reason = f'Strong volume surge (z={vol_z_20:.1f})'
+        vol_reason = VOL_SURGE
     elif vol_z_20 >= 1.0:
-        vol_reason = f'Above-average volume (z={vol_z_20:.1f})'
+        vol_reason = VOL_ABOVE_AVERAGE
     elif vol_z_20 <= -1.5:
-        vol_reason = f'Low volume (z={vol_z_20:.1f})'
+        vol_reason = VOL_LOW
     else:
-        vol_reason = f'Normal volume (z={vol_z_20:.1f})'
+        vol_reason = VOL_NORMAL
 
     # ── News ──
     news = 50
@@ -86,13 +199,13 @@ def score_from_features(feature_json):
         news += min(news_count_24h, 5) * 2
 
     if news_count_24h == 0:
-        news_reason = 'No news in last 24h'
+        news_reason = NEWS_NONE
     elif news_sent_avg_24h >= 0.2:
-        news_reason = f'Positive news sentiment ({news_count_24h} items, avg {news_sent_avg_24h:.2f})'
+        news_reason = NEWS_POSITIVE
     elif news_sent_avg_24h <= -0.2:
-        news_reason = f'Negative news sentiment ({news_count_24h} items, avg {news_sent_avg_24h:.2f})'
+        news_reason = NEWS_NEGATIVE
     else:
-        news_reason = f'{news_count_24h} news items; neutral sentiment'
+        news_reason = NEWS_NEUTRAL
 
     # ── Announcements ──
     announcements = 50 + ann_impact_sum_24h * 0.4
@@ -100,29 +213,27 @@ def score_from_features(feature_json):
         announcements += 10
 
     if ann_impact_sum_24h >= 20:
-        ann_reason = f'High-impact announcements in 24h (sum={ann_impact_sum_24h})'
+        ann_reason = ANN_HIGH_IMPACT
     elif results_flag_7d:
-        ann_reason = 'Results/board meeting announced in last 7 days'
+        ann_reason = ANN_RESULTS
     elif ann_impact_sum_24h > 0:
-        ann_reason = f'Some announcement activity (impact sum {ann_impact_sum_24h})'
+        ann_reason = ANN_SOME
     else:
-        ann_reason = 'No significant announcements'
+        ann_reason = ANN_NONE
 
     # ── Regime ──
+    # The *_VWAP variants add the VWAP signal to the regime context when it
+    # is meaningful.
+    near_vwap = abs(vwap_dist) < 0.005
     if regime_label == 'volatile':
         regime = 35
-        reg_reason = f'Volatile regime (vol={realized_vol_60m:.4f})'
+        reg_reason = REGIME_VOLATILE if near_vwap else REGIME_VOLATILE_VWAP
     elif regime_label == 'active':
         regime = 50
-        reg_reason = f'Active regime (vol={realized_vol_60m:.4f})'
+        reg_reason = REGIME_ACTIVE if near_vwap else REGIME_ACTIVE_VWAP
     else:
         regime = 65
-        reg_reason = f'Calm regime (vol={realized_vol_60m:.4f})'
-
-    # Add VWAP signal to regime context when meaningful
-    if abs(vwap_dist) >= 0.005:
-        direction = 'above' if vwap_dist > 0 else 'below'
-        reg_reason += f'; {abs(vwap_dist)*100:.2f}% {direction} VWAP'
+        reg_reason = REGIME_CALM if near_vwap else REGIME_CALM_VWAP
 
     price_action = _clamp(price_action)
     volume = _clamp(volume)
@@ -141,28 +252,35 @@ def score_from_features(feature_json):
     # Aggregate top reasons for the overview card
     top_reasons = []
     if ann_impact_sum_24h >= 20:
-        top_reasons.append('High announcement impact in last 24h')
+        top_reasons.append(TOP_ANN_IMPACT)
     if vol_z_20 >= 1.5:
-        top_reasons.append('Volume surge vs 20m average')
+        top_reasons.append(TOP_VOLUME_SURGE)
     if ret_15m >= 0.005:
-        top_reasons.append('Positive 15m momentum')
+        top_reasons.append(TOP_POSITIVE_MOMENTUM)
     if ret_15m <= -0.005:
-        top_reasons.append('Negative 15m momentum')
+        top_reasons.append(TOP_NEGATIVE_MOMENTUM)
     if rsi_14 >= 70:
-        top_reasons.append('RSI elevated (overbought)')
+        top_reasons.append(TOP_RSI_OVERBOUGHT)
     if rsi_14 <= 30:
-        top_reasons.append('RSI depressed (oversold)')
+        top_reasons.append(TOP_RSI_OVERSOLD)
     if news_count_24h > 0 and news_sent_avg_24h >= 0.2:
-        top_reasons.append('Positive news sentiment')
+        top_reasons.append(TOP_POSITIVE_NEWS)
     if news_count_24h > 0 and news_sent_avg_24h <= -0.2:
-        top_reasons.append('Negative news sentiment')
-    if abs(vwap_dist) >= 0.005:
-        direction = 'above' if vwap_dist > 0 else 'below'
-        top_reasons.append(f'Price {abs(vwap_dist)*100:.1f}% {direction} VWAP')
+        top_reasons.append(TOP_NEGATIVE_NEWS)
+    if not near_vwap:
+        top_reasons.append(TOP_VWAP)
 
     if not top_reasons:
-        top_reasons.append('Mixed signals; neutral stance')
+        top_reasons.append(TOP_MIXED)
 
+    codes = {
+        'top': top_reasons[:MAX_TOP_REASONS],
+        'price_action': pa_reason,
+        'volume': vol_reason,
+        'announcements': ann_reason,
+        'news': news_reason,
+        'regime': reg_reason,
+    }
     return {
         'price_action_score': price_action,
         'volume_score': volume,
@@ -170,24 +288,6 @@ def score_from_features(feature_json):
         'announcements_score': announcements,
         'regime_score': regime,
         'overall_score': overall,
-        'explain_json': {
-            'key_features': {
-                'ret_1m': feature_json.get('ret_1m', 0.0),
-                'ret_15m': ret_15m,
-                'rsi_14': rsi_14,
-                'vol_z_20': vol_z_20,
-                'ann_impact_sum_24h': ann_impact_sum_24h,
-                'results_flag_7d': results_flag_7d,
-                'realized_vol_60m': realized_vol_60m,
-                'vwap_dist': vwap_dist,
-            },
-            'top_reasons': top_reasons[:3],
-            'category_reasons': {
-                'price_action': pa_reason,
-                'volume': vol_reason,
-                'announcements': ann_reason,
-                'news': news_reason,
-                'regime': reg_reason,
-            },
-        },
+        'reason_codes': codes,
+        'explain_json': render_explain(values, codes),
     }
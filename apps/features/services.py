@@ -1,29 +1,36 @@
 ﻿from django.db import transaction
 
 from apps.market.models import Ohlc1m
+from apps.market.symbols import default_symbol
+from apps.ops import metrics
 
 from .compute import compute_features_for_ts, localtime_floor_minute
 from .models import Feature1m, SignalScore
-from .scoring import score_from_features
+from .scoring import explain_values, score_from_features
 
 
-def compute_and_store(ts):
+def compute_and_store(ts, symbol=None, frame=None):
     if ts is None:
         return None
 
     ts_floor = localtime_floor_minute(ts)
     if ts_floor is None:
         return None
+    symbol = symbol or default_symbol()
 
-    feature_json = compute_features_for_ts(ts_floor)
-    scores = score_from_features(feature_json)
+    with metrics.timer('features.compute'):
+        feature_json = compute_features_for_ts(ts_floor, symbol=symbol, frame=frame)
+    with metrics.timer('features.score'):
+        scores = score_from_features(feature_json)
 
-    with transaction.atomic():
+    with metrics.timer('features.write'), transaction.atomic():
         Feature1m.objects.update_or_create(
+            symbol=symbol,
             ts=ts_floor,
-            defaults={'feature_json': feature_json},
+            defaults=Feature1m.columns(feature_json),
         )
         score_obj, _created = SignalScore.objects.update_or_create(
+            symbol=symbol,
             ts=ts_floor,
             defaults={
                 'price_action_score': scores['price_action_score'],
@@ -32,21 +39,32 @@ def compute_and_store(ts):
                 'announcements_score': scores['announcements_score'],
                 'regime_score': scores['regime_score'],
                 'overall_score': scores['overall_score'],
-                'explain_json': scores['explain_json'],
+                **SignalScore.explain_columns(explain_values(feature_json), scores['reason_codes']),
             },
         )
+    metrics.count('features.scores_written')
 
     return score_obj
 
 
-def compute_latest_missing():
-    latest_candle = Ohlc1m.objects.order_by('-ts').first()
+def compute_latest_missing(symbol=None, frame=None):
+    symbol = symbol or default_symbol()
+    latest_candle = Ohlc1m.objects.filter(symbol=symbol).order_by('-ts').first()
     if latest_candle is None:
         return None
 
-    latest_score = SignalScore.objects.order_by('-ts').first()
+    latest_score = SignalScore.objects.filter(symbol=symbol).order_by('-ts').first()
     ts_floor = localtime_floor_minute(latest_candle.ts)
     if latest_score and ts_floor and latest_score.ts >= ts_floor:
         return latest_score
 
-    return compute_and_store(latest_candle.ts)
+    return compute_and_store(latest_candle.ts, symbol=symbol, frame=frame)
+
+
+def recompute_latest(symbol=None, frame=None):
+    """Recompute the score for the latest candle even if one is already stored."""
+    symbol = symbol or default_symbol()
+    latest_ts = Ohlc1m.objects.filter(symbol=symbol).order_by('-ts').values_list('ts', flat=True).first()
+    if latest_ts is None:
+        return None
+    return compute_and_store(latest_ts, symbol=symbol, frame=frame)
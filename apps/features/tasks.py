@@ -6,6 +6,9 @@ from django.conf import settings
 from django.utils import timezone
 
 from apps.market.market_time import market_state
+from apps.market.symbols import active_symbols
+from apps.ops.locks import COALESCE, single_flight
+from apps.ops.profiling import profile_task
 
 from .services import compute_latest_missing
 
@@ -19,14 +22,26 @@ def _should_run():
 
 
 @shared_task
+@single_flight(key='compute_scores', ttl=55)
 def compute_scores_task():
     if not _should_run():
         return 'skip'
+    from celery import group
+
+    symbols = active_symbols()
+    group(compute_symbol_scores_task.s(symbol) for symbol in symbols).apply_async()
+    return {'dispatched': symbols}
+
+
+@shared_task
+@single_flight(key='scores:{0}', ttl=120, policy=COALESCE)
+@profile_task
+def compute_symbol_scores_task(symbol):
     try:
-        result = compute_latest_missing()
+        result = compute_latest_missing(symbol=symbol)
         if result is None:
             return 'no_data'
         return 'ok'
     except Exception as exc:
-        logger.exception('compute_scores_task failed: %s', exc)
+        logger.exception('compute_scores_task failed symbol=%s: %s', symbol, exc)
         return 'error'
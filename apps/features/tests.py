@@ -1,16 +1,28 @@
 ﻿from datetime import timedelta
+from importlib import import_module
 
 from django.test import TestCase
 from django.utils import timezone
 from rest_framework.test import APITestCase
 
+from apps.events.aggregates import refresh_announcement_aggregates
 from apps.events.models import Announcement
 from apps.market.models import Ohlc1m
+from apps.market.symbols import default_symbol
+from apps.ops.locks import get_backend
 
-from .compute import compute_features_for_ts
-from .models import SignalScore
-from .scoring import score_from_features
-from .services import compute_latest_missing
+from .compute import FEATURE_KEYS, compute_features_for_ts
+from .models import Feature1m, SignalScore
+from .registry import FeatureFrame, compile_plan
+from .scoring import REASONS, explain_values, score_from_features
+from .services import compute_latest_missing, recompute_latest
+
+
+def _announce(**fields):
+    # Writers refresh the minute aggregates themselves, as the services do.
+    announcement = Announcement.objects.create(**fields)
+    refresh_announcement_aggregates(announcement.symbol, since=announcement.published_at)
+    return announcement
 
 
 class FeatureStoreTests(TestCase):
@@ -50,14 +62,14 @@ class FeatureStoreTests(TestCase):
     def test_leakage_prevention_announcements(self):
         now = timezone.now().replace(second=0, microsecond=0)
         last_ts = self._seed_candles(now, count=30)
-        Announcement.objects.create(
+        _announce(
             published_at=last_ts - timedelta(hours=1),
             headline='Financial Results Update',
             impact_score=30,
             low_priority=False,
             type='results',
         )
-        Announcement.objects.create(
+        _announce(
             published_at=last_ts + timedelta(hours=1),
             headline='Future Financial Results',
             impact_score=50,
@@ -68,6 +80,113 @@ class FeatureStoreTests(TestCase):
         self.assertEqual(features['ann_impact_sum_24h'], 30)
         self.assertEqual(features['ann_results_flag_7d'], 1)
 
+    def test_recompute_latest_picks_up_new_announcement(self):
+        now = timezone.now().replace(second=0, microsecond=0)
+        last_ts = self._seed_candles(now, count=30)
+        first = compute_latest_missing()
+        _announce(
+            published_at=last_ts - timedelta(minutes=5),
+            headline='Outcome of Board Meeting - Financial Results',
+            impact_score=70,
+            type='results',
+        )
+        # The latest candle already has a score, so the regular path keeps it.
+        self.assertEqual(compute_latest_missing().announcements_score, first.announcements_score)
+        refreshed = recompute_latest()
+        self.assertEqual(SignalScore.objects.count(), 1)
+        self.assertNotEqual(refreshed.announcements_score, first.announcements_score)
+
+    def test_plan_shares_intermediates(self):
+        plan = compile_plan(['vol_std_60', 'realized_vol_60m', 'mom_15', 'ret_1m'])
+        names = [step.name for step in plan.steps]
+        self.assertEqual(names.count('r1'), 1)
+        self.assertEqual(names.count('vol_std_60'), 1)
+        self.assertLess(names.index('r1'), names.index('vol_std_60'))
+        self.assertEqual(plan.warmup, 61)
+        with self.assertRaises(ValueError):
+            compile_plan(['no_such_feature'])
+
+    def test_scoring_and_model_features_agree(self):
+        from apps.predictions.services import FEATURE_COLUMNS, MODEL_PLAN
+
+        now = timezone.now().replace(second=0, microsecond=0)
+        last_ts = self._seed_candles(now, count=30)
+        _announce(
+            published_at=last_ts - timedelta(hours=1),
+            headline='Financial Results Update',
+            impact_score=30,
+            low_priority=False,
+            type='results',
+        )
+        features = compute_features_for_ts(last_ts)
+        frame = FeatureFrame.load(now, last_ts, default_symbol())
+        model_row = frame.compute(MODEL_PLAN).iloc[-1]
+        shared = set(FEATURE_KEYS) & set(FEATURE_COLUMNS)
+        self.assertTrue({'rsi_14', 'atr_pct', 'vwap_dist', 'vol_z_60', 'ann_impact_sum_24h'} <= shared)
+        for key in shared:
+            self.assertAlmostEqual(features[key], model_row[key], places=9, msg=key)
+
+    def test_stored_rows_round_trip(self):
+        now = timezone.now().replace(second=0, microsecond=0)
+        last_ts = self._seed_candles(now, count=30)
+        _announce(
+            published_at=last_ts - timedelta(hours=1),
+            headline='Financial Results Update',
+            impact_score=30,
+            low_priority=False,
+            type='results',
+        )
+        features = compute_features_for_ts(last_ts)
+        compute_latest_missing()
+        stored = Feature1m.objects.get()
+        score = SignalScore.objects.get()
+        self.assertEqual(stored.feature_json, features)
+        self.assertEqual(score.explain_json, score_from_features(features)['explain_json'])
+        self.assertIsNone(score.legacy_explain_json)
+
+    def test_legacy_explain_served_verbatim(self):
+        legacy = {'top_reasons': ['Old wording'], 'category_reasons': {}, 'key_features': {}}
+        score = SignalScore.objects.create(ts=timezone.now(), legacy_explain_json=legacy)
+        self.assertEqual(SignalScore.objects.get(pk=score.pk).explain_json, legacy)
+
+    def test_explain_renders_every_reason(self):
+        rows = [
+            {'rsi_14': 75.0, 'ret_15m': 0.004, 'vwap_dist': 0.01, 'regime_label': 'volatile'},
+            {'rsi_14': 25.0, 'ret_15m': -0.008, 'vol_z_20': 2.5, 'news_count_24h': 2, 'news_sent_avg_24h': -0.4},
+            {'ret_15m': 0.008, 'vol_z_20': 1.2, 'news_count_24h': 3, 'news_sent_avg_24h': 0.5, 'ann_impact_sum_24h': 25},
+            {'vol_z_20': -2.0, 'news_count_24h': 1, 'ann_impact_sum_24h': 5, 'vwap_dist': -0.006, 'regime_label': 'active'},
+            {'ann_results_flag_7d': 1},
+            {'insufficient_history': True},
+        ]
+        for features in rows:
+            scores = score_from_features(features)
+            score = SignalScore(
+                ts=timezone.now(),
+                **SignalScore.explain_columns(explain_values(features), scores['reason_codes']),
+            )
+            self.assertEqual(score.explain_json, scores['explain_json'])
+
+    def test_migration_reason_codes_reproduce_legacy_explain(self):
+        migration = import_module('apps.features.migrations.0004_typed_feature_columns')
+        self.assertEqual(REASONS[:len(migration._REASONS)], migration._REASONS)
+
+        rows = [
+            {'rsi_14': 75.0, 'ret_15m': 0.004, 'vwap_dist': 0.01, 'regime_label': 'volatile'},
+            {'vol_z_20': -2.0, 'news_count_24h': 1, 'ann_impact_sum_24h': 5, 'vwap_dist': -0.006, 'regime_label': 'active'},
+            {'ret_15m': 0.008, 'news_count_24h': 3, 'news_sent_avg_24h': 0.5, 'ann_impact_sum_24h': 25},
+            {'insufficient_history': True},
+        ]
+        for features in rows:
+            scores = score_from_features(features)
+            values, codes = migration._reason_codes(scores['explain_json'])
+            self.assertEqual(values, explain_values(features))
+            self.assertEqual(codes, scores['reason_codes'])
+
+        self.assertIsNone(migration._reason_codes({'top_reasons': ['Old wording'], 'category_reasons': {}, 'key_features': {}}))
+        edited = score_from_features(rows[0])['explain_json']
+        edited['top_reasons'] = edited['top_reasons'] + ['Mixed signals; neutral stance'] * 3
+        self.assertIsNone(migration._reason_codes(edited))
+
     def test_score_ranges(self):
         now = timezone.now().replace(second=0, microsecond=0)
         last_ts = self._seed_candles(now, count=30)
@@ -103,3 +222,20 @@ class FeatureApiTests(APITestCase):
         payload = response.json()
         self.assertIn('scores', payload)
         self.assertIn('overall', payload.get('scores', {}))
+
+
+class ScoreTaskLockTests(TestCase):
+    def setUp(self):
+        get_backend().reset()
+        self.addCleanup(get_backend().reset)
+
+    def test_score_tasks_share_one_lock_per_symbol(self):
+        from apps.predictions.tasks import score_and_predict_symbol_task
+
+        from .tasks import compute_symbol_scores_task
+
+        get_backend().acquire('jsll:singleflight:scores:AAA.NS', 'running', 60)
+        for task in (compute_symbol_scores_task, score_and_predict_symbol_task):
+            with self.subTest(task=task.name):
+                self.assertEqual(task('AAA.NS'), {'skipped': True, 'reason': 'coalesced'})
+        self.assertEqual(compute_symbol_scores_task('BBB.NS'), 'no_data')
@@ -0,0 +1,301 @@
+"""Hot/cold retention for the minute-grain tables.
+
+Sealed months older than ``JSLL_HOT_RETENTION_DAYS`` are written to compressed
+files under ``JSLL_ARCHIVE_DIR`` (Parquet when pyarrow is installed, gzipped
+JSON lines otherwise) and then removed from the database: on Postgres by
+detaching the month partition, on SQLite by deleting the rows.  Range reads
+that go through ``iter_range_rows`` (``load_ohlc_rows`` for candles) stitch
+archived months back in, so callers do not need to know where a row lives:
+the model feature frame and backtest, and the data exports use them.
+
+Reads of the latest rows stay on the live table on purpose: the API quote,
+OHLC, status and score views, scoring warm-up (``FeatureFrame.load_latest``),
+ingest and health checks.  They look back minutes to days, and a month is
+only sealed once all of it is ``JSLL_HOT_RETENTION_DAYS`` old.
+"""
+import gzip
+import itertools
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import ArchivedPartition, Ohlc1m
+from .partitioning import (
+    PARTITIONED_TABLES,
+    detach_and_drop_partition,
+    is_partitioned,
+    iter_months,
+    month_start,
+    next_month,
+)
+from .symbols import default_symbol
+
+ARCHIVE_MODELS = {
+    'market_ohlc1m': 'market.Ohlc1m',
+    'market_ingestrun': 'market.IngestRun',
+    'features_feature1m': 'features.Feature1m',
+    'features_signalscore': 'features.SignalScore',
+}
+
+OHLC_FIELDS = ('ts', 'open', 'high', 'low', 'close', 'volume')
+
+_CHUNK_SIZE = 5000
+
+
+def archive_root():
+    return Path(settings.JSLL_ARCHIVE_DIR)
+
+
+def _month_bounds(month):
+    start = datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc)
+    nxt = next_month(month)
+    end = datetime(nxt.year, nxt.month, 1, tzinfo=dt_timezone.utc)
+    return start, end
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def _arrow_type(pa, field):
+    if isinstance(field, models.DateTimeField):
+        return pa.timestamp('us', tz='UTC')
+    if isinstance(field, models.FloatField):
+        return pa.float64()
+    if isinstance(field, models.BooleanField):
+        return pa.bool_()
+    if isinstance(field, (models.IntegerField, models.AutoField, models.BigAutoField)):
+        return pa.int64()
+    return pa.string()
+
+
+def _encode_value(field, value):
+    if isinstance(field, models.JSONField):
+        return json.dumps(value)
+    return value
+
+
+def _decode_value(field, value):
+    if value is None:
+        return None
+    if isinstance(field, models.JSONField):
+        # Archives written before JSON columns were encoded hold the value itself.
+        return json.loads(value) if isinstance(value, str) else value
+    if isinstance(field, models.DateTimeField) and isinstance(value, str):
+        return parse_datetime(value)
+    return value
+
+
+def _concrete_fields(model):
+    return [field for field in model._meta.concrete_fields]
+
+
+def _write_parquet(pa, path, model, chunks):
+    import pyarrow.parquet as pq
+
+    fields = _concrete_fields(model)
+    schema = pa.schema([(field.attname, _arrow_type(pa, field)) for field in fields])
+    rows = 0
+    with pq.ParquetWriter(str(path), schema, compression='zstd') as writer:
+        for chunk in chunks:
+            arrays = [
+                pa.array([_encode_value(field, row[field.attname]) for row in chunk], type=schema.field(idx).type)
+                for idx, field in enumerate(fields)
+            ]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            rows += len(chunk)
+    return rows
+
+
+def _write_jsonl(path, model, chunks):
+    fields = _concrete_fields(model)
+    rows = 0
+    with gzip.open(path, 'wt', encoding='utf-8') as handle:
+        for chunk in chunks:
+            for row in chunk:
+                record = {}
+                for field in fields:
+                    value = _encode_value(field, row[field.attname])
+                    record[field.attname] = value.isoformat() if isinstance(value, datetime) else value
+                handle.write(json.dumps(record))
+                handle.write('\n')
+            rows += len(chunk)
+    return rows
+
+
+def _iter_chunks(rows):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= _CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def sealed_months(table, now=None):
+    """Months whose rows are all older than the hot retention horizon."""
+    now = now or timezone.now()
+    cutoff = month_start((now - timedelta(days=settings.JSLL_HOT_RETENTION_DAYS)).date())
+    model = apps.get_model(ARCHIVE_MODELS[table])
+    column = PARTITIONED_TABLES[table]
+    oldest = model.objects.order_by(column).values_list(column, flat=True).first()
+    if oldest is None:
+        return []
+    return [month for month in iter_months(oldest.astimezone(dt_timezone.utc).date(), cutoff) if month < cutoff]
+
+
+def archive_month(table, month):
+    """Move one month of ``table`` to cold storage. Returns rows archived."""
+    model = apps.get_model(ARCHIVE_MODELS[table])
+    column = PARTITIONED_TABLES[table]
+    start, end = _month_bounds(month)
+    queryset = model.objects.filter(**{f'{column}__gte': start, f'{column}__lt': end}).order_by(column)
+    if not queryset.exists():
+        return 0
+
+    directory = archive_root() / table
+    directory.mkdir(parents=True, exist_ok=True)
+    pa = _pyarrow()
+    fmt = 'parquet' if pa is not None else 'jsonl.gz'
+    path = directory / f"{month:%Y-%m}.{fmt}"
+    staging = path.with_name(f"{path.name}.tmp")
+    names = [field.attname for field in _concrete_fields(model)]
+    # Rows that land in a month after it was archived are merged with the
+    # existing archive, so the month keeps a single file holding all of it.
+    existing = ArchivedPartition.objects.filter(table=table, month=month).first()
+    records = queryset.values(*names).iterator(chunk_size=_CHUNK_SIZE)
+    if existing is not None:
+        archived = ({name: record.get(name) for name in names} for record in _read_archive(existing, model))
+        records = itertools.chain(archived, records)
+    if pa is not None:
+        total = _write_parquet(pa, staging, model, _iter_chunks(records))
+    else:
+        total = _write_jsonl(staging, model, _iter_chunks(records))
+    staging.replace(path)
+    rows = total - (existing.row_count if existing is not None else 0)
+
+    with transaction.atomic():
+        ArchivedPartition.objects.update_or_create(
+            table=table,
+            month=month,
+            defaults={'path': str(path), 'format': fmt, 'row_count': total},
+        )
+        if not (is_partitioned(table) and detach_and_drop_partition(table, month)):
+            queryset.delete()
+    if existing is not None and existing.path != str(path):
+        Path(existing.path).unlink(missing_ok=True)
+    return rows
+
+
+def archive_sealed_months(now=None, tables=None):
+    results = []
+    for table in tables or ARCHIVE_MODELS:
+        for month in sealed_months(table, now=now):
+            rows = archive_month(table, month)
+            if rows:
+                results.append((table, month, rows))
+    return results
+
+
+def _upgrade_record(model, record):
+    """Map columns an older archive stored under another shape onto today's fields."""
+    label = model._meta.label
+    if label == 'features.Feature1m' and 'feature_json' in record:
+        legacy = record.pop('feature_json')
+        legacy = json.loads(legacy) if isinstance(legacy, str) else legacy
+        record = {**model.columns(legacy or {}), **record}
+    elif label == 'features.SignalScore' and 'explain_json' in record:
+        record['legacy_explain_json'] = record.pop('explain_json')
+    return record
+
+
+def _archive_records(entry):
+    if entry.format == 'parquet':
+        pa = _pyarrow()
+        if pa is None:
+            raise RuntimeError(f"pyarrow is required to read {entry.path}")
+        import pyarrow.parquet as pq
+
+        yield from pq.read_table(entry.path).to_pylist()
+        return
+
+    with gzip.open(entry.path, 'rt', encoding='utf-8') as handle:
+        for line in handle:
+            yield json.loads(line)
+
+
+def _read_archive(entry, model):
+    fields = {field.attname: field for field in _concrete_fields(model)}
+    for record in _archive_records(entry):
+        record = _upgrade_record(model, record)
+        yield {name: _decode_value(fields[name], value) for name, value in record.items() if name in fields}
+
+
+def iter_archived_rows(table, start_ts, end_ts, fields, symbol=None):
+    """Row dicts for ``[start_ts, end_ts]`` from archived months, in range-column order.
+
+    Months are read one at a time.  Fields an older archive does not have come
+    back as ``None``.
+    """
+    column = PARTITIONED_TABLES[table]
+    entries = ArchivedPartition.objects.filter(
+        table=table,
+        month__gte=month_start(start_ts.astimezone(dt_timezone.utc).date()),
+        month__lte=month_start(end_ts.astimezone(dt_timezone.utc).date()),
+    ).order_by('month')
+    model = apps.get_model(ARCHIVE_MODELS[table])
+    for entry in entries:
+        rows = []
+        for record in _read_archive(entry, model):
+            value = record[column]
+            if symbol is not None and record.get('symbol') != symbol:
+                continue
+            if start_ts <= value <= end_ts:
+                rows.append({name: record.get(name) for name in fields})
+        rows.sort(key=lambda row: row[column])
+        yield from rows
+
+
+def load_archived_rows(table, start_ts, end_ts, fields, symbol=None):
+    """Rows for ``[start_ts, end_ts]`` from archived months only, sorted by range column."""
+    return list(iter_archived_rows(table, start_ts, end_ts, fields, symbol=symbol))
+
+
+def iter_range_rows(table, start_ts, end_ts, fields, symbol=None, chunk_size=_CHUNK_SIZE):
+    """Tuples of ``fields`` for ``[start_ts, end_ts]`` from cold storage, then the database.
+
+    Archived months are whole months older than anything left in the table, so
+    the two parts concatenate in range-column order.  The live part streams
+    through ``QuerySet.iterator``.
+    """
+    column = PARTITIONED_TABLES[table]
+    for row in iter_archived_rows(table, start_ts, end_ts, fields, symbol=symbol):
+        yield tuple(row[name] for name in fields)
+    queryset = apps.get_model(ARCHIVE_MODELS[table]).objects.filter(
+        **{f'{column}__gte': start_ts, f'{column}__lte': end_ts}
+    )
+    if symbol is not None:
+        queryset = queryset.filter(symbol=symbol)
+    yield from queryset.order_by(column).values_list(*fields).iterator(chunk_size=chunk_size)
+
+
+def load_ohlc_rows(start_ts, end_ts, symbol=None):
+    """``Ohlc1m`` rows in ``[start_ts, end_ts]`` from cold storage and the database."""
+    symbol = symbol or default_symbol()
+    return [
+        dict(zip(OHLC_FIELDS, row))
+        for row in iter_range_rows('market_ohlc1m', start_ts, end_ts, OHLC_FIELDS, symbol=symbol)
+    ]
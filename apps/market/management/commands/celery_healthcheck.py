@@ -7,6 +7,7 @@ from django.utils import timezone
 from apps.events.models import EventsFetchRun
 from apps.features.models import SignalScore
 from apps.market.models import IngestRun, Ohlc1m
+from apps.market.symbols import active_symbols
 from config.celery import app
 
 
@@ -64,3 +65,8 @@ class Command(BaseCommand):
         self.stdout.write(
             f"Candle freshness sec: {freshness_sec}"
         )
+        for symbol in active_symbols():
+            symbol_candle = Ohlc1m.objects.filter(symbol=symbol).order_by('-ts').first()
+            self.stdout.write(
+                f"{symbol} latest candle ts: {symbol_candle.ts if symbol_candle else None}"
+            )
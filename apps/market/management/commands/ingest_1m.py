@@ -3,18 +3,29 @@ from django.core.management.base import BaseCommand
 from apps.market.providers.yfinance_download_provider import YFinanceDownloadProvider
 from apps.market.providers.yfinance_provider import YFinanceHistoryProvider
 from apps.market.services import ingest_1m_candles_multi
+from apps.ops.profiling import add_profile_argument, profile_run, report
 
 
 class Command(BaseCommand):
     help = 'Ingest 1m candles using primary and fallback providers.'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--symbol', help='Ticker to ingest. Default: JSLL_TICKER')
+        add_profile_argument(parser)
+
     def handle(self, *args, **options):
-        primary = YFinanceHistoryProvider()
-        fallback = YFinanceDownloadProvider()
+        with profile_run('ingest_1m', enabled=options['profile']) as profile:
+            self.ingest(options)
+        report(self.stdout, profile)
+
+    def ingest(self, options):
+        symbol = options.get('symbol')
+        primary = YFinanceHistoryProvider(symbol)
+        fallback = YFinanceDownloadProvider(symbol)
 
-        run, meta = ingest_1m_candles_multi(primary, fallback)
+        run, meta = ingest_1m_candles_multi(primary, fallback, symbol=symbol)
 
-        self.stdout.write('Ingestion summary')
+        self.stdout.write(f'Ingestion summary ({run.symbol})')
         self.stdout.write(f"Primary OK: {run.primary_ok} ({run.candles_fetched_primary})")
         self.stdout.write(f"Fallback OK: {run.fallback_ok} ({run.candles_fetched_fallback})")
         self.stdout.write(f"Candles saved: {run.candles_saved}")
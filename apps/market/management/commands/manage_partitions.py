@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.market.archive import ARCHIVE_MODELS, archive_sealed_months, sealed_months
+from apps.market.partitioning import (
+    PARTITIONED_TABLES,
+    convert_to_partitioned,
+    ensure_partitions,
+    is_partitioned,
+    is_postgres,
+    list_partitions,
+    missing_indexes,
+)
+from apps.market.rollup import rollup_ingest_runs
+
+
+class Command(BaseCommand):
+    help = 'Maintain monthly partitions and move sealed months to cold storage.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--convert',
+            action='store_true',
+            help='Rebuild the minute-grain tables as monthly RANGE partitions (Postgres only).',
+        )
+        parser.add_argument(
+            '--archive',
+            action='store_true',
+            help='Archive months older than JSLL_HOT_RETENTION_DAYS to JSLL_ARCHIVE_DIR.',
+        )
+        parser.add_argument(
+            '--rollup',
+            action='store_true',
+            help='Roll IngestRun rows older than JSLL_INGEST_RUN_RETENTION_DAYS into hourly summaries.',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be archived.')
+
+    def handle(self, *args, **options):
+        today = timezone.now().date()
+        months_ahead = settings.JSLL_PARTITION_MONTHS_AHEAD
+
+        if not is_postgres():
+            self.stdout.write('Partitioning unavailable on this database; using plain tables.')
+
+        if options.get('convert'):
+            for table in PARTITIONED_TABLES:
+                copied = convert_to_partitioned(table, today, months_ahead=months_ahead)
+                if copied is not None:
+                    self.stdout.write(f"Converted {table} ({copied} rows)")
+
+        for table in PARTITIONED_TABLES:
+            if is_partitioned(table):
+                ensure_partitions(table, today, months_ahead=months_ahead)
+                self.stdout.write(f"{table}: {len(list_partitions(table))} month partitions")
+                missing = missing_indexes(table)
+                if missing:
+                    self.stderr.write(f"{table}: missing model indexes {', '.join(missing)}")
+
+        if options.get('rollup') and not options.get('dry_run'):
+            self.stdout.write(f"Rolled up {rollup_ingest_runs()} ingest runs into hourly summaries")
+
+        if options.get('dry_run'):
+            for table in ARCHIVE_MODELS:
+                months = sealed_months(table)
+                self.stdout.write(f"{table}: {len(months)} sealed months to archive")
+            return
+
+        if options.get('archive'):
+            results = archive_sealed_months()
+            for table, month, rows in results:
+                self.stdout.write(f"Archived {table} {month:%Y-%m}: {rows} rows")
+            if not results:
+                self.stdout.write('Nothing to archive')
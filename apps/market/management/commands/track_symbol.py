@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from apps.market.models import TrackedSymbol
+from apps.market.symbols import to_nse_symbol
+
+
+class Command(BaseCommand):
+    help = 'Add, update or deactivate a ticker on the watchlist.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('ticker', nargs='?', help='Ticker, e.g. JSLL.NS')
+        parser.add_argument('--nse-symbol', help='NSE code used for announcements. Default: ticker without suffix')
+        parser.add_argument(
+            '--news-keywords',
+            help='Comma-separated news search terms. Default: the NSE code (JSLL\'s company names for JSLL.NS)',
+        )
+        parser.add_argument('--deactivate', action='store_true', help='Stop processing this ticker')
+        parser.add_argument('--list', action='store_true', help='List tracked tickers')
+
+    def handle(self, *args, **options):
+        ticker = options.get('ticker')
+        if ticker:
+            nse_symbol = options.get('nse_symbol') or to_nse_symbol(ticker)
+            defaults = {'nse_symbol': nse_symbol, 'active': not options['deactivate']}
+            if options.get('news_keywords') is not None:
+                defaults['news_keywords'] = options['news_keywords']
+            tracked, created = TrackedSymbol.objects.update_or_create(ticker=ticker, defaults=defaults)
+            action = 'Added' if created else 'Updated'
+            self.stdout.write(f"{action} {tracked.ticker} nse={tracked.nse_symbol} active={tracked.active}")
+
+        if options['list'] or not ticker:
+            for tracked in TrackedSymbol.objects.all():
+                self.stdout.write(f"{tracked.ticker} nse={tracked.nse_symbol} active={tracked.active}")
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0002_ingestrun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPartition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table', models.CharField(max_length=64)),
+                ('month', models.DateField()),
+                ('path', models.CharField(max_length=500)),
+                ('format', models.CharField(max_length=20)),
+                ('row_count', models.IntegerField(default=0)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['table', 'month'],
+                'constraints': [models.UniqueConstraint(fields=('table', 'month'), name='uniq_archived_partition_table_month')],
+            },
+        ),
+    ]
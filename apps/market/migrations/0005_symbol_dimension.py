@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:03
+
+import apps.market.symbols
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0004_brin_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrackedSymbol',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ticker', models.CharField(max_length=32, unique=True)),
+                ('nse_symbol', models.CharField(blank=True, default='', max_length=32)),
+                ('active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['ticker'],
+            },
+        ),
+        migrations.AddField(
+            model_name='ingestrun',
+            name='symbol',
+            field=models.CharField(db_index=True, default=apps.market.symbols.default_symbol, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='ohlc1m',
+            name='symbol',
+            field=models.CharField(default=apps.market.symbols.default_symbol, max_length=32),
+        ),
+        migrations.AlterField(
+            model_name='ohlc1m',
+            name='ts',
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.AddConstraint(
+            model_name='ohlc1m',
+            constraint=models.UniqueConstraint(fields=('symbol', 'ts'), name='uniq_ohlc1m_symbol_ts'),
+        ),
+    ]
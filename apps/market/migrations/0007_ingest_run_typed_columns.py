@@ -0,0 +1,105 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:39
+
+import re
+
+import apps.market.symbols
+from django.db import migrations, models
+from django.utils.dateparse import parse_datetime
+
+_BATCH_SIZE = 2000
+
+
+def backfill_from_notes(apps, schema_editor):
+    """Copy the values ingest used to write into ``notes`` into the new columns."""
+    IngestRun = apps.get_model('market', 'IngestRun')
+    batch = []
+    queryset = IngestRun.objects.filter(notes__contains='=').only('id', 'notes')
+    for run in queryset.iterator(chunk_size=_BATCH_SIZE):
+        delay = re.search(r'provider_delay_sec=(-?\d+)', run.notes)
+        fetched_end = re.search(r'fetched_end_ts=(\S+?)(?:;|$)', run.notes)
+        run.provider_delay_sec = int(delay.group(1)) if delay else None
+        run.fetched_end_ts = parse_datetime(fetched_end.group(1)) if fetched_end else None
+        run.no_new_candles = 'no_new_candles' in run.notes
+        batch.append(run)
+        if len(batch) >= _BATCH_SIZE:
+            IngestRun.objects.bulk_update(batch, ['provider_delay_sec', 'fetched_end_ts', 'no_new_candles'])
+            batch = []
+    if batch:
+        IngestRun.objects.bulk_update(batch, ['provider_delay_sec', 'fetched_end_ts', 'no_new_candles'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0006_run_timings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestRunHourly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(max_length=32)),
+                ('hour', models.DateTimeField()),
+                ('runs', models.IntegerField(default=0)),
+                ('primary_ok_runs', models.IntegerField(default=0)),
+                ('fallback_ok_runs', models.IntegerField(default=0)),
+                ('no_new_candles_runs', models.IntegerField(default=0)),
+                ('candles_fetched_primary', models.IntegerField(default=0)),
+                ('candles_fetched_fallback', models.IntegerField(default=0)),
+                ('candles_saved', models.IntegerField(default=0)),
+                ('missing_filled', models.IntegerField(default=0)),
+                ('outliers_rejected', models.IntegerField(default=0)),
+                ('provider_delay_sec_avg', models.FloatField(blank=True, null=True)),
+                ('provider_delay_sec_max', models.IntegerField(blank=True, null=True)),
+                ('primary_latency_ms_avg', models.FloatField(blank=True, null=True)),
+                ('primary_latency_ms_max', models.IntegerField(blank=True, null=True)),
+                ('fallback_latency_ms_avg', models.FloatField(blank=True, null=True)),
+                ('fallback_latency_ms_max', models.IntegerField(blank=True, null=True)),
+                ('first_started_at', models.DateTimeField(blank=True, null=True)),
+                ('last_finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['symbol', '-hour'],
+            },
+        ),
+        migrations.AddField(
+            model_name='ingestrun',
+            name='fallback_latency_ms',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ingestrun',
+            name='fetched_end_ts',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ingestrun',
+            name='no_new_candles',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='ingestrun',
+            name='primary_latency_ms',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ingestrun',
+            name='provider_delay_sec',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_from_notes, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='ingestrun',
+            index=models.Index(fields=['symbol', '-started_at'], name='ingestrun_symbol_started_idx'),
+        ),
+        migrations.AlterField(
+            model_name='ingestrun',
+            name='symbol',
+            field=models.CharField(default=apps.market.symbols.default_symbol, max_length=32),
+        ),
+        migrations.AddConstraint(
+            model_name='ingestrunhourly',
+            constraint=models.UniqueConstraint(fields=('symbol', 'hour'), name='uniq_ingestrunhourly_symbol_hour'),
+        ),
+    ]
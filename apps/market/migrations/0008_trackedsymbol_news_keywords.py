@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0007_ingest_run_typed_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trackedsymbol',
+            name='news_keywords',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+    ]
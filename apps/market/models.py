@@ -1,8 +1,26 @@
 from django.db import models
 
+from .symbols import default_symbol
+
+
+class TrackedSymbol(models.Model):
+    ticker = models.CharField(max_length=32, unique=True)
+    nse_symbol = models.CharField(max_length=32, blank=True, default='')
+    # Comma-separated news search terms; see ``apps.events.rss.news_keywords``.
+    news_keywords = models.CharField(max_length=255, blank=True, default='')
+    active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['ticker']
+
+    def __str__(self):
+        return f"{self.ticker} active={self.active}"
+
 
 class Ohlc1m(models.Model):
-    ts = models.DateTimeField(unique=True, db_index=True)
+    symbol = models.CharField(max_length=32, default=default_symbol)
+    ts = models.DateTimeField(db_index=True)
     open = models.FloatField()
     high = models.FloatField()
     low = models.FloatField()
@@ -13,12 +31,16 @@ class Ohlc1m(models.Model):
 
     class Meta:
         ordering = ['ts']
+        constraints = [
+            models.UniqueConstraint(fields=['symbol', 'ts'], name='uniq_ohlc1m_symbol_ts'),
+        ]
 
     def __str__(self):
-        return f"{self.ts.isoformat()} O:{self.open} H:{self.high} L:{self.low} C:{self.close}"
+        return f"{self.symbol} {self.ts.isoformat()} O:{self.open} H:{self.high} L:{self.low} C:{self.close}"
 
 
 class IngestRun(models.Model):
+    symbol = models.CharField(max_length=32, default=default_symbol)
     started_at = models.DateTimeField(auto_now_add=True)
     finished_at = models.DateTimeField(null=True, blank=True)
     provider_primary = models.CharField(max_length=50)
@@ -30,10 +52,74 @@ class IngestRun(models.Model):
     candles_saved = models.IntegerField(default=0)
     missing_filled = models.IntegerField(default=0)
     outliers_rejected = models.IntegerField(default=0)
+    fetched_end_ts = models.DateTimeField(null=True, blank=True)
+    provider_delay_sec = models.IntegerField(null=True, blank=True)
+    no_new_candles = models.BooleanField(default=False)
+    primary_latency_ms = models.IntegerField(null=True, blank=True)
+    fallback_latency_ms = models.IntegerField(null=True, blank=True)
     notes = models.TextField(blank=True, default='')
+    timings_json = models.JSONField(default=dict, blank=True)
 
     class Meta:
         ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['symbol', '-started_at'], name='ingestrun_symbol_started_idx'),
+        ]
+
+    def __str__(self):
+        return f"IngestRun {self.started_at.isoformat()} primary_ok={self.primary_ok} fallback_ok={self.fallback_ok}"
+
+
+class IngestRunHourly(models.Model):
+    """One hour of ``IngestRun`` rows for a symbol, kept after the rows are rolled up.
+
+    Built by ``apps.market.rollup``; averages are over the runs that recorded
+    the value.
+    """
+
+    symbol = models.CharField(max_length=32)
+    hour = models.DateTimeField()
+    runs = models.IntegerField(default=0)
+    primary_ok_runs = models.IntegerField(default=0)
+    fallback_ok_runs = models.IntegerField(default=0)
+    no_new_candles_runs = models.IntegerField(default=0)
+    candles_fetched_primary = models.IntegerField(default=0)
+    candles_fetched_fallback = models.IntegerField(default=0)
+    candles_saved = models.IntegerField(default=0)
+    missing_filled = models.IntegerField(default=0)
+    outliers_rejected = models.IntegerField(default=0)
+    provider_delay_sec_avg = models.FloatField(null=True, blank=True)
+    provider_delay_sec_max = models.IntegerField(null=True, blank=True)
+    primary_latency_ms_avg = models.FloatField(null=True, blank=True)
+    primary_latency_ms_max = models.IntegerField(null=True, blank=True)
+    fallback_latency_ms_avg = models.FloatField(null=True, blank=True)
+    fallback_latency_ms_max = models.IntegerField(null=True, blank=True)
+    first_started_at = models.DateTimeField(null=True, blank=True)
+    last_finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['symbol', '-hour']
+        constraints = [
+            models.UniqueConstraint(fields=['symbol', 'hour'], name='uniq_ingestrunhourly_symbol_hour'),
+        ]
+
+    def __str__(self):
+        return f"IngestRunHourly {self.symbol} {self.hour.isoformat()} runs={self.runs}"
+
+
+class ArchivedPartition(models.Model):
+    table = models.CharField(max_length=64)
+    month = models.DateField()
+    path = models.CharField(max_length=500)
+    format = models.CharField(max_length=20)
+    row_count = models.IntegerField(default=0)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['table', 'month']
+        constraints = [
+            models.UniqueConstraint(fields=['table', 'month'], name='uniq_archived_partition_table_month'),
+        ]
 
     def __str__(self):
-        return f"IngestRun {self.started_at.isoformat()} primary_ok={self.primary_ok} fallback_ok={self.fallback_ok}"
\ No newline at end of file
+        return f"ArchivedPartition {self.table} {self.month:%Y-%m} rows={self.row_count}"
@@ -0,0 +1,233 @@
+"""Monthly range partitioning for the minute-grain tables (Postgres only).
+
+On SQLite every helper here is a no-op so development keeps working against a
+plain table; retention then falls back to row deletes (see ``archive.py``).
+"""
+from datetime import date
+
+from django.apps import apps
+from django.db import connection, transaction
+
+# table -> range column.  Every table gets one partition per calendar month.
+PARTITIONED_TABLES = {
+    'market_ohlc1m': 'ts',
+    'market_ingestrun': 'started_at',
+    'features_feature1m': 'ts',
+    'features_signalscore': 'ts',
+}
+
+# Model-level unique constraints.  The partition key is part of each of them,
+# which Postgres requires for unique constraints on partitioned tables.
+UNIQUE_CONSTRAINTS = {
+    'market_ohlc1m': [('uniq_ohlc1m_symbol_ts', ('symbol', 'ts'))],
+    'features_feature1m': [('uniq_feature1m_symbol_ts', ('symbol', 'ts'))],
+    'features_signalscore': [('uniq_signalscore_symbol_ts', ('symbol', 'ts'))],
+}
+
+
+def is_postgres(conn=None):
+    return (conn or connection).vendor == 'postgresql'
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def next_month(value):
+    if value.month == 12:
+        return date(value.year + 1, 1, 1)
+    return date(value.year, value.month + 1, 1)
+
+
+def iter_months(first, last):
+    current = month_start(first)
+    last = month_start(last)
+    while current <= last:
+        yield current
+        current = next_month(current)
+
+
+def partition_name(table, month):
+    return f"{table}_p{month:%Y%m}"
+
+
+def is_partitioned(table, conn=None):
+    conn = conn or connection
+    if not is_postgres(conn):
+        return False
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [table],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(table, conn=None):
+    """Return the month-partition names currently attached to ``table``."""
+    conn = conn or connection
+    if not is_partitioned(table, conn):
+        return []
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = %s ORDER BY child.relname",
+            [table],
+        )
+        return [row[0] for row in cursor.fetchall() if row[0] != f"{table}_default"]
+
+
+def _create_month_partition(cursor, table, month):
+    """Create ``month``'s partition, moving its rows out of the default partition.
+
+    Postgres refuses ``PARTITION OF`` for a range the DEFAULT partition already
+    holds rows for, so when a default exists the month is built as a plain
+    table, filled from the default and then attached.  Run inside a
+    transaction so the rows are never visible twice or not at all.
+    """
+    name = partition_name(table, month)
+    cursor.execute('SELECT to_regclass(%s)', [f'"{name}"'])
+    if cursor.fetchone()[0] is not None:
+        return name
+    start, end = month.isoformat(), next_month(month).isoformat()
+    bounds = f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    default = f"{table}_default"
+    cursor.execute('SELECT to_regclass(%s)', [f'"{default}"'])
+    if cursor.fetchone()[0] is None:
+        cursor.execute(f'CREATE TABLE "{name}" PARTITION OF "{table}" {bounds}')
+        return name
+
+    column = PARTITIONED_TABLES[table]
+    cursor.execute(f'CREATE TABLE "{name}" (LIKE "{table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+    cursor.execute(
+        f'WITH moved AS (DELETE FROM "{default}" WHERE "{column}" >= %s AND "{column}" < %s RETURNING *) '
+        f'INSERT INTO "{name}" SELECT * FROM moved',
+        [start, end],
+    )
+    cursor.execute(f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" {bounds}')
+    return name
+
+
+def ensure_partitions(table, today, months_ahead=2, conn=None):
+    """Create the current month's partition and ``months_ahead`` future ones."""
+    conn = conn or connection
+    if not is_partitioned(table, conn):
+        return []
+    created = []
+    last = month_start(today)
+    for _ in range(months_ahead):
+        last = next_month(last)
+    for month in iter_months(today, last):
+        with transaction.atomic(using=conn.alias), conn.cursor() as cursor:
+            created.append(_create_month_partition(cursor, table, month))
+    return created
+
+
+def create_brin_index(table, column, conn=None):
+    conn = conn or connection
+    if not is_postgres(conn):
+        return
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{table}_{column}_brin" ON "{table}" '
+            f'USING brin ("{column}") WITH (pages_per_range = 32)'
+        )
+
+
+def model_index_statements(table, conn=None):
+    """``{index name: CREATE INDEX sql}`` for the indexes ``table``'s model declares.
+
+    Covers ``db_index`` fields and ``Meta.indexes``; unique constraints are
+    handled separately through ``UNIQUE_CONSTRAINTS``.
+    """
+    conn = conn or connection
+    model = next(model for model in apps.get_models() if model._meta.db_table == table)
+    editor = conn.schema_editor()
+    return {str(statement.parts['name']).strip('"'): str(statement) for statement in editor._model_indexes_sql(model)}
+
+
+def missing_indexes(table, conn=None):
+    """Names of model indexes absent from ``table`` on Postgres, sorted."""
+    conn = conn or connection
+    if not is_postgres(conn):
+        return []
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT indexname FROM pg_indexes WHERE tablename = %s AND schemaname = current_schema()",
+            [table],
+        )
+        present = {row[0] for row in cursor.fetchall()}
+    return sorted(set(model_index_statements(table, conn)) - present)
+
+
+def convert_to_partitioned(table, today, months_ahead=2, conn=None):
+    """Rebuild ``table`` as a RANGE-partitioned table, one partition per month.
+
+    Existing rows are copied into month partitions spanning the stored range.
+    The primary key becomes ``(id, <range column>)`` because Postgres requires
+    the partition key in every unique constraint; Django still addresses rows
+    by ``id`` alone.  ``LIKE`` copies no indexes, so the model's indexes are
+    created again on the new parent, which cascades them to every partition.
+    Returns the number of rows copied, or ``None`` if the table is already
+    partitioned or the backend is not Postgres.
+    """
+    conn = conn or connection
+    if not is_postgres(conn) or is_partitioned(table, conn):
+        return None
+
+    column = PARTITIONED_TABLES[table]
+    legacy = f"{table}_legacy"
+    with transaction.atomic(using=conn.alias), conn.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE "{table}" IN ACCESS EXCLUSIVE MODE')
+        cursor.execute(f'SELECT MIN("{column}"), MAX("{column}") FROM "{table}"')
+        first, last = cursor.fetchone()
+        first = (first.date() if first else today)
+        last = max(last.date() if last else today, today)
+
+        cursor.execute(f'ALTER TABLE "{table}" RENAME TO "{legacy}"')
+        cursor.execute(
+            f'CREATE TABLE "{table}" (LIKE "{legacy}" INCLUDING DEFAULTS INCLUDING GENERATED) '
+            f'PARTITION BY RANGE ("{column}")'
+        )
+        end = month_start(last)
+        for _ in range(months_ahead):
+            end = next_month(end)
+        for month in iter_months(first, end):
+            _create_month_partition(cursor, table, month)
+        cursor.execute(f'CREATE TABLE "{table}_default" PARTITION OF "{table}" DEFAULT')
+
+        cursor.execute(f'INSERT INTO "{table}" SELECT * FROM "{legacy}"')
+        copied = cursor.rowcount
+        cursor.execute(f'DROP TABLE "{legacy}"')
+
+        cursor.execute(f'ALTER TABLE "{table}" ADD PRIMARY KEY ("id", "{column}")')
+        for name, columns in UNIQUE_CONSTRAINTS.get(table, []):
+            column_sql = ', '.join(f'"{unique_column}"' for unique_column in columns)
+            cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" UNIQUE ({column_sql})')
+        for sql in model_index_statements(table, conn).values():
+            cursor.execute(sql)
+        cursor.execute(f'CREATE SEQUENCE "{table}_id_seq" OWNED BY "{table}"."id"')
+        cursor.execute(f'ALTER TABLE "{table}" ALTER COLUMN "id" SET DEFAULT nextval(\'"{table}_id_seq"\')')
+        cursor.execute(
+            f"SELECT setval('\"{table}_id_seq\"', COALESCE(MAX(\"id\"), 0) + 1, false) FROM \"{table}\""
+        )
+    create_brin_index(table, column, conn)
+    return copied
+
+
+def detach_and_drop_partition(table, month, conn=None):
+    """Drop a sealed month partition. Returns True if one existed."""
+    conn = conn or connection
+    if not is_partitioned(table, conn):
+        return False
+    name = partition_name(table, month)
+    if name not in list_partitions(table, conn):
+        return False
+    with transaction.atomic(using=conn.alias), conn.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"')
+        cursor.execute(f'DROP TABLE "{name}"')
+    return True
@@ -2,9 +2,10 @@ import csv
 import io
 from datetime import datetime
 
-import requests
 from django.utils import timezone
 
+from apps.ops import tape
+
 from .base import BasePriceProvider
 from .errors import ProviderError
 
@@ -14,9 +15,11 @@ class StooqProvider(BasePriceProvider):
         self.symbol = symbol
 
     def fetch_latest_1m(self):
+        import requests
+
         url = f"https://stooq.com/q/d/l/?s={self.symbol}&i=5"
         try:
-            response = requests.get(url, timeout=10)
+            response = tape.http_get('stooq', url, requests.get, url, timeout=10)
         except Exception as exc:
             raise ProviderError(f"stooq request failed: {exc}")
 
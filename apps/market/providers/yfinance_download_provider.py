@@ -1,6 +1,7 @@
-import yfinance as yf
 from django.conf import settings
 
+from apps.ops import tape
+
 from .base import BasePriceProvider
 from .errors import ProviderError
 from .yfinance_provider import _normalize_candles
@@ -10,16 +11,21 @@ class YFinanceDownloadProvider(BasePriceProvider):
     def __init__(self, symbol=None):
         self.symbol = symbol or settings.JSLL_TICKER
 
+    def _download(self):
+        import yfinance as yf
+
+        return yf.download(
+            tickers=self.symbol,
+            period='1d',
+            interval='1m',
+            progress=False,
+            threads=False,
+            auto_adjust=False,
+        )
+
     def fetch_latest_1m(self):
         try:
-            data = yf.download(
-                tickers=self.symbol,
-                period='1d',
-                interval='1m',
-                progress=False,
-                threads=False,
-                auto_adjust=False,
-            )
+            data = tape.dataframe('yfinance_download', self.symbol, self._download)
         except Exception as exc:
             raise ProviderError(f"yfinance download failed: {exc}")
 
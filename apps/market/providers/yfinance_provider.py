@@ -1,9 +1,10 @@
 from datetime import time
 from zoneinfo import ZoneInfo
 
-import yfinance as yf
 from django.conf import settings
 
+from apps.ops import tape
+
 from .base import BasePriceProvider
 from .errors import ProviderError
 
@@ -61,16 +62,20 @@ class YFinanceHistoryProvider(BasePriceProvider):
     def __init__(self, symbol=None):
         self.symbol = symbol or settings.JSLL_TICKER
 
+    def _history(self):
+        import yfinance as yf
+
+        return yf.Ticker(self.symbol).history(
+            period='1d',
+            interval='1m',
+            auto_adjust=False,
+            actions=False,
+            prepost=False,
+        )
+
     def fetch_latest_1m(self):
         try:
-            ticker = yf.Ticker(self.symbol)
-            data = ticker.history(
-                period='1d',
-                interval='1m',
-                auto_adjust=False,
-                actions=False,
-                prepost=False,
-            )
+            data = tape.dataframe('yfinance_history', self.symbol, self._history)
         except Exception as exc:
             raise ProviderError(f"yfinance history failed: {exc}")
 
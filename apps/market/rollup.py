@@ -0,0 +1,132 @@
+"""Roll old ``IngestRun`` rows up into ``IngestRunHourly``.
+
+Ingest writes one run per symbol per minute.  Rows older than
+``JSLL_INGEST_RUN_RETENTION_DAYS`` are folded into one summary per symbol and
+UTC hour and then deleted, a day at a time, so the status views only ever read
+a few days of runs.  An hour that already has a summary (late rows) is merged
+into it.
+"""
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Min, Q, Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from .models import IngestRun, IngestRunHourly
+
+_SUMMED = (
+    'runs',
+    'primary_ok_runs',
+    'fallback_ok_runs',
+    'no_new_candles_runs',
+    'candles_fetched_primary',
+    'candles_fetched_fallback',
+    'candles_saved',
+    'missing_filled',
+    'outliers_rejected',
+)
+_AVERAGED = ('provider_delay_sec', 'primary_latency_ms', 'fallback_latency_ms')
+
+
+def _hourly_rows(queryset):
+    aggregates = {
+        'runs': Count('id'),
+        'primary_ok_runs': Count('id', filter=Q(primary_ok=True)),
+        'fallback_ok_runs': Count('id', filter=Q(fallback_ok=True)),
+        'no_new_candles_runs': Count('id', filter=Q(no_new_candles=True)),
+        'candles_fetched_primary': Sum('candles_fetched_primary'),
+        'candles_fetched_fallback': Sum('candles_fetched_fallback'),
+        'candles_saved': Sum('candles_saved'),
+        'missing_filled': Sum('missing_filled'),
+        'outliers_rejected': Sum('outliers_rejected'),
+        'first_started_at': Min('started_at'),
+        'last_finished_at': Max('finished_at'),
+    }
+    for name in _AVERAGED:
+        aggregates[f'{name}_avg'] = Avg(name)
+        aggregates[f'{name}_max'] = Max(name)
+    return (
+        queryset.annotate(hour=TruncHour('started_at', tzinfo=dt_timezone.utc))
+        .values('symbol', 'hour')
+        .annotate(**aggregates)
+        .order_by()
+    )
+
+
+def _merge(existing, row):
+    # Averages are weighted by runs, not by the samples behind them, which
+    # is close enough for the rare hour that is rolled up twice.
+    for name in _AVERAGED:
+        old_avg = getattr(existing, f'{name}_avg')
+        new_avg = row[f'{name}_avg']
+        if old_avg is None or new_avg is None:
+            setattr(existing, f'{name}_avg', new_avg if old_avg is None else old_avg)
+        else:
+            weight = existing.runs + row['runs']
+            setattr(existing, f'{name}_avg', (old_avg * existing.runs + new_avg * row['runs']) / weight)
+        values = [value for value in (getattr(existing, f'{name}_max'), row[f'{name}_max']) if value is not None]
+        setattr(existing, f'{name}_max', max(values) if values else None)
+    for name in _SUMMED:
+        setattr(existing, name, getattr(existing, name) + (row[name] or 0))
+    if row['first_started_at'] and (existing.first_started_at is None or row['first_started_at'] < existing.first_started_at):
+        existing.first_started_at = row['first_started_at']
+    if row['last_finished_at'] and (existing.last_finished_at is None or row['last_finished_at'] > existing.last_finished_at):
+        existing.last_finished_at = row['last_finished_at']
+
+
+def _rollup_window(start, end):
+    queryset = IngestRun.objects.filter(started_at__gte=start, started_at__lt=end)
+    with transaction.atomic():
+        rows = list(_hourly_rows(queryset))
+        if not rows:
+            return 0
+        existing = {
+            (summary.symbol, summary.hour): summary
+            for summary in IngestRunHourly.objects.select_for_update().filter(hour__gte=start, hour__lt=end)
+        }
+        created = []
+        updated = []
+        for row in rows:
+            summary = existing.get((row['symbol'], row['hour']))
+            if summary is None:
+                created.append(
+                    IngestRunHourly(
+                        symbol=row['symbol'],
+                        hour=row['hour'],
+                        first_started_at=row['first_started_at'],
+                        last_finished_at=row['last_finished_at'],
+                        **{name: row[name] or 0 for name in _SUMMED},
+                        **{f'{name}_{part}': row[f'{name}_{part}'] for name in _AVERAGED for part in ('avg', 'max')},
+                    )
+                )
+            else:
+                _merge(summary, row)
+                updated.append(summary)
+        IngestRunHourly.objects.bulk_create(created)
+        if updated:
+            fields = [field.name for field in IngestRunHourly._meta.concrete_fields if field.name not in ('id', 'symbol', 'hour')]
+            IngestRunHourly.objects.bulk_update(updated, fields)
+        deleted, _ = queryset.delete()
+    return deleted
+
+
+def rollup_ingest_runs(now=None, retention_days=None):
+    """Fold runs older than the retention into hourly summaries.
+
+    Returns the number of ``IngestRun`` rows removed.
+    """
+    now = now or timezone.now()
+    retention_days = settings.JSLL_INGEST_RUN_RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = (now - timedelta(days=retention_days)).astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+    oldest = IngestRun.objects.filter(started_at__lt=cutoff).order_by('started_at').values_list('started_at', flat=True).first()
+    if oldest is None:
+        return 0
+    start = datetime.combine(oldest.astimezone(dt_timezone.utc).date(), time(), tzinfo=dt_timezone.utc)
+    removed = 0
+    while start < cutoff:
+        end = min(start + timedelta(days=1), cutoff)
+        removed += _rollup_window(start, end)
+        start = end
+    return removed
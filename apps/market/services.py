@@ -2,9 +2,12 @@ from datetime import timedelta
 
 from django.utils import timezone
 
+from apps.ops import metrics
+
 from .data_quality import DataQualityEngine
 from .models import IngestRun, Ohlc1m
 from .reconcile import reconcile_batches
+from .symbols import default_symbol
 
 
 def _fetch_with_optional_window(provider, start_ts=None, limit=None):
@@ -24,8 +27,13 @@ def _fetch_with_optional_window(provider, start_ts=None, limit=None):
     return provider.fetch_latest_1m()
 
 
-def ingest_1m_candles(provider):
-    last_candle = Ohlc1m.objects.order_by('-ts').first()
+def _provider_symbol(provider, symbol=None):
+    return symbol or getattr(provider, 'symbol', None) or default_symbol()
+
+
+def ingest_1m_candles(provider, symbol=None):
+    symbol = _provider_symbol(provider, symbol)
+    last_candle = Ohlc1m.objects.filter(symbol=symbol).order_by('-ts').first()
     db_latest_ts = last_candle.ts if last_candle else None
     start_ts = None
     limit = None
@@ -33,8 +41,10 @@ def ingest_1m_candles(provider):
         start_ts = db_latest_ts - timedelta(minutes=3)
         limit = 50
 
-    batch = _fetch_with_optional_window(provider, start_ts=start_ts, limit=limit)
+    with metrics.timer('market.ingest.fetch'):
+        batch = _fetch_with_optional_window(provider, start_ts=start_ts, limit=limit)
     fetched_count = len(batch)
+    metrics.count('market.candles_fetched', fetched_count)
     fetched_end_ts = max((item['ts'] for item in batch), default=None)
 
     provider_delay_sec = None
@@ -68,14 +78,15 @@ def ingest_1m_candles(provider):
     if not filtered:
         return summary
 
-    engine = DataQualityEngine()
-    cleaned, _stats = engine.clean_batch(last_candle, filtered)
+    with metrics.timer('market.ingest.clean'):
+        cleaned, _stats = DataQualityEngine().clean_batch(last_candle, filtered)
 
     if not cleaned:
         return summary
 
     objects = [
         Ohlc1m(
+            symbol=symbol,
             ts=item['ts'],
             open=item['open'],
             high=item['high'],
@@ -87,46 +98,69 @@ def ingest_1m_candles(provider):
         for item in cleaned
     ]
 
-    Ohlc1m.objects.bulk_create(objects, ignore_conflicts=True)
+    with metrics.timer('market.ingest.write'):
+        Ohlc1m.objects.bulk_create(objects, ignore_conflicts=True)
+    metrics.count('market.candles_saved', len(objects))
     summary['saved'] = len(objects)
     summary['new_ts_count'] = len(objects)
     return summary
 
 
-def ingest_1m_candles_multi(primary_provider, fallback_provider):
+def ingest_1m_candles_multi(primary_provider, fallback_provider, symbol=None):
+    symbol = _provider_symbol(primary_provider, symbol)
     run = IngestRun.objects.create(
+        symbol=symbol,
         provider_primary=primary_provider.__class__.__name__,
         provider_fallback=fallback_provider.__class__.__name__,
     )
+    with metrics.collect() as timings:
+        meta = _ingest_multi(run, primary_provider, fallback_provider, symbol)
+    run.primary_latency_ms = _latency_ms(timings, 'market.ingest.fetch_primary')
+    run.fallback_latency_ms = _latency_ms(timings, 'market.ingest.fetch_fallback')
+    run.timings_json = timings.summary()
+    run.finished_at = timezone.now()
+    run.save()
+    return run, meta
 
+
+def _latency_ms(timings, stage):
+    seconds = timings.stages.get(stage)
+    return None if seconds is None else round(seconds * 1000)
+
+
+def _ingest_multi(run, primary_provider, fallback_provider, symbol):
     primary_batch = []
     fallback_batch = []
     notes = []
 
     try:
-        primary_batch = primary_provider.fetch_latest_1m()
+        with metrics.timer('market.ingest.fetch_primary'):
+            primary_batch = primary_provider.fetch_latest_1m()
         run.primary_ok = True
         run.candles_fetched_primary = len(primary_batch)
     except Exception as exc:
         notes.append(f"primary failed: {exc}")
 
     try:
-        fallback_batch = fallback_provider.fetch_latest_1m()
+        with metrics.timer('market.ingest.fetch_fallback'):
+            fallback_batch = fallback_provider.fetch_latest_1m()
         run.fallback_ok = True
         run.candles_fetched_fallback = len(fallback_batch)
     except Exception as exc:
         notes.append(f"fallback failed: {exc}")
+    metrics.count('market.candles_fetched', len(primary_batch) + len(fallback_batch))
 
-    merged = reconcile_batches(primary_batch, fallback_batch)
-    last_candle = Ohlc1m.objects.order_by('-ts').first()
+    with metrics.timer('market.ingest.reconcile'):
+        merged = reconcile_batches(primary_batch, fallback_batch)
+    last_candle = Ohlc1m.objects.filter(symbol=symbol).order_by('-ts').first()
     db_latest_ts = last_candle.ts if last_candle else None
 
     fetched_end_ts = max((item['ts'] for item in merged), default=None)
     provider_delay_sec = None
     if fetched_end_ts:
         provider_delay_sec = int((timezone.now() - fetched_end_ts).total_seconds())
-        notes.append(f"provider_delay_sec={provider_delay_sec}")
-        notes.append(f"fetched_end_ts={fetched_end_ts.isoformat()}")
+    run.fetched_end_ts = fetched_end_ts
+    run.provider_delay_sec = provider_delay_sec
     if db_latest_ts:
         notes.append(f"db_latest_ts={db_latest_ts.isoformat()}")
 
@@ -139,21 +173,20 @@ def ingest_1m_candles_multi(primary_provider, fallback_provider):
 
     if fetched_end_ts and db_latest_ts and fetched_end_ts <= db_latest_ts:
         meta['no_new_candles'] = True
-        notes.append('no_new_candles')
+        run.no_new_candles = True
         run.candles_saved = 0
         run.missing_filled = 0
         run.outliers_rejected = 0
         run.notes = '; '.join(notes)
-        run.finished_at = timezone.now()
-        run.save()
-        return run, meta
+        return meta
 
-    engine = DataQualityEngine()
-    cleaned, stats = engine.clean_batch(last_candle, merged)
+    with metrics.timer('market.ingest.clean'):
+        cleaned, stats = DataQualityEngine().clean_batch(last_candle, merged)
 
     if cleaned:
         objects = [
             Ohlc1m(
+                symbol=symbol,
                 ts=item['ts'],
                 open=item['open'],
                 high=item['high'],
@@ -164,12 +197,12 @@ def ingest_1m_candles_multi(primary_provider, fallback_provider):
             )
             for item in cleaned
         ]
-        Ohlc1m.objects.bulk_create(objects, ignore_conflicts=True)
+        with metrics.timer('market.ingest.write'):
+            Ohlc1m.objects.bulk_create(objects, ignore_conflicts=True)
         run.candles_saved = len(objects)
+        metrics.count('market.candles_saved', len(objects))
 
     run.missing_filled = stats.get('missing_filled', 0)
     run.outliers_rejected = stats.get('outliers_rejected', 0)
     run.notes = '; '.join(notes)
-    run.finished_at = timezone.now()
-    run.save()
-    return run, meta
+    return meta
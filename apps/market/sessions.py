@@ -0,0 +1,33 @@
+"""Vectorized trading-session calendar for minute frames.
+
+A session is a calendar day in ``JSLL_MARKET_TZ``, numbered as days since
+1970-01-01 in an int32 array, so grouping, "next session" lookups and fold
+splits work on plain integers instead of an object array of ``date``\\ s.
+Trading days are the sessions present in the frame: weekends and exchange
+holidays never have candles, so the next session after a Friday is the
+Monday (or whichever day trades next).
+"""
+import numpy as np
+from django.conf import settings
+
+
+def session_ordinals(index, tz=None):
+    """int32 session ordinal of each timestamp in a tz-aware ``DatetimeIndex``."""
+    local = index.tz_convert(tz or settings.JSLL_MARKET_TZ).tz_localize(None)
+    return local.to_numpy().astype('datetime64[D]').astype(np.int32)
+
+
+def session_bounds(sessions):
+    """Sessions present in a sorted ordinal array and the rows each one covers.
+
+    Returns ``(days, starts, ends)``: the distinct ordinals in order and, for
+    each, the ``[start, end)`` positions of its rows.
+    """
+    sessions = np.asarray(sessions)
+    if not len(sessions):
+        empty = np.empty(0, dtype=np.intp)
+        return sessions[:0], empty, empty
+    starts = np.flatnonzero(np.r_[True, sessions[1:] != sessions[:-1]])
+    ends = np.r_[starts[1:], len(sessions)]
+    return sessions[starts], starts, ends
+
@@ -0,0 +1,47 @@
+from django.conf import settings
+
+NSE_SUFFIXES = ('.NS', '.BO')
+
+
+def default_symbol():
+    return settings.JSLL_TICKER
+
+
+def to_nse_symbol(ticker):
+    """Exchange code used by NSE endpoints, e.g. ``JSLL.NS`` -> ``JSLL``."""
+    from .models import TrackedSymbol
+
+    tracked = TrackedSymbol.objects.filter(ticker=ticker).values_list('nse_symbol', flat=True).first()
+    if tracked:
+        return tracked
+    for suffix in NSE_SUFFIXES:
+        if ticker.upper().endswith(suffix):
+            return ticker[: -len(suffix)]
+    return ticker
+
+
+def to_ticker(symbol):
+    """Resolve a ticker or bare NSE code to the ticker stored on rows."""
+    from .models import TrackedSymbol
+
+    if not symbol:
+        return default_symbol()
+    if '.' in symbol:
+        return symbol
+    tracked = TrackedSymbol.objects.filter(nse_symbol=symbol).values_list('ticker', flat=True).first()
+    return tracked or f"{symbol}.NS"
+
+
+def active_symbols():
+    """Tickers the pipeline should process this tick.
+
+    Read from ``TrackedSymbol`` on every call so adding a symbol takes effect on
+    the next beat tick without restarting workers.  Falls back to
+    ``JSLL_SYMBOLS`` when nothing is registered yet.
+    """
+    from .models import TrackedSymbol
+
+    tickers = list(TrackedSymbol.objects.filter(active=True).order_by('ticker').values_list('ticker', flat=True))
+    if tickers:
+        return tickers
+    return list(settings.JSLL_SYMBOLS)
@@ -2,10 +2,13 @@ import logging
 from datetime import time
 from zoneinfo import ZoneInfo
 
-from celery import shared_task
+from celery import shared_task, signature
 from django.conf import settings
 from django.utils import timezone
 
+from apps.ops.locks import single_flight
+from apps.ops.profiling import profile_task
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,12 +22,46 @@ def is_market_open(current_time=None):
     return start <= now.time() <= end
 
 
+def dispatch_downstream(symbol, recompute_latest=False):
+    """Score, then predict, for a symbol that just received new candles.
+
+    With ``recompute_latest`` the latest candle is rescored even if it already
+    has a score (new events changed its inputs).  Both steps run in one task
+    over one loaded frame; it is addressed by name so this module does not
+    import the feature and prediction stacks.
+    """
+    return signature(
+        'apps.predictions.tasks.score_and_predict_symbol_task',
+        args=(symbol,),
+        kwargs={'recompute_latest': recompute_latest},
+    ).apply_async()
+
+
 @shared_task
+@single_flight(key='ingest_1m', ttl=55)
 def ingest_1m_task():
+    """Beat entry point: fan out one ``ingest_symbol_task`` per active symbol.
+
+    The watchlist is read on every tick, so adding a symbol needs neither a
+    new beat entry nor a worker restart; each symbol ingests concurrently.
+    """
     if not is_market_open():
         return {'skipped': True, 'reason': 'market_closed'}
 
-    logger.info('Ingest task started')
+    from celery import group
+
+    from apps.market.symbols import active_symbols
+
+    symbols = active_symbols()
+    group(ingest_symbol_task.s(symbol) for symbol in symbols).apply_async()
+    return {'dispatched': symbols}
+
+
+@shared_task
+@single_flight(key='ingest:{0}', ttl=120)
+@profile_task
+def ingest_symbol_task(symbol):
+    logger.info('Ingest task started symbol=%s', symbol)
     try:
         from apps.market.providers.yfinance_download_provider import (
             YFinanceDownloadProvider,
@@ -33,13 +70,14 @@ def ingest_1m_task():
         from apps.market.services import ingest_1m_candles_multi
         from apps.market.models import Ohlc1m
 
-        primary = YFinanceHistoryProvider()
-        fallback = YFinanceDownloadProvider()
-        run, meta = ingest_1m_candles_multi(primary, fallback)
-        latest = Ohlc1m.objects.order_by('-ts').first()
+        primary = YFinanceHistoryProvider(symbol)
+        fallback = YFinanceDownloadProvider(symbol)
+        run, meta = ingest_1m_candles_multi(primary, fallback, symbol=symbol)
+        latest = Ohlc1m.objects.filter(symbol=symbol).order_by('-ts').first()
         latest_ts = latest.ts if latest else None
         logger.info(
-            'Ingest summary primary_ok=%s fallback_ok=%s fetched_primary=%s fetched_fallback=%s saved=%s missing=%s outliers=%s latest_ts=%s fetched_end_ts=%s provider_delay_sec=%s no_new_candles=%s',
+            'Ingest summary symbol=%s primary_ok=%s fallback_ok=%s fetched_primary=%s fetched_fallback=%s saved=%s missing=%s outliers=%s latest_ts=%s fetched_end_ts=%s provider_delay_sec=%s no_new_candles=%s',
+            symbol,
             run.primary_ok,
             run.fallback_ok,
             run.candles_fetched_primary,
@@ -52,8 +90,48 @@ def ingest_1m_task():
             meta.get('provider_delay_sec'),
             meta.get('no_new_candles'),
         )
-        logger.info('Ingest task finished')
+        if run.candles_saved:
+            dispatch_downstream(symbol)
+        logger.info('Ingest task finished symbol=%s', symbol)
         return 'ok'
     except Exception as exc:
-        logger.exception('Ingest task failed: %s', exc)
+        logger.exception('Ingest task failed symbol=%s: %s', symbol, exc)
         return 'error'
+
+
+@shared_task
+@single_flight(key='maintain_partitions', ttl=6 * 3600)
+def maintain_partitions_task():
+    """Create upcoming partitions, roll up old ingest runs and archive sealed months.
+
+    Each step runs on its own, so a failure in one is logged and reported as
+    ``'error'`` without skipping the others.
+    """
+    from apps.market.archive import archive_sealed_months
+    from apps.market.partitioning import PARTITIONED_TABLES, ensure_partitions
+    from apps.market.rollup import rollup_ingest_runs
+
+    result = {}
+    try:
+        today = timezone.now().date()
+        for table in PARTITIONED_TABLES:
+            ensure_partitions(table, today, months_ahead=settings.JSLL_PARTITION_MONTHS_AHEAD)
+        result['partitions'] = 'ok'
+    except Exception as exc:
+        logger.exception('Partition creation failed: %s', exc)
+        result['partitions'] = 'error'
+
+    try:
+        result['rolled_up'] = rollup_ingest_runs()
+    except Exception as exc:
+        logger.exception('Ingest run rollup failed: %s', exc)
+        result['rolled_up'] = 'error'
+
+    try:
+        archived = archive_sealed_months()
+        logger.info('Partition maintenance archived=%s', [(t, m.isoformat(), r) for t, m, r in archived])
+        result['archived'] = len(archived)
+    except Exception as exc:
+        logger.exception('Month archiving failed: %s', exc)
+        result['archived'] = 'error'
+    return result
@@ -1,10 +1,16 @@
+import gzip
+import json
+import tempfile
+from io import StringIO
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
+from unittest import skipUnless
 from unittest.mock import patch
 
 from django.core.management import call_command
+from django.db import connection
 from django.db.utils import IntegrityError
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils import timezone
 from rest_framework.test import APITestCase
 
@@ -13,6 +19,14 @@ from apps.events.nse import parse_nse_datetime_to_utc
 from apps.events.services import fetch_announcements_nse
 from apps.events.taxonomy import classify_announcement
 from apps.events.utils import build_announcement_dedupe_key
+from apps.market.archive import (
+    archive_month,
+    archive_sealed_months,
+    iter_range_rows,
+    load_archived_rows,
+    load_ohlc_rows,
+    sealed_months,
+)
 from apps.market.data_quality import DataQualityEngine
 from apps.market.market_time import (
     compute_thresholds,
@@ -20,11 +34,24 @@ from apps.market.market_time import (
     is_within_today_session_end,
     market_state,
 )
-from apps.market.models import IngestRun, Ohlc1m
+from apps.market.models import ArchivedPartition, IngestRun, IngestRunHourly, Ohlc1m, TrackedSymbol
+from apps.market.partitioning import (
+    PARTITIONED_TABLES,
+    _create_month_partition,
+    convert_to_partitioned,
+    ensure_partitions,
+    is_partitioned,
+    missing_indexes,
+    model_index_statements,
+)
 from apps.market.providers.mock_provider import MockPriceProvider
+from apps.market.providers.synthetic_provider import SyntheticPriceProvider
 from apps.market.reconcile import reconcile_batches
+from apps.market.rollup import rollup_ingest_runs
 from apps.market.services import ingest_1m_candles, ingest_1m_candles_multi
-from apps.market.tasks import is_market_open
+from apps.market.sessions import session_bounds, session_ordinals
+from apps.market.symbols import active_symbols, to_nse_symbol, to_ticker
+from apps.market.tasks import ingest_symbol_task, is_market_open, maintain_partitions_task
 
 
 class DummyProvider:
@@ -63,6 +90,24 @@ class MarketTimeTests(TestCase):
         dt = datetime(2026, 2, 11, 15, 30, tzinfo=tz)
         self.assertTrue(is_within_today_session_end(dt))
 
+    def test_session_ordinals_follow_ist_days(self):
+        import pandas as pd
+
+        # IST midnight is 18:30 UTC; Friday 13th is followed by Monday 16th.
+        index = pd.DatetimeIndex(
+            ['2026-02-12 18:29', '2026-02-12 18:30', '2026-02-13 09:00', '2026-02-16 04:00'],
+            tz='UTC',
+        )
+        sessions = session_ordinals(index)
+        self.assertEqual(sessions.dtype.name, 'int32')
+        first = (datetime(2026, 2, 12).date() - datetime(1970, 1, 1).date()).days
+        self.assertEqual(sessions.tolist(), [first, first + 1, first + 1, first + 4])
+
+        days, starts, ends = session_bounds(sessions)
+        self.assertEqual(days.tolist(), [first, first + 1, first + 4])
+        self.assertEqual(starts.tolist(), [0, 1, 3])
+        self.assertEqual(ends.tolist(), [1, 3, 4])
+
 
 class TaxonomyTests(TestCase):
     def test_classify_dividend(self):
@@ -210,6 +255,34 @@ class AnnouncementTests(TestCase):
         self.assertEqual(second['saved_count'], 0)
         self.assertEqual(Announcement.objects.count(), 1)
 
+    @patch('apps.events.services.classify_announcement', wraps=classify_announcement)
+    @patch('apps.events.services.fetch_nse_announcements')
+    def test_fetch_announcements_bulk_upsert_skips_unchanged_rows(self, mock_fetch, mock_classify):
+        now = timezone.now()
+        items = [
+            {'headline': f'Outcome of Board Meeting {idx}', 'published_at': now, 'published_text': '', 'url': f'http://example.com/{idx}.pdf'}
+            for idx in range(5)
+        ]
+        mock_fetch.return_value = items
+        first = fetch_announcements_nse(symbol='JSLL')
+        self.assertEqual((first['saved_count'], first['updated_count']), (5, 0))
+        self.assertEqual(mock_classify.call_count, 5)
+
+        mock_classify.reset_mock()
+        # Symbol resolution, newest-row lookup and one prefetch; nothing is rewritten.
+        with self.assertNumQueries(4):
+            second = fetch_announcements_nse(symbol='JSLL')
+        self.assertEqual((second['saved_count'], second['updated_count'], second['skipped_duplicates']), (0, 5, 0))
+        mock_classify.assert_not_called()
+
+        # A re-cased headline keeps its dedupe key but is reclassified and rewritten.
+        mock_fetch.return_value = [dict(items[0], headline='OUTCOME OF BOARD MEETING 0')] + items[1:]
+        third = fetch_announcements_nse(symbol='JSLL')
+        self.assertEqual((third['saved_count'], third['updated_count']), (0, 5))
+        self.assertEqual(mock_classify.call_count, 1)
+        self.assertTrue(Announcement.objects.filter(headline='OUTCOME OF BOARD MEETING 0').exists())
+        self.assertEqual(Announcement.objects.count(), 5)
+
     def test_dedupe_prefers_results_over_other(self):
         base = timezone.now().replace(second=10, microsecond=0)
         url = 'http://example.com/doc.pdf'
@@ -305,6 +378,23 @@ class IngestionTests(TestCase):
         ingest_1m_candles(provider)
         self.assertEqual(Ohlc1m.objects.count(), first_count)
 
+    def test_symbols_keep_separate_series(self):
+        first = ingest_1m_candles(MockPriceProvider(), symbol='AAA.NS')
+        second = ingest_1m_candles(MockPriceProvider(), symbol='BBB.NS')
+        self.assertGreater(second['saved'], 0)
+        self.assertEqual(Ohlc1m.objects.filter(symbol='AAA.NS').count(), first['saved'])
+        self.assertEqual(Ohlc1m.objects.filter(symbol='BBB.NS').count(), second['saved'])
+
+        start = timezone.now() - timedelta(hours=1)
+        rows = load_ohlc_rows(start, timezone.now(), symbol='BBB.NS')
+        self.assertEqual(len(rows), second['saved'])
+
+    def test_ingest_multi_records_symbol_on_run(self):
+        run, _meta = ingest_1m_candles_multi(MockPriceProvider(), MockPriceProvider(), symbol='AAA.NS')
+        self.assertEqual(run.symbol, 'AAA.NS')
+        self.assertTrue(Ohlc1m.objects.filter(symbol='AAA.NS').exists())
+        self.assertFalse(Ohlc1m.objects.exclude(symbol='AAA.NS').exists())
+
     def test_outlier_detection(self):
         engine = DataQualityEngine(max_jump_pct=0.10)
         now = timezone.now().replace(second=0, microsecond=0)
@@ -391,6 +481,39 @@ class IngestionTests(TestCase):
         self.assertGreater(Ohlc1m.objects.count(), 0)
         self.assertTrue(run.primary_ok)
         self.assertIsNotNone(meta['fetched_end_ts'])
+        run.refresh_from_db()
+        self.assertIn('market.ingest.fetch_primary', run.timings_json['stages'])
+        self.assertIn('market.ingest.write', run.timings_json['stages'])
+        self.assertEqual(run.timings_json['rows']['market.candles_saved'], run.candles_saved)
+        self.assertEqual(run.fetched_end_ts, now + timedelta(minutes=1))
+        self.assertEqual(run.provider_delay_sec, meta['provider_delay_sec'])
+        self.assertFalse(run.no_new_candles)
+        self.assertIsNotNone(run.primary_latency_ms)
+        self.assertIsNotNone(run.fallback_latency_ms)
+        self.assertNotIn('provider_delay_sec', run.notes)
+
+        run, meta = ingest_1m_candles_multi(primary, fallback)
+        run.refresh_from_db()
+        self.assertTrue(run.no_new_candles)
+        response = self.client.get('/api/v1/jsll/quote/latest')
+        self.assertEqual(response.json()['delayed_reason'], 'no_new_candles')
+
+    def test_synthetic_provider_is_deterministic_session_data(self):
+        tz = ZoneInfo('Asia/Kolkata')
+        start = datetime(2026, 2, 13, 9, 0, tzinfo=tz)  # Friday
+        end = datetime(2026, 2, 16, 16, 0, tzinfo=tz)  # Monday
+        candles = list(SyntheticPriceProvider(start, end, seed=3).candles())
+
+        self.assertEqual(candles, list(SyntheticPriceProvider(start, end, seed=3).candles()))
+        self.assertNotEqual(candles, list(SyntheticPriceProvider(start, end, seed=4).candles()))
+        local = [candle['ts'].astimezone(tz) for candle in candles]
+        self.assertEqual({ts.date().isoformat() for ts in local}, {'2026-02-13', '2026-02-16'})
+        self.assertTrue(all(market_state(ts) == 'OPEN' for ts in local))
+        self.assertGreater(len(candles), 2 * 370)
+        self.assertTrue(all(c['low'] <= min(c['open'], c['close']) <= max(c['open'], c['close']) <= c['high'] for c in candles))
+
+        latest = SyntheticPriceProvider(start, end, seed=3).fetch_latest_1m(limit=3)
+        self.assertEqual(latest, candles[-3:])
 
     def test_ingest_early_exit_no_new_candles(self):
         now = timezone.now().replace(second=0, microsecond=0)
@@ -459,6 +582,51 @@ class IngestionTests(TestCase):
         self.assertTrue(is_market_open(now))
 
 
+class PipelineChainTests(TestCase):
+    @patch('apps.market.tasks.dispatch_downstream')
+    @patch('apps.market.services.ingest_1m_candles_multi')
+    def test_new_candles_trigger_scoring_chain(self, mock_ingest, mock_dispatch):
+        mock_ingest.return_value = (IngestRun(symbol='AAA.NS', candles_saved=3), {})
+        self.assertEqual(ingest_symbol_task('AAA.NS'), 'ok')
+        mock_dispatch.assert_called_once_with('AAA.NS')
+
+    @patch('apps.market.tasks.dispatch_downstream')
+    @patch('apps.market.services.ingest_1m_candles_multi')
+    def test_no_new_candles_skips_chain(self, mock_ingest, mock_dispatch):
+        mock_ingest.return_value = (IngestRun(symbol='AAA.NS', candles_saved=0), {'no_new_candles': True})
+        self.assertEqual(ingest_symbol_task('AAA.NS'), 'ok')
+        mock_dispatch.assert_not_called()
+
+
+class SymbolTests(TestCase):
+    @override_settings(JSLL_SYMBOLS=['JSLL.NS'])
+    def test_active_symbols_falls_back_to_settings(self):
+        self.assertEqual(active_symbols(), ['JSLL.NS'])
+
+    def test_active_symbols_reads_watchlist(self):
+        TrackedSymbol.objects.create(ticker='BBB.NS', nse_symbol='BBB')
+        TrackedSymbol.objects.create(ticker='AAA.NS', nse_symbol='AAA')
+        TrackedSymbol.objects.create(ticker='OFF.NS', nse_symbol='OFF', active=False)
+        self.assertEqual(active_symbols(), ['AAA.NS', 'BBB.NS'])
+
+    def test_symbol_conversions(self):
+        self.assertEqual(to_nse_symbol('JSLL.NS'), 'JSLL')
+        self.assertEqual(to_ticker('JSLL'), 'JSLL.NS')
+        self.assertEqual(to_ticker('JSLL.NS'), 'JSLL.NS')
+        TrackedSymbol.objects.create(ticker='M&M.NS', nse_symbol='M%26M')
+        self.assertEqual(to_nse_symbol('M&M.NS'), 'M%26M')
+
+    def test_track_symbol_command(self):
+        call_command('track_symbol', 'AAA.NS', stdout=StringIO())
+        tracked = TrackedSymbol.objects.get(ticker='AAA.NS')
+        self.assertEqual(tracked.nse_symbol, 'AAA')
+        self.assertTrue(tracked.active)
+
+        call_command('track_symbol', 'AAA.NS', '--deactivate', stdout=StringIO())
+        tracked.refresh_from_db()
+        self.assertFalse(tracked.active)
+
+
 class EventsApiTests(APITestCase):
     def test_news_endpoint(self):
         NewsItem.objects.create(
@@ -509,3 +677,184 @@ class EventsApiTests(APITestCase):
         self.assertEqual(self.client.get('/api/schema/').status_code, 200)
         self.assertEqual(self.client.get('/api/docs/').status_code, 200)
         self.assertEqual(self.client.get('/api/redoc/').status_code, 200)
+
+
+class RetentionTests(TestCase):
+    def _create_candle(self, ts, price=100.0):
+        return Ohlc1m.objects.create(
+            ts=ts,
+            open=price,
+            high=price,
+            low=price,
+            close=price,
+            volume=10.0,
+            source='test',
+        )
+
+    def test_archive_moves_sealed_months_and_reads_stay_transparent(self):
+        now = timezone.now().replace(second=0, microsecond=0)
+        old_ts = now - timedelta(days=500)
+        self._create_candle(old_ts, 90.0)
+        self._create_candle(old_ts + timedelta(minutes=1), 91.0)
+        self._create_candle(now, 100.0)
+
+        with tempfile.TemporaryDirectory() as tmp, override_settings(JSLL_ARCHIVE_DIR=tmp, JSLL_HOT_RETENTION_DAYS=400):
+            results = archive_sealed_months(now=now, tables=['market_ohlc1m'])
+            self.assertEqual(sum(rows for _table, _month, rows in results), 2)
+            self.assertEqual(Ohlc1m.objects.count(), 1)
+            self.assertEqual(ArchivedPartition.objects.count(), 1)
+
+            rows = load_ohlc_rows(old_ts - timedelta(minutes=1), now)
+            self.assertEqual([row['close'] for row in rows], [90.0, 91.0, 100.0])
+            self.assertEqual(rows[0]['ts'], old_ts)
+
+    def test_archiving_a_month_twice_keeps_earlier_rows(self):
+        now = timezone.now().replace(second=0, microsecond=0)
+        old_ts = now - timedelta(days=500)
+        month = old_ts.astimezone(ZoneInfo('UTC')).date().replace(day=1)
+        self._create_candle(old_ts, 90.0)
+        self._create_candle(old_ts + timedelta(minutes=1), 91.0)
+
+        with tempfile.TemporaryDirectory() as tmp, override_settings(JSLL_ARCHIVE_DIR=tmp, JSLL_HOT_RETENTION_DAYS=400):
+            self.assertEqual(archive_month('market_ohlc1m', month), 2)
+            # A late backfill lands in the month after it was archived.
+            self._create_candle(old_ts - timedelta(minutes=1), 89.0)
+            self.assertEqual(archive_month('market_ohlc1m', month), 1)
+
+            entry = ArchivedPartition.objects.get(table='market_ohlc1m', month=month)
+            self.assertEqual(entry.row_count, 3)
+            self.assertFalse(Ohlc1m.objects.exists())
+            rows = load_ohlc_rows(old_ts - timedelta(minutes=5), now)
+        self.assertEqual([row['close'] for row in rows], [89.0, 90.0, 91.0])
+
+    def test_feature_frame_reads_archived_months(self):
+        from apps.predictions.services import build_features_dataframe
+
+        now = timezone.now().replace(second=0, microsecond=0)
+        old_ts = now - timedelta(days=500)
+        for minute in range(3):
+            self._create_candle(old_ts + timedelta(minutes=minute), 90.0 + minute)
+
+        with tempfile.TemporaryDirectory() as tmp, override_settings(JSLL_ARCHIVE_DIR=tmp, JSLL_HOT_RETENTION_DAYS=400):
+            archive_sealed_months(now=now, tables=['market_ohlc1m'])
+            self.assertFalse(Ohlc1m.objects.exists())
+            df = build_features_dataframe(old_ts, old_ts + timedelta(minutes=2))
+        self.assertEqual(df['close'].tolist(), [90.0, 91.0, 92.0])
+
+    def test_legacy_feature_archives_fill_typed_columns(self):
+        month = datetime(2024, 3, 1).date()
+        ts = datetime(2024, 3, 5, 4, 0, tzinfo=ZoneInfo('UTC'))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = f'{tmp}/2024-03.jsonl.gz'
+            with gzip.open(path, 'wt', encoding='utf-8') as handle:
+                record = {'id': 1, 'symbol': 'JSLL.NS', 'ts': ts.isoformat(), 'feature_json': {'ret_1m': 0.5, 'rsi_14': 61.0}}
+                handle.write(json.dumps(record) + '\n')
+            ArchivedPartition.objects.create(table='features_feature1m', month=month, path=path, format='jsonl.gz', row_count=1)
+            rows = list(iter_range_rows('features_feature1m', ts, ts, ('ts', 'ret_1m', 'rsi_14', 'vol_z_20'), symbol='JSLL.NS'))
+        self.assertEqual(rows, [(ts, 0.5, 61.0, 0.0)])
+
+    def test_archived_json_columns_round_trip(self):
+        now = timezone.now().replace(second=0, microsecond=0)
+        old_ts = now - timedelta(days=500)
+        run = IngestRun.objects.create(
+            provider_primary='a',
+            provider_fallback='b',
+            timings_json={'ingest.fetch': {'count': 1, 'total_ms': 12.5}},
+        )
+        IngestRun.objects.filter(pk=run.pk).update(started_at=old_ts)
+
+        with tempfile.TemporaryDirectory() as tmp, override_settings(JSLL_ARCHIVE_DIR=tmp, JSLL_HOT_RETENTION_DAYS=400):
+            archive_sealed_months(now=now, tables=['market_ingestrun'])
+            self.assertFalse(IngestRun.objects.exists())
+            rows = load_archived_rows('market_ingestrun', old_ts, now, ('started_at', 'timings_json'))
+        self.assertEqual(rows, [{'started_at': old_ts, 'timings_json': {'ingest.fetch': {'count': 1, 'total_ms': 12.5}}}])
+
+    def test_recent_months_are_not_sealed(self):
+        now = timezone.now()
+        self._create_candle(now - timedelta(days=30))
+        with override_settings(JSLL_HOT_RETENTION_DAYS=400):
+            self.assertEqual(sealed_months('market_ohlc1m', now=now), [])
+
+    def _create_run(self, started_at, **fields):
+        run = IngestRun.objects.create(provider_primary='a', provider_fallback='b', **fields)
+        IngestRun.objects.filter(pk=run.pk).update(started_at=started_at, finished_at=started_at + timedelta(seconds=2))
+        return run
+
+    def test_rollup_compacts_old_runs_into_hourly_summaries(self):
+        now = datetime(2026, 3, 20, 12, 30, tzinfo=ZoneInfo('UTC'))
+        hour = datetime(2026, 3, 1, 9, 0, tzinfo=ZoneInfo('UTC'))
+        self._create_run(hour + timedelta(minutes=1), primary_ok=True, candles_saved=2, provider_delay_sec=60, primary_latency_ms=100)
+        self._create_run(hour + timedelta(minutes=2), primary_ok=True, candles_saved=1, provider_delay_sec=120, primary_latency_ms=300)
+        self._create_run(hour + timedelta(minutes=3), no_new_candles=True)
+        self._create_run(hour + timedelta(hours=1, minutes=5), symbol='AAA.NS', fallback_ok=True)
+        recent = self._create_run(now - timedelta(days=2), primary_ok=True)
+
+        with override_settings(JSLL_INGEST_RUN_RETENTION_DAYS=14):
+            self.assertEqual(rollup_ingest_runs(now=now), 4)
+        self.assertEqual(list(IngestRun.objects.values_list('pk', flat=True)), [recent.pk])
+
+        summary = IngestRunHourly.objects.get(symbol='JSLL.NS', hour=hour)
+        self.assertEqual((summary.runs, summary.primary_ok_runs, summary.no_new_candles_runs), (3, 2, 1))
+        self.assertEqual(summary.candles_saved, 3)
+        self.assertEqual((summary.provider_delay_sec_avg, summary.provider_delay_sec_max), (90.0, 120))
+        self.assertEqual((summary.primary_latency_ms_avg, summary.primary_latency_ms_max), (200.0, 300))
+        self.assertIsNone(summary.fallback_latency_ms_avg)
+        self.assertEqual(summary.first_started_at, hour + timedelta(minutes=1))
+        self.assertEqual(IngestRunHourly.objects.get(symbol='AAA.NS').fallback_ok_runs, 1)
+
+        # Late rows for an hour that is already summarised are merged in.
+        self._create_run(hour + timedelta(minutes=40), candles_saved=5, provider_delay_sec=150)
+        rollup_ingest_runs(now=now, retention_days=14)
+        summary.refresh_from_db()
+        self.assertEqual((summary.runs, summary.candles_saved, summary.provider_delay_sec_max), (4, 8, 150))
+
+    def test_month_partition_moves_rows_out_of_default(self):
+        class RecordingCursor:
+            def __init__(self, existing):
+                self.existing = existing
+                self.statements = []
+                self.result = None
+
+            def execute(self, sql, params=None):
+                self.statements.append(sql)
+                if sql.startswith('SELECT to_regclass'):
+                    self.result = (params[0] if params[0].strip('"') in self.existing else None,)
+
+            def fetchone(self):
+                return self.result
+
+        cursor = RecordingCursor({'market_ohlc1m_default'})
+        _create_month_partition(cursor, 'market_ohlc1m', datetime(2026, 5, 1).date())
+        moved = [sql for sql in cursor.statements if not sql.startswith('SELECT')]
+        self.assertTrue(moved[0].startswith('CREATE TABLE "market_ohlc1m_p202605" (LIKE'))
+        self.assertIn('DELETE FROM "market_ohlc1m_default"', moved[1])
+        self.assertIn('ATTACH PARTITION "market_ohlc1m_p202605"', moved[2])
+
+        cursor = RecordingCursor({'market_ohlc1m_p202605', 'market_ohlc1m_default'})
+        _create_month_partition(cursor, 'market_ohlc1m', datetime(2026, 5, 1).date())
+        self.assertEqual(len(cursor.statements), 1)
+
+    def test_partitioning_is_noop_on_sqlite(self):
+        self.assertIsNone(convert_to_partitioned('market_ohlc1m', timezone.now().date()))
+        self.assertEqual(ensure_partitions('market_ohlc1m', timezone.now().date()), [])
+        self.assertEqual(missing_indexes('market_ingestrun'), [])
+
+    def test_partitioned_tables_recreate_model_indexes(self):
+        self.assertIn('ingestrun_symbol_started_idx', model_index_statements('market_ingestrun'))
+        statements = model_index_statements('market_ohlc1m').values()
+        self.assertTrue(any('("ts")' in sql for sql in statements))
+
+    @skipUnless(connection.vendor == 'postgresql', 'range partitioning needs Postgres')
+    def test_converted_tables_keep_model_indexes(self):
+        for table in PARTITIONED_TABLES:
+            convert_to_partitioned(table, timezone.now().date())
+            self.assertTrue(is_partitioned(table))
+            self.assertEqual(missing_indexes(table), [])
+
+    @patch('apps.market.archive.archive_sealed_months', return_value=[])
+    @patch('apps.market.rollup.rollup_ingest_runs', return_value=3)
+    @patch('apps.market.partitioning.ensure_partitions', side_effect=RuntimeError('lock timeout'))
+    def test_maintenance_steps_fail_independently(self, mock_ensure, mock_rollup, mock_archive):
+        self.assertEqual(maintain_partitions_task(), {'partitions': 'error', 'rolled_up': 3, 'archived': 0})
+        mock_rollup.assert_called_once()
+        mock_archive.assert_called_once()
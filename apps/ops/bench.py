@@ -0,0 +1,346 @@
+"""Benchmark suite for the pipeline hot paths (``manage.py bench``).
+
+``fill_synthetic_market`` loads ``days`` of deterministic candles from
+``SyntheticPriceProvider`` plus announcements and news into the current
+database.  ``run_suite`` then times each stage at each size and records
+rows/sec and the tracemalloc peak.  The command runs the suite in a throwaway
+test database so the real tables are never touched.
+"""
+import gc
+import random
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, override_settings
+
+from apps.events.aggregates import refresh_announcement_aggregates, refresh_news_aggregates
+from apps.events.models import Announcement, NewsItem
+from apps.events.sentiment import score_sentiment
+from apps.events.taxonomy import classify_announcements, tag_news
+from apps.events.utils import build_announcement_dedupe_key
+from apps.features.compute import compute_features_for_ts
+from apps.features.services import compute_and_store
+from apps.market.data_quality import DataQualityEngine
+from apps.market.models import Ohlc1m
+from apps.market.providers.synthetic_provider import SyntheticPriceProvider
+from apps.market.reconcile import reconcile_batches
+from apps.market.symbols import to_nse_symbol
+from apps.predictions import services as predictions
+
+BENCH_SYMBOL = 'BENCH.NS'
+DEFAULT_DAYS = (1, 5, 30)
+MAX_DAYS = 730
+DEFAULT_SEED = 7
+# A Wednesday close (15:30 IST), so every size ends on a full session.
+DEFAULT_END = datetime(2025, 12, 31, 10, 0, tzinfo=dt_timezone.utc)
+
+_INSERT_BATCH_SIZE = 2000
+_SCORED_MINUTES = 60
+
+ANNOUNCEMENT_HEADLINES = (
+    'Outcome of Board Meeting - Financial Results for the quarter ended',
+    'Board Meeting Intimation for consideration of financial results',
+    'Unaudited Financial Results for the quarter',
+    'Declaration of interim dividend and record date',
+    'Closure of Trading Window',
+    'Allotment of equity shares under ESOP scheme',
+    'Intimation of credit rating reaffirmed',
+    'Press Release - order win from a leading customer',
+    'Disclosure under Regulation 30 - litigation update',
+    'Newspaper publication of notice',
+    'Investor presentation for analyst meet',
+    'Fund raising by way of qualified institutions placement',
+)
+NEWS_TITLES = (
+    'Shares rally after strong quarterly profit growth',
+    'Stock falls as margins weaken on input costs',
+    'Brokerage upgrades target on robust order book',
+    'Company faces probe over accounting lapses',
+    'Sector outlook stable as demand recovers',
+    'Promoter pledge concerns weigh on stock',
+    'Record revenue beats street estimates',
+    'Plant shutdown hits production volumes',
+)
+
+
+def fill_synthetic_market(days, symbol=BENCH_SYMBOL, seed=DEFAULT_SEED, end=DEFAULT_END,
+                          announcements_per_day=0.6, news_per_day=4):
+    """Insert ``days`` of synthetic candles, announcements and news ending at ``end``.
+
+    Returns the inserted counts and the candle list.
+    """
+    provider = SyntheticPriceProvider(end - timedelta(days=days), end, symbol=symbol, seed=seed)
+    candles = list(provider.candles())
+    Ohlc1m.objects.bulk_create(
+        [Ohlc1m(symbol=symbol, **candle) for candle in candles],
+        batch_size=_INSERT_BATCH_SIZE,
+    )
+
+    rng = random.Random(seed + 1)
+    session_days = sorted({candle['ts'].date() for candle in candles})
+    by_day = {}
+    for candle in candles:
+        by_day.setdefault(candle['ts'].date(), []).append(candle['ts'])
+
+    nse_symbol = to_nse_symbol(symbol)
+    planned = []
+    for day in session_days:
+        count = int(announcements_per_day) + (rng.random() < announcements_per_day % 1)
+        for _ in range(count):
+            planned.append((rng.choice(by_day[day]), rng.choice(ANNOUNCEMENT_HEADLINES)))
+    announcements = []
+    for index, ((published_at, headline), classification) in enumerate(
+        zip(planned, classify_announcements([headline for _, headline in planned]))
+    ):
+        url = f'https://bench.invalid/{symbol}/announcements/{index}'
+        announcements.append(
+            Announcement(
+                symbol=symbol,
+                published_at=published_at,
+                headline=headline,
+                url=url,
+                type=classification['type'],
+                polarity=classification['polarity'],
+                impact_score=classification['impact_score'],
+                low_priority=classification['low_priority'],
+                dedupe_key=build_announcement_dedupe_key(nse_symbol, headline, published_at, url, str(index)),
+                tags_json={'tags': classification['tags']},
+            )
+        )
+    Announcement.objects.bulk_create(announcements, batch_size=_INSERT_BATCH_SIZE)
+
+    news = []
+    for day in session_days:
+        for _ in range(news_per_day):
+            title = rng.choice(NEWS_TITLES)
+            news.append(
+                NewsItem(
+                    symbol=symbol,
+                    published_at=rng.choice(by_day[day]) - timedelta(minutes=rng.randint(0, 600)),
+                    source='bench',
+                    title=title,
+                    url=f'https://bench.invalid/news/{len(news)}',
+                    summary='',
+                    sentiment=score_sentiment(title),
+                    entities_json=tag_news(title),
+                )
+            )
+    NewsItem.objects.bulk_create(news, batch_size=_INSERT_BATCH_SIZE)
+
+    refresh_announcement_aggregates(symbol)
+    refresh_news_aggregates(symbol)
+    return {'candles': len(candles), 'announcements': len(announcements), 'news': len(news)}, candles
+
+
+def _stage_reconcile(context):
+    fallback = SyntheticPriceProvider(
+        context['start'], context['end'], symbol=context['symbol'], seed=context['seed'] + 1
+    )
+    reconcile_batches(context['candles'], list(fallback.candles()))
+    return len(context['candles'])
+
+
+def _stage_clean(context):
+    DataQualityEngine().clean_batch(None, context['candles'])
+    return len(context['candles'])
+
+
+def _stage_build_features(context):
+    context['df'] = predictions.build_features_dataframe(context['start'], context['end'], symbol=context['symbol'])
+    return len(context['df'])
+
+
+def _stage_build_labels(context):
+    context['labelled'] = predictions.build_labels(context['df'])
+    return len(context['labelled'])
+
+
+def _stage_train(context):
+    predictions.train_models(context['labelled'])
+    return len(context['labelled'])
+
+
+def _stage_predict(context):
+    predictions.invalidate_model_cache(context['symbol'])
+    predictions.generate_latest_predictions(force_retrain=True, symbol=context['symbol'])
+    return _rows_since(context, timedelta(days=180))
+
+
+def _stage_backtest(context):
+    predictions.run_backtest_and_store(symbol=context['symbol'])
+    return _rows_since(context, timedelta(days=240))
+
+
+def _stage_compute_features(context):
+    for candle in context['candles'][-_SCORED_MINUTES:]:
+        compute_features_for_ts(candle['ts'], symbol=context['symbol'])
+    return min(_SCORED_MINUTES, len(context['candles']))
+
+
+API_PATHS = (
+    'quote/latest',
+    'pipeline/status',
+    'ohlc/1m',
+    'events/summary',
+    'announcements',
+    'scores/latest',
+    'predictions/latest',
+)
+
+
+def _stage_api(context):
+    client = Client()
+    with override_settings(ALLOWED_HOSTS=['*']):
+        for path in API_PATHS:
+            client.get(f"/api/v1/symbols/{context['symbol']}/{path}")
+        client.get('/api/v1/jsll/news')
+    return len(API_PATHS) + 1
+
+
+def _rows_since(context, window):
+    since = context['candles'][-1]['ts'] - window
+    return sum(1 for candle in context['candles'] if candle['ts'] >= since)
+
+
+# Order matters: later stages reuse the dataframes built by earlier ones.
+STAGES = (
+    ('reconcile_batches', _stage_reconcile),
+    ('clean_batch', _stage_clean),
+    ('build_features_dataframe', _stage_build_features),
+    ('build_labels', _stage_build_labels),
+    ('train_models', _stage_train),
+    ('generate_latest_predictions', _stage_predict),
+    ('run_backtest_and_store', _stage_backtest),
+    ('compute_features_for_ts', _stage_compute_features),
+    ('api', _stage_api),
+)
+STAGE_NAMES = tuple(name for name, _ in STAGES)
+_PREREQUISITES = {
+    'build_labels': ('build_features_dataframe',),
+    'train_models': ('build_features_dataframe', 'build_labels'),
+}
+
+
+def _measure(func, context, repeat, trace_memory):
+    best = None
+    rows = 0
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        rows = func(context)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    peak_kb = None
+    if trace_memory:
+        # A separate traced pass, so tracemalloc overhead stays out of the timings.
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func(context)
+            peak_kb = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        finally:
+            tracemalloc.stop()
+    return rows, best, peak_kb
+
+
+def _result(stage, days, rows, seconds, peak_kb):
+    return {
+        'stage': stage,
+        'days': days,
+        'rows': rows,
+        'seconds': round(seconds, 6),
+        'rows_per_sec': round(rows / seconds, 1) if seconds else None,
+        'peak_kb': peak_kb,
+    }
+
+
+def _reset():
+    call_command('flush', interactive=False, verbosity=0)
+    predictions.invalidate_model_cache()
+
+
+def run_suite(days_list=DEFAULT_DAYS, stages=None, repeat=1, trace_memory=True, seed=DEFAULT_SEED,
+              symbol=BENCH_SYMBOL, end=DEFAULT_END, progress=None):
+    """Time ``stages`` (default: all) at each size in ``days_list``.
+
+    Each size starts from an empty database.  Returns a list of result dicts
+    with ``stage``, ``days``, ``rows``, ``seconds`` (best of ``repeat``),
+    ``rows_per_sec`` and ``peak_kb``.
+    """
+    selected = set(stages or STAGE_NAMES)
+    for stage in list(selected):
+        selected.update(_PREREQUISITES.get(stage, ()))
+    results = []
+    with override_settings(JSLL_METRICS_BACKEND='off', JSLL_LOCK_BACKEND='local'):
+        for days in days_list:
+            _reset()
+            started = time.perf_counter()
+            counts, candles = fill_synthetic_market(days, symbol=symbol, seed=seed, end=end)
+            results.append(_result('generate', days, sum(counts.values()), time.perf_counter() - started, None))
+            if progress:
+                progress(results[-1])
+            if not candles:
+                continue
+            context = {
+                'symbol': symbol,
+                'seed': seed,
+                'start': end - timedelta(days=days),
+                'end': end,
+                'candles': candles,
+            }
+            for name, func in STAGES:
+                if name not in selected:
+                    continue
+                if name == 'api':
+                    compute_and_store(candles[-1]['ts'], symbol=symbol)
+                rows, seconds, peak_kb = _measure(func, context, repeat, trace_memory)
+                results.append(_result(name, days, rows, seconds, peak_kb))
+                if progress:
+                    progress(results[-1])
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Pair ``results`` with ``baseline`` results by ``(stage, days)``.
+
+    Returns ``(stage, days, seconds, baseline_seconds, ratio, regressed)``
+    rows; ``regressed`` is true when ``ratio`` exceeds ``threshold``.
+    """
+    previous = {(item['stage'], item['days']): item for item in baseline}
+    rows = []
+    for item in results:
+        before = previous.get((item['stage'], item['days']))
+        if before is None or not before['seconds']:
+            continue
+        ratio = item['seconds'] / before['seconds']
+        rows.append((item['stage'], item['days'], item['seconds'], before['seconds'], ratio, ratio > threshold))
+    return rows
+
+
+@contextmanager
+def isolated_database(file_backed=False):
+    """Run the block against a freshly migrated test database.
+
+    ``file_backed`` keeps a SQLite test database in a temporary file rather
+    than in memory, so other threads (a live server) can open connections to it.
+    """
+    old_name = connection.settings_dict['NAME']
+    test_settings = connection.settings_dict['TEST']
+    old_test_name = test_settings.get('NAME')
+    tmpdir = None
+    if file_backed and connection.vendor == 'sqlite' and not old_test_name:
+        tmpdir = tempfile.TemporaryDirectory(prefix='jsll-')
+        test_settings['NAME'] = f'{tmpdir.name}/test.sqlite3'
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        if tmpdir is not None:
+            test_settings['NAME'] = old_test_name
+            tmpdir.cleanup()
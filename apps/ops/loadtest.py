@@ -0,0 +1,224 @@
+"""Load generator for the public API (``manage.py loadtest``).
+
+A seeded, weighted mix of ``/api/v1/`` paths is replayed by a pool of worker
+threads against a running server.  Each response contributes its latency and
+the ``X-DB-Query-Count`` header set by ``QueryCountMiddleware``; ``summarize``
+turns the samples into per-endpoint throughput, latency percentiles and
+queries per request, and ``check_slos`` compares them with the budgets in the
+config file.
+
+Without ``--url`` the command seeds a throwaway database with
+``fill_synthetic_market`` plus scores, predictions and run rows, and serves it
+from an in-process live server.
+"""
+import itertools
+import json
+import math
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from pathlib import Path
+
+from django.utils import timezone
+
+from apps.events.models import EventsFetchRun
+from apps.features.services import compute_and_store
+from apps.market.models import IngestRun
+from apps.market.symbols import default_symbol
+from apps.predictions import services as predictions
+
+from .bench import DEFAULT_SEED, fill_synthetic_market
+from .middleware import QUERY_COUNT_HEADER
+
+API_PREFIX = '/api/v1/'
+DEFAULT_MIX = {
+    'jsll/quote/latest': 4,
+    'jsll/pipeline/status': 2,
+    'jsll/ohlc/1m?limit=390': 2,
+    'jsll/scores/latest': 2,
+    'jsll/predictions/latest': 2,
+    'jsll/events/summary': 1,
+    'jsll/news': 1,
+    'jsll/announcements': 1,
+}
+SLO_KEYS = ('p50_ms', 'p99_ms', 'max_queries', 'max_error_rate')
+_SCORED_MINUTES = 30
+
+
+def load_config(path):
+    """``{'mix': {path: weight}, 'slo': {'default'|path: budgets}}`` from a JSON file."""
+    config = json.loads(Path(path).read_text())
+    mix = config.get('mix') or DEFAULT_MIX
+    if any(weight <= 0 for weight in mix.values()):
+        raise ValueError('mix weights must be positive')
+    slo = config.get('slo') or {}
+    for endpoint, budgets in slo.items():
+        unknown = set(budgets) - set(SLO_KEYS)
+        if unknown:
+            raise ValueError(f"unknown SLO keys for {endpoint}: {', '.join(sorted(unknown))}")
+    return {'mix': mix, 'slo': slo}
+
+
+def plan_requests(mix, total, seed=DEFAULT_SEED):
+    """``total`` endpoint keys drawn from ``mix`` by weight, the same for a given seed."""
+    endpoints = sorted(mix)
+    return random.Random(seed).choices(endpoints, weights=[mix[key] for key in endpoints], k=total)
+
+
+def run_load(base_url, plan, concurrency=8, duration=None, timeout=10.0):
+    """Send the planned requests from ``concurrency`` threads.
+
+    With ``duration`` the plan is cycled until that many seconds have passed.
+    Returns the samples ``(endpoint, status, latency_ms, queries)`` and the wall
+    time; ``status`` is ``None`` when the request failed outright.
+    """
+    import requests
+
+    base_url = base_url.rstrip('/')
+    source = itertools.cycle(plan) if duration else iter(plan)
+    source_lock = threading.Lock()
+    samples = []
+    started = time.perf_counter()
+    deadline = started + duration if duration else None
+
+    def next_endpoint():
+        if deadline is not None and time.perf_counter() >= deadline:
+            return None
+        with source_lock:
+            return next(source, None)
+
+    def worker():
+        session = requests.Session()
+        local = []
+        while True:
+            endpoint = next_endpoint()
+            if endpoint is None:
+                break
+            sent = time.perf_counter()
+            try:
+                response = session.get(f'{base_url}{API_PREFIX}{endpoint}', timeout=timeout)
+            except requests.RequestException:
+                local.append((endpoint, None, (time.perf_counter() - sent) * 1000, None))
+                continue
+            elapsed_ms = (time.perf_counter() - sent) * 1000
+            queries = response.headers.get(QUERY_COUNT_HEADER)
+            local.append((endpoint, response.status_code, elapsed_ms, int(queries) if queries is not None else None))
+        session.close()
+        with source_lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, concurrency))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values`` (sorted or not)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _stats(samples, wall_seconds):
+    latencies = [latency for _, _, latency, _ in samples]
+    errors = sum(1 for _, status, _, _ in samples if status is None or status >= 400)
+    queries = [count for _, _, _, count in samples if count is not None]
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'error_rate': round(errors / len(samples), 4),
+        'rps': round(len(samples) / wall_seconds, 1) if wall_seconds else None,
+        'mean_ms': round(sum(latencies) / len(latencies), 2),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p90_ms': round(percentile(latencies, 90), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'max_ms': round(max(latencies), 2),
+        'queries_mean': round(sum(queries) / len(queries), 2) if queries else None,
+        'queries_max': max(queries) if queries else None,
+    }
+
+
+def summarize(samples, wall_seconds):
+    """Per-endpoint and overall statistics for ``run_load`` samples."""
+    by_endpoint = {}
+    for sample in samples:
+        by_endpoint.setdefault(sample[0], []).append(sample)
+    return {
+        'endpoints': {endpoint: _stats(group, wall_seconds) for endpoint, group in sorted(by_endpoint.items())},
+        'total': _stats(samples, wall_seconds) if samples else None,
+    }
+
+
+def check_slos(endpoints, slo):
+    """Budget violations as ``(endpoint, key, observed, limit)`` tuples.
+
+    Each endpoint is held to ``slo['default']`` updated with its own entry.
+    Query budgets are skipped when the server sent no query-count header.
+    """
+    observed_key = {'p50_ms': 'p50_ms', 'p99_ms': 'p99_ms', 'max_queries': 'queries_max', 'max_error_rate': 'error_rate'}
+    violations = []
+    for endpoint, stats in endpoints.items():
+        budgets = {**slo.get('default', {}), **slo.get(endpoint, {})}
+        for key in SLO_KEYS:
+            limit = budgets.get(key)
+            observed = stats[observed_key[key]]
+            if limit is None or observed is None:
+                continue
+            if observed > limit:
+                violations.append((endpoint, key, observed, limit))
+    return violations
+
+
+def seed_database(days, seed=DEFAULT_SEED, symbol=None):
+    """Fill the current database with what the dashboard endpoints read."""
+    symbol = symbol or default_symbol()
+    counts, candles = fill_synthetic_market(days, symbol=symbol, seed=seed)
+    if not candles:
+        return counts
+    for candle in candles[-_SCORED_MINUTES:]:
+        compute_and_store(candle['ts'], symbol=symbol)
+    predictions.invalidate_model_cache(symbol)
+    predictions.generate_latest_predictions(force_retrain=True, symbol=symbol)
+
+    now = timezone.now()
+    IngestRun.objects.create(
+        symbol=symbol,
+        finished_at=now,
+        provider_primary='synthetic',
+        provider_fallback='synthetic',
+        primary_ok=True,
+        candles_fetched_primary=len(candles),
+        candles_saved=len(candles),
+    )
+    EventsFetchRun.objects.create(
+        finished_at=now + timedelta(seconds=1),
+        news_ok=True,
+        announcements_ok=True,
+        news_new=counts['news'],
+        announcements_fetched=counts['announcements'],
+    )
+    return counts
+
+
+@contextmanager
+def live_server(host='127.0.0.1'):
+    """Serve this project from a background thread; yields the base URL."""
+    from django.test.testcases import LiveServerThread
+
+    server = LiveServerThread(host, lambda handler: handler)
+    server.daemon = True
+    server.start()
+    server.is_ready.wait()
+    if server.error:
+        raise server.error
+    try:
+        yield f'http://{host}:{server.port}'
+    finally:
+        server.terminate()
@@ -0,0 +1,255 @@
+"""Single-flight leases for Celery tasks.
+
+``single_flight`` wraps a task body so only one copy runs per key across all
+workers.  A second caller either returns immediately (``SKIP``) or leaves a
+pending marker that makes the running copy execute exactly once more after it
+finishes (``COALESCE``), so bursts of triggers collapse into one follow-up run.
+The marker carries the ``sticky`` flags the coalesced calls asked for.
+
+Leases expire after ``ttl`` seconds so a killed worker cannot wedge a task.
+If the lock store is unreachable the task runs unguarded (fail open): a
+duplicate run is cheaper than a missed ingest.
+"""
+import functools
+import logging
+import threading
+import time
+import uuid
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+SKIP = 'skip'
+COALESCE = 'coalesce'
+
+_KEY_PREFIX = 'jsll:singleflight:'
+_COUNTERS_KEY = f'{_KEY_PREFIX}counters'
+
+# Compare-and-delete so a worker whose lease expired cannot release the lease
+# another worker has since acquired.
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+_EXTEND_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class RedisLockBackend:
+    def __init__(self, url):
+        import redis
+
+        self.client = redis.Redis.from_url(url, socket_timeout=1.0, socket_connect_timeout=1.0)
+
+    def acquire(self, key, token, ttl):
+        return bool(self.client.set(key, token, nx=True, px=int(ttl * 1000)))
+
+    def extend(self, key, token, ttl):
+        return bool(self.client.eval(_EXTEND_SCRIPT, 1, key, token, int(ttl * 1000)))
+
+    def release(self, key, token):
+        self.client.eval(_RELEASE_SCRIPT, 1, key, token)
+
+    def mark_pending(self, key, ttl, flags=()):
+        pending = f'{key}:pending'
+        pipe = self.client.pipeline()
+        pipe.hset(pending, mapping={'': 1, **{flag: 1 for flag in flags}})
+        pipe.pexpire(pending, int(ttl * 1000))
+        pipe.execute()
+
+    def pop_pending(self, key):
+        pending = f'{key}:pending'
+        pipe = self.client.pipeline()
+        pipe.hkeys(pending)
+        pipe.delete(pending)
+        fields, _deleted = pipe.execute()
+        if not fields:
+            return None
+        return {field.decode() for field in fields} - {''}
+
+    def incr(self, name):
+        self.client.hincrby(_COUNTERS_KEY, name, 1)
+
+    def counters(self):
+        return {name.decode(): int(value) for name, value in self.client.hgetall(_COUNTERS_KEY).items()}
+
+    def reset(self):
+        self.client.delete(_COUNTERS_KEY)
+
+
+class LocalLockBackend:
+    """In-process backend for tests and single-worker development."""
+
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self._leases = {}
+        self._pending = {}
+        self._counters = {}
+
+    def _live(self, table, key):
+        entry = table.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            table.pop(key, None)
+            return None
+        return value
+
+    def acquire(self, key, token, ttl):
+        with self._mutex:
+            if self._live(self._leases, key) is not None:
+                return False
+            self._leases[key] = (token, time.monotonic() + ttl)
+            return True
+
+    def extend(self, key, token, ttl):
+        with self._mutex:
+            if self._live(self._leases, key) != token:
+                return False
+            self._leases[key] = (token, time.monotonic() + ttl)
+            return True
+
+    def release(self, key, token):
+        with self._mutex:
+            if self._live(self._leases, key) == token:
+                self._leases.pop(key, None)
+
+    def mark_pending(self, key, ttl, flags=()):
+        with self._mutex:
+            current = self._live(self._pending, key) or set()
+            self._pending[key] = (current | set(flags), time.monotonic() + ttl)
+
+    def pop_pending(self, key):
+        with self._mutex:
+            flags = self._live(self._pending, key)
+            self._pending.pop(key, None)
+            return flags
+
+    def incr(self, name):
+        with self._mutex:
+            self._counters[name] = self._counters.get(name, 0) + 1
+
+    def counters(self):
+        with self._mutex:
+            return dict(self._counters)
+
+    def reset(self):
+        with self._mutex:
+            self._leases.clear()
+            self._pending.clear()
+            self._counters.clear()
+
+
+_backends = {}
+
+
+def get_backend():
+    name = settings.JSLL_LOCK_BACKEND
+    if name == 'local':
+        key = ('local',)
+    else:
+        key = ('redis', settings.JSLL_LOCK_REDIS_URL)
+    backend = _backends.get(key)
+    if backend is None:
+        backend = LocalLockBackend() if name == 'local' else RedisLockBackend(settings.JSLL_LOCK_REDIS_URL)
+        _backends[key] = backend
+    return backend
+
+
+def single_flight_counters():
+    """Counts of ``<task>:acquired|skipped|coalesced|reran`` across workers."""
+    try:
+        return get_backend().counters()
+    except Exception as exc:
+        logger.warning('single-flight counters unavailable: %s', exc)
+        return {}
+
+
+def _default_key(func, args, kwargs):
+    parts = [f'{func.__module__}.{func.__name__}']
+    parts.extend(str(arg) for arg in args)
+    parts.extend(f'{name}={kwargs[name]}' for name in sorted(kwargs))
+    return ':'.join(parts)
+
+
+def single_flight(key=None, ttl=300, policy=SKIP, sticky=()):
+    """Allow one concurrent run per key.
+
+    ``key`` is a format string over the call's arguments (``'ingest:{0}'``,
+    ``'events:{schedule_type}'``) or a callable taking ``(*args, **kwargs)``;
+    by default the function path plus its arguments.  ``ttl`` should exceed
+    the longest expected run.  Place it below ``@shared_task``.
+
+    A coalesced rerun repeats the running call's arguments.  ``sticky`` names
+    boolean keyword arguments that a coalesced call can turn on: the rerun
+    gets them as ``True`` if any call coalesced into it passed them truthy.
+    """
+    if policy not in (SKIP, COALESCE):
+        raise ValueError(f'unknown single-flight policy: {policy}')
+
+    def decorator(func):
+        name = func.__name__
+
+        def lock_key(args, kwargs):
+            if key is None:
+                return _KEY_PREFIX + _default_key(func, args, kwargs)
+            if callable(key):
+                return _KEY_PREFIX + key(*args, **kwargs)
+            return _KEY_PREFIX + key.format(*args, **kwargs)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            lock = lock_key(args, kwargs)
+            token = uuid.uuid4().hex
+            try:
+                backend = get_backend()
+                acquired = backend.acquire(lock, token, ttl)
+            except Exception as exc:
+                logger.warning('single-flight lock unavailable for %s, running unguarded: %s', lock, exc)
+                return func(*args, **kwargs)
+
+            if not acquired:
+                if policy == COALESCE:
+                    flags = [flag for flag in sticky if kwargs.get(flag)]
+                    _safe(backend.mark_pending, lock, ttl, flags)
+                    _safe(backend.incr, f'{name}:coalesced')
+                    logger.info('single-flight %s busy, coalesced', lock)
+                    return {'skipped': True, 'reason': 'coalesced'}
+                _safe(backend.incr, f'{name}:skipped')
+                logger.info('single-flight %s busy, skipped', lock)
+                return {'skipped': True, 'reason': 'already_running'}
+
+            _safe(backend.incr, f'{name}:acquired')
+            try:
+                result = func(*args, **kwargs)
+                while policy == COALESCE:
+                    flags = _safe(backend.pop_pending, lock)
+                    if flags is None:
+                        break
+                    _safe(backend.extend, lock, token, ttl)
+                    _safe(backend.incr, f'{name}:reran')
+                    result = func(*args, **{**kwargs, **{flag: True for flag in flags}})
+                return result
+            finally:
+                _safe(backend.release, lock, token)
+
+        wrapper.single_flight_policy = policy
+        return wrapper
+
+    return decorator
+
+
+def _safe(method, *args):
+    try:
+        return method(*args)
+    except Exception as exc:
+        logger.warning('single-flight backend error in %s: %s', method.__name__, exc)
+        return None
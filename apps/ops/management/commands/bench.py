@@ -0,0 +1,109 @@
+import json
+import platform
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from apps.ops.bench import (
+    DEFAULT_DAYS,
+    DEFAULT_SEED,
+    MAX_DAYS,
+    STAGE_NAMES,
+    compare,
+    isolated_database,
+    run_suite,
+)
+
+
+def _int_list(value):
+    return [int(item) for item in value.split(',') if item.strip()]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the pipeline hot paths on synthetic data in a throwaway database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=_int_list,
+            default=list(DEFAULT_DAYS),
+            help=f"Comma-separated history sizes in days (1-{MAX_DAYS}). Default: {','.join(map(str, DEFAULT_DAYS))}",
+        )
+        parser.add_argument('--stage', action='append', choices=STAGE_NAMES, help='Stage to run (repeatable). Default: all')
+        parser.add_argument('--repeat', type=int, default=1, help='Timed runs per stage; the best is kept. Default: 1')
+        parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help=f'Synthetic data seed. Default: {DEFAULT_SEED}')
+        parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc pass for peak memory.')
+        parser.add_argument('--output', help='Results file. Default: JSLL_BENCH_DIR/bench-<timestamp>.json')
+        parser.add_argument('--baseline', help='Earlier results file to compare against.')
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=1.25,
+            help='Slowdown ratio against the baseline reported as a regression. Default: 1.25',
+        )
+        parser.add_argument(
+            '--fail-on-regression',
+            action='store_true',
+            help='Exit with an error when any stage regresses past --threshold.',
+        )
+
+    def handle(self, *args, **options):
+        days_list = options['days']
+        if not days_list or any(days < 1 or days > MAX_DAYS for days in days_list):
+            raise CommandError(f'--days must be between 1 and {MAX_DAYS}')
+        baseline = None
+        if options.get('baseline'):
+            try:
+                baseline = json.loads(Path(options['baseline']).read_text())['results']
+            except (OSError, ValueError, KeyError) as exc:
+                raise CommandError(f'could not read baseline: {exc}')
+
+        def progress(item):
+            rate = f"{item['rows_per_sec']:.0f} rows/s" if item['rows_per_sec'] else '-'
+            peak = f"{item['peak_kb']:.0f}KB" if item['peak_kb'] is not None else '-'
+            self.stdout.write(
+                f"{item['days']:>4}d {item['stage']:<28} {item['seconds']:>9.3f}s {item['rows']:>8} rows {rate:>16} peak={peak}"
+            )
+
+        vendor = connection.vendor
+        with isolated_database():
+            results = run_suite(
+                days_list,
+                stages=options.get('stage'),
+                repeat=max(1, options['repeat']),
+                trace_memory=not options['no_memory'],
+                seed=options['seed'],
+                progress=progress,
+            )
+
+        started_at = timezone.now()
+        output = Path(options.get('output') or Path(settings.JSLL_BENCH_DIR) / f"bench-{timezone.localtime(started_at):%Y%m%d-%H%M%S}.json")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(
+            json.dumps(
+                {
+                    'created_at': started_at.isoformat(),
+                    'python': platform.python_version(),
+                    'database': vendor,
+                    'seed': options['seed'],
+                    'repeat': options['repeat'],
+                    'results': results,
+                },
+                indent=2,
+            )
+        )
+        self.stdout.write(f'Results written to {output}')
+
+        if baseline is None:
+            return
+        regressions = 0
+        self.stdout.write(f"Against {options['baseline']} (threshold {options['threshold']:.2f}x):")
+        for stage, days, seconds, before, ratio, regressed in compare(results, baseline, options['threshold']):
+            regressions += regressed
+            flag = '  REGRESSION' if regressed else ''
+            self.stdout.write(f"{days:>4}d {stage:<28} {before:>9.3f}s -> {seconds:>9.3f}s {ratio:>6.2f}x{flag}")
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f'{regressions} stage(s) regressed past {options["threshold"]:.2f}x')
@@ -0,0 +1,139 @@
+import json
+import platform
+from contextlib import nullcontext
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.utils import timezone
+
+from apps.ops.bench import DEFAULT_SEED, MAX_DAYS, isolated_database
+from apps.ops.loadtest import (
+    check_slos,
+    live_server,
+    load_config,
+    plan_requests,
+    run_load,
+    seed_database,
+    summarize,
+)
+
+
+class Command(BaseCommand):
+    help = 'Load-test the API endpoints and fail when a latency SLO or query budget is exceeded.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help='Base URL of a running server. Default: seed a throwaway database and serve it')
+        parser.add_argument('--days', type=int, default=30, help='Synthetic history to seed, in days. Default: 30')
+        parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help=f'Data and request-mix seed. Default: {DEFAULT_SEED}')
+        parser.add_argument('--requests', type=int, default=2000, help='Measured requests. Default: 2000')
+        parser.add_argument('--duration', type=float, help='Run for this many seconds instead of a request count.')
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients. Default: 8')
+        parser.add_argument('--warmup', type=int, default=50, help='Unmeasured requests sent first. Default: 50')
+        parser.add_argument('--timeout', type=float, default=10.0, help='Per-request timeout in seconds. Default: 10')
+        parser.add_argument('--config', help='Mix and SLO file. Default: JSLL_LOADTEST_CONFIG')
+        parser.add_argument('--p99-ms', type=float, help='Override the default p99 budget (ms).')
+        parser.add_argument('--max-queries', type=int, help='Override the default per-request query budget.')
+        parser.add_argument('--output', help='Results file. Default: JSLL_BENCH_DIR/loadtest-<timestamp>.json')
+
+    def handle(self, *args, **options):
+        if not options['url'] and not 1 <= options['days'] <= MAX_DAYS:
+            raise CommandError(f'--days must be between 1 and {MAX_DAYS}')
+        config_path = options.get('config') or settings.JSLL_LOADTEST_CONFIG
+        try:
+            config = load_config(config_path)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'could not read {config_path}: {exc}')
+        default_budget = config['slo'].setdefault('default', {})
+        if options.get('p99_ms') is not None:
+            default_budget['p99_ms'] = options['p99_ms']
+        if options.get('max_queries') is not None:
+            default_budget['max_queries'] = options['max_queries']
+
+        plan = plan_requests(config['mix'], options['requests'], seed=options['seed'])
+        warmup = plan_requests(config['mix'], options['warmup'], seed=options['seed'] + 1)
+
+        if options['url']:
+            target = options['url']
+            samples, wall = self._run(target, warmup, plan, options)
+        else:
+            overrides = override_settings(
+                ALLOWED_HOSTS=['*'],
+                JSLL_QUERY_COUNT_HEADER=True,
+                JSLL_METRICS_BACKEND='off',
+                JSLL_LOCK_BACKEND='local',
+            )
+            with isolated_database(file_backed=True), overrides:
+                counts = seed_database(options['days'], seed=options['seed'])
+                self.stdout.write(
+                    f"Seeded {options['days']}d: {counts['candles']} candles, "
+                    f"{counts['announcements']} announcements, {counts['news']} news"
+                )
+                with live_server() as target:
+                    samples, wall = self._run(target, warmup, plan, options)
+            target = 'live server'
+
+        if not samples:
+            raise CommandError('no requests were sent')
+        summary = summarize(samples, wall)
+        self._report(summary)
+
+        started_at = timezone.now()
+        output = Path(
+            options.get('output')
+            or Path(settings.JSLL_BENCH_DIR) / f"loadtest-{timezone.localtime(started_at):%Y%m%d-%H%M%S}.json"
+        )
+        output.parent.mkdir(parents=True, exist_ok=True)
+        violations = check_slos(summary['endpoints'], config['slo'])
+        output.write_text(
+            json.dumps(
+                {
+                    'created_at': started_at.isoformat(),
+                    'python': platform.python_version(),
+                    'target': target,
+                    'days': None if options['url'] else options['days'],
+                    'seed': options['seed'],
+                    'concurrency': options['concurrency'],
+                    'wall_seconds': round(wall, 3),
+                    **summary,
+                    'slo': config['slo'],
+                    'violations': [list(item) for item in violations],
+                },
+                indent=2,
+            )
+        )
+        self.stdout.write(f'Results written to {output}')
+
+        if all(stats['queries_max'] is None for stats in summary['endpoints'].values()):
+            self.stdout.write('No X-DB-Query-Count headers received; set JSLL_QUERY_COUNT_HEADER=true on the server.')
+        for endpoint, key, observed, limit in violations:
+            self.stdout.write(f'SLO {endpoint}: {key} {observed} > {limit}')
+        if violations:
+            raise CommandError(f'{len(violations)} SLO/query budget(s) exceeded')
+
+    def _run(self, target, warmup, plan, options):
+        if warmup:
+            run_load(target, warmup, concurrency=options['concurrency'], timeout=options['timeout'])
+        self.stdout.write(f"Load test against {target} with {options['concurrency']} clients")
+        return run_load(
+            target,
+            plan,
+            concurrency=options['concurrency'],
+            duration=options.get('duration'),
+            timeout=options['timeout'],
+        )
+
+    def _report(self, summary):
+        self.stdout.write(
+            f"{'endpoint':<28} {'reqs':>6} {'err':>4} {'rps':>7} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8} {'q/req':>6} {'q max':>5}"
+        )
+        rows = list(summary['endpoints'].items()) + [('total', summary['total'])]
+        for endpoint, stats in rows:
+            queries_mean = f"{stats['queries_mean']:.1f}" if stats['queries_mean'] is not None else '-'
+            queries_max = stats['queries_max'] if stats['queries_max'] is not None else '-'
+            self.stdout.write(
+                f"{endpoint:<28} {stats['requests']:>6} {stats['errors']:>4} {stats['rps']:>7.1f} "
+                f"{stats['p50_ms']:>7.1f}ms {stats['p90_ms']:>6.1f}ms {stats['p99_ms']:>6.1f}ms {stats['max_ms']:>6.1f}ms "
+                f"{queries_mean:>6} {queries_max:>5}"
+            )
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.ops.profiling import diff_summaries, load_summary
+
+
+def _change(delta, fmt):
+    before, after, change = delta['before'], delta['after'], delta['delta']
+    pct = f" ({change / before * 100:+.1f}%)" if before else ''
+    return f"{before:{fmt}} -> {after:{fmt}} ({change:+{fmt}}){pct}"
+
+
+class Command(BaseCommand):
+    help = 'Compare two profiles written by --profile or JSLL_PROFILE_TASKS.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('before', help='Baseline profile (.json or .prof; relative to JSLL_PROFILE_DIR).')
+        parser.add_argument('after', help='Profile to compare against the baseline.')
+        parser.add_argument('--top', type=int, default=20, help='Functions and stages to list. Default: 20')
+        parser.add_argument('--match', help='Only list functions whose key contains this text, e.g. train_models.')
+
+    def handle(self, *args, **options):
+        try:
+            before = load_summary(options['before'])
+            after = load_summary(options['after'])
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'could not read profile: {exc}')
+        diff = diff_summaries(before, after, top=options['top'], match=options.get('match'))
+
+        self.stdout.write(f"Profile diff: {before['name']} {before['started_at']} -> {after['name']} {after['started_at']}")
+        self.stdout.write(f"Wall seconds: {_change(diff['wall_seconds'], '.3f')}")
+        self.stdout.write(f"Queries: {_change(diff['queries'], 'd')}")
+        self.stdout.write(f"Query seconds: {_change(diff['query_seconds'], '.3f')}")
+        self.stdout.write(f"Peak memory KB: {_change(diff['peak_kb'], '.0f')}")
+        if diff['stages']:
+            self.stdout.write('Stages (seconds):')
+            for name, delta in diff['stages'].items():
+                self.stdout.write(f"  {name}: {_change(delta, '.3f')}")
+        self.stdout.write('Functions (cumulative seconds):')
+        for key, delta in diff['functions'].items():
+            calls_before, calls_after = delta['calls']
+            self.stdout.write(f"  {key}: {_change(delta, '.3f')} calls {calls_before} -> {calls_after}")
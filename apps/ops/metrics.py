@@ -0,0 +1,262 @@
+"""Stage timings and row counters for the pipeline services.
+
+``with timer('market.ingest.fetch'):`` records the block's wall time in the
+``jsll_stage_seconds`` histogram and ``count('market.candles_saved', n)`` adds
+to ``jsll_rows_total``.  Both also feed every enclosing ``collect()`` block,
+which is how run rows get their ``timings_json`` summary.
+
+``JSLL_METRICS_BACKEND`` selects where the process-wide series live: ``redis``
+aggregates across web and worker processes, ``local`` keeps them in this
+process, and ``off`` turns ``timer``/``count`` into no-ops outside a
+``collect()`` block.  Like the single-flight locks, an unreachable store never
+fails the caller; metrics are skipped for ``_RETRY_AFTER_SEC`` instead.
+"""
+import contextvars
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+STAGE_METRIC = 'jsll_stage_seconds'
+ROWS_METRIC = 'jsll_rows_total'
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+_KEY_PREFIX = 'jsll:metrics:'
+_STAGES_KEY = f'{_KEY_PREFIX}stages'
+_ROWS_KEY = f'{_KEY_PREFIX}rows'
+_RETRY_AFTER_SEC = 60
+
+_NULL_TIMER = nullcontext()
+_collector = contextvars.ContextVar('jsll_metrics_collector', default=None)
+
+
+def _bucket_index(seconds):
+    # Index of the first bucket whose upper bound holds ``seconds``;
+    # ``len(BUCKETS)`` is +Inf.
+    return bisect_left(BUCKETS, seconds)
+
+
+class RedisMetricsBackend:
+    def __init__(self, url):
+        import redis
+
+        self.client = redis.Redis.from_url(url, socket_timeout=1.0, socket_connect_timeout=1.0)
+
+    def observe(self, stage, seconds):
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hincrby(_STAGES_KEY, f'{stage}|{_bucket_index(seconds)}', 1)
+        pipe.hincrbyfloat(_STAGES_KEY, f'{stage}|sum', seconds)
+        pipe.hincrby(_STAGES_KEY, f'{stage}|count', 1)
+        pipe.execute()
+
+    def incr(self, name, amount):
+        self.client.hincrby(_ROWS_KEY, name, amount)
+
+    def snapshot(self):
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hgetall(_STAGES_KEY)
+        pipe.hgetall(_ROWS_KEY)
+        raw_stages, raw_rows = pipe.execute()
+        stages = {}
+        for field, value in raw_stages.items():
+            stage, _, part = field.decode().rpartition('|')
+            entry = stages.setdefault(stage, _empty_histogram())
+            if part == 'sum':
+                entry['sum'] = float(value)
+            elif part == 'count':
+                entry['count'] = int(value)
+            else:
+                entry['buckets'][int(part)] = int(value)
+        rows = {name.decode(): int(value) for name, value in raw_rows.items()}
+        return {'stages': stages, 'rows': rows}
+
+    def reset(self):
+        self.client.delete(_STAGES_KEY, _ROWS_KEY)
+
+
+class LocalMetricsBackend:
+    """In-process backend for tests and single-process development."""
+
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self._stages = {}
+        self._rows = {}
+
+    def observe(self, stage, seconds):
+        with self._mutex:
+            entry = self._stages.get(stage)
+            if entry is None:
+                entry = self._stages[stage] = _empty_histogram()
+            entry['buckets'][_bucket_index(seconds)] += 1
+            entry['sum'] += seconds
+            entry['count'] += 1
+
+    def incr(self, name, amount):
+        with self._mutex:
+            self._rows[name] = self._rows.get(name, 0) + amount
+
+    def snapshot(self):
+        with self._mutex:
+            stages = {
+                stage: {'buckets': list(entry['buckets']), 'sum': entry['sum'], 'count': entry['count']}
+                for stage, entry in self._stages.items()
+            }
+            return {'stages': stages, 'rows': dict(self._rows)}
+
+    def reset(self):
+        with self._mutex:
+            self._stages.clear()
+            self._rows.clear()
+
+
+def _empty_histogram():
+    return {'buckets': [0] * (len(BUCKETS) + 1), 'sum': 0.0, 'count': 0}
+
+
+_backends = {}
+_suspended_until = 0.0
+
+
+def enabled():
+    return settings.JSLL_METRICS_BACKEND != 'off'
+
+
+def get_backend():
+    name = settings.JSLL_METRICS_BACKEND
+    if name == 'local':
+        key = ('local',)
+    else:
+        key = ('redis', settings.JSLL_METRICS_REDIS_URL)
+    backend = _backends.get(key)
+    if backend is None:
+        backend = LocalMetricsBackend() if name == 'local' else RedisMetricsBackend(settings.JSLL_METRICS_REDIS_URL)
+        _backends[key] = backend
+    return backend
+
+
+def _record(method, *args):
+    global _suspended_until
+    if not enabled() or time.monotonic() < _suspended_until:
+        return
+    try:
+        getattr(get_backend(), method)(*args)
+    except Exception as exc:
+        _suspended_until = time.monotonic() + _RETRY_AFTER_SEC
+        logger.warning('metrics store unavailable, skipping metrics for %ss: %s', _RETRY_AFTER_SEC, exc)
+
+
+class Collector:
+    """Per-run totals gathered by ``collect()``."""
+
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.stages = {}
+        self.rows = {}
+
+    def summary(self):
+        return {
+            'stages': {stage: round(seconds, 4) for stage, seconds in sorted(self.stages.items())},
+            'rows': dict(sorted(self.rows.items())),
+        }
+
+
+@contextmanager
+def collect():
+    """Gather the stage times and row counts recorded inside the block."""
+    collector = Collector(parent=_collector.get())
+    token = _collector.set(collector)
+    try:
+        yield collector
+    finally:
+        _collector.reset(token)
+
+
+def observe(stage, seconds):
+    collector = _collector.get()
+    while collector is not None:
+        collector.stages[stage] = collector.stages.get(stage, 0.0) + seconds
+        collector = collector.parent
+    _record('observe', stage, seconds)
+
+
+def count(name, amount=1):
+    collector = _collector.get()
+    while collector is not None:
+        collector.rows[name] = collector.rows.get(name, 0) + amount
+        collector = collector.parent
+    _record('incr', name, int(amount))
+
+
+class _Timer:
+    __slots__ = ('stage', 'started')
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        observe(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+def timer(stage):
+    """Context manager timing a block as ``stage``."""
+    if _collector.get() is None and not enabled():
+        return _NULL_TIMER
+    return _Timer(stage)
+
+
+def snapshot():
+    try:
+        return get_backend().snapshot()
+    except Exception as exc:
+        logger.warning('metrics snapshot unavailable: %s', exc)
+        return {'stages': {}, 'rows': {}}
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_le(bound):
+    return '+Inf' if bound is None else repr(float(bound))
+
+
+def render_text(data, extra_counters=None):
+    """Render a ``snapshot()`` in the Prometheus text exposition format.
+
+    ``extra_counters`` maps ``metric_name -> {label_dict_items: value}`` for
+    counters kept elsewhere (the single-flight outcomes).
+    """
+    lines = [
+        f'# HELP {STAGE_METRIC} Wall time spent in pipeline stages.',
+        f'# TYPE {STAGE_METRIC} histogram',
+    ]
+    for stage, entry in sorted(data['stages'].items()):
+        label = f'stage="{_escape(stage)}"'
+        cumulative = 0
+        for bound, bucket_count in zip(BUCKETS + (None,), entry['buckets']):
+            cumulative += bucket_count
+            lines.append(f'{STAGE_METRIC}_bucket{{{label},le="{_format_le(bound)}"}} {cumulative}')
+        lines.append(f"{STAGE_METRIC}_sum{{{label}}} {entry['sum']!r}")
+        lines.append(f"{STAGE_METRIC}_count{{{label}}} {entry['count']}")
+
+    lines.append(f'# HELP {ROWS_METRIC} Rows processed by pipeline stages.')
+    lines.append(f'# TYPE {ROWS_METRIC} counter')
+    for name, value in sorted(data['rows'].items()):
+        lines.append(f'{ROWS_METRIC}{{name="{_escape(name)}"}} {value}')
+
+    for metric, series in sorted((extra_counters or {}).items()):
+        lines.append(f'# TYPE {metric} counter')
+        for labels, value in sorted(series.items()):
+            rendered = ','.join(f'{key}="{_escape(val)}"' for key, val in labels)
+            lines.append(f'{metric}{{{rendered}}} {value}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.db import connection
+
+QUERY_COUNT_HEADER = 'X-DB-Query-Count'
+QUERY_TIME_HEADER = 'X-DB-Query-Ms'
+
+
+class QueryCountMiddleware:
+    """Report the queries a request ran in response headers.
+
+    Enabled by ``JSLL_QUERY_COUNT_HEADER``, or by ``DEBUG`` when that is
+    ``None``; ``manage.py loadtest`` reads the
+    headers to check per-endpoint query budgets.  Queries run while a
+    streaming response is consumed happen after the headers are sent and are
+    not counted.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        enabled = settings.JSLL_QUERY_COUNT_HEADER
+        if not (settings.DEBUG if enabled is None else enabled):
+            return self.get_response(request)
+        totals = [0, 0.0]
+
+        def count(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                totals[0] += 1
+                totals[1] += time.perf_counter() - started
+
+        with connection.execute_wrapper(count):
+            response = self.get_response(request)
+        response[QUERY_COUNT_HEADER] = str(totals[0])
+        response[QUERY_TIME_HEADER] = f'{totals[1] * 1000:.2f}'
+        return response
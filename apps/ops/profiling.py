@@ -0,0 +1,254 @@
+"""Opt-in profiling for management commands and Celery tasks.
+
+``profile_run(name)`` wraps a run with cProfile, tracemalloc and a database
+execute wrapper, then writes two files to ``JSLL_PROFILE_DIR``:
+``<name>-<YYYYmmdd-HHMMSS>.prof``, the raw stats for ``pstats``/snakeviz, and
+a ``.json`` summary.  The summary holds wall time, the top functions by
+cumulative time, the peak and top allocations, query count and time, and the
+``apps.ops.metrics`` stage timings.  ``profile_diff`` compares two summaries.
+
+Commands opt in with ``--profile``.  Tasks wrapped in ``profile_task`` are
+profiled when their name (or ``all``) is listed in ``JSLL_PROFILE_TASKS``.
+Only the outermost run is profiled; a nested ``profile_run`` is a no-op.
+"""
+import cProfile
+import functools
+import json
+import logging
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+TOP_FUNCTIONS = 200
+TOP_ALLOCATIONS = 15
+TOP_QUERIES = 15
+
+_active = False
+
+
+class QueryRecorder:
+    """``connection.execute_wrapper`` that totals queries by statement."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.seconds += elapsed
+            entry = self.statements.setdefault(sql, [0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+
+    def summary(self):
+        slowest = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)[:TOP_QUERIES]
+        return {
+            'count': self.count,
+            'seconds': round(self.seconds, 6),
+            'top': [{'sql': sql[:500], 'calls': calls, 'seconds': round(seconds, 6)} for sql, (calls, seconds) in slowest],
+        }
+
+
+def _relative(filename):
+    try:
+        return str(Path(filename).resolve().relative_to(settings.BASE_DIR))
+    except ValueError:
+        return filename
+
+
+def _function_key(filename, name):
+    # Keyed by file and function rather than line so profiles taken before and
+    # after an edit still line up in ``profile_diff``.
+    return f'{_relative(filename)}:{name}'
+
+
+def function_stats(profiler):
+    stats = pstats.Stats(profiler)
+    functions = {}
+    for (filename, _line, name), (_cc, ncalls, tottime, cumtime, _callers) in stats.stats.items():
+        entry = functions.setdefault(_function_key(filename, name), {'calls': 0, 'tottime': 0.0, 'cumtime': 0.0})
+        entry['calls'] += ncalls
+        entry['tottime'] += tottime
+        entry['cumtime'] += cumtime
+    top = sorted(functions.items(), key=lambda item: item[1]['cumtime'], reverse=True)[:TOP_FUNCTIONS]
+    return {
+        key: {'calls': entry['calls'], 'tottime': round(entry['tottime'], 6), 'cumtime': round(entry['cumtime'], 6)}
+        for key, entry in top
+    }
+
+
+def allocation_stats(snapshot):
+    return [
+        {
+            'where': f'{_relative(stat.traceback[0].filename)}:{stat.traceback[0].lineno}',
+            'size_kb': round(stat.size / 1024, 1),
+            'count': stat.count,
+        }
+        for stat in snapshot.statistics('lineno')[:TOP_ALLOCATIONS]
+    ]
+
+
+class Profile:
+    def __init__(self, name):
+        self.name = name
+        self.started_at = timezone.now()
+        self.summary = None
+        self.path = None
+
+
+def _write(profile, profiler):
+    directory = Path(settings.JSLL_PROFILE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    stem = f"{profile.name}-{timezone.localtime(profile.started_at).strftime('%Y%m%d-%H%M%S')}"
+    suffix = 1
+    while (directory / f'{stem}.json').exists():
+        suffix += 1
+        stem = f"{stem.rsplit('~', 1)[0]}~{suffix}"
+    profiler.dump_stats(str(directory / f'{stem}.prof'))
+    profile.path = directory / f'{stem}.json'
+    profile.path.write_text(json.dumps(profile.summary, indent=2, sort_keys=True))
+
+
+@contextmanager
+def profile_run(name, enabled=True):
+    """Profile the block; yields a ``Profile`` (``summary``/``path`` set on exit) or ``None``."""
+    global _active
+    if not enabled or _active:
+        yield None
+        return
+
+    _active = True
+    profile = Profile(name)
+    recorder = QueryRecorder()
+    profiler = cProfile.Profile()
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    started = time.perf_counter()
+    try:
+        with metrics.collect() as timings, connection.execute_wrapper(recorder):
+            profiler.enable()
+            try:
+                yield profile
+            finally:
+                profiler.disable()
+    finally:
+        wall = time.perf_counter() - started
+        _current, peak = tracemalloc.get_traced_memory()
+        allocations = allocation_stats(tracemalloc.take_snapshot())
+        if started_tracing:
+            tracemalloc.stop()
+        _active = False
+        profile.summary = {
+            'name': name,
+            'started_at': profile.started_at.isoformat(),
+            'wall_seconds': round(wall, 6),
+            'queries': recorder.summary(),
+            'memory': {'peak_kb': round(peak / 1024, 1), 'top': allocations},
+            'stages': timings.summary(),
+            'functions': function_stats(profiler),
+        }
+        try:
+            _write(profile, profiler)
+        except OSError as exc:
+            logger.warning('could not write profile for %s: %s', name, exc)
+
+
+def add_profile_argument(parser):
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Write cProfile, memory and query statistics for this run to JSLL_PROFILE_DIR.',
+    )
+
+
+def report(stdout, profile):
+    if profile is None or profile.path is None:
+        return
+    summary = profile.summary
+    stdout.write(
+        f"Profile: {profile.path} (wall={summary['wall_seconds']:.3f}s, "
+        f"queries={summary['queries']['count']}, peak={summary['memory']['peak_kb']:.0f}KB)"
+    )
+
+
+def _task_enabled(name):
+    names = {item.strip() for item in settings.JSLL_PROFILE_TASKS.split(',') if item.strip()}
+    return 'all' in names or name in names
+
+
+def profile_task(func):
+    """Profile a task body when ``JSLL_PROFILE_TASKS`` names it.  Place it below ``single_flight``."""
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _task_enabled(name):
+            return func(*args, **kwargs)
+        with profile_run(name):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def load_summary(path):
+    path = Path(path)
+    if not path.exists() and not path.is_absolute():
+        path = Path(settings.JSLL_PROFILE_DIR) / path
+    if path.suffix == '.prof':
+        path = path.with_suffix('.json')
+    return json.loads(path.read_text())
+
+
+def _delta(before, after):
+    return {'before': before, 'after': after, 'delta': after - before}
+
+
+def diff_summaries(before, after, top=20, match=None):
+    """Totals, stage and function deltas between two profile summaries.
+
+    Functions and stages are sorted by the absolute change in (cumulative)
+    seconds; ``match`` keeps only function keys containing that substring.
+    """
+    stage_names = set(before['stages']['stages']) | set(after['stages']['stages'])
+    stages = {
+        name: _delta(before['stages']['stages'].get(name, 0.0), after['stages']['stages'].get(name, 0.0))
+        for name in stage_names
+    }
+    empty = {'calls': 0, 'tottime': 0.0, 'cumtime': 0.0}
+    functions = {}
+    for key in set(before['functions']) | set(after['functions']):
+        if match and match not in key:
+            continue
+        old = before['functions'].get(key, empty)
+        new = after['functions'].get(key, empty)
+        functions[key] = dict(_delta(old['cumtime'], new['cumtime']), calls=(old['calls'], new['calls']))
+
+    def largest(items):
+        return dict(sorted(items.items(), key=lambda item: abs(item[1]['delta']), reverse=True)[:top])
+
+    return {
+        'wall_seconds': _delta(before['wall_seconds'], after['wall_seconds']),
+        'queries': _delta(before['queries']['count'], after['queries']['count']),
+        'query_seconds': _delta(before['queries']['seconds'], after['queries']['seconds']),
+        'peak_kb': _delta(before['memory']['peak_kb'], after['memory']['peak_kb']),
+        'stages': largest(stages),
+        'functions': largest(functions),
+    }
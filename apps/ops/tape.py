@@ -0,0 +1,160 @@
+"""Record/replay of raw provider responses.
+
+Every network read in the price providers, the RSS fetcher and the NSE client
+goes through ``dataframe`` or ``http_get`` here.  ``JSLL_PROVIDER_TAPE_MODE``
+selects the behaviour:
+
+- unset: call through, nothing else happens;
+- ``record``: call through and save the raw payload (yfinance DataFrame as
+  CSV, Stooq CSV, RSS XML, NSE JSON) under ``JSLL_PROVIDER_TAPE_DIR``;
+- ``replay``: never touch the network; serve the recordings for the same
+  source and key in recorded order, cycling, after
+  ``JSLL_PROVIDER_TAPE_LATENCY_MS`` (+ up to ``..._JITTER_MS``) and failing a
+  seeded ``JSLL_PROVIDER_TAPE_FAILURE_RATE`` share of calls with
+  ``ConnectionError``.
+
+Parsing stays in the providers, so replayed runs exercise the same code as
+live ones.
+"""
+import hashlib
+import io
+import json
+import random
+import re
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+RECORD = 'record'
+REPLAY = 'replay'
+
+_RECORDED_HEADERS = ('ETag', 'Last-Modified', 'Content-Type')
+
+_lock = threading.Lock()
+_cursors = {}
+_rng = None
+
+
+class TapeMiss(LookupError):
+    """Replay found no recording for a source and key."""
+
+
+class TapeResponse:
+    """The parts of a ``requests.Response`` the providers read."""
+
+    def __init__(self, status_code, text, headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+    @property
+    def content(self):
+        return self.text.encode('utf-8')
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def mode():
+    return settings.JSLL_PROVIDER_TAPE_MODE
+
+
+def reset():
+    """Rewind replay cursors and the failure/latency RNG."""
+    global _rng
+    with _lock:
+        _cursors.clear()
+        _rng = None
+
+
+def _key_dir(source, key):
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', key).strip('_')[:60]
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:10]
+    return Path(settings.JSLL_PROVIDER_TAPE_DIR) / source / f'{slug}-{digest}'
+
+
+def _record(source, key, kind, body, **meta):
+    directory = _key_dir(source, key)
+    entry = {
+        'source': source,
+        'key': key,
+        'kind': kind,
+        'recorded_at': timezone.now().isoformat(),
+        'body': body,
+        **meta,
+    }
+    with _lock:
+        directory.mkdir(parents=True, exist_ok=True)
+        sequence = len(list(directory.glob('*.json')))
+        (directory / f'{sequence:06d}.json').write_text(json.dumps(entry))
+
+
+def _replay(source, key):
+    global _rng
+    directory = _key_dir(source, key)
+    paths = sorted(directory.glob('*.json'))
+    if not paths:
+        raise TapeMiss(f'no recording for {source} {key}')
+    with _lock:
+        if _rng is None:
+            _rng = random.Random(settings.JSLL_PROVIDER_TAPE_SEED)
+        index = _cursors.get(directory, 0)
+        _cursors[directory] = index + 1
+        delay_ms = settings.JSLL_PROVIDER_TAPE_LATENCY_MS + _rng.uniform(0, settings.JSLL_PROVIDER_TAPE_JITTER_MS)
+        failed = _rng.random() < settings.JSLL_PROVIDER_TAPE_FAILURE_RATE
+    if delay_ms > 0:
+        time.sleep(delay_ms / 1000)
+    if failed:
+        raise ConnectionError(f'injected failure for {source} {key}')
+    return json.loads(paths[index % len(paths)].read_text())
+
+
+def dataframe(source, key, fetch):
+    """``fetch()`` a pandas DataFrame through the tape."""
+    current = mode()
+    if not current:
+        return fetch()
+    if current == REPLAY:
+        import pandas as pd
+
+        entry = _replay(source, key)
+        if entry['body'] is None:
+            return None
+        levels = entry['column_levels']
+        frame = pd.read_csv(
+            io.StringIO(entry['body']),
+            header=list(range(levels)) if levels > 1 else 0,
+            index_col=0,
+        )
+        frame.index = pd.to_datetime(frame.index, utc=True)
+        return frame
+
+    frame = fetch()
+    if frame is None:
+        _record(source, key, 'dataframe', None, column_levels=1)
+    else:
+        _record(source, key, 'dataframe', frame.to_csv(), column_levels=frame.columns.nlevels)
+    return frame
+
+
+def http_get(source, key, get, *args, **kwargs):
+    """``get(*args, **kwargs)`` an HTTP response through the tape.
+
+    ``key`` identifies the request independently of volatile parameters
+    (dates, conditional-GET headers) so replays match across days.
+    """
+    current = mode()
+    if not current:
+        return get(*args, **kwargs)
+    if current == REPLAY:
+        entry = _replay(source, key)
+        return TapeResponse(entry['status_code'], entry['body'], entry['headers'])
+
+    response = get(*args, **kwargs)
+    if response is not None:
+        headers = {name: response.headers[name] for name in _RECORDED_HEADERS if name in response.headers}
+        _record(source, key, 'response', response.text, status_code=response.status_code, headers=headers)
+    return response
@@ -0,0 +1,455 @@
+import json
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import LiveServerTestCase, SimpleTestCase, TestCase, override_settings
+
+from apps.events.models import Announcement, EventMinuteAggregate
+from apps.market.models import Ohlc1m
+from apps.market.providers.synthetic_provider import SyntheticPriceProvider
+from apps.ops import bench, loadtest, metrics, profiling, tape
+from apps.ops.locks import COALESCE, LocalLockBackend, get_backend, single_flight, single_flight_counters
+
+
+@override_settings(JSLL_LOCK_BACKEND='local')
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        get_backend().reset()
+
+    def test_skip_policy_drops_overlapping_run(self):
+        calls = []
+
+        @single_flight(key='job:{0}', ttl=30)
+        def job(symbol):
+            calls.append(symbol)
+            if len(calls) == 1:
+                # A second worker picking up the same key mid-run.
+                self.assertEqual(job(symbol), {'skipped': True, 'reason': 'already_running'})
+                # Other keys are independent.
+                job('OTHER')
+            return 'ok'
+
+        self.assertEqual(job('AAA'), 'ok')
+        self.assertEqual(calls, ['AAA', 'OTHER'])
+        self.assertEqual(job('AAA'), 'ok')
+
+        counters = single_flight_counters()
+        self.assertEqual(counters['job:skipped'], 1)
+        self.assertEqual(counters['job:acquired'], 3)
+
+    def test_coalesce_policy_reruns_once_after_burst(self):
+        calls = []
+
+        @single_flight(key='score', ttl=30, policy=COALESCE)
+        def score():
+            calls.append(1)
+            if len(calls) == 1:
+                for _ in range(3):
+                    self.assertEqual(score(), {'skipped': True, 'reason': 'coalesced'})
+            return len(calls)
+
+        self.assertEqual(score(), 2)
+        counters = single_flight_counters()
+        self.assertEqual(counters['score:coalesced'], 3)
+        self.assertEqual(counters['score:reran'], 1)
+
+    def test_coalesced_sticky_flag_reaches_the_rerun(self):
+        calls = []
+
+        @single_flight(key='rescore', ttl=30, policy=COALESCE, sticky=('force',))
+        def rescore(symbol, force=False):
+            calls.append(force)
+            if len(calls) == 1:
+                rescore(symbol, force=True)
+                rescore(symbol, force=False)
+            return force
+
+        self.assertTrue(rescore('AAA', force=False))
+        self.assertEqual(calls, [False, True])
+
+    def test_lease_released_on_error(self):
+        @single_flight(key='boom', ttl=30)
+        def boom():
+            raise RuntimeError('fail')
+
+        with self.assertRaises(RuntimeError):
+            boom()
+        with self.assertRaises(RuntimeError):
+            boom()
+
+    def test_expired_lease_can_be_taken(self):
+        backend = LocalLockBackend()
+        self.assertTrue(backend.acquire('k', 'a', ttl=0))
+        self.assertTrue(backend.acquire('k', 'b', ttl=30))
+        backend.release('k', 'a')
+        self.assertFalse(backend.acquire('k', 'c', ttl=30))
+
+    def test_fails_open_when_backend_unavailable(self):
+        @single_flight(ttl=30)
+        def job():
+            return 'ran'
+
+        with patch('apps.ops.locks.get_backend', side_effect=ConnectionError('down')):
+            self.assertEqual(job(), 'ran')
+
+
+@override_settings(JSLL_METRICS_BACKEND='local', JSLL_LOCK_BACKEND='local')
+class MetricsTests(SimpleTestCase):
+    def setUp(self):
+        metrics.get_backend().reset()
+        get_backend().reset()
+
+    def test_timer_and_count_feed_backend_and_collectors(self):
+        with metrics.collect() as outer:
+            with metrics.collect() as inner:
+                with metrics.timer('stage.a'):
+                    pass
+                metrics.count('rows.a', 3)
+            metrics.observe('stage.a', 0.2)
+
+        self.assertEqual(inner.summary()['rows'], {'rows.a': 3})
+        self.assertEqual(set(outer.summary()['stages']), {'stage.a'})
+        self.assertGreaterEqual(outer.stages['stage.a'], 0.2)
+
+        data = metrics.snapshot()
+        self.assertEqual(data['stages']['stage.a']['count'], 2)
+        self.assertEqual(data['rows'], {'rows.a': 3})
+
+    def test_disabled_metrics_skip_backend_but_still_collect(self):
+        with override_settings(JSLL_METRICS_BACKEND='off'):
+            self.assertIs(metrics.timer('stage.off'), metrics._NULL_TIMER)
+            with metrics.collect() as run:
+                with metrics.timer('stage.off'):
+                    pass
+                metrics.count('rows.off')
+        self.assertIn('stage.off', run.stages)
+        self.assertEqual(run.rows, {'rows.off': 1})
+        self.assertEqual(metrics.snapshot(), {'stages': {}, 'rows': {}})
+
+    def test_unreachable_store_is_skipped_for_a_while(self):
+        class Broken:
+            def __init__(self):
+                self.calls = 0
+
+            def observe(self, stage, seconds):
+                self.calls += 1
+                raise ConnectionError('down')
+
+        broken = Broken()
+        with patch('apps.ops.metrics.get_backend', return_value=broken), patch.object(metrics, '_suspended_until', 0.0):
+            with self.assertLogs('apps.ops.metrics', level='WARNING'):
+                metrics.observe('stage.a', 0.1)
+            metrics.observe('stage.a', 0.1)
+        self.assertEqual(broken.calls, 1)
+
+    def test_render_text_is_cumulative(self):
+        metrics.observe('stage.a', 0.003)
+        metrics.observe('stage.a', 0.3)
+        metrics.observe('stage.a', 1000)
+        metrics.count('rows.a', 5)
+        text = metrics.render_text(metrics.snapshot())
+
+        self.assertIn('# TYPE jsll_stage_seconds histogram', text)
+        self.assertIn('jsll_stage_seconds_bucket{stage="stage.a",le="0.005"} 1', text)
+        self.assertIn('jsll_stage_seconds_bucket{stage="stage.a",le="0.5"} 2', text)
+        self.assertIn('jsll_stage_seconds_bucket{stage="stage.a",le="300.0"} 2', text)
+        self.assertIn('jsll_stage_seconds_bucket{stage="stage.a",le="+Inf"} 3', text)
+        self.assertIn('jsll_stage_seconds_count{stage="stage.a"} 3', text)
+        self.assertIn('jsll_rows_total{name="rows.a"} 5', text)
+
+    def test_metrics_endpoint(self):
+        @single_flight(key='job')
+        def job():
+            return 'ok'
+
+        job()
+        metrics.count('rows.a', 2)
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn('jsll_rows_total{name="rows.a"} 2', body)
+        self.assertIn('jsll_single_flight_total{task="job",outcome="acquired"} 1', body)
+
+        with override_settings(JSLL_METRICS_BACKEND='off'):
+            self.assertEqual(self.client.get('/metrics').status_code, 404)
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        override = override_settings(JSLL_PROFILE_DIR=tmp.name, JSLL_PROFILE_TASKS='')
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_command_profile_writes_artifacts(self):
+        out = StringIO()
+        call_command('compute_scores', '--profile', stdout=out)
+
+        self.assertIn('Profile:', out.getvalue())
+        [summary_path] = self.dir.glob('compute_scores-*.json')
+        self.assertTrue(summary_path.with_suffix('.prof').exists())
+        summary = json.loads(summary_path.read_text())
+        self.assertGreaterEqual(summary['queries']['count'], 1)
+        self.assertGreater(summary['memory']['peak_kb'], 0)
+        self.assertIn('apps/features/services.py:compute_latest_missing', summary['functions'])
+
+        call_command('compute_scores', stdout=StringIO())
+        self.assertEqual(len(list(self.dir.glob('*.json'))), 1)
+
+    def test_task_profiling_follows_setting(self):
+        @profiling.profile_task
+        def job_task():
+            return 'ok'
+
+        self.assertEqual(job_task(), 'ok')
+        self.assertEqual(list(self.dir.iterdir()), [])
+
+        with override_settings(JSLL_PROFILE_TASKS='other, job_task'):
+            self.assertEqual(job_task(), 'ok')
+        self.assertEqual([path.name.split('-')[0] for path in self.dir.glob('*.json')], ['job_task'])
+
+    def test_nested_runs_are_not_profiled(self):
+        with profiling.profile_run('outer') as outer:
+            with profiling.profile_run('inner') as inner:
+                pass
+        self.assertIsNotNone(outer)
+        self.assertIsNone(inner)
+        self.assertEqual([path.name.split('-')[0] for path in self.dir.glob('*.json')], ['outer'])
+
+    def test_profile_diff_reports_largest_changes(self):
+        def summary(train, build, queries):
+            return {
+                'name': 'prediction_run_once',
+                'started_at': '2026-01-01T00:00:00+00:00',
+                'wall_seconds': train + build,
+                'queries': {'count': queries, 'seconds': 0.1, 'top': []},
+                'memory': {'peak_kb': 1000.0, 'top': []},
+                'stages': {'stages': {'predictions.train': train}, 'rows': {}},
+                'functions': {
+                    'apps/predictions/services.py:train_models': {'calls': 1, 'tottime': 0.0, 'cumtime': train},
+                    'apps/predictions/services.py:build_features_dataframe': {
+                        'calls': 1, 'tottime': 0.0, 'cumtime': build,
+                    },
+                },
+            }
+
+        (self.dir / 'a.json').write_text(json.dumps(summary(1.0, 2.0, 10)))
+        (self.dir / 'b.json').write_text(json.dumps(summary(3.0, 2.1, 12)))
+        out = StringIO()
+        call_command('profile_diff', 'a.json', 'b.json', stdout=out)
+        lines = out.getvalue().splitlines()
+
+        self.assertIn('Queries: 10 -> 12 (+2) (+20.0%)', lines)
+        functions = lines[lines.index('Functions (cumulative seconds):') + 1:]
+        self.assertTrue(functions[0].strip().startswith('apps/predictions/services.py:train_models: 1.000 -> 3.000'))
+
+        out = StringIO()
+        call_command('profile_diff', 'a.json', 'b.json', '--match', 'build_features', stdout=out)
+        self.assertNotIn('train_models', out.getvalue())
+
+
+class BenchTests(TestCase):
+    def test_fill_synthetic_market(self):
+        counts, candles = bench.fill_synthetic_market(3)
+        provider = SyntheticPriceProvider(bench.DEFAULT_END - timedelta(days=3), bench.DEFAULT_END)
+
+        self.assertEqual(candles, list(provider.candles()))
+        self.assertEqual(Ohlc1m.objects.filter(symbol=bench.BENCH_SYMBOL).count(), counts['candles'])
+        self.assertEqual(Announcement.objects.filter(symbol=bench.BENCH_SYMBOL).count(), counts['announcements'])
+        self.assertGreater(counts['news'], 0)
+        self.assertTrue(EventMinuteAggregate.objects.filter(symbol=bench.BENCH_SYMBOL).exists())
+
+    def test_run_suite_times_selected_stages_with_prerequisites(self):
+        results = bench.run_suite([1], stages=['build_labels', 'clean_batch'], trace_memory=False)
+
+        self.assertEqual(
+            [item['stage'] for item in results],
+            ['generate', 'clean_batch', 'build_features_dataframe', 'build_labels'],
+        )
+        labels = results[-1]
+        self.assertGreater(labels['rows'], 0)
+        self.assertGreater(labels['rows_per_sec'], 0)
+        self.assertIsNone(labels['peak_kb'])
+
+    def test_compare_flags_regressions(self):
+        baseline = [
+            {'stage': 'train_models', 'days': 5, 'seconds': 1.0},
+            {'stage': 'clean_batch', 'days': 5, 'seconds': 0.1},
+        ]
+        results = [
+            {'stage': 'train_models', 'days': 5, 'seconds': 1.5},
+            {'stage': 'clean_batch', 'days': 5, 'seconds': 0.1},
+            {'stage': 'api', 'days': 5, 'seconds': 0.2},
+        ]
+        rows = bench.compare(results, baseline, threshold=1.25)
+        self.assertEqual([(stage, regressed) for stage, _, _, _, _, regressed in rows],
+                         [('train_models', True), ('clean_batch', False)])
+
+
+class LoadTestTests(TestCase):
+    def test_query_count_headers(self):
+        with override_settings(JSLL_QUERY_COUNT_HEADER=True):
+            response = self.client.get('/api/v1/jsll/news')
+        self.assertEqual(response['X-DB-Query-Count'], '1')
+        self.assertIn('X-DB-Query-Ms', response)
+
+        with override_settings(JSLL_QUERY_COUNT_HEADER=False):
+            response = self.client.get('/api/v1/jsll/news')
+        self.assertNotIn('X-DB-Query-Count', response)
+
+        # Unset follows DEBUG.
+        with override_settings(JSLL_QUERY_COUNT_HEADER=None, DEBUG=True):
+            self.assertIn('X-DB-Query-Count', self.client.get('/api/v1/jsll/news'))
+        with override_settings(JSLL_QUERY_COUNT_HEADER=None, DEBUG=False):
+            self.assertNotIn('X-DB-Query-Count', self.client.get('/api/v1/jsll/news'))
+
+    def test_plan_is_weighted_and_repeatable(self):
+        mix = {'jsll/quote/latest': 3, 'jsll/news': 1}
+        plan = loadtest.plan_requests(mix, 400, seed=3)
+
+        self.assertEqual(plan, loadtest.plan_requests(mix, 400, seed=3))
+        self.assertGreater(plan.count('jsll/quote/latest'), 2 * plan.count('jsll/news'))
+
+    def test_summary_and_slo_violations(self):
+        samples = [('jsll/news', 200, float(ms), 1) for ms in range(1, 101)]
+        samples += [('jsll/events/summary', 200, 20.0, 12), ('jsll/events/summary', 500, 30.0, 12)]
+        summary = loadtest.summarize(samples, wall_seconds=2.0)
+
+        news = summary['endpoints']['jsll/news']
+        self.assertEqual((news['p50_ms'], news['p99_ms'], news['max_ms']), (50.0, 99.0, 100.0))
+        self.assertEqual(news['rps'], 50.0)
+        self.assertEqual(summary['total']['requests'], 102)
+        self.assertEqual(summary['endpoints']['jsll/events/summary']['error_rate'], 0.5)
+
+        slo = {
+            'default': {'p99_ms': 95, 'max_queries': 2, 'max_error_rate': 0},
+            'jsll/events/summary': {'max_queries': 12},
+        }
+        self.assertEqual(
+            loadtest.check_slos(summary['endpoints'], slo),
+            [('jsll/events/summary', 'max_error_rate', 0.5, 0), ('jsll/news', 'p99_ms', 99.0, 95)],
+        )
+
+    def test_shipped_config_is_valid(self):
+        config = loadtest.load_config(Path(__file__).resolve().parents[2] / 'config' / 'loadtest.json')
+        self.assertEqual(set(config['mix']), set(loadtest.DEFAULT_MIX))
+        self.assertIn('default', config['slo'])
+
+
+@override_settings(JSLL_QUERY_COUNT_HEADER=True)
+class LoadTestLiveServerTests(LiveServerTestCase):
+    def test_run_load_records_latency_and_queries(self):
+        plan = loadtest.plan_requests({'jsll/news': 1, 'jsll/announcements': 1}, 6)
+        samples, wall = loadtest.run_load(self.live_server_url, plan, concurrency=1)
+
+        self.assertEqual(len(samples), 6)
+        self.assertTrue(all(status == 200 and queries == 1 for _, status, _, queries in samples))
+        self.assertGreater(wall, 0)
+
+
+_FEED = b"""<?xml version="1.0"?><rss version="2.0"><channel><title>Feed</title>
+<item><title>JSLL wins order</title><link>https://news.example.com/1</link>
+<pubDate>Mon, 09 Feb 2026 10:00:00 GMT</pubDate></item></channel></rss>"""
+
+
+class _HttpResponse:
+    def __init__(self, status_code, text, headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode('utf-8')
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class ProviderTapeTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        tape.reset()
+        self.addCleanup(tape.reset)
+
+    def _settings(self, mode, **extra):
+        return override_settings(JSLL_PROVIDER_TAPE_MODE=mode, JSLL_PROVIDER_TAPE_DIR=self.dir, **extra)
+
+    def _frame(self, multi_columns=False):
+        import pandas as pd
+
+        index = pd.date_range('2026-02-11 10:00', periods=3, freq='min', tz='Asia/Kolkata')
+        columns = ['Open', 'High', 'Low', 'Close', 'Volume']
+        frame = pd.DataFrame(
+            [[100.0, 101.0, 99.5, 100.5, 1200], [100.5, 101.5, 100.0, 101.0, 900], [101.0, 102.0, 100.5, 101.5, 700]],
+            index=index,
+            columns=columns,
+        )
+        if multi_columns:
+            frame.columns = pd.MultiIndex.from_product([columns, ['JSLL.NS']], names=['Price', 'Ticker'])
+        return frame
+
+    def test_yfinance_frames_replay_through_providers(self):
+        from apps.market.providers.yfinance_download_provider import YFinanceDownloadProvider
+        from apps.market.providers.yfinance_provider import YFinanceHistoryProvider
+
+        with self._settings(tape.RECORD):
+            with patch.object(YFinanceHistoryProvider, '_history', return_value=self._frame()):
+                history = YFinanceHistoryProvider('JSLL.NS').fetch_latest_1m()
+            with patch.object(YFinanceDownloadProvider, '_download', return_value=self._frame(multi_columns=True)):
+                download = YFinanceDownloadProvider('JSLL.NS').fetch_latest_1m()
+
+        offline = AssertionError('network used during replay')
+        with self._settings(tape.REPLAY), \
+                patch.object(YFinanceHistoryProvider, '_history', side_effect=offline), \
+                patch.object(YFinanceDownloadProvider, '_download', side_effect=offline):
+            self.assertEqual(YFinanceHistoryProvider('JSLL.NS').fetch_latest_1m(), history)
+            self.assertEqual(YFinanceDownloadProvider('JSLL.NS').fetch_latest_1m(), download)
+        self.assertEqual(len(history), 3)
+
+    def test_nse_and_rss_replay_without_network(self):
+        from apps.events.nse import fetch_nse_announcements
+        from apps.events.rss import fetch_feeds
+
+        rows = [{'desc': 'Outcome of Board Meeting', 'dt': '11-Feb-2026 10:15:00', 'attchmntFile': '', 'annId': '1'}]
+
+        class Client:
+            def get(self, url, params=None):
+                return _HttpResponse(200, json.dumps(rows))
+
+        urls = ['https://feeds.example.com/a']
+        with self._settings(tape.RECORD), patch('apps.events.rss.get_rss_urls', return_value=urls), \
+                patch('requests.get', return_value=_HttpResponse(200, _FEED.decode(), {'ETag': '"a1"'})):
+            announcements = fetch_nse_announcements('JSLL', client=Client())
+            items, _feeds = fetch_feeds()
+
+        class OfflineClient:
+            def get(self, url, params=None):
+                raise AssertionError('network used during replay')
+
+        with self._settings(tape.REPLAY), patch('apps.events.rss.get_rss_urls', return_value=urls), \
+                patch('requests.get', side_effect=AssertionError('network used during replay')):
+            self.assertEqual(fetch_nse_announcements('JSLL', client=OfflineClient()), announcements)
+            self.assertEqual([item['title'] for item in fetch_feeds()[0]], [item['title'] for item in items])
+            with self.assertRaises(tape.TapeMiss):
+                fetch_nse_announcements('OTHER', client=OfflineClient())
+        self.assertEqual(len(announcements), 1)
+
+    def test_replay_injects_latency_and_failures(self):
+        with self._settings(tape.RECORD):
+            tape.http_get('stooq', 'k', lambda url: _HttpResponse(200, 'ok'), 'https://example.com')
+
+        with self._settings(tape.REPLAY, JSLL_PROVIDER_TAPE_LATENCY_MS=50), \
+                patch('apps.ops.tape.time.sleep') as sleep:
+            self.assertEqual(tape.http_get('stooq', 'k', None).text, 'ok')
+        sleep.assert_called_once_with(0.05)
+
+        with self._settings(tape.REPLAY, JSLL_PROVIDER_TAPE_FAILURE_RATE=1.0):
+            with self.assertRaises(ConnectionError):
+                tape.http_get('stooq', 'k', None)
@@ -0,0 +1,16 @@
+from django.http import Http404, HttpResponse
+
+from .locks import single_flight_counters
+from .metrics import enabled, render_text, snapshot
+
+
+def metrics(request):
+    """Stage histograms, row counters and single-flight outcomes for Prometheus."""
+    if not enabled():
+        raise Http404('metrics are disabled')
+    single_flight = {}
+    for name, value in single_flight_counters().items():
+        task, _, outcome = name.rpartition(':')
+        single_flight[(('task', task), ('outcome', outcome))] = value
+    body = render_text(snapshot(), extra_counters={'jsll_single_flight_total': single_flight})
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 
 from apps.predictions.services import generate_latest_predictions, invalidate_model_cache, run_backtest_and_store
+from apps.ops.profiling import add_profile_argument, profile_run, report
 
 
 class Command(BaseCommand):
@@ -9,15 +10,23 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument('--backtest', action='store_true', help='Run backtest after predictions')
         parser.add_argument('--force-retrain', action='store_true', help='Force model retrain (ignore cache)')
+        parser.add_argument('--symbol', help='Ticker to predict. Default: JSLL_TICKER')
+        add_profile_argument(parser)
 
     def handle(self, *args, **options):
+        with profile_run('prediction_run_once', enabled=options['profile']) as profile:
+            self.predict(options)
+        report(self.stdout, profile)
+
+    def predict(self, options):
         force = options.get('force_retrain', False)
+        symbol = options.get('symbol')
         if force:
-            invalidate_model_cache()
-        preds = generate_latest_predictions(force_retrain=force)
+            invalidate_model_cache(symbol)
+        preds = generate_latest_predictions(force_retrain=force, symbol=symbol)
         self.stdout.write(f'Predictions generated: {len(preds)}')
         if options.get('backtest'):
-            run = run_backtest_and_store()
+            run = run_backtest_and_store(symbol=symbol)
             if run:
                 self.stdout.write('Backtest run stored')
             else:
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:03
+
+import apps.market.symbols
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='priceprediction',
+            name='uniq_prediction_ts_horizon',
+        ),
+        migrations.AddField(
+            model_name='priceprediction',
+            name='symbol',
+            field=models.CharField(default=apps.market.symbols.default_symbol, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='pricepredictionrun',
+            name='symbol',
+            field=models.CharField(db_index=True, default=apps.market.symbols.default_symbol, max_length=32),
+        ),
+        migrations.AddConstraint(
+            model_name='priceprediction',
+            constraint=models.UniqueConstraint(fields=('symbol', 'ts', 'horizon_min'), name='uniq_prediction_symbol_ts_horizon'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictions', '0002_symbol_dimension'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pricepredictionrun',
+            name='timings_json',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -1,7 +1,10 @@
 from django.db import models
 
+from apps.market.symbols import default_symbol
+
 
 class PricePredictionRun(models.Model):
+    symbol = models.CharField(max_length=32, default=default_symbol, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     train_start = models.DateTimeField(null=True, blank=True)
     train_end = models.DateTimeField(null=True, blank=True)
@@ -10,6 +13,7 @@ class PricePredictionRun(models.Model):
     status = models.CharField(max_length=20, default='ok')
     notes = models.TextField(blank=True, default='')
     metrics_json = models.JSONField(default=dict, blank=True)
+    timings_json = models.JSONField(default=dict, blank=True)
 
     class Meta:
         ordering = ['-created_at']
@@ -19,6 +23,7 @@ class PricePredictionRun(models.Model):
 
 
 class PricePrediction(models.Model):
+    symbol = models.CharField(max_length=32, default=default_symbol)
     ts = models.DateTimeField(db_index=True)
     horizon_min = models.IntegerField()
     predicted_return = models.FloatField()
@@ -38,8 +43,11 @@ class PricePrediction(models.Model):
     class Meta:
         ordering = ['-ts']
         constraints = [
-            models.UniqueConstraint(fields=['ts', 'horizon_min'], name='uniq_prediction_ts_horizon'),
+            models.UniqueConstraint(
+                fields=['symbol', 'ts', 'horizon_min'],
+                name='uniq_prediction_symbol_ts_horizon',
+            ),
         ]
 
     def __str__(self):
-        return f"Prediction {self.ts} {self.horizon_min}m"
+        return f"Prediction {self.symbol} {self.ts} {self.horizon_min}m"
@@ -5,16 +5,18 @@ import time
 from dataclasses import dataclass
 from datetime import timedelta
 from typing import Dict, List, Optional, Tuple
-from zoneinfo import ZoneInfo
 
 import numpy as np
 import pandas as pd
 from django.conf import settings
 from django.db import transaction
-from django.utils import timezone
 
-from apps.events.models import Announcement, NewsItem
+from apps.features.compute import load_latest_frame
+from apps.features.registry import FeatureFrame, compile_plan
 from apps.market.models import Ohlc1m
+from apps.market.sessions import session_bounds, session_ordinals
+from apps.market.symbols import default_symbol
+from apps.ops import metrics
 
 from .models import PricePrediction, PricePredictionRun
 
@@ -24,24 +26,32 @@ logger = logging.getLogger('apps')
 # Keeps trained models between prediction cycles so we only retrain once per
 # JSLL_MODEL_RETRAIN_INTERVAL_SEC (default 3600 = 1 hour) instead of every
 # 5-minute Celery beat tick.  Prediction itself is cheap (single row predict).
+# Bundles are keyed by symbol so each ticker retrains on its own schedule.
 
-_model_cache: Dict[str, Optional[ModelBundle]] = {}
-_cache_ts: float = 0.0  # epoch seconds when models were last trained
+_model_cache: Dict[str, Dict[str, Optional[ModelBundle]]] = {}
+_cache_ts: Dict[str, float] = {}  # symbol -> monotonic seconds when models were last trained
 
 
-def _models_are_fresh() -> bool:
+def _models_are_fresh(symbol: Optional[str] = None) -> bool:
     """Return True if cached models are still within the retrain interval."""
-    if not _model_cache:
+    symbol = symbol or default_symbol()
+    if not _model_cache.get(symbol):
         return False
     interval = getattr(settings, 'JSLL_MODEL_RETRAIN_INTERVAL_SEC', 3600)
-    return (time.monotonic() - _cache_ts) < interval
+    return (time.monotonic() - _cache_ts.get(symbol, 0.0)) < interval
 
 
-def invalidate_model_cache() -> None:
-    """Force next prediction cycle to retrain (useful for management commands)."""
-    global _model_cache, _cache_ts
-    _model_cache = {}
-    _cache_ts = 0.0
+def invalidate_model_cache(symbol: Optional[str] = None) -> None:
+    """Force next prediction cycle to retrain (useful for management commands).
+
+    Clears every symbol when ``symbol`` is None.
+    """
+    if symbol is None:
+        _model_cache.clear()
+        _cache_ts.clear()
+        return
+    _model_cache.pop(symbol, None)
+    _cache_ts.pop(symbol, None)
 
 
 FEATURE_COLUMNS = [
@@ -65,12 +75,14 @@ FEATURE_COLUMNS = [
     'open_to_now_ret',  # Return from session open to current close
     # Announcement event features
     'ann_high_count_2h', 'ann_high_count_24h', 'ann_high_count_7d',
-    'ann_high_sum_2h', 'ann_high_sum_24h', 'ann_high_sum_7d',
+    'ann_impact_sum_2h', 'ann_impact_sum_24h', 'ann_impact_sum_7d',
     'ann_last_impact', 'ann_results_flag_7d',
     # News sentiment features
     'news_count_2h', 'news_count_24h',
     'news_sent_avg_2h', 'news_sent_avg_24h',
 ]
+# All of them are declared in ``apps.features.registry``.
+MODEL_PLAN = compile_plan(FEATURE_COLUMNS)
 
 HORIZONS = {
     '1h': 60,
@@ -212,241 +224,20 @@ def _fit_gbr_bundle(X: np.ndarray, y: np.ndarray) -> Optional[ModelBundle]:
     )
 
 
-# ─────────────────────── Technical indicator helpers ─────────────────────────
-
-def _rsi_series(close: pd.Series, period: int = 14) -> pd.Series:
-    """RSI using Wilder's EMA (alpha = 1/period). Returns values in [0, 100].
-
-    Uses a small epsilon floor on avg_loss so that pure-uptrend sessions
-    correctly return RSI ≈ 100 rather than NaN→50.
-    """
-    delta = close.diff()
-    gain = delta.clip(lower=0.0)
-    loss = (-delta).clip(lower=0.0)
-    alpha = 1.0 / period
-    avg_gain = gain.ewm(alpha=alpha, adjust=False, min_periods=period).mean()
-    avg_loss = loss.ewm(alpha=alpha, adjust=False, min_periods=period).mean()
-    # clip to a tiny epsilon: pure uptrend → RS very large → RSI ≈ 100
-    rs = avg_gain / avg_loss.clip(lower=1e-10)
-    rsi = 100.0 - 100.0 / (1.0 + rs)
-    # Restore NaN for periods that lack sufficient history (min_periods not met)
-    return rsi.where(avg_gain.notna(), other=50.0)
-
-
-def _atr_pct_series(df: pd.DataFrame, period: int = 14) -> pd.Series:
-    """ATR as percentage of close price — scale-invariant volatility."""
-    high, low, prev_close = df['high'], df['low'], df['close'].shift(1)
-    tr = pd.concat(
-        [high - low, (high - prev_close).abs(), (low - prev_close).abs()],
-        axis=1,
-    ).max(axis=1)
-    atr = tr.ewm(alpha=1.0 / period, adjust=False, min_periods=period).mean()
-    return (atr / df['close'].replace(0.0, np.nan)).fillna(0.0)
-
-
-def _macd_hist_series(close: pd.Series) -> pd.Series:
-    """MACD histogram normalised by price — scale-free momentum signal."""
-    ema12 = close.ewm(span=12, adjust=False).mean()
-    ema26 = close.ewm(span=26, adjust=False).mean()
-    macd = ema12 - ema26
-    signal = macd.ewm(span=9, adjust=False).mean()
-    return ((macd - signal) / close.replace(0.0, np.nan)).fillna(0.0)
-
-
-def _bb_pct_b_series(close: pd.Series, period: int = 20) -> pd.Series:
-    """Bollinger Band %B: 0 = lower band, 0.5 = midline, 1 = upper band."""
-    mid = close.rolling(period).mean()
-    std = close.rolling(period).std()
-    upper = mid + 2.0 * std
-    lower = mid - 2.0 * std
-    band = (upper - lower).replace(0.0, np.nan)
-    return ((close - lower) / band).fillna(0.5)
-
-
-# ─────────────────────────── Event feature helpers ───────────────────────────
-
-def _build_cumulative_window(
-    ts_index: pd.DatetimeIndex,
-    events_df: pd.DataFrame,
-    value_col: str,
-    window: pd.Timedelta,
-) -> np.ndarray:
-    """Sum of events_df[value_col] in (ts - window, ts] for each ts in ts_index."""
-    if events_df.empty:
-        return np.zeros(len(ts_index))
-
-    df = events_df[['published_at', value_col]].copy()
-    df['cum'] = df[value_col].cumsum()
-    df = df.sort_values('published_at')
-
-    ts_df = pd.DataFrame({'ts': ts_index})
-    end = pd.merge_asof(ts_df, df[['published_at', 'cum']], left_on='ts', right_on='published_at', direction='backward')
-    start_df = pd.DataFrame({'ts': ts_index - window})
-    start = pd.merge_asof(start_df, df[['published_at', 'cum']], left_on='ts', right_on='published_at', direction='backward')
-
-    return end['cum'].fillna(0.0).to_numpy() - start['cum'].fillna(0.0).to_numpy()
-
-
-def _add_event_features(df: pd.DataFrame) -> pd.DataFrame:
-    if df.empty:
-        return df
-
-    start_ts = df.index.min() - pd.Timedelta(days=7)
-    end_ts = df.index.max()
-
-    ann_qs = Announcement.objects.filter(
-        published_at__gte=start_ts,
-        published_at__lte=end_ts,
-        low_priority=False,
-    ).values('published_at', 'impact_score', 'type', 'headline')
-
-    ann_df = pd.DataFrame(list(ann_qs))
-    _zero_cols = (
-        'ann_high_count_2h', 'ann_high_count_24h', 'ann_high_count_7d',
-        'ann_high_sum_2h', 'ann_high_sum_24h', 'ann_high_sum_7d',
-        'ann_last_impact', 'ann_results_flag_7d',
-    )
-    if ann_df.empty:
-        for col in _zero_cols:
-            df[col] = 0
-        return df
-
-    ann_df['published_at'] = pd.to_datetime(ann_df['published_at'], utc=True)
-    ann_df = ann_df.sort_values('published_at')
-    ann_df['high_flag'] = (ann_df['impact_score'] >= 10).astype(int)
-    ann_df['headline_lower'] = ann_df['headline'].str.lower()
-    ann_df['results_flag'] = (
-        ann_df['type'].isin(['results', 'board_meeting'])
-        & ann_df['headline_lower'].str.contains('financial|results', regex=True)
-    ).astype(int)
-
-    ts_index = df.index
-    df['ann_high_count_2h'] = _build_cumulative_window(ts_index, ann_df, 'high_flag', pd.Timedelta(hours=2))
-    df['ann_high_count_24h'] = _build_cumulative_window(ts_index, ann_df, 'high_flag', pd.Timedelta(hours=24))
-    df['ann_high_count_7d'] = _build_cumulative_window(ts_index, ann_df, 'high_flag', pd.Timedelta(days=7))
-    df['ann_high_sum_2h'] = _build_cumulative_window(ts_index, ann_df, 'impact_score', pd.Timedelta(hours=2))
-    df['ann_high_sum_24h'] = _build_cumulative_window(ts_index, ann_df, 'impact_score', pd.Timedelta(hours=24))
-    df['ann_high_sum_7d'] = _build_cumulative_window(ts_index, ann_df, 'impact_score', pd.Timedelta(days=7))
-    df['ann_results_flag_7d'] = (
-        _build_cumulative_window(ts_index, ann_df, 'results_flag', pd.Timedelta(days=7)) > 0
-    ).astype(int)
-
-    last = pd.merge_asof(
-        pd.DataFrame({'ts': ts_index}),
-        ann_df[['published_at', 'impact_score']],
-        left_on='ts',
-        right_on='published_at',
-        direction='backward',
-    )
-    df['ann_last_impact'] = last['impact_score'].fillna(0.0).to_numpy()
-    return df
-
-
-def _add_news_features(df: pd.DataFrame) -> pd.DataFrame:
-    if df.empty:
-        return df
-
-    start_ts = df.index.min() - pd.Timedelta(days=1)
-    end_ts = df.index.max()
-    news_qs = NewsItem.objects.filter(
-        published_at__gte=start_ts,
-        published_at__lte=end_ts,
-    ).values('published_at', 'sentiment')
-
-    news_df = pd.DataFrame(list(news_qs))
-    if news_df.empty:
-        for col in ('news_count_2h', 'news_count_24h', 'news_sent_avg_2h', 'news_sent_avg_24h'):
-            df[col] = 0
-        return df
-
-    news_df['published_at'] = pd.to_datetime(news_df['published_at'], utc=True)
-    news_df = news_df.sort_values('published_at')
-    news_df['count_flag'] = 1
-    news_df['sent_sum'] = news_df['sentiment']
-
-    ts_index = df.index
-    count_2h = _build_cumulative_window(ts_index, news_df, 'count_flag', pd.Timedelta(hours=2))
-    count_24h = _build_cumulative_window(ts_index, news_df, 'count_flag', pd.Timedelta(hours=24))
-    sum_2h = _build_cumulative_window(ts_index, news_df, 'sent_sum', pd.Timedelta(hours=2))
-    sum_24h = _build_cumulative_window(ts_index, news_df, 'sent_sum', pd.Timedelta(hours=24))
-
-    df['news_count_2h'] = count_2h
-    df['news_count_24h'] = count_24h
-    df['news_sent_avg_2h'] = np.where(count_2h > 0, sum_2h / count_2h, 0.0)
-    df['news_sent_avg_24h'] = np.where(count_24h > 0, sum_24h / count_24h, 0.0)
-    return df
-
-
 # ──────────────────────────── Feature dataframe ──────────────────────────────
 
-def build_features_dataframe(start_ts, end_ts) -> pd.DataFrame:
-    qs = Ohlc1m.objects.filter(ts__gte=start_ts, ts__lte=end_ts).order_by('ts').values(
-        'ts', 'open', 'high', 'low', 'close', 'volume'
-    )
-    rows = list(qs)
-    if not rows:
-        return pd.DataFrame()
+def build_features_dataframe(start_ts, end_ts, symbol: Optional[str] = None) -> pd.DataFrame:
+    with metrics.timer('predictions.build_features'):
+        return _build_features_dataframe(start_ts, end_ts, symbol or default_symbol())
 
-    df = pd.DataFrame(rows)
-    df['ts'] = pd.to_datetime(df['ts'], utc=True)
-    df = df.set_index('ts').sort_index()
-
-    # ── Price returns ──
-    df['r1'] = df['close'].pct_change(1)
-    df['r5'] = df['close'].pct_change(5)
-    df['r15'] = df['close'].pct_change(15)
-    df['r60'] = df['close'].pct_change(60)
-    df['r120'] = df['close'].pct_change(120)
-
-    # ── Return volatility ──
-    df['vol_std_5'] = df['r1'].rolling(5).std()
-    df['vol_std_15'] = df['r1'].rolling(15).std()
-    df['vol_std_60'] = df['r1'].rolling(60).std()
-    df['vol_std_120'] = df['r1'].rolling(120).std()
-
-    # ── Momentum ──
-    df['mom_15'] = df['r1'].rolling(15).sum()
-    df['mom_60'] = df['r1'].rolling(60).sum()
-    df['mom_120'] = df['r1'].rolling(120).sum()
-
-    # ── Price range ratio ──
-    rng = (df['high'] - df['low']) / df['close'].replace(0.0, np.nan)
-    df['range_mean_15'] = rng.rolling(15).mean()
-    df['range_mean_60'] = rng.rolling(60).mean()
-    df['range_mean_120'] = rng.rolling(120).mean()
-
-    # ── Volume z-scores (normalised, scale-invariant) ──
-    for w in (15, 60, 120):
-        vmean = df['volume'].rolling(w).mean()
-        vstd = df['volume'].rolling(w).std().replace(0.0, np.nan)
-        df[f'vol_z_{w}'] = ((df['volume'] - vmean) / vstd).fillna(0.0)
-
-    # ── Technical indicators ──
-    df['rsi_14'] = _rsi_series(df['close'])
-    df['atr_pct'] = _atr_pct_series(df)
-    df['macd_hist'] = _macd_hist_series(df['close'])
-    df['bb_pct_b'] = _bb_pct_b_series(df['close'])
-
-    # ── Intraday context (session-scoped, resets at IST 09:15 each day) ──
-    ist = ZoneInfo('Asia/Kolkata')
-    session_key = pd.Series(df.index.tz_convert(ist).date, index=df.index)
-
-    # VWAP = cumulative(typical_price * volume) / cumulative(volume) within session
-    vol_clipped = df['volume'].clip(lower=0.0)
-    tp = (df['high'] + df['low'] + df['close']) / 3.0
-    cum_tp_vol = (tp * vol_clipped).groupby(session_key).cumsum()
-    cum_vol = vol_clipped.groupby(session_key).cumsum()
-    vwap = cum_tp_vol / cum_vol.replace(0.0, np.nan)
-    df['vwap_dist'] = ((df['close'] - vwap) / df['close'].replace(0.0, np.nan)).fillna(0.0)
-
-    # Return from the first candle of the session to current close
-    session_open = df['open'].groupby(session_key).transform('first')
-    df['open_to_now_ret'] = ((df['close'] - session_open) / session_open.replace(0.0, np.nan)).fillna(0.0)
-
-    df = _add_event_features(df)
-    df = _add_news_features(df)
 
-    return df
+def _build_features_dataframe(start_ts, end_ts, symbol: str) -> pd.DataFrame:
+    with metrics.timer('predictions.load_ohlc'):
+        frame = FeatureFrame.load(start_ts, end_ts, symbol)
+    metrics.count('predictions.ohlc_rows', len(frame))
+    if not len(frame):
+        return pd.DataFrame()
+    return pd.concat([frame.candles, frame.compute(MODEL_PLAN)], axis=1)
 
 
 def build_labels(df: pd.DataFrame) -> pd.DataFrame:
@@ -458,13 +249,16 @@ def build_labels(df: pd.DataFrame) -> pd.DataFrame:
     df['y_3h'] = df['close'].shift(-180) / df['close'] - 1.0
     df['y_5h'] = df['close'].shift(-300) / df['close'] - 1.0
 
-    ist = ZoneInfo('Asia/Kolkata')
-    df['local_date'] = df.index.tz_convert(ist).date
-    last_close_by_date = df.groupby('local_date')['close'].last()
-    dates_sorted = sorted(last_close_by_date.index)
-    next_date_map = {dates_sorted[i]: dates_sorted[i + 1] for i in range(len(dates_sorted) - 1)}
-    df['next_date'] = df['local_date'].map(next_date_map)
-    df['next_close'] = df['next_date'].map(last_close_by_date)
+    # Next-day label: last close of the next session present in the frame.
+    sessions = session_ordinals(df.index)
+    days, _, ends = session_bounds(sessions)
+    last_close = df['close'].to_numpy(dtype=float)[ends - 1]
+    following = np.searchsorted(days, sessions, side='right')
+    has_next = following < len(days)
+    next_close = np.full(len(df), np.nan)
+    next_close[has_next] = last_close[following[has_next]]
+    df['session'] = sessions
+    df['next_close'] = next_close
     df['y_1d'] = df['next_close'] / df['close'] - 1.0
 
     return df
@@ -490,9 +284,11 @@ def train_models(df: pd.DataFrame) -> Dict[str, Optional[ModelBundle]]:
         X = subset[FEATURE_COLUMNS].to_numpy(dtype=float)
         y = subset[y_col].to_numpy(dtype=float)
 
-        model = _fit_gbr_bundle(X, y)
-        if model is None:
-            model = _fit_ridge_bundle(X, y)
+        with metrics.timer('predictions.train'):
+            model = _fit_gbr_bundle(X, y)
+            if model is None:
+                model = _fit_ridge_bundle(X, y)
+        metrics.count('predictions.training_rows', len(subset))
         models[label] = model
 
     return models
@@ -507,46 +303,54 @@ def _confidence_from_residual(residual_std: Optional[float], horizon_min: int =
     return round(max(0.0, score), 4)
 
 
-def generate_latest_predictions(force_retrain: bool = False) -> List[PricePrediction]:
+def generate_latest_predictions(
+    force_retrain: bool = False,
+    symbol: Optional[str] = None,
+    frame: Optional[FeatureFrame] = None,
+) -> List[PricePrediction]:
     """Generate predictions for the latest candle.
 
     Model caching strategy:
     - If cached models are fresh (< JSLL_MODEL_RETRAIN_INTERVAL_SEC old),
-      only fetch a lightweight ~500-minute feature window for prediction.
+      reuse them.
     - If stale or force_retrain=True, do the full 180-day build + retrain,
       then cache the models for subsequent calls.
-    """
-    global _model_cache, _cache_ts
 
-    latest = Ohlc1m.objects.order_by('-ts').first()
+    The predicted row comes from ``frame`` (the ``load_latest_frame`` scoring
+    just used) or, without one, from a fresh load of the latest candles.
+    """
+    symbol = symbol or default_symbol()
+    latest = Ohlc1m.objects.filter(symbol=symbol).order_by('-ts').first()
     if not latest:
         return []
 
-    need_retrain = force_retrain or not _models_are_fresh()
+    need_retrain = force_retrain or not _models_are_fresh(symbol)
 
     if need_retrain:
         # Full 180-day window: build features + labels, train models
-        logger.info('Model cache miss — retraining (force=%s)', force_retrain)
+        logger.info('Model cache miss — retraining symbol=%s (force=%s)', symbol, force_retrain)
         start_ts = latest.ts - timedelta(days=180)
-        df = build_features_dataframe(start_ts, latest.ts)
+        df = build_features_dataframe(start_ts, latest.ts, symbol=symbol)
         df = build_labels(df)
         models = train_models(df)
-        _model_cache = models
-        _cache_ts = time.monotonic()
+        _model_cache[symbol] = models
+        _cache_ts[symbol] = time.monotonic()
     else:
-        # Lightweight: only fetch recent ~500 minutes for feature computation
-        logger.info('Model cache hit — using cached models')
-        models = _model_cache
-        start_ts = latest.ts - timedelta(minutes=500)
-        df = build_features_dataframe(start_ts, latest.ts)
+        logger.info('Model cache hit — using cached models symbol=%s', symbol)
+        models = _model_cache[symbol]
 
-    if df.empty:
+    if frame is None:
+        with metrics.timer('predictions.load_ohlc'):
+            frame = load_latest_frame(latest.ts, symbol)
+    if not len(frame):
         return []
 
-    latest_row = df.iloc[-1]
+    latest_row = frame.compute(MODEL_PLAN).iloc[-1]
+    latest_ts = frame.index[-1].to_pydatetime()
+    last_close = float(frame.candles['close'].iloc[-1])
     predictions = []
 
-    with transaction.atomic():
+    with metrics.timer('predictions.write'), transaction.atomic():
         for label, horizon in HORIZONS.items():
             model = models.get(label)
             feature_vals = latest_row[FEATURE_COLUMNS].to_numpy(dtype=float)
@@ -559,19 +363,21 @@ def generate_latest_predictions(force_retrain: bool = False) -> List[PricePredic
                 model_name = model.model_name
                 confidence = _confidence_from_residual(model.residual_std, horizon)
 
-            predicted_price = float(latest_row['close']) * (1.0 + predicted_return)
+            predicted_price = last_close * (1.0 + predicted_return)
             obj, _created = PricePrediction.objects.update_or_create(
-                ts=latest.ts,
+                symbol=symbol,
+                ts=latest_ts,
                 horizon_min=horizon,
                 defaults={
                     'predicted_return': float(predicted_return),
                     'predicted_price': float(predicted_price),
-                    'last_close': float(latest_row['close']),
+                    'last_close': last_close,
                     'model_name': model_name,
                     'confidence': confidence,
                 },
             )
             predictions.append(obj)
+    metrics.count('predictions.written', len(predictions))
 
     return predictions
 
@@ -579,39 +385,48 @@ def generate_latest_predictions(force_retrain: bool = False) -> List[PricePredic
 def run_backtest_and_store(
     train_days: int = 60,
     test_days: int = 5,
+    symbol: Optional[str] = None,
 ) -> Optional[PricePredictionRun]:
-    latest = Ohlc1m.objects.order_by('-ts').first()
+    symbol = symbol or default_symbol()
+    with metrics.collect() as timings:
+        fields = _backtest(train_days, test_days, symbol)
+    if fields is None:
+        return None
+    return PricePredictionRun.objects.create(symbol=symbol, status='ok', timings_json=timings.summary(), **fields)
+
+
+def _backtest(train_days: int, test_days: int, symbol: str) -> Optional[dict]:
+    latest = Ohlc1m.objects.filter(symbol=symbol).order_by('-ts').first()
     if not latest:
         return None
 
     start_ts = latest.ts - timedelta(days=240)
-    df = build_features_dataframe(start_ts, latest.ts)
+    df = build_features_dataframe(start_ts, latest.ts, symbol=symbol)
     df = build_labels(df)
     if df.empty:
         return None
 
-    ist = ZoneInfo('Asia/Kolkata')
-    df = df.copy()
-    df['local_date'] = df.index.tz_convert(ist).date
-    dates = sorted(df['local_date'].unique())
-    if len(dates) < train_days + test_days:
+    # Folds are contiguous row ranges: the frame is in time order, so a run of
+    # sessions is the slice from its first session's start to its last's end.
+    _, starts, ends = session_bounds(df['session'].to_numpy())
+    if len(starts) < train_days + test_days:
         return None
 
-    metrics = {label: {'mae': 0.0, 'dir_acc': 0.0, 'n': 0, 'folds': 0} for label in HORIZONS}
-    test_start_date = None
-    test_end_date = None
+    fold_metrics = {label: {'mae': 0.0, 'dir_acc': 0.0, 'n': 0, 'folds': 0} for label in HORIZONS}
+    test_start_dt = None
+    test_end_dt = None
 
-    for i in range(train_days, len(dates) - test_days + 1, test_days):
-        train_dates = set(dates[i - train_days: i])
-        test_dates = set(dates[i: i + test_days])
+    for i in range(train_days, len(starts) - test_days + 1, test_days):
+        train_rows = df.iloc[starts[i - train_days]: starts[i]]
+        test_rows = df.iloc[starts[i]: ends[i + test_days - 1]]
 
-        if test_start_date is None:
-            test_start_date = min(test_dates)
-        test_end_date = max(test_dates)
+        if test_start_dt is None:
+            test_start_dt = test_rows.index[0].to_pydatetime()
+        test_end_dt = test_rows.index[-1].to_pydatetime()
 
         # Exclude gap-fill candles from both train and test
-        df_train = df[df['local_date'].isin(train_dates) & (df['volume'] > 0)]
-        df_test = df[df['local_date'].isin(test_dates) & (df['volume'] > 0)]
+        df_train = train_rows[train_rows['volume'] > 0]
+        df_test = test_rows[test_rows['volume'] > 0]
 
         fold_models = train_models(df_train)
         for label in HORIZONS:
@@ -627,13 +442,13 @@ def run_backtest_and_store(
             y_true = test_subset[y_col].to_numpy(dtype=float)
             preds = fold_model.predict_many(X)
 
-            metrics[label]['mae'] += float(np.mean(np.abs(preds - y_true)))
-            metrics[label]['dir_acc'] += float(np.mean(np.sign(preds) == np.sign(y_true)))
-            metrics[label]['n'] += len(test_subset)
-            metrics[label]['folds'] += 1
+            fold_metrics[label]['mae'] += float(np.mean(np.abs(preds - y_true)))
+            fold_metrics[label]['dir_acc'] += float(np.mean(np.sign(preds) == np.sign(y_true)))
+            fold_metrics[label]['n'] += len(test_subset)
+            fold_metrics[label]['folds'] += 1
 
     metrics_summary = {}
-    for label, stats in metrics.items():
+    for label, stats in fold_metrics.items():
         if stats['folds'] == 0:
             metrics_summary[label] = {'mae': None, 'directional_accuracy': None, 'samples': 0}
         else:
@@ -643,24 +458,10 @@ def run_backtest_and_store(
                 'samples': stats['n'],
             }
 
-    # Resolve UTC datetimes for the test window boundaries
-    test_start_dt = None
-    test_end_dt = None
-    if test_start_date is not None:
-        rows = df[df['local_date'] == test_start_date]
-        if not rows.empty:
-            test_start_dt = rows.index.min().to_pydatetime()
-    if test_end_date is not None:
-        rows = df[df['local_date'] == test_end_date]
-        if not rows.empty:
-            test_end_dt = rows.index.max().to_pydatetime()
-
-    run = PricePredictionRun.objects.create(
-        train_start=df.index.min().to_pydatetime(),
-        train_end=df.index.max().to_pydatetime(),
-        test_start=test_start_dt,
-        test_end=test_end_dt,
-        status='ok',
-        metrics_json=metrics_summary,
-    )
-    return run
+    return {
+        'train_start': df.index.min().to_pydatetime(),
+        'train_end': df.index.max().to_pydatetime(),
+        'test_start': test_start_dt,
+        'test_end': test_end_dt,
+        'metrics_json': metrics_summary,
+    }
@@ -6,12 +6,15 @@ from django.conf import settings
 from django.utils import timezone
 
 from apps.market.market_time import market_state
-from .services import generate_latest_predictions, _models_are_fresh
+from apps.market.symbols import active_symbols
+from apps.ops.locks import COALESCE, single_flight
+from apps.ops.profiling import profile_task
 
 logger = logging.getLogger('apps')
 
 
 @shared_task
+@single_flight(key='prediction', ttl=290)
 def prediction_task():
     tz = ZoneInfo(settings.JSLL_MARKET_TZ)
     now_ist = timezone.now().astimezone(tz)
@@ -19,15 +22,72 @@ def prediction_task():
         logger.info('Prediction task skipped: market closed')
         return {'skipped': True, 'reason': 'market_closed'}
 
+    from celery import group
+
+    symbols = active_symbols()
+    group(prediction_symbol_task.s(symbol) for symbol in symbols).apply_async()
+    return {'status': 'dispatched', 'symbols': symbols}
+
+
+@shared_task
+@single_flight(key='prediction:{0}', ttl=1800, policy=COALESCE)
+@profile_task
+def prediction_symbol_task(symbol):
+    from .services import generate_latest_predictions, _models_are_fresh
+
     try:
-        cache_fresh = _models_are_fresh()
-        preds = generate_latest_predictions()
+        cache_fresh = _models_are_fresh(symbol)
+        preds = generate_latest_predictions(symbol=symbol)
         logger.info(
-            'Prediction task completed: generated=%s cache=%s',
+            'Prediction task completed: symbol=%s generated=%s cache=%s',
+            symbol,
             len(preds),
             'hit' if cache_fresh else 'miss',
         )
         return {'status': 'ok', 'generated': len(preds), 'cache': 'hit' if cache_fresh else 'miss'}
     except Exception:  # pragma: no cover
-        logger.exception('Prediction task failed')
+        logger.exception('Prediction task failed symbol=%s', symbol)
         return {'status': 'error'}
+
+
+@single_flight(key='prediction:{0}', ttl=1800)
+def _predict_from_frame(symbol, frame):
+    from .services import generate_latest_predictions
+
+    return generate_latest_predictions(symbol=symbol, frame=frame)
+
+
+@shared_task
+@single_flight(key='scores:{0}', ttl=1800, policy=COALESCE, sticky=('recompute_latest',))
+@profile_task
+def score_and_predict_symbol_task(symbol, recompute_latest=False):
+    """Score the latest candle, then predict, from one load of its candles and events.
+
+    With ``recompute_latest`` the candle is rescored even if it already has a
+    score; a rescore that arrives mid-run makes the follow-up run rescore.  A prediction already running for the symbol (the beat task, or a
+    retrain) is left to finish rather than queued behind.
+    """
+    from apps.features.compute import load_latest_frame
+    from apps.features.services import compute_latest_missing
+    from apps.features.services import recompute_latest as rescore_latest
+    from apps.market.models import Ohlc1m
+
+    latest_ts = Ohlc1m.objects.filter(symbol=symbol).order_by('-ts').values_list('ts', flat=True).first()
+    if latest_ts is None:
+        return {'status': 'no_data'}
+    frame = load_latest_frame(latest_ts, symbol)
+    rescore = rescore_latest if recompute_latest else compute_latest_missing
+    try:
+        score = 'ok' if rescore(symbol=symbol, frame=frame) is not None else 'no_data'
+    except Exception as exc:
+        logger.exception('Scoring failed symbol=%s: %s', symbol, exc)
+        score = 'error'
+
+    try:
+        preds = _predict_from_frame(symbol, frame)
+    except Exception:  # pragma: no cover
+        logger.exception('Prediction failed symbol=%s', symbol)
+        return {'score': score, 'status': 'error'}
+    if isinstance(preds, dict):
+        return {'score': score, **preds}
+    return {'score': score, 'status': 'ok', 'generated': len(preds)}
@@ -1,11 +1,25 @@
 from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest.mock import patch
 from zoneinfo import ZoneInfo
 
 from django.test import TestCase
 from django.utils import timezone
 
+from apps.features.compute import LATEST_WINDOW
+from apps.features.models import SignalScore
+from apps.features.registry import FeatureFrame
 from apps.market.models import Ohlc1m
-from .services import build_features_dataframe, build_labels, generate_latest_predictions
+from .models import PricePrediction
+from .services import (
+    MODEL_PLAN,
+    _model_cache,
+    _models_are_fresh,
+    build_features_dataframe,
+    build_labels,
+    generate_latest_predictions,
+    invalidate_model_cache,
+)
+from .tasks import score_and_predict_symbol_task
 
 
 class PredictionFeatureLabelTests(TestCase):
@@ -50,6 +64,19 @@ class PredictionFeatureLabelTests(TestCase):
         expected = (122.0 / 100.0) - 1.0
         self.assertAlmostEqual(first['y_1d'], expected, places=6)
 
+    def test_next_trading_day_close_skips_weekend(self):
+        ist = ZoneInfo('Asia/Kolkata')
+        friday = datetime(2026, 2, 13, 15, 0, tzinfo=ist).astimezone(dt_timezone.utc)
+        monday = datetime(2026, 2, 16, 9, 15, tzinfo=ist).astimezone(dt_timezone.utc)
+
+        self._create_candles(friday, 3, start_price=100.0)
+        self._create_candles(monday, 3, start_price=110.0)
+
+        df = build_labels(build_features_dataframe(friday, monday + timedelta(minutes=2)))
+        self.assertAlmostEqual(df.iloc[2]['y_1d'], (112.0 / 102.0) - 1.0, places=6)
+        self.assertTrue(df.iloc[3:]['y_1d'].isna().all())
+        self.assertEqual(df['session'].dtype.name, 'int32')
+
 
 class PredictionApiTests(TestCase):
     def test_predictions_latest_endpoint(self):
@@ -72,3 +99,109 @@ class PredictionApiTests(TestCase):
         data = response.json()
         self.assertIn('predictions', data)
         self.assertEqual(len(data['predictions']), 4)
+
+
+class PerSymbolModelCacheTests(TestCase):
+    def setUp(self):
+        invalidate_model_cache()
+        self.addCleanup(invalidate_model_cache)
+
+    def _create_candles(self, symbol, start_price):
+        base = timezone.now().replace(second=0, microsecond=0) - timedelta(hours=3)
+        Ohlc1m.objects.bulk_create(
+            [
+                Ohlc1m(
+                    symbol=symbol,
+                    ts=base + timedelta(minutes=i),
+                    open=start_price + i * 0.1,
+                    high=start_price + i * 0.1,
+                    low=start_price + i * 0.1,
+                    close=start_price + i * 0.1,
+                    volume=100.0,
+                    source='test',
+                )
+                for i in range(200)
+            ]
+        )
+
+    def test_models_and_predictions_are_keyed_by_symbol(self):
+        self._create_candles('AAA.NS', 100.0)
+        self._create_candles('BBB.NS', 500.0)
+
+        generate_latest_predictions(symbol='AAA.NS')
+        self.assertTrue(_models_are_fresh('AAA.NS'))
+        self.assertFalse(_models_are_fresh('BBB.NS'))
+
+        generate_latest_predictions(symbol='BBB.NS')
+        self.assertEqual(set(_model_cache), {'AAA.NS', 'BBB.NS'})
+        self.assertEqual(PricePrediction.objects.filter(symbol='AAA.NS').count(), 4)
+        bbb = PricePrediction.objects.filter(symbol='BBB.NS').first()
+        self.assertGreater(bbb.last_close, 500.0)
+
+        invalidate_model_cache('AAA.NS')
+        self.assertFalse(_models_are_fresh('AAA.NS'))
+        self.assertTrue(_models_are_fresh('BBB.NS'))
+
+
+class ScoreAndPredictTests(TestCase):
+    def setUp(self):
+        invalidate_model_cache()
+        self.addCleanup(invalidate_model_cache)
+
+    def test_latest_window_covers_model_warmup(self):
+        self.assertLess(MODEL_PLAN.warmup, LATEST_WINDOW)
+
+    def test_scoring_and_prediction_share_one_candle_load(self):
+        base = timezone.now().replace(second=0, microsecond=0) - timedelta(hours=3)
+        Ohlc1m.objects.bulk_create(
+            [
+                Ohlc1m(
+                    symbol='AAA.NS',
+                    ts=base + timedelta(minutes=i),
+                    open=100.0 + i * 0.1,
+                    high=100.0 + i * 0.1,
+                    low=100.0 + i * 0.1,
+                    close=100.0 + i * 0.1,
+                    volume=100.0,
+                    source='test',
+                )
+                for i in range(200)
+            ]
+        )
+        generate_latest_predictions(symbol='AAA.NS')
+        PricePrediction.objects.all().delete()
+
+        with patch.object(FeatureFrame, 'load_latest', wraps=FeatureFrame.load_latest) as load_latest:
+            result = score_and_predict_symbol_task('AAA.NS')
+
+        self.assertEqual(load_latest.call_count, 1)
+        self.assertEqual(result['score'], 'ok')
+        latest_ts = base + timedelta(minutes=199)
+        self.assertTrue(SignalScore.objects.filter(symbol='AAA.NS', ts=latest_ts).exists())
+        self.assertEqual(PricePrediction.objects.filter(symbol='AAA.NS', ts=latest_ts).count(), 4)
+
+    def test_rescore_arriving_mid_run_is_replayed(self):
+        from apps.features import services as feature_services
+
+        calls = []
+        real_compute = feature_services.compute_latest_missing
+
+        def compute_while_event_arrives(symbol=None, frame=None):
+            calls.append('missing')
+            # A high-impact announcement asks for a rescore while this run holds the lock.
+            self.assertEqual(
+                score_and_predict_symbol_task(symbol, recompute_latest=True),
+                {'skipped': True, 'reason': 'coalesced'},
+            )
+            return real_compute(symbol=symbol, frame=frame)
+
+        def rescore(symbol=None, frame=None):
+            calls.append('rescore')
+            return None
+
+        Ohlc1m.objects.create(symbol='AAA.NS', ts=timezone.now(), open=1, high=1, low=1, close=1, volume=1, source='test')
+        with patch.object(feature_services, 'compute_latest_missing', side_effect=compute_while_event_arrives), \
+                patch.object(feature_services, 'recompute_latest', side_effect=rescore), \
+                patch('apps.predictions.tasks._predict_from_frame', return_value=[]):
+            score_and_predict_symbol_task('AAA.NS', recompute_latest=False)
+        self.assertEqual(calls, ['missing', 'rescore'])
@@ -12,23 +12,19 @@ app.conf.beat_schedule = {
         'task': 'apps.market.tasks.ingest_1m_task',
         'schedule': 60.0,
     },
-    'events-fetch-open': {
+    # Checks every minute; each source is only fetched once its adaptive
+    # interval (apps.events.scheduler) has elapsed.
+    'events-fetch-adaptive': {
         'task': 'apps.events.tasks.fetch_events_task',
-        'schedule': 600.0,
-        'args': ('open',),
-    },
-    'events-fetch-closed': {
-        'task': 'apps.events.tasks.fetch_events_task',
-        'schedule': 1800.0,
-        'args': ('closed',),
-    },
-    'compute-scores-every-minute': {
-        'task': 'apps.features.tasks.compute_scores_task',
         'schedule': 60.0,
+        'args': ('auto',),
     },
-    'predict-every-5-min': {
-        'task': 'apps.predictions.tasks.prediction_task',
-        'schedule': 300.0,
+    # Scoring and prediction are chained from ingest_symbol_task whenever new
+    # candles are saved; compute_scores_task / prediction_task remain for
+    # manual sweeps.
+    'maintain-partitions-daily': {
+        'task': 'apps.market.tasks.maintain_partitions_task',
+        'schedule': 86400.0,
     },
 }
 
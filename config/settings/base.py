@@ -1,5 +1,6 @@
 from pathlib import Path
 import os
+import sys
 
 from dotenv import load_dotenv
 import dj_database_url
@@ -19,9 +20,34 @@ ALLOWED_HOSTS = [
 ]
 
 JSLL_TICKER = os.getenv('JSLL_TICKER', 'JSLL.NS')
+JSLL_SYMBOLS = [
+    symbol.strip()
+    for symbol in os.getenv('JSLL_SYMBOLS', JSLL_TICKER).split(',')
+    if symbol.strip()
+]
 JSLL_MARKET_TZ = os.getenv('JSLL_MARKET_TZ', 'Asia/Kolkata')
 JSLL_PRICE_DELAY_SEC = int(os.getenv('JSLL_PRICE_DELAY_SEC', '120'))
 JSLL_MODEL_RETRAIN_INTERVAL_SEC = int(os.getenv('JSLL_MODEL_RETRAIN_INTERVAL_SEC', '3600'))
+JSLL_HOT_RETENTION_DAYS = int(os.getenv('JSLL_HOT_RETENTION_DAYS', '400'))
+JSLL_ARCHIVE_DIR = os.getenv('JSLL_ARCHIVE_DIR', str(BASE_DIR / 'archive'))
+# IngestRun rows older than this are rolled up into hourly summaries.
+JSLL_INGEST_RUN_RETENTION_DAYS = int(os.getenv('JSLL_INGEST_RUN_RETENTION_DAYS', '14'))
+JSLL_PARTITION_MONTHS_AHEAD = int(os.getenv('JSLL_PARTITION_MONTHS_AHEAD', '2'))
+JSLL_RSS_MAX_WORKERS = int(os.getenv('JSLL_RSS_MAX_WORKERS', '8'))
+JSLL_RSS_TIMEOUT_SEC = float(os.getenv('JSLL_RSS_TIMEOUT_SEC', '10'))
+JSLL_NSE_COOKIE_TTL_SEC = int(os.getenv('JSLL_NSE_COOKIE_TTL_SEC', '600'))
+JSLL_EVENTS_OPEN_INTERVAL_SEC = int(os.getenv('JSLL_EVENTS_OPEN_INTERVAL_SEC', '600'))
+JSLL_EVENTS_CLOSED_INTERVAL_SEC = int(os.getenv('JSLL_EVENTS_CLOSED_INTERVAL_SEC', '1800'))
+JSLL_EVENTS_MAX_INTERVAL_SEC = int(os.getenv('JSLL_EVENTS_MAX_INTERVAL_SEC', '7200'))
+JSLL_EVENTS_BURST_INTERVAL_SEC = int(os.getenv('JSLL_EVENTS_BURST_INTERVAL_SEC', '120'))
+JSLL_EVENTS_BACKOFF_FACTOR = float(os.getenv('JSLL_EVENTS_BACKOFF_FACTOR', '2'))
+JSLL_EVENTS_CATALYST_HOURS = int(os.getenv('JSLL_EVENTS_CATALYST_HOURS', '12'))
+# MM-DD:MM-DD ranges (IST dates) when quarterly results usually land.
+JSLL_RESULTS_SEASONS = [
+    window.strip()
+    for window in os.getenv('JSLL_RESULTS_SEASONS', '01-10:02-15,04-10:05-31,07-10:08-15,10-10:11-15').split(',')
+    if window.strip()
+]
 
 INSTALLED_APPS = [
     'django.contrib.admin',
@@ -40,10 +66,12 @@ INSTALLED_APPS = [
     'apps.ml',
     'apps.tournament',
     'apps.api',
+    'apps.ops',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'apps.ops.middleware.QueryCountMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -135,6 +163,43 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = JSLL_MARKET_TZ
 
+# Single-flight task locks: 'redis' in deployments, 'local' (in-process) for
+# tests and single-worker development.
+JSLL_LOCK_BACKEND = os.getenv('JSLL_LOCK_BACKEND', 'local' if 'test' in sys.argv else 'redis')
+JSLL_LOCK_REDIS_URL = os.getenv('JSLL_LOCK_REDIS_URL', os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+
+# Pipeline stage timings and row counters served at /metrics: 'redis' shares
+# them across web and worker processes, 'local' keeps them per process, 'off'
+# disables them (run tables still get their timings_json summary).
+JSLL_METRICS_BACKEND = os.getenv('JSLL_METRICS_BACKEND', 'local' if 'test' in sys.argv else 'redis')
+JSLL_METRICS_REDIS_URL = os.getenv('JSLL_METRICS_REDIS_URL', JSLL_LOCK_REDIS_URL)
+
+# Profiles from `--profile` and from the Celery tasks listed in
+# JSLL_PROFILE_TASKS (comma-separated task names, or 'all').
+JSLL_PROFILE_DIR = os.getenv('JSLL_PROFILE_DIR', str(BASE_DIR / 'logs' / 'profiles'))
+JSLL_PROFILE_TASKS = os.getenv('JSLL_PROFILE_TASKS', '')
+JSLL_BENCH_DIR = os.getenv('JSLL_BENCH_DIR', str(BASE_DIR / 'logs' / 'bench'))
+
+# X-DB-Query-Count / X-DB-Query-Ms response headers, read by `manage.py
+# loadtest` for query budgets.  Unset (None) follows DEBUG at request time, so
+# settings modules that change DEBUG need not repeat it.
+JSLL_QUERY_COUNT_HEADER = (
+    os.getenv('JSLL_QUERY_COUNT_HEADER').lower() in {'1', 'true', 'yes'}
+    if os.getenv('JSLL_QUERY_COUNT_HEADER')
+    else None
+)
+JSLL_LOADTEST_CONFIG = os.getenv('JSLL_LOADTEST_CONFIG', str(BASE_DIR / 'config' / 'loadtest.json'))
+
+# Provider record/replay (apps.ops.tape): '' calls the network, 'record' also
+# saves raw responses, 'replay' serves saved responses with injected latency
+# and failures instead of calling the network.
+JSLL_PROVIDER_TAPE_MODE = os.getenv('JSLL_PROVIDER_TAPE_MODE', '')
+JSLL_PROVIDER_TAPE_DIR = os.getenv('JSLL_PROVIDER_TAPE_DIR', str(BASE_DIR / 'logs' / 'tapes'))
+JSLL_PROVIDER_TAPE_LATENCY_MS = float(os.getenv('JSLL_PROVIDER_TAPE_LATENCY_MS', '0'))
+JSLL_PROVIDER_TAPE_JITTER_MS = float(os.getenv('JSLL_PROVIDER_TAPE_JITTER_MS', '0'))
+JSLL_PROVIDER_TAPE_FAILURE_RATE = float(os.getenv('JSLL_PROVIDER_TAPE_FAILURE_RATE', '0'))
+JSLL_PROVIDER_TAPE_SEED = int(os.getenv('JSLL_PROVIDER_TAPE_SEED', '0'))
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -2,4 +2,4 @@ import os
 
 from .base import *
 
-DEBUG = os.getenv('DEBUG', 'true').lower() in {'1', 'true', 'yes'}
\ No newline at end of file
+DEBUG = os.getenv('DEBUG', 'true').lower() in {'1', 'true', 'yes'}
@@ -7,10 +7,12 @@ from drf_spectacular.views import (
 )
 
 from apps.api.views import PredictionsLatestView, dashboard
+from apps.ops.views import metrics
 
 urlpatterns = [
     path('', dashboard, name='dashboard'),
     path('admin/', admin.site.urls),
+    path('metrics', metrics, name='metrics'),
     path('api/v1/', include('apps.api.urls')),
     path('api/predictions/latest', PredictionsLatestView.as_view(), name='predictions-latest-root'),
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),